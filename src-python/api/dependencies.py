@@ -152,4 +152,12 @@ async def cleanup_services():
     # if _connection_service:
     #     await _connection_service.cleanup()
     
+    # Volcar métricas pendientes antes de detener el executor
+    from services.database.mediamtx_db_service import flush_mediamtx_metrics
+    await flush_mediamtx_metrics()
+    
+    # Detener los hilos del executor de BD tras cerrar los servicios
+    from services.database.db_executor import shutdown_db_executor
+    shutdown_db_executor()
+    
     logger.info("Servicios limpiados correctamente")
\ No newline at end of file
@@ -28,6 +28,7 @@ if sys.platform == 'win32':
 from api.config import settings
 from api.middleware import setup_middleware
 from api.dependencies import cleanup_services, create_response
+from api.responses import FastJSONResponse
 
 # Importar routers
 from routers import scanner, config, streaming
@@ -101,6 +102,7 @@ app = FastAPI(
     version=settings.app_version,
     description="API REST y WebSocket para Universal Camera Viewer",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json"
@@ -0,0 +1,23 @@
+"""
+Clases de respuesta de la API
+"""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from utils.json_codec import dumps
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse serializada con ``utils.json_codec``.
+
+    Es la clase de respuesta por defecto de la aplicación. Los endpoints
+    con colecciones grandes pueden devolverla directamente para evitar
+    el recorrido de ``jsonable_encoder``: datetime, Enum y NumPy se
+    serializan de forma nativa.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
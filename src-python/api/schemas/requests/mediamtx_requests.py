@@ -87,6 +87,12 @@ class GetMetricsRequest(BaseModel):
         None,
         description="Intervalo de agregación (1m, 5m, 1h, etc.)"
     )
+    max_points: Optional[int] = Field(
+        None,
+        ge=10,
+        le=10000,
+        description="Máximo de puntos; si se indica, la serie sale de los rollups"
+    )
     
     @validator('start_time', 'end_time')
     def validate_custom_range(cls, v, values):
@@ -201,6 +201,15 @@ class PublishMetricsSnapshot(BaseModel):
         }
 
 
+class MetricAggregate(BaseModel):
+    """Estadísticos de una métrica dentro de un cubo de tiempo."""
+    
+    avg: float = Field(..., description="Media")
+    min: Optional[float] = Field(None, description="Mínimo")
+    max: Optional[float] = Field(None, description="Máximo")
+    p95: Optional[float] = Field(None, description="Percentil 95")
+
+
 class MetricPoint(BaseModel):
     """Punto de métrica individual."""
     
@@ -213,6 +222,11 @@ class MetricPoint(BaseModel):
     viewer_count: Optional[int] = Field(None, description="Viewers conectados")
     cpu_usage_percent: Optional[float] = Field(None, description="Uso de CPU %")
     memory_usage_mb: Optional[float] = Field(None, description="Uso de memoria MB")
+    samples: Optional[int] = Field(None, description="Muestras agregadas en el punto")
+    fps_stats: Optional[MetricAggregate] = Field(None, description="FPS del cubo")
+    bitrate_stats: Optional[MetricAggregate] = Field(None, description="Bitrate del cubo")
+    viewers_stats: Optional[MetricAggregate] = Field(None, description="Viewers del cubo")
+    quality_stats: Optional[MetricAggregate] = Field(None, description="Quality score del cubo")
     
     class Config:
         from_attributes = True
@@ -274,6 +288,10 @@ class PublicationMetricsResponse(BaseModel):
     data_points: List[MetricPoint] = Field(..., description="Puntos de métrica")
     summary: MetricsSummary = Field(..., description="Resumen estadístico")
     viewer_stats: Optional[ViewerStats] = Field(None, description="Estadísticas de viewers")
+    bucket_seconds: Optional[int] = Field(
+        None,
+        description="Segundos por punto si la serie sale de los rollups"
+    )
     
     class Config:
         from_attributes = True
@@ -0,0 +1,3 @@
+"""
+Benchmarks del pipeline de streaming con fuentes sintéticas.
+"""
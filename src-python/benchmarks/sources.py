@@ -0,0 +1,221 @@
+"""
+Fuentes de video sintéticas para benchmarks del pipeline de streaming.
+
+Sustituyen a las cámaras reales por un ``StreamManager`` que entrega frames
+a la cadencia nativa de una cámara: un patrón generado (barras en
+movimiento) o un archivo de video local reproducido en bucle. El resto del
+pipeline (slot de captura, planificador de FPS, codificación, difusión y
+envío por WebSocket) es el de producción.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+from models.streaming import StreamModel, StreamProtocol
+from models import ConnectionConfig
+from utils.video import FrameConverter
+from services.video.stream_manager import StreamManager, StreamManagerFactory
+
+
+class CaptureClock:
+    """
+    Registro del instante de captura de cada frame entregado.
+
+    Los frames se identifican por ``id()`` del array; el registro es
+    acotado y solo debe consultarse mientras el frame siga referenciado
+    (``EncodedFrame.source`` lo mantiene vivo hasta el envío).
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self._times: "OrderedDict[int, float]" = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def mark(self, frame: np.ndarray) -> None:
+        """Registra el instante de captura (``time.perf_counter``)."""
+        with self._lock:
+            self._times[id(frame)] = time.perf_counter()
+            while len(self._times) > self._max_entries:
+                self._times.popitem(last=False)
+
+    def get(self, frame: Optional[np.ndarray]) -> Optional[float]:
+        """Obtiene el instante de captura de un frame."""
+        if frame is None:
+            return None
+        with self._lock:
+            return self._times.get(id(frame))
+
+
+class SyntheticStreamManager(StreamManager):
+    """
+    Stream manager que simula una cámara a ``native_fps``.
+
+    ``_grab_frame`` bloquea hasta el siguiente frame de la "cámara", igual
+    que un ``VideoCapture.grab`` sobre RTSP, así que el planificador de
+    captura descarta frames igual que en producción.
+    """
+
+    PATTERN_FRAMES = 8
+
+    def __init__(
+        self,
+        stream_model: StreamModel,
+        connection_config: Optional[ConnectionConfig],
+        frame_converter: FrameConverter,
+        resolution: Tuple[int, int] = (1280, 720),
+        native_fps: float = 25.0,
+        source_file: Optional[str] = None,
+        clock: Optional[CaptureClock] = None
+    ):
+        """
+        Inicializa la fuente.
+
+        Args:
+            stream_model: Modelo del stream
+            connection_config: No se usa (interfaz de StreamManager)
+            frame_converter: Convertidor de frames
+            resolution: Resolución (width, height) del patrón generado
+            native_fps: FPS de la cámara simulada
+            source_file: Archivo de video a reproducir en bucle (opcional)
+            clock: Registro compartido de instantes de captura
+        """
+        super().__init__(stream_model, connection_config, frame_converter)
+        self.resolution = resolution
+        self.native_fps = native_fps
+        self.source_file = source_file
+        self.clock = clock or CaptureClock()
+
+        self._patterns: list = []
+        self._pattern_index = 0
+        self._next_frame_time = 0.0
+
+    async def _initialize_connection(self) -> None:
+        if self.source_file:
+            import cv2
+
+            self._connection = cv2.VideoCapture(self.source_file)
+            if not self._connection.isOpened():
+                raise ConnectionError(f"No se pudo abrir {self.source_file}")
+            file_fps = self._connection.get(cv2.CAP_PROP_FPS)
+            if file_fps and file_fps > 0:
+                self.native_fps = file_fps
+            self.resolution = (
+                int(self._connection.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                int(self._connection.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            )
+        else:
+            self._patterns = self._build_patterns()
+
+        self._next_frame_time = time.perf_counter()
+        self.stream_model.metadata.update({
+            'width': self.resolution[0],
+            'height': self.resolution[1],
+            'native_fps': self.native_fps,
+            'codec': 'synthetic' if not self.source_file else 'file'
+        })
+
+    def _build_patterns(self) -> list:
+        """Genera barras de color desplazadas (contenido no trivial para JPEG)."""
+        width, height = self.resolution
+        x = np.arange(width, dtype=np.int32)
+        y = np.arange(height, dtype=np.int32)[:, None]
+
+        patterns = []
+        for i in range(self.PATTERN_FRAMES):
+            offset = i * width // self.PATTERN_FRAMES
+            frame = np.empty((height, width, 3), dtype=np.uint8)
+            frame[..., 0] = ((x + offset) * 255 // width % 256).astype(np.uint8)
+            frame[..., 1] = (y * 255 // height).astype(np.uint8)
+            frame[..., 2] = (((x + offset) // 64 + y // 64) % 2 * 200).astype(np.uint8)
+            patterns.append(frame)
+        return patterns
+
+    async def _validate_stream(self) -> None:
+        if not self.source_file and not self._patterns:
+            raise ValueError("Fuente sintética sin frames")
+
+    def _grab_frame(self) -> Optional[bool]:
+        # Esperar al siguiente frame de la cámara simulada
+        delay = self._next_frame_time - time.perf_counter()
+        if delay > 0 and self._capture_stop.wait(delay):
+            return False
+        # Como el buffer RTSP: si el consumidor se atrasa, los frames llegan
+        # en ráfaga hasta recuperar, con un máximo de un segundo acumulado
+        self._next_frame_time = max(
+            self._next_frame_time + 1.0 / self.native_fps,
+            time.perf_counter() - 1.0
+        )
+
+        if self.source_file:
+            ret = self._connection.grab()
+            if not ret:
+                # Fin del archivo: volver al inicio
+                import cv2
+                self._connection.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret = self._connection.grab()
+            return bool(ret)
+
+        self._pattern_index = (self._pattern_index + 1) % len(self._patterns)
+        return True
+
+    def _retrieve_frame(self) -> Optional[np.ndarray]:
+        if self.source_file:
+            ret, frame = self._connection.retrieve()
+            if not ret:
+                return None
+        else:
+            # Copia: equivale al buffer de salida de un decodificador
+            frame = self._patterns[self._pattern_index].copy()
+
+        self.clock.mark(frame)
+        return frame
+
+    def _capture_frame(self) -> Optional[np.ndarray]:
+        if not self._grab_frame():
+            return None
+        return self._retrieve_frame()
+
+    async def _close_connection(self) -> None:
+        if self.source_file and self._connection is not None:
+            self._connection.release()
+        self._connection = None
+
+
+class SyntheticStreamManagerFactory(StreamManagerFactory):
+    """Factory que crea fuentes sintéticas para cualquier protocolo."""
+
+    def __init__(
+        self,
+        resolution: Tuple[int, int] = (1280, 720),
+        native_fps: float = 25.0,
+        source_file: Optional[str] = None,
+        clock: Optional[CaptureClock] = None
+    ):
+        super().__init__()
+        self.resolution = resolution
+        self.native_fps = native_fps
+        self.source_file = source_file
+        self.clock = clock or CaptureClock()
+
+    def create_stream_manager(
+        self,
+        protocol: StreamProtocol,
+        stream_model: StreamModel,
+        connection_config: ConnectionConfig,
+        frame_converter: FrameConverter,
+        decode_backend: Optional[str] = None,
+        keyframes_only: bool = False
+    ) -> StreamManager:
+        return SyntheticStreamManager(
+            stream_model,
+            connection_config,
+            frame_converter,
+            resolution=self.resolution,
+            native_fps=self.native_fps,
+            source_file=self.source_file,
+            clock=self.clock
+        )
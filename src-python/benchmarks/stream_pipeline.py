@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Benchmark del pipeline captura → codificación → WebSocket.
+
+Levanta ``VideoStreamService`` con fuentes sintéticas (patrón generado o
+archivo local) y conecta visores ``StreamHandler`` sobre WebSockets en
+memoria, sin cámaras reales. Para cada combinación de cámaras, visores por
+cámara y resolución mide:
+
+- FPS capturados, publicados y enviados
+- Latencias por etapa (p50/p95/p99): captura→publicación (slot + codificación),
+  publicación→envío (difusión + envío) y extremo a extremo
+- CPU por etapa (threads de captura, pool de codificación, event loop) y RSS
+
+El resultado se imprime como JSON (o se guarda con ``--output``) para
+compararlo entre versiones.
+
+Uso:
+    python benchmarks/stream_pipeline.py --cameras 1,4,16 --viewers 1,4 \\
+        --resolution 1280x720 --duration 10 --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Agregar src-python al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import psutil
+
+from benchmarks.sources import CaptureClock, SyntheticStreamManagerFactory
+from models import ConnectionConfig
+from models.streaming import StreamProtocol, EncodedFrame
+from services.video.frame_broadcast_hub import FrameBroadcastHub
+from services.video.video_stream_service import VideoStreamService
+from utils.video.latency_tracker import LatencyTracker
+from websocket.connection_manager import manager
+from websocket.stream_handler import StreamHandler
+
+
+# Grupos de threads para el reparto de CPU por etapa
+THREAD_STAGES = (
+    ("capture", "capture_"),
+    ("encode", "frame_encode"),
+)
+
+
+@dataclass
+class BenchmarkScenario:
+    """Combinación de parámetros de una ejecución."""
+    cameras: int
+    viewers_per_camera: int
+    width: int
+    height: int
+    target_fps: int = 15
+    native_fps: float = 25.0
+    transport: str = "binary"
+    jpeg_quality: int = 85
+    duration: float = 10.0
+    warmup: float = 2.0
+    source_file: Optional[str] = None
+
+
+class _ClientState:
+    """Estado de conexión compatible con ``WebSocketState.CONNECTED``."""
+    value = 1
+
+
+class MemoryWebSocket:
+    """
+    WebSocket en memoria: acepta todos los envíos y cuenta mensajes y bytes.
+
+    Cede el control al event loop en cada envío, como haría un socket con
+    buffer disponible.
+    """
+
+    def __init__(self):
+        self.client_state = _ClientState()
+        self.messages = 0
+        self.bytes = 0
+
+    async def accept(self) -> None:
+        return None
+
+    async def send_text(self, data: str) -> None:
+        self.messages += 1
+        self.bytes += len(data)
+        await asyncio.sleep(0)
+
+    async def send_bytes(self, data: bytes) -> None:
+        self.messages += 1
+        self.bytes += len(data)
+        await asyncio.sleep(0)
+
+    async def send_json(self, data: Dict[str, Any]) -> None:
+        await self.send_text(json.dumps(data))
+
+
+class StageRecorder:
+    """Registra los instantes de cada frame por etapa."""
+
+    def __init__(self, clock: CaptureClock):
+        self.clock = clock
+        self.latency = LatencyTracker(window_size=20000)
+        self._published: Dict[Tuple[str, int], Tuple[Optional[float], float]] = {}
+        self._lock = threading.Lock()
+        self.frames_published = 0
+        self.frames_sent = 0
+        self.recording = False
+
+    def reset(self) -> None:
+        """Descarta lo medido durante el calentamiento."""
+        self.latency.reset()
+        self.frames_published = 0
+        self.frames_sent = 0
+
+    def published(self, frame: EncodedFrame) -> None:
+        """Frame codificado entregado por el pipeline."""
+        now = time.perf_counter()
+        captured = self.clock.get(frame.source)
+
+        with self._lock:
+            self._published[(frame.camera_id, frame.sequence)] = (captured, now)
+            # Mantener acotado el registro de frames en vuelo
+            if len(self._published) > 50000:
+                for key in list(self._published)[:10000]:
+                    del self._published[key]
+
+        if self.recording:
+            self.frames_published += 1
+            if captured is not None:
+                self.latency.record("capture_to_publish", (now - captured) * 1000)
+
+    def sent(self, frame: Any) -> None:
+        """Frame enviado a un visor."""
+        if not self.recording or not isinstance(frame, EncodedFrame):
+            return
+
+        now = time.perf_counter()
+        with self._lock:
+            entry = self._published.get((frame.camera_id, frame.sequence))
+
+        self.frames_sent += 1
+        if entry is None:
+            return
+
+        captured, published = entry
+        self.latency.record("publish_to_send", (now - published) * 1000)
+        if captured is not None:
+            self.latency.record("end_to_end", (now - captured) * 1000)
+
+
+class BenchmarkStreamHandler(StreamHandler):
+    """StreamHandler de producción con registro del instante de envío."""
+
+    def __init__(self, camera_id: str, websocket: Any, client_id: str, recorder: StageRecorder):
+        super().__init__(camera_id, websocket, client_id)
+        self.recorder = recorder
+
+    async def _deliver_frame(self, frame_data: Any) -> None:
+        await super()._deliver_frame(frame_data)
+        self.recorder.sent(frame_data)
+
+
+class ResourceSampler:
+    """
+    Muestrea RSS periódicamente y reparte el tiempo de CPU por etapa.
+
+    La CPU por etapa se obtiene agrupando los tiempos de CPU de cada thread
+    del proceso según su nombre; los procesos hijos (pool de codificación en
+    modo proceso) se suman a la etapa ``encode``.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.rss_samples: List[int] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_cpu: Dict[str, float] = {}
+        self._start_time = 0.0
+
+    def _stage_cpu_times(self) -> Dict[str, float]:
+        """Tiempo de CPU acumulado (s) por etapa."""
+        names = {t.native_id: t.name for t in threading.enumerate() if t.native_id}
+        main_id = threading.main_thread().native_id
+
+        totals: Dict[str, float] = {"event_loop": 0.0, "other": 0.0}
+        for stage, _ in THREAD_STAGES:
+            totals[stage] = 0.0
+
+        for thread in self.process.threads():
+            cpu = thread.user_time + thread.system_time
+            name = names.get(thread.id, "")
+            if thread.id == main_id:
+                totals["event_loop"] += cpu
+                continue
+            for stage, prefix in THREAD_STAGES:
+                if name.startswith(prefix):
+                    totals[stage] += cpu
+                    break
+            else:
+                totals["other"] += cpu
+
+        for child in self.process.children(recursive=True):
+            try:
+                times = child.cpu_times()
+                totals["encode"] += times.user + times.system
+            except psutil.Error:
+                continue
+
+        return totals
+
+    def start(self) -> None:
+        """Inicia el muestreo."""
+        self.rss_samples.clear()
+        self._stop.clear()
+        self._start_cpu = self._stage_cpu_times()
+        self._start_time = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample_loop, name="bench_sampler", daemon=True)
+        self._thread.start()
+
+    def _sample_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.rss_samples.append(self.process.memory_info().rss)
+
+    def stop(self) -> Dict[str, Any]:
+        """Detiene el muestreo y devuelve CPU (% de un núcleo) y RSS."""
+        end_cpu = self._stage_cpu_times()
+        elapsed = max(time.perf_counter() - self._start_time, 1e-6)
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+        cpu_percent = {
+            stage: round((end_cpu.get(stage, 0.0) - self._start_cpu.get(stage, 0.0)) / elapsed * 100, 1)
+            for stage in end_cpu
+        }
+        cpu_percent["total"] = round(sum(cpu_percent.values()), 1)
+
+        rss = self.rss_samples or [self.process.memory_info().rss]
+        mb = 1024 * 1024
+        return {
+            "cpu_percent": cpu_percent,
+            "rss_mb": {
+                "avg": round(sum(rss) / len(rss) / mb, 1),
+                "peak": round(max(rss) / mb, 1),
+                "end": round(rss[-1] / mb, 1)
+            }
+        }
+
+
+async def run_scenario(scenario: BenchmarkScenario) -> Dict[str, Any]:
+    """
+    Ejecuta un escenario y devuelve sus métricas.
+
+    Args:
+        scenario: Parámetros de la ejecución
+
+    Returns:
+        Diccionario con throughput, latencias y recursos
+    """
+    clock = CaptureClock()
+    recorder = StageRecorder(clock)
+    hub = FrameBroadcastHub()
+    sampler = ResourceSampler()
+
+    service = VideoStreamService()
+    service.set_manager_factory(SyntheticStreamManagerFactory(
+        resolution=(scenario.width, scenario.height),
+        native_fps=scenario.native_fps,
+        source_file=scenario.source_file,
+        clock=clock
+    ))
+
+    def publish(camera_id: str, frame: Any) -> None:
+        if isinstance(frame, EncodedFrame):
+            recorder.published(frame)
+            hub.publish(camera_id, frame)
+
+    connection_config = ConnectionConfig(ip="127.0.0.1", username="benchmark", password="")
+    camera_ids = [f"bench_cam_{i:02d}" for i in range(scenario.cameras)]
+    handlers: List[BenchmarkStreamHandler] = []
+    subscriptions = []
+    tasks: List[asyncio.Task] = []
+
+    try:
+        for camera_id in camera_ids:
+            await service.start_stream(
+                camera_id=camera_id,
+                connection_config=connection_config,
+                protocol=StreamProtocol.GENERIC,
+                on_frame_callback=publish,
+                target_fps=scenario.target_fps,
+                frame_format="bytes",
+                jpeg_quality=scenario.jpeg_quality,
+                max_width=scenario.width
+            )
+
+            for _ in range(scenario.viewers_per_camera):
+                client_id = f"bench_{uuid.uuid4().hex[:8]}"
+                websocket = MemoryWebSocket()
+                await manager.connect(websocket, client_id)
+
+                handler = BenchmarkStreamHandler(camera_id, websocket, client_id, recorder)
+                handler.transport = scenario.transport
+                handler.fps = scenario.target_fps
+                handler.frame_interval = 1.0 / scenario.target_fps
+                handler.is_streaming = True
+                handler.start_time = datetime.utcnow()
+
+                subscription = hub.subscribe(camera_id, client_id)
+                handlers.append(handler)
+                subscriptions.append(subscription)
+                tasks.append(asyncio.create_task(handler.consume_subscription(subscription)))
+
+        await asyncio.sleep(scenario.warmup)
+
+        recorder.reset()
+        recorder.recording = True
+        sampler.start()
+        await asyncio.sleep(scenario.duration)
+        resources = sampler.stop()
+        recorder.recording = False
+
+        dropped = sum(
+            (service.get_stream_metrics(camera_id) or {}).get('dropped_frames', 0)
+            for camera_id in camera_ids
+        )
+        encode_latency = [
+            (service.get_stream_metrics(camera_id) or {}).get('encode_latency')
+            for camera_id in camera_ids
+        ]
+        encode_p95 = [summary['p95_ms'] for summary in encode_latency if summary]
+        hub_stats = hub.get_stats()
+
+    finally:
+        for handler in handlers:
+            handler.is_streaming = False
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for subscription in subscriptions:
+            hub.unsubscribe(subscription)
+        for handler in handlers:
+            await manager.disconnect(handler.client_id)
+        await service.stop_all_streams()
+
+    viewers = scenario.cameras * scenario.viewers_per_camera
+    latencies = recorder.latency.get_all_summaries()
+
+    return {
+        "scenario": asdict(scenario),
+        "throughput": {
+            "published_fps": round(recorder.frames_published / scenario.duration, 1),
+            "sent_fps": round(recorder.frames_sent / scenario.duration, 1),
+            "sent_fps_per_viewer": round(recorder.frames_sent / scenario.duration / max(viewers, 1), 1),
+            "dropped_capture_frames": dropped,
+            # Incluye el calentamiento: frames que un visor lento no llegó a leer
+            "viewer_dropped_frames": sum(
+                subscription.get("dropped_frames", 0)
+                for camera in hub_stats.values()
+                for subscription in camera["subscriptions"]
+            )
+        },
+        "latency_ms": {
+            **latencies,
+            "encode_p95_max": max(encode_p95) if encode_p95 else None
+        },
+        "resources": resources
+    }
+
+
+def _parse_int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def _parse_resolutions(value: str) -> List[Tuple[int, int]]:
+    resolutions = []
+    for item in value.split(","):
+        width, _, height = item.strip().lower().partition("x")
+        resolutions.append((int(width), int(height)))
+    return resolutions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Crea el parser de argumentos de la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de streaming")
+    parser.add_argument("--cameras", default="1,4,16", help="Cámaras por escenario (lista, 1-64)")
+    parser.add_argument("--viewers", default="1", help="Visores por cámara (lista)")
+    parser.add_argument("--resolution", default="1280x720", help="Resoluciones WxH (lista)")
+    parser.add_argument("--fps", type=int, default=15, help="FPS objetivo del stream")
+    parser.add_argument("--native-fps", type=float, default=25.0, help="FPS de la cámara simulada")
+    parser.add_argument("--transport", choices=("json", "binary"), default="binary")
+    parser.add_argument("--quality", type=int, default=85, help="Calidad JPEG")
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos medidos por escenario")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Segundos de calentamiento")
+    parser.add_argument("--source", default="pattern", help="'pattern' o ruta a un archivo de video")
+    parser.add_argument("--output", help="Archivo JSON de salida (stdout si se omite)")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar logs del pipeline")
+    return parser
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """Ejecuta todos los escenarios de la línea de comandos."""
+    source_file = None if args.source == "pattern" else args.source
+    results = []
+
+    for width, height in _parse_resolutions(args.resolution):
+        for cameras in _parse_int_list(args.cameras):
+            if not 1 <= cameras <= 64:
+                raise ValueError(f"Número de cámaras fuera de rango (1-64): {cameras}")
+            for viewers in _parse_int_list(args.viewers):
+                scenario = BenchmarkScenario(
+                    cameras=cameras,
+                    viewers_per_camera=viewers,
+                    width=width,
+                    height=height,
+                    target_fps=args.fps,
+                    native_fps=args.native_fps,
+                    transport=args.transport,
+                    jpeg_quality=args.quality,
+                    duration=args.duration,
+                    warmup=args.warmup,
+                    source_file=source_file
+                )
+                print(
+                    f"▶ {cameras} cámaras x {viewers} visores @ {width}x{height}",
+                    file=sys.stderr
+                )
+                results.append(await run_scenario(scenario))
+
+    await VideoStreamService().cleanup()
+
+    return {
+        "benchmark": "stream_pipeline",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "encode_executor": os.getenv("VIDEO_ENCODE_EXECUTOR", "thread")
+        },
+        "results": results
+    }
+
+
+def main() -> int:
+    """Punto de entrada de la línea de comandos."""
+    args = build_parser().parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR)
+    if not args.verbose:
+        # Los servicios usan loggers propios con nivel explícito
+        logging.disable(logging.WARNING)
+
+    report = asyncio.run(run_benchmark(args))
+    output = json.dumps(report, indent=2)
+
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+        print(f"Resultados guardados en {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
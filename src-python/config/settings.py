@@ -29,11 +29,27 @@ class Settings:
     # Configuración de WebSocket
     WS_HEARTBEAT_INTERVAL: int = int(os.getenv("WS_HEARTBEAT_INTERVAL", "30"))
     WS_MAX_CONNECTIONS: int = int(os.getenv("WS_MAX_CONNECTIONS", "100"))
+    # Cola de salida por conexión: al superar frames o bytes se descartan los frames más antiguos
+    WS_SEND_QUEUE_MAX_FRAMES: int = int(os.getenv("WS_SEND_QUEUE_MAX_FRAMES", "5"))
+    WS_SEND_QUEUE_MAX_BYTES: int = int(os.getenv("WS_SEND_QUEUE_MAX_BYTES", str(4 * 1024 * 1024)))
+    # Segundos máximos por destinatario en los broadcast
+    WS_SEND_TIMEOUT: float = float(os.getenv("WS_SEND_TIMEOUT", "1.0"))
     
     # Configuración de streaming
     DEFAULT_FPS: int = int(os.getenv("DEFAULT_FPS", "30"))
     DEFAULT_QUALITY: str = os.getenv("DEFAULT_QUALITY", "medium")
     STREAM_BUFFER_SIZE: int = int(os.getenv("STREAM_BUFFER_SIZE", "5"))
+    # Pool de codificación de frames: "thread" (por defecto) o "process"
+    VIDEO_ENCODE_EXECUTOR: str = os.getenv("VIDEO_ENCODE_EXECUTOR", "thread")
+    VIDEO_ENCODE_WORKERS: int = int(os.getenv("VIDEO_ENCODE_WORKERS", "0"))  # 0 = automático
+    # Decodificación RTSP: "opencv" (por defecto) o "ffmpeg" (requiere ffmpeg/ffprobe)
+    VIDEO_DECODE_BACKEND: str = os.getenv("VIDEO_DECODE_BACKEND", "opencv")
+    VIDEO_DECODER_THREADS: int = int(os.getenv("VIDEO_DECODER_THREADS", "0"))  # 0 = automático
+    # Vista de mosaico: miniaturas desde el substream a pocos FPS
+    GRID_TILE_FPS: int = int(os.getenv("GRID_TILE_FPS", "2"))
+    GRID_MAX_TILES: int = int(os.getenv("GRID_MAX_TILES", "64"))
+    GRID_USE_SUBSTREAM: bool = os.getenv("GRID_USE_SUBSTREAM", "true").lower() == "true"
+    GRID_KEYFRAMES_ONLY: bool = os.getenv("GRID_KEYFRAMES_ONLY", "false").lower() == "true"
     
     # Configuración de cámaras específicas
     # Dahua
@@ -46,6 +62,9 @@ class Settings:
     CONNECTION_TIMEOUT: int = int(os.getenv("CONNECTION_TIMEOUT", "10"))
     MAX_RETRIES: int = int(os.getenv("MAX_RETRIES", "3"))
     RETRY_DELAY: float = float(os.getenv("RETRY_DELAY", "1.0"))
+    # Discovery de protocolos: pruebas simultáneas e intervalo mínimo por host
+    DISCOVERY_MAX_CONCURRENCY: int = int(os.getenv("DISCOVERY_MAX_CONCURRENCY", "8"))
+    DISCOVERY_HOST_MIN_INTERVAL_MS: int = int(os.getenv("DISCOVERY_HOST_MIN_INTERVAL_MS", "100"))
     
     # Rutas RTSP por marca
     RTSP_PATHS = {
@@ -61,6 +80,16 @@ class Settings:
     # Usar ruta absoluta basada en src-python
     _default_db_path = str(Path(__file__).parent.parent / "data" / "camera_data.db")
     DATABASE_PATH: str = os.getenv("DATABASE_PATH", _default_db_path)
+    # Pragmas de las conexiones SQLite compartidas (WAL)
+    DB_MMAP_SIZE_MB: int = int(os.getenv("DB_MMAP_SIZE_MB", "64"))
+    DB_CACHE_SIZE_MB: int = int(os.getenv("DB_CACHE_SIZE_MB", "16"))
+    DB_BUSY_TIMEOUT_MS: int = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+    # Executor de BD: un hilo escritor y N lectores
+    DB_READER_THREADS: int = int(os.getenv("DB_READER_THREADS", "4"))
+    # Buffer write-behind de publication_metrics
+    METRICS_BATCH_ROWS: int = int(os.getenv("METRICS_BATCH_ROWS", "200"))
+    METRICS_FLUSH_INTERVAL_MS: int = int(os.getenv("METRICS_FLUSH_INTERVAL_MS", "2000"))
+    METRICS_BUFFER_MAX_ROWS: int = int(os.getenv("METRICS_BUFFER_MAX_ROWS", "10000"))
     
     # Configuración de caché
     CACHE_TTL: int = int(os.getenv("CACHE_TTL", "300"))  # 5 minutos
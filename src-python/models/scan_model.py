@@ -21,13 +21,22 @@ import logging
 import socket
 import threading
 import time
+from collections.abc import Sequence
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional, Set, Tuple, Any, Callable
+from typing import Dict, List, Optional, Set, Tuple, Any, Callable, Awaitable, Iterable, Iterator
 
 from .camera_model import ProtocolType
+from utils.brand_manager import get_brand_manager
+from utils.network import (
+    DiscoveredDevice,
+    LivenessProber,
+    ProtocolFingerprinter,
+    ssdp_discovery,
+    ws_discovery
+)
 
 
 class ScanStatus(Enum):
@@ -76,6 +85,44 @@ class ScanConfig:
             raise ValueError("Debe especificar al menos un puerto")
 
 
+class IPRangeSequence(Sequence):
+    """
+    Secuencia perezosa de IPs de un rango.
+
+    Se comporta como una lista de strings (``len``, índices, iteración,
+    ``random.choice``) pero solo guarda los extremos del rango como enteros,
+    así que un /16 ocupa lo mismo que un /30.
+    """
+
+    __slots__ = ('_start', '_end')
+
+    def __init__(self, start: int, end: int):
+        self._start = start
+        self._end = end
+
+    def __len__(self) -> int:
+        return max(0, self._end - self._start + 1)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("IP fuera del rango")
+        return str(ipaddress.ip_address(self._start + index))
+
+    def __iter__(self) -> Iterator[str]:
+        for ip_int in range(self._start, self._end + 1):
+            yield str(ipaddress.ip_address(ip_int))
+
+    def __contains__(self, ip) -> bool:
+        try:
+            return self._start <= int(ipaddress.ip_address(ip)) <= self._end
+        except ValueError:
+            return False
+
+
 @dataclass
 class ScanRange:
     """Configuración de rango de escaneo."""
@@ -109,11 +156,39 @@ class ScanRange:
         """Total de combinaciones IP:Puerto a escanear."""
         return self.ip_count * len(self.ports)
     
-    def get_ip_list(self) -> List[str]:
-        """Genera lista de IPs en el rango."""
+    @property
+    def ips(self) -> IPRangeSequence:
+        """IPs del rango como secuencia perezosa (memoria constante)."""
         start = int(ipaddress.ip_address(self.start_ip))
         end = int(ipaddress.ip_address(self.end_ip))
-        return [str(ipaddress.ip_address(ip)) for ip in range(start, end + 1)]
+        return IPRangeSequence(start, end)
+    
+    def get_ip_list(self) -> List[str]:
+        """
+        Genera lista de IPs en el rango.
+        
+        Materializa todas las IPs; para rangos grandes usar ``ips`` o
+        ``iter_targets``.
+        """
+        return list(self.ips)
+    
+    def iter_targets(self, ports: Optional[List[int]] = None) -> Iterator[Tuple[str, int]]:
+        """
+        Genera pares (ip, puerto) bajo demanda.
+        
+        Los puertos de una IP son consecutivos, de modo que cada host se
+        sondea en bloque.
+        
+        Args:
+            ports: Puertos a combinar (por defecto los del rango)
+            
+        Returns:
+            Iterador de tuplas (ip, puerto)
+        """
+        ports = list(ports if ports is not None else self.ports)
+        for ip in self.ips:
+            for port in ports:
+                yield ip, port
 
 
 @dataclass
@@ -138,6 +213,7 @@ class ScanResult:
     """Resultado de escaneo de una IP específica."""
     ip: str
     hostname: Optional[str] = None
+    mac_address: Optional[str] = None
     is_alive: bool = False
     open_ports: List[int] = field(default_factory=list)
     detected_protocols: List[ProtocolDetectionResult] = field(default_factory=list)
@@ -218,15 +294,33 @@ class ScanModel:
     
     Gestiona el proceso completo de descubrimiento de cámaras IP en la red,
     incluyendo ping sweep, port scanning, y detección de protocolos.
+    
+    Los sondeos por IP/puerto se ejecutan con un pool fijo de
+    ``max_concurrent`` workers que consumen los objetivos de forma perezosa,
+    por lo que la memoria no crece con el tamaño del rango.
     """
     
+    # Notificar progreso cada N sondeos o cada T segundos (lo que ocurra antes)
+    PROGRESS_BATCH_SIZE = 256
+    PROGRESS_INTERVAL = 0.5
+    
+    # Timeout máximo por host en el ping sweep (se adapta al RTT de la subred)
+    LIVENESS_MAX_TIMEOUT = 1.5
+    
+    # Ventana de escucha de respuestas multicast (WS-Discovery / SSDP)
+    DISCOVERY_WINDOW = 3.0
+    
+    # Sondas para puertos sin protocolo conocido
+    DEFAULT_PROBE_PROTOCOLS = [ProtocolType.RTSP, ProtocolType.ONVIF, ProtocolType.HTTP]
+    
     def __init__(self, 
                  scan_id: str,
                  scan_range: ScanRange,
                  methods: Optional[List[ScanMethod]] = None,
                  max_concurrent: int = 50,
                  timeout: float = 5.0,
-                 include_offline: bool = False):
+                 include_offline: bool = False,
+                 known_results: Optional[Dict[str, ScanResult]] = None):
         """
         Inicializa el modelo de escaneo.
         
@@ -237,6 +331,8 @@ class ScanModel:
             max_concurrent: Máximo de tareas concurrentes
             timeout: Timeout por operación
             include_offline: Incluir IPs offline en resultados
+            known_results: Resultados recientes del índice por IP; los hosts
+                activos sin cambios los reutilizan en vez de sondearse
         """
         self.logger = logging.getLogger(f"{__name__}.{scan_id}")
         
@@ -248,6 +344,10 @@ class ScanModel:
         self.timeout = timeout
         self.include_offline = include_offline
         
+        # Escaneo incremental
+        self.known_results = known_results or {}
+        self.reused_ips: Set[str] = set()
+        
         # Estado del escaneo
         self._status = ScanStatus.IDLE
         self._status_lock = threading.Lock()
@@ -263,16 +363,26 @@ class ScanModel:
         self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix=f"scan_{scan_id}")
         self._cancel_event = threading.Event()
         self._progress_callbacks: List[Callable[[ScanProgress], None]] = []
+        self._pending_progress = 0
+        self._last_progress_notify = 0.0
+        self._alive_known = False
+        
+        # Sondeo de hosts activos (TCP + ARP, sin root)
+        self.liveness_prober = LivenessProber(max_timeout=min(timeout, self.LIVENESS_MAX_TIMEOUT))
         
         # Configuración de protocolos por puerto
         self.port_protocol_mapping = {
             80: [ProtocolType.HTTP, ProtocolType.ONVIF],
             554: [ProtocolType.RTSP],
-            8080: [ProtocolType.HTTP],
+            8554: [ProtocolType.RTSP],
+            5543: [ProtocolType.RTSP],
+            2020: [ProtocolType.ONVIF],
+            8080: [ProtocolType.HTTP, ProtocolType.ONVIF],
             37777: [ProtocolType.AMCREST],
-            8000: [ProtocolType.HTTP],
+            8000: [ProtocolType.HTTP, ProtocolType.ONVIF],
             443: [ProtocolType.HTTP],
         }
+        self._fingerprinter: Optional[ProtocolFingerprinter] = None
         
         self.logger.info(f"Scan model initialized: {scan_id} for range {scan_range.start_ip}-{scan_range.end_ip}")
     
@@ -329,6 +439,76 @@ class ScanModel:
             except Exception as e:
                 self.logger.error(f"Error in progress callback: {e}")
     
+    def _advance_progress(self, ips: int = 0, ports: int = 0, current_ip: Optional[str] = None):
+        """
+        Acumula progreso y notifica por lotes.
+        
+        Args:
+            ips: IPs completadas
+            ports: Puertos completados
+            current_ip: Última IP procesada
+        """
+        self.progress.scanned_ips += ips
+        self.progress.scanned_ports += ports
+        if current_ip is not None:
+            self.progress.current_ip = current_ip
+        self._pending_progress += 1
+        
+        if (self._pending_progress >= self.PROGRESS_BATCH_SIZE
+                or time.monotonic() - self._last_progress_notify >= self.PROGRESS_INTERVAL):
+            self._flush_progress()
+    
+    def _flush_progress(self):
+        """Notifica el progreso acumulado pendiente."""
+        if not self._pending_progress:
+            return
+        self._pending_progress = 0
+        self._last_progress_notify = time.monotonic()
+        self.progress.elapsed_time = self.duration_seconds
+        self._notify_progress()
+    
+    async def _run_worker_pool(self,
+                               targets: Iterable[Tuple[str, int]],
+                               handler: Callable[[str, int], Awaitable[None]]) -> int:
+        """
+        Ejecuta ``handler`` sobre cada objetivo con un pool fijo de workers.
+        
+        Los workers extraen los objetivos del iterador compartido bajo
+        demanda: nunca hay más de ``max_concurrent`` sondeos en vuelo ni
+        objetivos pendientes materializados.
+        
+        Args:
+            targets: Iterable de pares (ip, puerto)
+            handler: Corrutina a ejecutar por objetivo
+            
+        Returns:
+            Número de objetivos procesados
+        """
+        iterator = iter(targets)
+        processed = 0
+        
+        async def worker():
+            nonlocal processed
+            # next() es síncrono: los workers del mismo loop no compiten
+            for ip, port in iterator:
+                if self._cancel_event.is_set():
+                    return
+                try:
+                    await handler(ip, port)
+                except Exception as e:
+                    self.logger.error(f"Probe failed for {ip}:{port}: {e}")
+                processed += 1
+        
+        workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrent)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            self._flush_progress()
+        
+        return processed
+    
     # === Gestión de Escaneo ===
     
     async def start_scan_async(self) -> bool:
@@ -350,9 +530,12 @@ class ScanModel:
         self._cancel_event.clear()
         self.results.clear()
         self.errors.clear()
+        self.reused_ips.clear()
+        self._alive_known = False
+        self._pending_progress = 0
         
-        # Configurar progreso
-        ip_list = self.scan_range.get_ip_list()
+        # Configurar progreso (IPs perezosas: memoria constante)
+        ip_list = self.scan_range.ips
         self.progress = ScanProgress(
             total_ips=len(ip_list),
             total_ports=len(self.scan_range.ports)
@@ -417,7 +600,7 @@ class ScanModel:
         finally:
             loop.close()
     
-    async def _execute_scan_method(self, method: ScanMethod, ip_list: List[str]) -> bool:
+    async def _execute_scan_method(self, method: ScanMethod, ip_list: Sequence) -> bool:
         """Ejecuta un método de escaneo específico."""
         try:
             if method == ScanMethod.PING_SWEEP:
@@ -439,155 +622,177 @@ class ScanModel:
     
     # === Métodos de Escaneo Específicos ===
     
-    async def _ping_sweep(self, ip_list: List[str]) -> bool:
-        """Ejecuta ping sweep para identificar hosts activos."""
-        self.logger.debug(f"Starting ping sweep for {len(ip_list)} IPs")
+    async def _ping_sweep(self, ip_list: Sequence) -> bool:
+        """
+        Identifica hosts activos sin ICMP.
+        
+        Cada host se sondea con conexiones TCP en paralelo a puertos típicos
+        de cámaras; la caché ARP se consulta antes y después del barrido
+        para incluir hosts que filtran TCP pero respondieron a ARP.
+        """
+        self.logger.debug(f"Starting liveness sweep for {len(ip_list)} IPs")
         self.status = ScanStatus.SCANNING
         
-        tasks = []
-        semaphore = asyncio.Semaphore(self.max_concurrent)
+        await self.liveness_prober.refresh_arp()
+        await self._run_worker_pool(((ip, 0) for ip in ip_list), self._ping_host)
         
-        for ip in ip_list:
-            if self._cancel_event.is_set():
-                break
-            task = self._ping_host(semaphore, ip)
-            tasks.append(task)
+        # Las conexiones del barrido resuelven ARP en la red local
+        if not self._cancel_event.is_set() and await self.liveness_prober.refresh_arp():
+            for ip, mac in self.liveness_prober.arp_entries().items():
+                if ip not in ip_list:
+                    continue
+                result = self.results.setdefault(ip, ScanResult(ip=ip))
+                result.is_alive = True
+                result.mac_address = mac
         
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        self._alive_known = True
         
         alive_count = len([r for r in self.results.values() if r.is_alive])
-        self.logger.info(f"Ping sweep completed. {alive_count}/{len(ip_list)} hosts alive")
+        self.logger.info(
+            f"Liveness sweep completed. {alive_count}/{len(ip_list)} hosts alive "
+            f"(subnet RTT: {self.liveness_prober.rtt.get_stats()})"
+        )
         return True
     
-    async def _ping_host(self, semaphore: asyncio.Semaphore, ip: str):
-        """Ejecuta ping a un host específico."""
-        async with semaphore:
-            if self._cancel_event.is_set():
-                return
-            
-            start_time = time.time()
-            is_alive = False
-            
-            try:
-                # Simular ping (en implementación real usaría subprocess o ping3)
-                await asyncio.sleep(0.1)  # Simular delay de ping
-                import random
-                is_alive = random.random() > 0.7  # 30% hosts activos para demo
-                
-            except Exception as e:
-                self.logger.error(f"Ping failed for {ip}: {e}")
-            
-            # Actualizar resultado
+    async def _ping_host(self, ip: str, port: int = 0):
+        """Determina si un host está activo."""
+        if self._cancel_event.is_set():
+            return
+        
+        start_time = time.time()
+        is_alive = False
+        open_port = None
+        
+        try:
+            liveness = await self.liveness_prober.probe(ip)
+            is_alive = liveness.alive
+            if liveness.port_open:
+                open_port = liveness.port
+        except Exception as e:
+            self.logger.error(f"Liveness probe failed for {ip}: {e}")
+        
+        # Solo se guardan hosts offline si se piden, para no crecer con el rango
+        if is_alive or self.include_offline or ip in self.results:
             if ip not in self.results:
                 self.results[ip] = ScanResult(ip=ip)
             
-            self.results[ip].is_alive = is_alive
-            self.results[ip].scan_duration_ms = (time.time() - start_time) * 1000
+            result = self.results[ip]
+            result.is_alive = is_alive
+            result.scan_duration_ms = (time.time() - start_time) * 1000
+            if open_port is not None and open_port not in result.open_ports:
+                result.open_ports.append(open_port)
+        
+        # Actualizar progreso
+        self._advance_progress(ips=1, current_ip=ip)
+    
+    def _reuse_known_results(self) -> int:
+        """
+        Reutiliza los resultados del índice de los hosts activos sin cambios.
+        
+        Un host cambió si su MAC es distinta o si el barrido encontró abierto
+        un puerto que el índice no tenía; en ese caso se vuelve a sondear.
+        
+        Returns:
+            Número de hosts reutilizados
+        """
+        for ip, result in self.results.items():
+            known = self.known_results.get(ip)
+            if known is None or not result.is_alive or ip in self.reused_ips:
+                continue
+            if known.mac_address and result.mac_address and known.mac_address != result.mac_address:
+                continue
+            if not set(result.open_ports) <= set(known.open_ports):
+                continue
             
-            # Actualizar progreso
-            self.progress.scanned_ips += 1
-            self.progress.current_ip = ip
-            self.progress.elapsed_time = self.duration_seconds
-            self._notify_progress()
+            result.open_ports = list(known.open_ports)
+            result.detected_protocols = list(known.detected_protocols)
+            result.hostname = result.hostname or known.hostname
+            self.reused_ips.add(ip)
+        
+        if self.reused_ips:
+            self.logger.info(f"Reusing indexed results for {len(self.reused_ips)} unchanged hosts")
+        return len(self.reused_ips)
     
-    async def _port_scan(self, ip_list: List[str]) -> bool:
+    async def _port_scan(self, ip_list: Sequence) -> bool:
         """Ejecuta port scan en hosts activos."""
-        # Si no hay resultados previos o include_offline está activo, escanear todas las IPs
-        if not self.results or self.include_offline:
-            active_ips = ip_list
-        else:
-            active_ips = [ip for ip, result in self.results.items() 
-                         if result.is_alive or self.include_offline]
-        
-        self.logger.debug(f"Starting port scan for {len(active_ips)} IPs on {len(self.scan_range.ports)} ports")
+        ports = self.scan_range.ports
         
-        tasks = []
-        semaphore = asyncio.Semaphore(self.max_concurrent)
+        # Sin ping sweep previo o con include_offline, escanear todo el rango
+        if not self._alive_known or self.include_offline:
+            ip_count = len(ip_list)
+            targets = ((ip, port) for ip in ip_list for port in ports)
+        else:
+            if self.known_results:
+                self._reuse_known_results()
+            active_ips = [
+                ip for ip, result in self.results.items()
+                if result.is_alive and ip not in self.reused_ips
+            ]
+            ip_count = len(active_ips)
+            targets = ((ip, port) for ip in active_ips for port in ports)
         
-        for ip in active_ips:
-            if self._cancel_event.is_set():
-                break
-            for port in self.scan_range.ports:
-                task = self._scan_port(semaphore, ip, port)
-                tasks.append(task)
+        self.logger.debug(f"Starting port scan for {ip_count} IPs on {len(ports)} ports")
         
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        await self._run_worker_pool(targets, self._scan_port)
         
         total_open_ports = sum(len(result.open_ports) for result in self.results.values())
         self.logger.info(f"Port scan completed. {total_open_ports} open ports found")
         return True
     
-    async def _scan_port(self, semaphore: asyncio.Semaphore, ip: str, port: int):
+    async def _scan_port(self, ip: str, port: int):
         """Escanea un puerto específico usando conexión TCP real."""
-        async with semaphore:
-            if self._cancel_event.is_set():
-                return
-            
-            try:
-                # Crear socket TCP
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.setblocking(False)  # Non-blocking para usar con asyncio
-                
-                # Configurar timeout
-                sock.settimeout(self.timeout)
-                
-                # Intentar conectar de forma asíncrona
-                loop = asyncio.get_event_loop()
-                try:
-                    # Usar el loop de asyncio para la conexión no bloqueante
-                    await asyncio.wait_for(
-                        loop.sock_connect(sock, (ip, port)),
-                        timeout=self.timeout
-                    )
-                    
-                    # Si llegamos aquí, el puerto está abierto
-                    if ip not in self.results:
-                        self.results[ip] = ScanResult(ip=ip)
-                    
-                    if port not in self.results[ip].open_ports:
-                        self.results[ip].open_ports.append(port)
-                        self.logger.debug(f"Puerto {port} abierto en {ip}")
-                    
-                    # Marcar como vivo si tiene puertos abiertos
-                    self.results[ip].is_alive = True
-                    
-                except (asyncio.TimeoutError, ConnectionRefusedError, OSError):
-                    # Puerto cerrado o timeout - esto es normal, no es un error
-                    pass
-                finally:
-                    sock.close()
-                
-                # Actualizar progreso
-                self.progress.scanned_ports += 1
-                self.progress.current_ip = ip
-                self._notify_progress()
-                
-            except Exception as e:
-                self.logger.error(f"Port scan failed for {ip}:{port}: {e}")
-    
-    async def _protocol_detection(self, ip_list: List[str]) -> bool:
-        """Ejecuta detección de protocolos en puertos abiertos."""
-        ips_with_ports = [(ip, result) for ip, result in self.results.items() 
-                         if result.open_ports]
+        if self._cancel_event.is_set():
+            return
+        
+        # Socket no bloqueante: un timeout en el socket haría que
+        # sock_connect bloquease el loop
+        family = socket.AF_INET6 if ':' in ip else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setblocking(False)
         
-        self.logger.debug(f"Starting protocol detection for {len(ips_with_ports)} IPs")
+        try:
+            loop = asyncio.get_running_loop()
+            await asyncio.wait_for(
+                loop.sock_connect(sock, (ip, port)),
+                timeout=self.timeout
+            )
+            
+            # Si llegamos aquí, el puerto está abierto
+            if ip not in self.results:
+                self.results[ip] = ScanResult(ip=ip)
+            
+            if port not in self.results[ip].open_ports:
+                self.results[ip].open_ports.append(port)
+                self.logger.debug(f"Puerto {port} abierto en {ip}")
+            
+            # Marcar como vivo si tiene puertos abiertos
+            self.results[ip].is_alive = True
+            
+        except (asyncio.TimeoutError, ConnectionRefusedError, OSError):
+            # Puerto cerrado o timeout - esto es normal, no es un error
+            pass
+        finally:
+            sock.close()
         
-        tasks = []
-        semaphore = asyncio.Semaphore(self.max_concurrent)
+        # Actualizar progreso
+        self._advance_progress(ports=1, current_ip=ip)
+    
+    async def _protocol_detection(self, ip_list: Sequence) -> bool:
+        """Identifica protocolos en los puertos abiertos con sondas reales."""
+        targets = [
+            (ip, port) for ip, result in list(self.results.items())
+            if ip not in self.reused_ips
+            for port in result.open_ports
+        ]
         
-        for ip, result in ips_with_ports:
-            if self._cancel_event.is_set():
-                break
-            for port in result.open_ports:
-                protocols = self.port_protocol_mapping.get(port, [ProtocolType.GENERIC])
-                for protocol in protocols:
-                    task = self._detect_protocol(semaphore, ip, port, protocol)
-                    tasks.append(task)
+        self.logger.debug(f"Starting protocol detection for {len(targets)} open ports")
         
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        async with ProtocolFingerprinter(timeout=self.timeout, max_connections=self.max_concurrent) as fingerprinter:
+            self._fingerprinter = fingerprinter
+            try:
+                await self._run_worker_pool(targets, self._detect_protocol)
+            finally:
+                self._fingerprinter = None
         
         # Actualizar contador de cámaras encontradas
         self.progress.cameras_found = len([r for r in self.results.values() if r.has_camera_protocols])
@@ -596,122 +801,109 @@ class ScanModel:
         self.logger.info(f"Protocol detection completed. {self.progress.cameras_found} cameras detected")
         return True
     
-    async def _detect_protocol(self, semaphore: asyncio.Semaphore, ip: str, port: int, protocol: ProtocolType):
-        """Detecta un protocolo específico en IP:Puerto."""
-        async with semaphore:
-            if self._cancel_event.is_set():
-                return
-            
-            start_time = time.time()
-            detected = False
-            error_message = None
-            details = {}
-            
-            try:
-                # Simular detección de protocolo (en implementación real haría requests específicos)
-                await asyncio.sleep(0.2)  # Simular delay de detección
-                import random
-                
-                # Probabilidades diferentes por protocolo
-                detection_rates = {
-                    ProtocolType.ONVIF: 0.3,
-                    ProtocolType.RTSP: 0.25,
-                    ProtocolType.HTTP: 0.4,
-                    ProtocolType.AMCREST: 0.15,
-                    ProtocolType.GENERIC: 0.2
-                }
-                
-                detected = random.random() < detection_rates.get(protocol, 0.2)
-                
-                if detected:
-                    details = {
-                        'device_info': f'Simulated {protocol.value} camera',
-                        'capabilities': ['streaming', 'control']
-                    }
-                
-            except Exception as e:
-                error_message = str(e)
-                self.logger.error(f"Protocol detection failed for {protocol.value} on {ip}:{port}: {e}")
-            
-            # Crear resultado de detección
-            detection_result = ProtocolDetectionResult(
+    async def _detect_protocol(self, ip: str, port: int):
+        """Ejecuta las sondas de los protocolos candidatos de IP:Puerto."""
+        if self._cancel_event.is_set():
+            return
+        
+        protocols = self.port_protocol_mapping.get(port, self.DEFAULT_PROBE_PROTOCOLS)
+        fingerprints = await self._fingerprinter.fingerprint(ip, port, [p.value for p in protocols])
+        
+        if ip not in self.results:
+            self.results[ip] = ScanResult(ip=ip)
+        
+        for fingerprint in fingerprints:
+            self.results[ip].detected_protocols.append(ProtocolDetectionResult(
                 ip=ip,
                 port=port,
-                protocol=protocol,
-                detected=detected,
-                response_time_ms=(time.time() - start_time) * 1000,
-                details=details,
-                error_message=error_message
-            )
-            
-            # Añadir al resultado del IP
-            if ip not in self.results:
-                self.results[ip] = ScanResult(ip=ip)
-            
-            self.results[ip].detected_protocols.append(detection_result)
+                protocol=ProtocolType(fingerprint.protocol),
+                detected=fingerprint.detected,
+                response_time_ms=fingerprint.response_time_ms,
+                details=fingerprint.details,
+                error_message=fingerprint.error_message
+            ))
     
-    async def _onvif_discovery(self, ip_list: List[str]) -> bool:
-        """Ejecuta descubrimiento ONVIF usando WS-Discovery."""
+    async def _onvif_discovery(self, ip_list: Sequence) -> bool:
+        """Ejecuta descubrimiento ONVIF con un probe WS-Discovery multicast."""
         self.logger.debug("Starting ONVIF discovery")
         
-        # Simular descubrimiento ONVIF
-        await asyncio.sleep(2.0)  # Simular delay de discovery
-        
-        # En implementación real usaría onvif-zeep o wsdiscovery
-        import random
-        discovered_count = random.randint(0, 3)
+        devices = await ws_discovery(window=self.DISCOVERY_WINDOW)
+        merged = 0
+        for device in devices:
+            if self._merge_discovered_device(device, ip_list, ProtocolType.ONVIF, detected=True):
+                merged += 1
         
-        for i in range(discovered_count):
-            ip = random.choice(ip_list)
-            if ip not in self.results:
-                self.results[ip] = ScanResult(ip=ip)
-            
-            # Añadir resultado ONVIF
-            onvif_result = ProtocolDetectionResult(
-                ip=ip,
-                port=80,
-                protocol=ProtocolType.ONVIF,
-                detected=True,
-                response_time_ms=500.0,
-                details={'discovery_method': 'ws-discovery', 'device_type': 'NetworkVideoTransmitter'}
-            )
-            self.results[ip].detected_protocols.append(onvif_result)
-            self.results[ip].open_ports.append(80)
-            self.results[ip].is_alive = True
-        
-        self.logger.info(f"ONVIF discovery completed. {discovered_count} devices found")
+        self.logger.info(f"ONVIF discovery completed. {merged}/{len(devices)} devices in range")
         return True
     
-    async def _upnp_discovery(self, ip_list: List[str]) -> bool:
-        """Ejecuta descubrimiento UPnP."""
+    async def _upnp_discovery(self, ip_list: Sequence) -> bool:
+        """Ejecuta descubrimiento UPnP con ``M-SEARCH`` SSDP multicast."""
         self.logger.debug("Starting UPnP discovery")
         
-        # Simular descubrimiento UPnP
-        await asyncio.sleep(1.5)  # Simular delay de discovery
+        devices = await ssdp_discovery(window=self.DISCOVERY_WINDOW)
+        brand_manager = get_brand_manager()
+        merged = 0
+        for device in devices:
+            # SSDP responde cualquier equipo UPnP: solo cuenta como cámara
+            # si el header SERVER o el USN coinciden con una marca conocida
+            brand = brand_manager.match_http_signature(device.server or "", device.endpoint or "")
+            if self._merge_discovered_device(device, ip_list, ProtocolType.GENERIC,
+                                             detected=brand is not None, brand=brand):
+                merged += 1
         
-        # En implementación real usaría upnpclient o similar
-        import random
-        discovered_count = random.randint(0, 2)
+        self.logger.info(f"UPnP discovery completed. {merged}/{len(devices)} devices in range")
+        return True
+    
+    def _merge_discovered_device(self,
+                                 device: DiscoveredDevice,
+                                 ip_list: Sequence,
+                                 protocol: ProtocolType,
+                                 detected: bool,
+                                 brand: Optional[str] = None) -> bool:
+        """
+        Incorpora un dispositivo descubierto por multicast a los resultados.
         
-        for i in range(discovered_count):
-            ip = random.choice(ip_list)
-            if ip not in self.results:
-                self.results[ip] = ScanResult(ip=ip)
+        Args:
+            device: Dispositivo que respondió
+            ip_list: IPs del rango escaneado
+            protocol: Protocolo a registrar
+            detected: Si el dispositivo cuenta como cámara
+            brand: Marca identificada (opcional)
             
-            # Añadir resultado genérico 
-            upnp_result = ProtocolDetectionResult(
-                ip=ip,
-                port=8080,
-                protocol=ProtocolType.GENERIC,
-                detected=True,
-                response_time_ms=300.0,
-                details={'discovery_method': 'upnp', 'device_type': 'MediaServer'}
-            )
-            self.results[ip].detected_protocols.append(upnp_result)
-            self.results[ip].open_ports.append(8080)
-            self.results[ip].is_alive = True
+        Returns:
+            True si la IP pertenece al rango y se registró
+        """
+        if device.ip not in ip_list:
+            return False
         
-        self.logger.info(f"UPnP discovery completed. {discovered_count} devices found")
+        if device.ip not in self.results:
+            self.results[device.ip] = ScanResult(ip=device.ip)
+        result = self.results[device.ip]
+        
+        details = device.to_details()
+        if brand:
+            details['brand'] = brand
+        
+        existing = next(
+            (det for det in result.detected_protocols
+             if det.protocol == protocol and det.port == device.port and det.detected),
+            None
+        )
+        if existing is not None:
+            # Ya confirmado por sonda directa: solo se añaden los datos del anuncio
+            existing.details.update(details)
+        else:
+            result.detected_protocols.append(ProtocolDetectionResult(
+                ip=device.ip,
+                port=device.port,
+                protocol=protocol,
+                detected=detected,
+                response_time_ms=0.0,
+                details=details
+            ))
+        if device.port not in result.open_ports:
+            result.open_ports.append(device.port)
+        result.is_alive = True
         return True
     
     def _process_final_results(self):
@@ -735,6 +927,25 @@ class ScanModel:
         self.progress.elapsed_time = self.duration_seconds
         self._notify_progress()
     
+    def complete_from_index(self, results: Dict[str, ScanResult]):
+        """
+        Completa el escaneo con resultados del índice sin sondear la red.
+        
+        Args:
+            results: Resultados indexados del rango por IP
+        """
+        self.start_time = self.end_time = datetime.now()
+        self.results = dict(results)
+        self.reused_ips = set(results)
+        self.progress = ScanProgress(
+            total_ips=self.scan_range.ip_count,
+            scanned_ips=self.scan_range.ip_count,
+            total_ports=len(self.scan_range.ports),
+            scanned_ports=len(self.scan_range.ports),
+            cameras_found=len([r for r in self.results.values() if r.has_camera_protocols])
+        )
+        self.status = ScanStatus.COMPLETED
+    
     # === Control de Escaneo ===
     
     def cancel_scan(self):
@@ -783,6 +994,14 @@ class ScanModel:
                 'timeout': self.timeout,
                 'include_offline': self.include_offline
             },
+            'liveness': {
+                'arp_entries': len(self.liveness_prober.arp_entries()),
+                'subnet_rtt': self.liveness_prober.rtt.get_stats()
+            },
+            'incremental': {
+                'known_hosts': len(self.known_results),
+                'reused_hosts': len(self.reused_ips)
+            },
             'errors': len(self.errors)
         }
     
@@ -823,9 +1042,11 @@ class ScanModel:
             result_info = {
                 'ip': ip,
                 'hostname': result.hostname,
+                'mac_address': result.mac_address,
                 'is_alive': result.is_alive,
                 'open_ports': result.open_ports,
                 'has_camera_protocols': result.has_camera_protocols,
+                'from_index': ip in self.reused_ips,
                 'camera_protocols': [p.value for p in result.camera_protocols],
                 'scan_duration_ms': result.scan_duration_ms,
                 'scan_timestamp': result.scan_timestamp.isoformat(),
@@ -4,11 +4,12 @@ Modelos de dominio para streaming de video.
 Este módulo contiene las entidades relacionadas con el streaming:
 - StreamModel: Estado y configuración de un stream
 - FrameModel: Datos de un frame individual
+- EncodedFrame: Frame codificado compartido entre consumidores
 - StreamMetrics: Métricas de rendimiento
 """
 
 from .stream_model import StreamModel, StreamStatus, StreamProtocol
-from .frame_model import FrameModel, FrameMetadata
+from .frame_model import FrameModel, FrameMetadata, EncodedFrame
 from .stream_metrics import StreamMetrics
 
 __all__ = [
@@ -17,5 +18,6 @@ __all__ = [
     'StreamProtocol',
     'FrameModel',
     'FrameMetadata',
+    'EncodedFrame',
     'StreamMetrics'
 ]
\ No newline at end of file
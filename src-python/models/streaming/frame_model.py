@@ -6,7 +6,8 @@ Define la estructura de datos para un frame individual.
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, Union
+import base64
 import numpy as np
 
 
@@ -138,4 +139,94 @@ class FrameModel:
             stream_id=stream_id,
             data=None,
             error=error
-        )
\ No newline at end of file
+        )
+
+class EncodedFrame:
+    """
+    Frame ya codificado compartido entre varios consumidores.
+    
+    Guarda los bytes del JPEG/PNG y genera la representación base64
+    solo la primera vez que se solicita, de modo que clientes binarios
+    y clientes JSON pueden compartir la misma codificación.
+    
+    Attributes:
+        camera_id: ID de la cámara que generó el frame
+        sequence: Número secuencial del frame en la cámara
+        capture_timestamp: Timestamp de captura en milisegundos (epoch)
+        encoding: Formato de codificación (jpeg, png)
+        quality: Calidad con la que se codificó
+        source: Frame original sin codificar, para recodificar a otra calidad
+        captured_at: Instante de captura según ``time.monotonic()``
+        encoded_at: Instante de fin de codificación según ``time.monotonic()``
+    """
+    
+    __slots__ = (
+        'camera_id', 'sequence', 'capture_timestamp', 'encoding',
+        'quality', 'source', 'captured_at', 'encoded_at', '_data', '_base64'
+    )
+    
+    def __init__(
+        self,
+        camera_id: str,
+        payload: Union[bytes, str],
+        sequence: int = 0,
+        capture_timestamp: Optional[float] = None,
+        encoding: str = "jpeg",
+        quality: Optional[int] = None,
+        source: Optional[np.ndarray] = None,
+        captured_at: Optional[float] = None,
+        encoded_at: Optional[float] = None
+    ):
+        """
+        Inicializa el frame codificado.
+        
+        Args:
+            camera_id: ID de la cámara
+            payload: Bytes codificados o string base64
+            sequence: Número secuencial del frame
+            capture_timestamp: Timestamp de captura en ms
+            encoding: Formato de codificación
+            quality: Calidad de codificación
+            source: Frame BGR original (opcional)
+            captured_at: Instante monotónico de captura (opcional)
+            encoded_at: Instante monotónico de fin de codificación (opcional)
+        """
+        self.camera_id = camera_id
+        self.sequence = sequence
+        self.capture_timestamp = capture_timestamp
+        self.encoding = encoding
+        self.quality = quality
+        self.source = source
+        self.captured_at = captured_at
+        self.encoded_at = encoded_at
+        
+        if isinstance(payload, str):
+            self._data: Optional[bytes] = None
+            self._base64: Optional[str] = payload
+        else:
+            self._data = bytes(payload)
+            self._base64 = None
+    
+    @property
+    def data(self) -> bytes:
+        """Bytes codificados del frame."""
+        if self._data is None:
+            self._data = base64.b64decode(self._base64)
+        return self._data
+    
+    @property
+    def base64(self) -> str:
+        """Frame codificado en base64 (se calcula una sola vez)."""
+        if self._base64 is None:
+            self._base64 = base64.b64encode(self._data).decode('ascii')
+        return self._base64
+    
+    @property
+    def base64_ready(self) -> bool:
+        """Indica si la representación base64 ya está calculada."""
+        return self._base64 is not None
+    
+    @property
+    def size_bytes(self) -> int:
+        """Tamaño de los bytes codificados."""
+        return len(self.data)
@@ -46,6 +46,8 @@ class StreamModel:
         status: Estado actual del stream
         fps: Frames por segundo actuales
         target_fps: FPS objetivo configurado
+        jpeg_quality: Calidad JPEG de la codificación compartida
+        max_width: Ancho máximo antes de codificar
         frame_count: Contador total de frames procesados
         dropped_frames: Contador de frames perdidos
         start_time: Timestamp de inicio del stream
@@ -62,6 +64,8 @@ class StreamModel:
     protocol: StreamProtocol = StreamProtocol.RTSP
     target_fps: int = 30
     buffer_size: int = 5
+    jpeg_quality: int = 85
+    max_width: int = 1280
     
     # Estado
     status: StreamStatus = StreamStatus.IDLE
@@ -96,6 +100,13 @@ class StreamModel:
                 context={'target_fps': self.target_fps, 'valid_range': '1-60'}
             )
         
+        if self.jpeg_quality < 1 or self.jpeg_quality > 100:
+            raise ValidationError(
+                message=f"jpeg_quality debe estar entre 1 y 100, recibido: {self.jpeg_quality}",
+                error_code="INVALID_QUALITY",
+                context={'jpeg_quality': self.jpeg_quality, 'valid_range': '1-100'}
+            )
+        
         if self.buffer_size < 1 or self.buffer_size > 30:
             raise ValidationError(
                 message=f"buffer_size debe estar entre 1 y 30, recibido: {self.buffer_size}",
@@ -161,6 +172,8 @@ class StreamModel:
             'status': self.status.value,
             'fps': self.fps,
             'target_fps': self.target_fps,
+            'jpeg_quality': self.jpeg_quality,
+            'max_width': self.max_width,
             'frame_count': self.frame_count,
             'dropped_frames': self.dropped_frames,
             'start_time': self.start_time.isoformat() if self.start_time else None,
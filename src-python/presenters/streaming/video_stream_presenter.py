@@ -143,6 +143,10 @@ class VideoStreamPresenter(BasePresenter):
             # Configurar opciones
             target_fps = options.get('targetFps', 30) if options else 30
             buffer_size = options.get('bufferSize', 5) if options else 5
+            frame_format = options.get('frameFormat', 'base64') if options else 'base64'
+            jpeg_quality = options.get('jpegQuality', 85) if options else 85
+            max_width = options.get('maxWidth', 1280) if options else 1280
+            keyframes_only = options.get('keyframesOnly', False) if options else False
             
             # Usar callback externo si se proporciona, sino usar el interno
             frame_callback = on_frame_callback or self._on_frame_received
@@ -154,7 +158,11 @@ class VideoStreamPresenter(BasePresenter):
                 protocol=protocol,
                 on_frame_callback=frame_callback,
                 target_fps=target_fps,
-                buffer_size=buffer_size
+                buffer_size=buffer_size,
+                frame_format=frame_format,
+                jpeg_quality=jpeg_quality,
+                max_width=max_width,
+                keyframes_only=keyframes_only
             )
             
             # Guardar referencia
@@ -390,6 +398,11 @@ class VideoStreamPresenter(BasePresenter):
     
     # === MÉTODOS DE UTILIDAD ===
     
+    @property
+    def video_service(self) -> VideoStreamService:
+        """Servicio de video utilizado por el presenter."""
+        return self._video_service
+    
     def get_active_streams(self) -> Dict[str, Dict[str, Any]]:
         """
         Obtiene información de todos los streams activos.
@@ -2,7 +2,7 @@
 Router para endpoints CRUD básicos de cámaras.
 """
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, status, Request, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, status, Request, Response, Depends, BackgroundTasks
 from datetime import datetime
 import logging
 import asyncio
@@ -13,7 +13,6 @@ from api.models.camera_models import (
     CreateCameraRequest,
     UpdateCameraRequest,
     CameraResponse,
-    CameraListResponse,
     ProtocolType,
     EndpointRequest,
 )
@@ -24,6 +23,7 @@ from utils.exceptions import (
     InvalidCredentialsError,
     ServiceError
 )
+from utils.json_codec import dumps
 from .shared import build_camera_response
 
 logger = logging.getLogger(__name__)
@@ -36,6 +36,23 @@ router = APIRouter(
 )
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Comprueba si la cabecera If-None-Match incluye el ETag actual.
+    
+    Args:
+        if_none_match: Valor de la cabecera (puede ser None)
+        etag: ETag de la respuesta actual
+        
+    Returns:
+        True si el cliente ya tiene esta versión
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in tags)
+
+
 # === Endpoints CRUD ===
 
 @router.get("/")
@@ -58,33 +75,23 @@ async def list_cameras(
     try:
         logger.info(f"Listando cámaras - active_only: {active_only}, protocol: {protocol}")
         
-        # Obtener todas las cámaras
-        cameras = await camera_manager_service.get_all_cameras()
-        
-        # Filtrar si es necesario
-        if active_only:
-            cameras = [c for c in cameras if c.is_active]
-            
-        if protocol:
-            cameras = [c for c in cameras if c.can_connect_with_protocol(protocol)]
-        
-        # Construir respuestas
-        camera_responses = []
-        for camera in cameras:
-            try:
-                camera_responses.append(build_camera_response(camera))
-            except ValueError as e:
-                logger.warning(f"Error construyendo respuesta para cámara {getattr(camera, 'camera_id', 'unknown')}: {e}")
-                # Continuar con las demás cámaras
-        
-        response_data = CameraListResponse(
-            total=len(camera_responses),
-            cameras=camera_responses
+        # Listado serializado en caché; solo se rehacen las cámaras cambiadas
+        snapshot = await camera_manager_service.get_camera_list_snapshot(
+            lambda camera: build_camera_response(camera).dict(),
+            active_only=active_only,
+            protocol=protocol
         )
         
-        return create_response(
-            success=True,
-            data=response_data.dict()
+        headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
+        # Sobre estándar de create_response con "data" ya serializado
+        envelope = dumps(create_response(success=True))
+        return Response(
+            content=envelope[:-1] + b',"data":' + snapshot.body + b"}",
+            media_type="application/json",
+            headers=headers
         )
         
     except ServiceError as e:
@@ -25,7 +25,7 @@ from api.schemas.responses.mediamtx_responses import (
     PaginatedMetricsResponse
 )
 from api.dependencies import create_response
-from services.database.mediamtx_db_service import get_mediamtx_db_service
+from services.database.mediamtx_db_service import get_mediamtx_db_service, DEFAULT_MAX_POINTS
 from services.camera_manager_service import camera_manager_service
 from utils.exceptions import ServiceError
 from api.validators.mediamtx_validators import (
@@ -35,6 +35,9 @@ from api.validators.mediamtx_validators import (
 
 logger = logging.getLogger(__name__)
 
+# Puntos de la serie exportada cuando no se piden datos crudos
+EXPORT_MAX_POINTS = 2000
+
 
 router = APIRouter(
     prefix="/api/publishing/metrics",
@@ -187,6 +190,12 @@ async def get_camera_metrics(
         None,
         regex="^(1m|5m|15m|1h|1d)$",
         description="Intervalo de agregación de datos"
+    ),
+    max_points: int = Query(
+        DEFAULT_MAX_POINTS,
+        ge=10,
+        le=5000,
+        description="Máximo de puntos de la serie; fija el tamaño de cubo"
     )
 ) -> PublicationMetricsResponse:
     """
@@ -199,9 +208,10 @@ async def get_camera_metrics(
         end_time: Fin del rango personalizado
         include_viewers: Si incluir estadísticas de viewers
         aggregate_interval: Intervalo para agregar datos
+        max_points: Máximo de puntos a devolver
         
     Returns:
-        PublicationMetricsResponse con métricas y resumen
+        PublicationMetricsResponse con métricas agregadas desde los rollups y resumen
         
     Raises:
         HTTPException: Si la cámara no existe o no está publicando
@@ -232,7 +242,8 @@ async def get_camera_metrics(
             start_time=start_time,
             end_time=end_time,
             include_viewers=include_viewers,
-            aggregate_interval=aggregate_interval
+            aggregate_interval=aggregate_interval,
+            max_points=max_points
         )
         
         # Obtener servicio de BD
@@ -252,13 +263,6 @@ async def get_camera_metrics(
                 }
             )
         
-        # TODO: Si se especifica aggregate_interval, agregar los data points
-        if aggregate_interval:
-            metrics_data['data_points'] = _aggregate_metrics(
-                metrics_data['data_points'],
-                aggregate_interval
-            )
-        
         # Construir respuesta
         response = PublicationMetricsResponse(**metrics_data)
         
@@ -669,27 +673,6 @@ def _determine_stream_status(quality_score: Optional[float]) -> Optional[str]:
         return "poor"
 
 
-def _aggregate_metrics(
-    data_points: list,
-    interval: str
-) -> list:
-    """
-    Agrega puntos de métricas según el intervalo especificado.
-    
-    Args:
-        data_points: Lista de puntos de métrica
-        interval: Intervalo de agregación (1m, 5m, etc.)
-        
-    Returns:
-        Lista de puntos agregados
-    """
-    # TODO: Implementar agregación real
-    # Por ahora retornamos los datos sin modificar
-    # La agregación debería promediar valores dentro de cada intervalo
-    logger.warning(f"Agregación con intervalo {interval} no implementada aún")
-    return data_points
-
-
 async def _generate_export_file(
     camera_id: str,
     file_path: Path,
@@ -705,7 +688,7 @@ async def _generate_export_file(
         file_path: Ruta donde guardar el archivo
         format: Formato de exportación
         time_range: Rango de tiempo
-        include_raw: Si incluir datos crudos
+        include_raw: Si exportar las filas crudas en lugar de la serie agregada
     """
     try:
         logger.info(f"Generando archivo de exportación: {file_path}")
@@ -714,9 +697,11 @@ async def _generate_export_file(
         db_service = get_mediamtx_db_service()
         await db_service.initialize()
         
+        # Sin max_points se leen las filas crudas; con él, los rollups
         request = GetMetricsRequest(
             time_range=time_range,
-            include_viewers=True
+            include_viewers=True,
+            max_points=None if include_raw else EXPORT_MAX_POINTS
         )
         
         metrics_data = await db_service.get_publication_metrics(camera_id, request)
@@ -785,6 +770,7 @@ async def _export_to_json(data: dict, file_path: Path, include_raw: bool):
         'camera_id': data['camera_id'],
         'publication_id': data['publication_id'],
         'time_range': data['time_range'],
+        'bucket_seconds': data.get('bucket_seconds'),
         'export_date': datetime.utcnow().isoformat(),
         'summary': data['summary']
     }
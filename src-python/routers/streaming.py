@@ -10,6 +10,8 @@ from datetime import datetime
 
 from websocket.connection_manager import manager
 from websocket.stream_handler import stream_manager
+from websocket.grid_handler import grid_manager
+from services.websocket_stream_service import websocket_stream_service
 from api.dependencies import create_response
 from api.deps.rate_limit import rate_limit, websocket_rate_limit
 
@@ -49,7 +51,7 @@ async def get_camera_stream_info(camera_id: str):
         camera_id: ID de la cámara
         
     Returns:
-        Información de streams de la cámara
+        Información de streams de la cámara y desglose de latencia por etapa
     """
     stats = stream_manager.get_stream_stats()
     
@@ -63,11 +65,26 @@ async def get_camera_stream_info(camera_id: str):
         success=True,
         data={
             "camera_id": camera_id,
-            "stream_info": stats["cameras"][camera_id]
+            "stream_info": stats["cameras"][camera_id],
+            "latency_breakdown": websocket_stream_service.get_latency_breakdown(camera_id)
         }
     )
 
 
+@router.get("/streams/grid/status")
+async def get_grid_status():
+    """
+    Obtener estado de las conexiones de mosaico.
+    
+    Returns:
+        Tiles activos por conexión con sus FPS y frames enviados
+    """
+    return create_response(
+        success=True,
+        data=grid_manager.get_stats()
+    )
+
+
 @router.get("/ws/status")
 async def get_websocket_status():
     """
@@ -105,11 +122,16 @@ async def websocket_stream(websocket: WebSocket, camera_id: str):
         "params": {
             "quality": "high",
             "fps": 30,
-            "format": "jpeg"
+            "format": "jpeg",
+            "transport": "json"
         }
     }
     ```
     
+    Con ``"transport": "binary"`` los frames se envían como mensajes binarios
+    (cabecera fija de 24 bytes + JPEG, ver ``websocket.binary_frame``) y las
+    métricas llegan cada 30 frames en un mensaje JSON ``"type": "metrics"``.
+    
     Servidor → Cliente:
     ```json
     {
@@ -143,6 +165,48 @@ async def websocket_stream(websocket: WebSocket, camera_id: str):
         await stream_manager.cleanup_stream(camera_id, client_id)
 
 
+@router.websocket("/grid")
+@websocket_rate_limit("websocket_connect")
+async def websocket_grid(websocket: WebSocket):
+    """
+    WebSocket endpoint para el mosaico de cámaras.
+    
+    Multiplexa miniaturas de muchas cámaras (substream, baja resolución y
+    pocos FPS) sobre una sola conexión. El stream principal solo se abre
+    para el tile enfocado.
+    
+    Args:
+        websocket: Conexión WebSocket
+        
+    Protocolo de mensajes:
+    
+    Cliente → Servidor:
+    ```json
+    {"action": "set_tiles", "params": {"cameras": ["cam_1", {"camera_id": "cam_2", "fps": 5}], "fps": 2, "transport": "binary"}}
+    {"action": "set_tile_fps", "params": {"camera_id": "cam_1", "fps": 1}}
+    {"action": "focus", "params": {"camera_id": "cam_1", "fps": 15, "quality": "medium"}}
+    {"action": "unfocus"}
+    ```
+    
+    Servidor → Cliente: con transporte binario cada frame lleva la cabecera
+    de ``websocket.binary_frame`` y el tile se identifica por el hash de
+    cámara (tabla ``camera_hashes`` del estado ``grid_updated``). Con
+    transporte JSON se envían mensajes ``"type": "tile"``.
+    """
+    client_id = f"grid_{uuid.uuid4()}"
+    
+    logger.info(f"Nueva conexión de mosaico: {client_id}")
+    
+    try:
+        await grid_manager.handle_grid_connection(websocket, client_id)
+    except WebSocketDisconnect:
+        logger.info(f"Cliente de mosaico {client_id} desconectado")
+    except Exception as e:
+        logger.error(f"Error en WebSocket grid: {e}")
+    finally:
+        await grid_manager.cleanup_grid(client_id)
+
+
 @router.websocket("/events")
 async def websocket_events(websocket: WebSocket):
     """
@@ -25,6 +25,7 @@ from api.schemas.websocket.ws_messages import (
 )
 from websocket.connection_manager import manager
 from websocket.stream_handler import stream_manager
+from services.websocket_stream_service import websocket_stream_service
 from api.dependencies import create_response
 
 logger = logging.getLogger(__name__)
@@ -91,7 +92,9 @@ async def get_camera_stream_info(camera_id: str):
         camera_id: ID de la cámara
         
     Returns:
-        Información detallada del stream de la cámara
+        Información detallada del stream de la cámara, con el desglose de
+        latencia por etapa (captura → cola → resize → encode → reparto →
+        base64 → envío) en ``latency_breakdown``
     """
     try:
         stats = stream_manager.get_stream_stats()
@@ -112,7 +115,8 @@ async def get_camera_stream_info(camera_id: str):
             "start_time": camera_info.get("start_time"),
             "duration_seconds": camera_info.get("duration", 0),
             "current_quality": camera_info.get("quality", "unknown"),
-            "metrics": camera_info.get("metrics", {})
+            "metrics": camera_info.get("metrics", {}),
+            "latency_breakdown": websocket_stream_service.get_latency_breakdown(camera_id)
         }
         
         return create_response(
@@ -0,0 +1,150 @@
+"""
+Snapshot precalculado del listado de cámaras.
+
+El listado de cámaras se consulta por polling y cambia poco. En lugar de
+reconstruir y serializar la respuesta de cada cámara en cada petición,
+se guarda cada cámara ya serializada y el cuerpo completo del listado
+por combinación de filtros, con un ETag derivado del contenido.
+
+Invalidación:
+- Explícita: el servicio llama a ``invalidate`` en cada alta, edición,
+  baja y cambio de credenciales o protocolos; se incrementa la versión y
+  se descarta solo la entrada de la cámara afectada.
+- Implícita: cada entrada guarda una huella del estado vivo de la cámara
+  (estado de conexión, streaming, ``last_updated``), de modo que los
+  cambios hechos directamente sobre el modelo (p. ej. por el servicio de
+  conexión) también rehacen la entrada.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from services.logging_service import get_secure_logger
+from utils.json_codec import dumps
+
+
+logger = get_secure_logger("services.camera_list_snapshot")
+
+
+@dataclass(frozen=True)
+class CameraListBody:
+    """Cuerpo serializado de un listado de cámaras."""
+
+    body: bytes
+    etag: str
+    total: int
+    version: int
+
+
+def _fingerprint(camera: Any) -> Tuple:
+    """Huella del estado de la cámara que cambia sin pasar por el servicio."""
+    return (
+        id(camera),
+        getattr(camera, 'last_updated', None),
+        getattr(camera, 'status', None),
+        getattr(camera, 'is_streaming', False),
+        getattr(camera, 'is_active', False)
+    )
+
+
+class CameraListSnapshot:
+    """
+    Caché versionada del listado de cámaras serializado.
+
+    No es thread-safe: se usa desde el event loop, y la reconstrucción no
+    cede el control, por lo que es atómica respecto a otras corrutinas.
+    """
+
+    def __init__(self):
+        """Inicializa la caché vacía."""
+        self.version = 0
+        # camera_id -> (huella, JSON de la cámara)
+        self._entries: Dict[str, Tuple[Tuple, bytes]] = {}
+        # filtros -> (huellas del listado, cuerpo)
+        self._bodies: Dict[Tuple, Tuple[Tuple, CameraListBody]] = {}
+        self._stats = {
+            'hits': 0,
+            'rebuilds': 0,
+            'entries_rendered': 0,
+            'invalidations': 0
+        }
+
+    def invalidate(self, camera_id: Optional[str] = None) -> None:
+        """
+        Marca el listado como modificado.
+
+        Args:
+            camera_id: Cámara afectada; None invalida todas las entradas
+        """
+        self.version += 1
+        self._stats['invalidations'] += 1
+        self._bodies.clear()
+        if camera_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(camera_id, None)
+
+    def get(self,
+            cameras: Iterable[Any],
+            render: Callable[[Any], Dict[str, Any]],
+            key: Tuple = ()) -> CameraListBody:
+        """
+        Obtiene el cuerpo del listado, reconstruyendo solo lo que cambió.
+
+        Args:
+            cameras: Cámaras ya filtradas, en orden de salida
+            render: Convierte una cámara en el diccionario de su respuesta;
+                si lanza ValueError la cámara se omite
+            key: Filtros aplicados, para cachear cada combinación aparte
+
+        Returns:
+            CameraListBody con ``{"total": n, "cameras": [...]}`` serializado
+        """
+        cameras = list(cameras)
+        fingerprints = tuple(_fingerprint(camera) for camera in cameras)
+
+        cached = self._bodies.get(key)
+        if cached is not None and cached[0] == fingerprints:
+            self._stats['hits'] += 1
+            return cached[1]
+
+        parts = []
+        for camera, fingerprint in zip(cameras, fingerprints):
+            camera_id = getattr(camera, 'camera_id', '')
+            entry = self._entries.get(camera_id)
+            if entry is None or entry[0] != fingerprint:
+                try:
+                    entry = (fingerprint, dumps(render(camera)))
+                except ValueError as e:
+                    logger.warning(f"Error construyendo respuesta para cámara {camera_id}: {e}")
+                    continue
+                self._entries[camera_id] = entry
+                self._stats['entries_rendered'] += 1
+            parts.append(entry[1])
+
+        body = b'{"total":%d,"cameras":[%s]}' % (len(parts), b",".join(parts))
+        result = CameraListBody(
+            body=body,
+            etag='"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest(),
+            total=len(parts),
+            version=self.version
+        )
+        self._bodies[key] = (fingerprints, result)
+        self._stats['rebuilds'] += 1
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas de la caché.
+
+        Returns:
+            Versión, aciertos, reconstrucciones, entradas serializadas e
+            invalidaciones
+        """
+        return {
+            **self._stats,
+            'version': self.version,
+            'cached_entries': len(self._entries),
+            'cached_bodies': len(self._bodies)
+        }
@@ -6,14 +6,17 @@ integrando el DataService con la nueva estructura normalizada.
 """
 import asyncio
 
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
 from services.base_service import BaseService
+from services.camera_list_snapshot import CameraListBody, CameraListSnapshot
 from services.data_service import DataService, get_data_service
 from services.connection_service import ConnectionService, ConnectionType
 from models.camera_model import CameraModel, ConnectionConfig, StreamConfig, CameraCapabilities, ProtocolType, ConnectionStatus
 from services.logging_service import get_secure_logger
+from services.protocol_discovery import DiscoveryCredential, ProtocolDiscoveryPlanner
+from config.settings import settings
 from utils.exceptions import (
     CameraNotFoundError,
     CameraAlreadyExistsError,
@@ -53,6 +56,8 @@ class CameraManagerService(BaseService):
         self._connection_service = ConnectionService()
         self._cameras_cache: Dict[str, CameraModel] = {}
         self._cache_lock = asyncio.Lock()
+        # Listado serializado para la API; se invalida con cada cambio
+        self._camera_list = CameraListSnapshot()
         self._initialized = True
         
         self.logger.info("CameraManagerService inicializado")
@@ -83,6 +88,7 @@ class CameraManagerService(BaseService):
             # Limpiar caché existente
             async with self._cache_lock:
                 self._cameras_cache.clear()
+                self._camera_list.invalidate()
                 self.logger.info("Caché de cámaras limpiado")
             
             # Obtener IDs de cámaras activas
@@ -94,6 +100,7 @@ class CameraManagerService(BaseService):
                     if camera:
                         async with self._cache_lock:
                             self._cameras_cache[camera_id] = camera
+                            self._camera_list.invalidate(camera_id)
                 except Exception as e:
                     self.logger.error(f"Error cargando cámara {camera_id}: {e}")
                     
@@ -135,11 +142,19 @@ class CameraManagerService(BaseService):
             # Obtener IDs de todas las cámaras
             camera_ids = await self._data_service.get_all_camera_ids()
             
+            # Resolver desde caché en una pasada; solo las ausentes van a DB
+            async with self._cache_lock:
+                cached = {camera_id: self._cameras_cache.get(camera_id) for camera_id in camera_ids}
+            
             cameras = []
             for camera_id in camera_ids:
-                camera = await self.get_camera(camera_id)
-                if camera:
-                    cameras.append(camera)
+                camera = cached[camera_id]
+                if camera is None:
+                    try:
+                        camera = await self.get_camera(camera_id)
+                    except CameraNotFoundError:
+                        continue
+                cameras.append(camera)
             
             self.logger.info(f"Listadas {len(cameras)} cámaras desde base de datos")
             return cameras
@@ -319,6 +334,7 @@ class CameraManagerService(BaseService):
             # Agregar a cache
             async with self._cache_lock:
                 self._cameras_cache[camera.camera_id] = camera
+                self._camera_list.invalidate(camera.camera_id)
             
             self.logger.info(f"Cámara creada: {camera.camera_id}")
             return camera
@@ -354,6 +370,7 @@ class CameraManagerService(BaseService):
         # Agregar a cache
         async with self._cache_lock:
             self._cameras_cache[camera_id] = camera
+            self._camera_list.invalidate(camera_id)
         
         return camera
     
@@ -379,6 +396,36 @@ class CameraManagerService(BaseService):
         async with self._cache_lock:
             return list(self._cameras_cache.values())
     
+    async def get_camera_list_snapshot(
+        self,
+        render: Callable[[CameraModel], Dict[str, Any]],
+        active_only: bool = True,
+        protocol: Optional[ProtocolType] = None
+    ) -> CameraListBody:
+        """
+        Obtiene el listado de cámaras serializado, con su ETag.
+        
+        Solo se vuelven a construir las cámaras que cambiaron desde la
+        última petición; si ninguna cambió se devuelve el mismo cuerpo.
+        
+        Args:
+            render: Convierte una cámara en el diccionario de su respuesta
+            active_only: Si solo incluir cámaras activas
+            protocol: Filtrar por protocolo específico
+            
+        Returns:
+            CameraListBody con el JSON ``{"total", "cameras"}`` y su ETag
+        """
+        cameras = await self.get_all_cameras()
+        
+        if active_only:
+            cameras = [c for c in cameras if c.is_active]
+            
+        if protocol:
+            cameras = [c for c in cameras if c.can_connect_with_protocol(protocol)]
+        
+        return self._camera_list.get(cameras, render, key=(active_only, protocol))
+    
     async def update_camera(self, camera_id: str, updates: Dict[str, Any]) -> CameraModel:
         """
         Actualiza una cámara.
@@ -428,6 +475,7 @@ class CameraManagerService(BaseService):
                     verified=endpoint.get('verified', False)
                 )
         
+        self._camera_list.invalidate(camera_id)
         self.logger.info(f"Cámara actualizada: {camera_id}")
         return camera
     
@@ -456,6 +504,7 @@ class CameraManagerService(BaseService):
         # Eliminar de cache
         async with self._cache_lock:
             self._cameras_cache.pop(camera_id, None)
+            self._camera_list.invalidate(camera_id)
         
         self.logger.info(f"Cámara eliminada: {camera_id}")
         return True
@@ -719,6 +768,7 @@ class CameraManagerService(BaseService):
                     if camera_id in self._cameras_cache:
                         self._cameras_cache[camera_id].connection_config.username = credential['username']
                         self._cameras_cache[camera_id].connection_config.auth_type = credential['auth_type']
+                        self._camera_list.invalidate(camera_id)
                         self.logger.debug(f"Caché actualizado con nueva credencial default para cámara {camera_id}")
             
             # Eliminar contraseña de la respuesta por seguridad
@@ -777,6 +827,7 @@ class CameraManagerService(BaseService):
             if credential.get('is_default'):
                 camera.connection_config.username = credential['username']
                 camera.connection_config.auth_type = credential.get('auth_type', 'basic')
+                self._camera_list.invalidate(camera_id)
             
             # Eliminar contraseña de la respuesta
             credential.pop('password_encrypted', None)
@@ -854,6 +905,7 @@ class CameraManagerService(BaseService):
             success = await self._data_service.delete_credential(camera_id, credential_id)
             
             if success:
+                self._camera_list.invalidate(camera_id)
                 self.logger.info(f"Credencial {credential_id} eliminada exitosamente de cámara {camera_id}")
             else:
                 raise ServiceError(f"No se pudo eliminar la credencial {credential_id} de la base de datos")
@@ -900,6 +952,7 @@ class CameraManagerService(BaseService):
             if success:
                 camera.connection_config.username = credential['username']
                 camera.connection_config.auth_type = credential.get('auth_type', 'basic')
+                self._camera_list.invalidate(camera_id)
             
             return success
             
@@ -1388,6 +1441,7 @@ class CameraManagerService(BaseService):
             
             # Obtener protocolo actualizado
             updated_protocol = await self._data_service.get_protocol_by_type(camera_id, protocol_type)
+            self._camera_list.invalidate(camera_id)
             
             # Si se cambió habilitación, actualizar caché
             if 'is_enabled' in updates:
@@ -1455,24 +1509,18 @@ class CameraManagerService(BaseService):
                 if not credential:
                     raise ValueError("No hay credencial default configurada")
             
-            self.logger.info(f"Probando protocolo {protocol_type} en {camera['ip']}:{protocol['port']}")
+            self.logger.info(f"Probando protocolo {protocol_type} en {camera.ip}:{protocol['port']}")
             
             # Delegar prueba al ProtocolService
             from services.protocol_service import protocol_service
             
             # Desencriptar password de forma segura
-            try:
-                decrypted_password = await self._encryption_service.decrypt(
-                    credential['password_encrypted']
-                )
-            except Exception as e:
-                self.logger.error(f"Error desencriptando credencial: {e}")
-                raise ServiceError("Error al procesar credenciales")
+            decrypted_password = self._decrypt_password(credential)
             
             start_time = asyncio.get_event_loop().time()
             
             result = await protocol_service.test_protocol(
-                ip=camera['ip'],
+                ip=camera.ip,
                 port=protocol['port'],
                 protocol_type=protocol_type,
                 username=credential['username'],
@@ -1577,85 +1625,48 @@ class CameraManagerService(BaseService):
                 raise ValueError("No hay credenciales disponibles para discovery")
             
             self.logger.info(
-                f"Iniciando discovery en {camera['ip']}: "
+                f"Iniciando discovery en {camera.ip}: "
                 f"{len(ports_to_scan)} puertos, {len(credentials)} credenciales"
             )
             
-            # Delegar discovery al ProtocolService
             from services.protocol_service import protocol_service
             
-            discovered = []
-            protocols_tested = set()
+            # Desencriptar cada credencial una sola vez; la default primero
+            credentials.sort(key=lambda c: not c.get('is_default'))
+            discovery_credentials = [
+                DiscoveryCredential(
+                    credential_id=c['credential_id'],
+                    username=c['username'],
+                    password=self._decrypt_password(c)
+                )
+                for c in credentials
+            ]
+            
+            planner = ProtocolDiscoveryPlanner(
+                protocol_service.test_protocol,
+                max_concurrency=settings.DISCOVERY_MAX_CONCURRENCY,
+                host_min_interval=settings.DISCOVERY_HOST_MIN_INTERVAL_MS / 1000,
+                attempt_timeout=5  # Timeout corto para discovery
+            )
+            remaining = timeout - (asyncio.get_event_loop().time() - start_time)
+            report = await planner.run(
+                camera.ip, ports_to_scan, discovery_credentials, timeout=max(1.0, remaining)
+            )
+            discovered = report.found
             
-            # Probar cada puerto con cada credencial
-            for port in ports_to_scan:
-                if (asyncio.get_event_loop().time() - start_time) > timeout:
-                    break
-                
-                for credential in credentials:
-                    if (asyncio.get_event_loop().time() - start_time) > timeout:
-                        break
-                    
-                    # Determinar protocolos a probar en este puerto
-                    if port in [80, 81, 8080, 8081, 2020, 2021]:
-                        test_protocols = ['onvif', 'http']
-                    elif port in [443, 8443]:
-                        test_protocols = ['https']
-                    elif port in [554, 555]:
-                        test_protocols = ['rtsp']
-                    elif port == 37777:
-                        test_protocols = ['amcrest']
-                    else:
-                        test_protocols = ['http', 'rtsp']
-                    
-                    for proto in test_protocols:
-                        key = f"{proto}:{port}"
-                        if key in protocols_tested:
-                            continue
-                        
-                        protocols_tested.add(key)
-                        
-                        try:
-                            # Desencriptar password de forma segura
-                            decrypted_password = await self._encryption_service.decrypt(
-                                credential['password_encrypted']
-                            )
-                            
-                            result = await protocol_service.test_protocol(
-                                ip=camera['ip'],
-                                port=port,
-                                protocol_type=proto,
-                                username=credential['username'],
-                                password=decrypted_password,
-                                timeout=5  # Timeout corto para discovery
-                            )
-                        except Exception as e:
-                            self.logger.debug(
-                                f"Error probando {proto} en puerto {port}: {e}"
-                            )
-                            result = {'success': False, 'error': str(e)}
-                        
-                        if result.get('success'):
-                            discovered.append({
-                                'protocol_type': proto,
-                                'port': port,
-                                'version': result.get('version'),
-                                'verified': True,
-                                'credential_id': credential['credential_id']
-                            })
-                            
-                            # Guardar en BD si es nuevo
-                            existing = await self._data_service.get_protocol_by_type(
-                                camera_id, proto
-                            )
-                            if not existing:
-                                await self._data_service.add_camera_protocol(camera_id, {
-                                    'protocol_type': proto,
-                                    'port': port,
-                                    'is_enabled': True,
-                                    'is_verified': True,
-                                    'version': result.get('version')
-                                })
+            # Guardar en BD los protocolos nuevos
+            for found in discovered:
+                existing = await self._data_service.get_protocol_by_type(
+                    camera_id, found['protocol_type']
+                )
+                if not existing:
+                    await self._data_service.add_camera_protocol(camera_id, {
+                        'protocol_type': found['protocol_type'],
+                        'port': found['port'],
+                        'is_enabled': True,
+                        'is_verified': True,
+                        'version': found.get('version')
+                    })
             
             scan_duration = int((asyncio.get_event_loop().time() - start_time) * 1000)
             
@@ -1664,7 +1675,11 @@ class CameraManagerService(BaseService):
                 'scan_duration_ms': scan_duration,
                 'protocols_found': discovered,
                 'ports_scanned': ports_to_scan,
+                'open_ports': report.open_ports,
                 'credentials_tested': len(credentials),
+                'attempts': report.attempts,
+                'cancelled_attempts': report.cancelled_attempts,
+                'timed_out': report.timed_out,
                 'message': f"Discovery completado. Encontrados {len(discovered)} protocolos activos."
             }
             
@@ -1675,6 +1690,21 @@ class CameraManagerService(BaseService):
             self.logger.error(f"Error en discovery de protocolos: {e}", exc_info=True)
             raise ServiceError(f"Error en discovery: {str(e)}")
     
+    def _decrypt_password(self, credential: Dict[str, Any]) -> str:
+        """
+        Desencripta el password de una credencial.
+        
+        Raises:
+            ServiceError: Si la credencial no puede desencriptarse
+        """
+        from services.encryption_service_v2 import encryption_service_v2
+        
+        try:
+            return encryption_service_v2.decrypt(credential['password_encrypted'])
+        except Exception as e:
+            self.logger.error(f"Error desencriptando credencial: {e}")
+            raise ServiceError("Error al procesar credenciales")
+    
     async def discover_protocols_async(self, camera_id: str, **kwargs):
         """
         Versión asíncrona de discover_protocols para ejecutar en background.
@@ -42,6 +42,8 @@ except ImportError:
 from dataclasses import dataclass, field
 from enum import Enum
 from services.logging_service import get_secure_logger
+from services.database.connection_pool import SQLiteConnectionPool, get_connection_pool
+from services.database.db_executor import db_read, db_write, get_db_executor
 
 try:
     from ..models import CameraModel, ConnectionModel, ScanModel
@@ -166,9 +168,13 @@ class DataService:
         self._initialized = False
         self._shutdown = False
         
-        # Base de datos
-        self._db_connection: Optional[Union[sqlite3.Connection, Any]] = None
-        self._db_lock = threading.RLock()
+        # Base de datos: conexiones SQLite por hilo (pool compartido) o
+        # conexión directa para DuckDB
+        self._pool: Optional[SQLiteConnectionPool] = None
+        self._direct_connection: Optional[Any] = None
+        self._direct_lock = threading.RLock()
+        # Todo el SQL corre en el executor de BD, nunca en el event loop
+        self._db_executor = get_db_executor()
         
         # Cache en memoria
         self._camera_cache: Dict[str, CameraData] = {}
@@ -191,6 +197,23 @@ class DataService:
         self._background_tasks = []
         self._executor = None
         
+    @property
+    def _db_connection(self) -> Optional[Union[sqlite3.Connection, Any]]:
+        """Conexión del hilo actual del pool SQLite, o la conexión directa."""
+        if self._pool is not None:
+            return self._pool.get()
+        return self._direct_connection
+    
+    @property
+    def _database_ready(self) -> bool:
+        """Indica si hay base de datos sin abrir conexión en el hilo actual."""
+        return self._pool is not None or self._direct_connection is not None
+    
+    @property
+    def _write_lock(self) -> threading.RLock:
+        """Lock de escrituras compartido con los demás servicios de la misma BD."""
+        return self._pool.write_lock if self._pool is not None else self._direct_lock
+    
     async def initialize(self) -> bool:
         """
         Inicializa el servicio de datos.
@@ -281,11 +304,7 @@ class DataService:
     
     async def _initialize_sqlite(self) -> None:
         """Inicializa base de datos SQLite."""
-        self._db_connection = sqlite3.connect(
-            self.config.database_path,
-            check_same_thread=False
-        )
-        self._db_connection.row_factory = sqlite3.Row
+        self._pool = get_connection_pool(self.config.database_path)
         
         # Crear tablas
         await self._create_tables_sqlite()
@@ -294,20 +313,20 @@ class DataService:
     
     async def _initialize_sqlite_memory(self) -> None:
         """Inicializa base de datos SQLite en memoria."""
-        self._db_connection = sqlite3.connect(":memory:", check_same_thread=False)
-        self._db_connection.row_factory = sqlite3.Row
+        self._pool = get_connection_pool(":memory:")
         await self._create_tables_sqlite()
         
         self.logger.info("Base de datos SQLite en memoria inicializada")
     
     async def _initialize_duckdb(self) -> None:
         """Inicializa base de datos DuckDB."""
-        self._db_connection = duckdb.connect(self.config.database_path)
+        self._direct_connection = duckdb.connect(self.config.database_path)
         await self._create_tables_duckdb()
         
         self.logger.info(f"🦆 Base de datos DuckDB inicializada: {self.config.database_path}")
     
-    async def _create_tables_sqlite(self) -> None:
+    @db_write
+    def _create_tables_sqlite(self) -> None:
         """Crea las tablas necesarias en SQLite con diseño normalizado 3FN."""
         if not self._db_connection:
             raise RuntimeError("Base de datos no inicializada")
@@ -322,9 +341,8 @@ class DataService:
         if not cursor.fetchone():
             self.logger.info("Base de datos no existe, creando estructura...")
             
-            # Cerrar conexión actual
-            self._db_connection.close()
-            self._db_connection = None
+            # Cerrar las conexiones del pool: el creador reemplaza el fichero
+            self._pool.close()
             
             # Crear base de datos usando el script dedicado
             creator = DatabaseCreator(self.config.database_path)
@@ -332,14 +350,7 @@ class DataService:
                 raise RuntimeError("Error creando estructura de base de datos")
             
             # Reconectar a la nueva base de datos
-            self._db_connection = sqlite3.connect(
-                self.config.database_path,
-                check_same_thread=False
-            )
-            self._db_connection.row_factory = sqlite3.Row
-            
-            # Habilitar claves foráneas
-            self._db_connection.execute("PRAGMA foreign_keys = ON")
+            self._pool = get_connection_pool(self.config.database_path)
             
             self.logger.info("Base de datos creada y reconectada exitosamente")
     
@@ -356,88 +367,88 @@ class DataService:
         
         self.logger.info(f"🧠 Cache inicializado: {len(self._camera_cache)} cámaras, {len(self._scan_cache)} escaneos")
     
-    async def _load_recent_cameras_to_cache(self) -> None:
+    @db_read
+    def _load_recent_cameras_to_cache(self) -> None:
         """Carga cámaras recientes al cache usando la nueva estructura 3FN."""
         if not self._db_connection:
             return
             
         try:
-            with self._db_lock:
-                cursor = self._db_connection.cursor()
-                # Query actualizada para nueva estructura
+            cursor = self._db_connection.cursor()
+            # Query actualizada para nueva estructura
+            cursor.execute("""
+                SELECT 
+                    c.camera_id, c.brand, c.model, c.ip_address,
+                    cs.last_connection_at, cs.total_connections,
+                    cs.successful_connections, cs.failed_connections,
+                    cs.total_uptime_seconds
+                FROM cameras c
+                LEFT JOIN camera_statistics cs ON c.camera_id = cs.camera_id
+                WHERE cs.last_connection_at > datetime('now', '-1 day')
+                   OR c.created_at > datetime('now', '-1 day')
+                ORDER BY COALESCE(cs.last_connection_at, c.created_at) DESC 
+                LIMIT 50
+            """)
+            
+            for row in cursor.fetchall():
+                # Obtener protocolos de la cámara
                 cursor.execute("""
-                    SELECT 
-                        c.camera_id, c.brand, c.model, c.ip_address,
-                        cs.last_connection_at, cs.total_connections,
-                        cs.successful_connections, cs.failed_connections,
-                        cs.total_uptime_seconds
-                    FROM cameras c
-                    LEFT JOIN camera_statistics cs ON c.camera_id = cs.camera_id
-                    WHERE cs.last_connection_at > datetime('now', '-1 day')
-                       OR c.created_at > datetime('now', '-1 day')
-                    ORDER BY COALESCE(cs.last_connection_at, c.created_at) DESC 
-                    LIMIT 50
-                """)
-                
-                for row in cursor.fetchall():
-                    # Obtener protocolos de la cámara
-                    cursor.execute("""
-                        SELECT protocol_type FROM camera_protocols 
-                        WHERE camera_id = ? AND is_enabled = 1
-                    """, (row[0],))
-                    protocols = [p[0] for p in cursor.fetchall()]
-                    
-                    camera_data = CameraData(
-                        camera_id=row[0],
-                        brand=row[1],
-                        model=row[2],
-                        ip=row[3],
-                        last_seen=datetime.fromisoformat(row[4]) if row[4] else datetime.now(),
-                        connection_count=row[5] or 0,
-                        successful_connections=row[6] or 0,
-                        failed_connections=row[7] or 0,
-                        total_uptime_minutes=int((row[8] or 0) / 60),
-                        snapshots_count=0,  # Campo no existe en nueva estructura
-                        protocols=protocols,
-                        metadata={}
-                    )
-                    
-                    with self._cache_lock:
-                        self._camera_cache[camera_data.camera_id] = camera_data
-                        self._cache_timestamps[f"camera_{camera_data.camera_id}"] = datetime.now()
+                    SELECT protocol_type FROM camera_protocols 
+                    WHERE camera_id = ? AND is_enabled = 1
+                """, (row[0],))
+                protocols = [p[0] for p in cursor.fetchall()]
+                
+                camera_data = CameraData(
+                    camera_id=row[0],
+                    brand=row[1],
+                    model=row[2],
+                    ip=row[3],
+                    last_seen=datetime.fromisoformat(row[4]) if row[4] else datetime.now(),
+                    connection_count=row[5] or 0,
+                    successful_connections=row[6] or 0,
+                    failed_connections=row[7] or 0,
+                    total_uptime_minutes=int((row[8] or 0) / 60),
+                    snapshots_count=0,  # Campo no existe en nueva estructura
+                    protocols=protocols,
+                    metadata={}
+                )
+                
+                with self._cache_lock:
+                    self._camera_cache[camera_data.camera_id] = camera_data
+                    self._cache_timestamps[f"camera_{camera_data.camera_id}"] = datetime.now()
                         
         except Exception as e:
             self.logger.error(f"Error cargando cámaras al cache desde nueva estructura: {e}")
     
-    async def _load_recent_scans_to_cache(self) -> None:
+    @db_read
+    def _load_recent_scans_to_cache(self) -> None:
         """Carga escaneos recientes al cache."""
         if not self._db_connection:
             return
             
         try:
-            with self._db_lock:
-                cursor = self._db_connection.cursor()
-                # Por ahora omitir carga de escaneos ya que la tabla se llama network_scans
-                # y tiene estructura diferente. Necesita adaptación completa.
-                pass  # TODO: Adaptar a nueva estructura network_scans
-                
-                for row in cursor.fetchall():
-                    scan_data = ScanData(
-                        scan_id=row['scan_id'],
-                        target_ip=row['target_ip'],
-                        timestamp=datetime.fromisoformat(row['timestamp']),
-                        duration_seconds=row['duration_seconds'],
-                        ports_scanned=row['ports_scanned'],
-                        ports_found=row['ports_found'],
-                        authentication_tested=bool(row['authentication_tested']),
-                        successful_auths=row['successful_auths'],
-                        protocols_detected=json.loads(row['protocols_detected'] or '[]'),
-                        results=json.loads(row['results'] or '{}')
-                    )
-                    
-                    with self._cache_lock:
-                        self._scan_cache[scan_data.scan_id] = scan_data
-                        self._cache_timestamps[f"scan_{scan_data.scan_id}"] = datetime.now()
+            cursor = self._db_connection.cursor()
+            # Por ahora omitir carga de escaneos ya que la tabla se llama network_scans
+            # y tiene estructura diferente. Necesita adaptación completa.
+            pass  # TODO: Adaptar a nueva estructura network_scans
+            
+            for row in cursor.fetchall():
+                scan_data = ScanData(
+                    scan_id=row['scan_id'],
+                    target_ip=row['target_ip'],
+                    timestamp=datetime.fromisoformat(row['timestamp']),
+                    duration_seconds=row['duration_seconds'],
+                    ports_scanned=row['ports_scanned'],
+                    ports_found=row['ports_found'],
+                    authentication_tested=bool(row['authentication_tested']),
+                    successful_auths=row['successful_auths'],
+                    protocols_detected=json.loads(row['protocols_detected'] or '[]'),
+                    results=json.loads(row['results'] or '{}')
+                )
+                
+                with self._cache_lock:
+                    self._scan_cache[scan_data.scan_id] = scan_data
+                    self._cache_timestamps[f"scan_{scan_data.scan_id}"] = datetime.now()
                         
         except Exception as e:
             self.logger.error(f"Error cargando escaneos al cache: {e}")
@@ -499,7 +510,7 @@ class DataService:
         
         Este método mapea la estructura antigua a la nueva estructura 3FN.
         """
-        if not self._db_connection:
+        if not self._database_ready:
             raise RuntimeError("Base de datos no inicializada")
             
         self.logger.warning(
@@ -562,7 +573,7 @@ class DataService:
         
         Este método mantiene compatibilidad con código que espera CameraData.
         """
-        if not self._db_connection:
+        if not self._database_ready:
             return None
             
         try:
@@ -760,7 +771,8 @@ class DataService:
         with open(filepath, 'w', encoding='utf-8') as htmlfile:
             htmlfile.write(html_content)
     
-    async def _get_filtered_cameras(self, filter_params: Optional[Dict[str, Any]] = None) -> List[CameraData]:
+    @db_read
+    def _get_filtered_cameras(self, filter_params: Optional[Dict[str, Any]] = None) -> List[CameraData]:
         """Obtiene cámaras con filtros aplicados usando nueva estructura 3FN."""
         if not self._db_connection:
             return []
@@ -768,44 +780,43 @@ class DataService:
         cameras = []
         
         try:
-            with self._db_lock:
-                cursor = self._db_connection.cursor()
-                # Query actualizada para nueva estructura
+            cursor = self._db_connection.cursor()
+            # Query actualizada para nueva estructura
+            cursor.execute("""
+                SELECT 
+                    c.camera_id, c.brand, c.model, c.ip_address,
+                    cs.last_connection_at, cs.total_connections,
+                    cs.successful_connections, cs.failed_connections,
+                    cs.total_uptime_seconds
+                FROM cameras c
+                LEFT JOIN camera_statistics cs ON c.camera_id = cs.camera_id
+                WHERE c.is_active = 1
+                ORDER BY COALESCE(cs.last_connection_at, c.created_at) DESC
+            """)
+            
+            for row in cursor.fetchall():
+                # Obtener protocolos de la cámara
                 cursor.execute("""
-                    SELECT 
-                        c.camera_id, c.brand, c.model, c.ip_address,
-                        cs.last_connection_at, cs.total_connections,
-                        cs.successful_connections, cs.failed_connections,
-                        cs.total_uptime_seconds
-                    FROM cameras c
-                    LEFT JOIN camera_statistics cs ON c.camera_id = cs.camera_id
-                    WHERE c.is_active = 1
-                    ORDER BY COALESCE(cs.last_connection_at, c.created_at) DESC
-                """)
-                
-                for row in cursor.fetchall():
-                    # Obtener protocolos de la cámara
-                    cursor.execute("""
-                        SELECT protocol_type FROM camera_protocols 
-                        WHERE camera_id = ? AND is_enabled = 1
-                    """, (row[0],))
-                    protocols = [p[0] for p in cursor.fetchall()]
-                    
-                    camera_data = CameraData(
-                        camera_id=row[0],
-                        brand=row[1],
-                        model=row[2],
-                        ip=row[3],
-                        last_seen=datetime.fromisoformat(row[4]) if row[4] else datetime.now(),
-                        connection_count=row[5] or 0,
-                        successful_connections=row[6] or 0,
-                        failed_connections=row[7] or 0,
-                        total_uptime_minutes=int((row[8] or 0) / 60),
-                        snapshots_count=0,  # Campo no existe en nueva estructura
-                        protocols=protocols,
-                        metadata={}
-                    )
-                    cameras.append(camera_data)
+                    SELECT protocol_type FROM camera_protocols 
+                    WHERE camera_id = ? AND is_enabled = 1
+                """, (row[0],))
+                protocols = [p[0] for p in cursor.fetchall()]
+                
+                camera_data = CameraData(
+                    camera_id=row[0],
+                    brand=row[1],
+                    model=row[2],
+                    ip=row[3],
+                    last_seen=datetime.fromisoformat(row[4]) if row[4] else datetime.now(),
+                    connection_count=row[5] or 0,
+                    successful_connections=row[6] or 0,
+                    failed_connections=row[7] or 0,
+                    total_uptime_minutes=int((row[8] or 0) / 60),
+                    snapshots_count=0,  # Campo no existe en nueva estructura
+                    protocols=protocols,
+                    metadata={}
+                )
+                cameras.append(camera_data)
                     
         except Exception as e:
             self.logger.error(f"Error obteniendo cámaras filtradas desde nueva estructura: {e}")
@@ -820,53 +831,54 @@ class DataService:
             **self._stats,
             "cache_size": len(self._camera_cache) + len(self._scan_cache),
             "database_type": self.config.database_type.value,
+            "db_executor": self._db_executor.get_metrics(),
             "uptime_minutes": (datetime.now() - datetime.now()).total_seconds() / 60  # Placeholder
         }
     
-    async def get_camera_statistics(self) -> Dict[str, Any]:
+    @db_read
+    def get_camera_statistics(self) -> Dict[str, Any]:
         """Obtiene estadísticas específicas de cámaras."""
         if not self._db_connection:
             return {}
             
         try:
-            with self._db_lock:
-                cursor = self._db_connection.cursor()
-                
-                # Función auxiliar para acceso seguro
-                def safe_fetchone_get(cursor_result: Any, field: str, default: Any = 0) -> Any:
-                    try:
-                        row = cursor_result
-                        if row and hasattr(row, '__getitem__'):
-                            return row[field]
-                        return default
-                    except (KeyError, TypeError):
-                        return default
-                
-                # Estadísticas básicas
-                cursor.execute("SELECT COUNT(*) as total FROM cameras")
-                result = cursor.fetchone()
-                total_cameras = safe_fetchone_get(result, 'total', 0)
-                
-                cursor.execute("SELECT brand, COUNT(*) as count FROM cameras GROUP BY brand")
-                brands = {}
-                for row in cursor.fetchall():
-                    try:
-                        brand = row['brand'] if row else 'unknown'
-                        count = row['count'] if row else 0
-                        brands[brand] = count
-                    except (KeyError, TypeError):
-                        continue
-                
-                cursor.execute("SELECT AVG(successful_connections) as avg_success FROM cameras")
-                result = cursor.fetchone()
-                avg_success = safe_fetchone_get(result, 'avg_success', 0)
-                
-                return {
-                    "total_cameras": total_cameras,
-                    "brands_distribution": brands,
-                    "average_success_rate": avg_success,
-                    "cache_hit_rate": self._stats['cache_hits'] / max(1, self._stats['cache_hits'] + self._stats['cache_misses'])
-                }
+            cursor = self._db_connection.cursor()
+            
+            # Función auxiliar para acceso seguro
+            def safe_fetchone_get(cursor_result: Any, field: str, default: Any = 0) -> Any:
+                try:
+                    row = cursor_result
+                    if row and hasattr(row, '__getitem__'):
+                        return row[field]
+                    return default
+                except (KeyError, TypeError):
+                    return default
+            
+            # Estadísticas básicas
+            cursor.execute("SELECT COUNT(*) as total FROM cameras")
+            result = cursor.fetchone()
+            total_cameras = safe_fetchone_get(result, 'total', 0)
+            
+            cursor.execute("SELECT brand, COUNT(*) as count FROM cameras GROUP BY brand")
+            brands = {}
+            for row in cursor.fetchall():
+                try:
+                    brand = row['brand'] if row else 'unknown'
+                    count = row['count'] if row else 0
+                    brands[brand] = count
+                except (KeyError, TypeError):
+                    continue
+            
+            cursor.execute("SELECT AVG(successful_connections) as avg_success FROM cameras")
+            result = cursor.fetchone()
+            avg_success = safe_fetchone_get(result, 'avg_success', 0)
+            
+            return {
+                "total_cameras": total_cameras,
+                "brands_distribution": brands,
+                "average_success_rate": avg_success,
+                "cache_hit_rate": self._stats['cache_hits'] / max(1, self._stats['cache_hits'] + self._stats['cache_misses'])
+            }
                 
         except Exception as e:
             self.logger.error(f"Error obteniendo estadísticas de cámaras: {e}")
@@ -937,7 +949,8 @@ class DataService:
             except Exception as e:
                 self.logger.error(f"Error en backup automático: {e}")
     
-    async def _create_backup(self) -> bool:
+    @db_read
+    def _create_backup(self) -> bool:
         """Crea un backup de la base de datos."""
         if not self._db_connection:
             return True # No hay nada que hacer backup en memoria
@@ -978,7 +991,8 @@ class DataService:
             except Exception as e:
                 self.logger.error(f"Error en limpieza de datos: {e}")
     
-    async def _cleanup_old_data(self) -> None:
+    @db_write
+    def _cleanup_old_data(self) -> None:
         """Limpia datos antiguos según configuración."""
         if not self._db_connection:
             return
@@ -986,7 +1000,7 @@ class DataService:
         try:
             cutoff_date = datetime.now() - timedelta(days=self.config.auto_cleanup_days)
             
-            with self._db_lock:
+            with self._write_lock:
                 cursor = self._db_connection.cursor()
                 
                 # Limpiar escaneos antiguos
@@ -1007,7 +1021,8 @@ class DataService:
     
     # ================== NUEVOS MÉTODOS CRUD PARA ESTRUCTURA 3FN ==================
     
-    async def save_camera_with_config(self, camera: CameraModel, credentials: Dict[str, str],
+    @db_write
+    def save_camera_with_config(self, camera: CameraModel, credentials: Dict[str, str],
                                     endpoints: List[Dict[str, Any]] = None) -> bool:
         """
         Guarda una cámara con su configuración completa en la nueva estructura.
@@ -1024,7 +1039,7 @@ class DataService:
             return False
             
         try:
-            with self._db_lock:
+            with self._write_lock:
                 cursor = self._db_connection.cursor()
                 
                 # Iniciar transacción
@@ -1135,7 +1150,8 @@ class DataService:
                 self._db_connection.rollback()
             return False
     
-    async def get_camera_full_config(self, camera_id: str) -> Optional[Dict[str, Any]]:
+    @db_read
+    def get_camera_full_config(self, camera_id: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene la configuración completa de una cámara desde la nueva estructura.
         
@@ -1149,86 +1165,86 @@ class DataService:
             return None
             
         try:
-            with self._db_lock:
-                cursor = self._db_connection.cursor()
-                
-                # Obtener datos básicos
-                cursor.execute("""
-                    SELECT * FROM cameras WHERE camera_id = ?
-                """, (camera_id,))
-                camera_row = cursor.fetchone()
-                
-                if not camera_row:
-                    return None
-                
-                # Convertir a diccionario
-                camera_data = dict(zip([col[0] for col in cursor.description], camera_row))
-                
-                # Obtener credenciales
-                cursor.execute("""
-                    SELECT username, password_encrypted 
-                    FROM camera_credentials 
-                    WHERE camera_id = ? AND is_default = 1
-                """, (camera_id,))
-                cred_row = cursor.fetchone()
-                
-                if cred_row:
-                    from .encryption_service_v2 import encryption_service_v2
-                    camera_data['credentials'] = {
-                        'username': cred_row[0],
-                        'password': encryption_service_v2.decrypt(cred_row[1]) if cred_row[1] else ''
-                    }
-                
-                # Obtener protocolos
-                cursor.execute("""
-                    SELECT protocol_type, port, is_primary 
-                    FROM camera_protocols 
-                    WHERE camera_id = ? AND is_enabled = 1
-                    ORDER BY is_primary DESC
-                """, (camera_id,))
-                protocols = []
-                for row in cursor.fetchall():
-                    protocols.append({
-                        'type': row[0],
-                        'port': row[1],
-                        'is_primary': bool(row[2])
-                    })
-                camera_data['protocols'] = protocols
-                
-                # Obtener endpoints
-                cursor.execute("""
-                    SELECT endpoint_type, url, is_verified, priority 
-                    FROM camera_endpoints 
-                    WHERE camera_id = ?
-                    ORDER BY priority ASC, is_verified DESC
-                """, (camera_id,))
-                endpoints = []
-                for row in cursor.fetchall():
-                    endpoints.append({
-                        'type': row[0],
-                        'url': row[1],
-                        'verified': bool(row[2]),
-                        'priority': row[3]
-                    })
-                camera_data['endpoints'] = endpoints
-                
-                # Obtener estadísticas
-                cursor.execute("""
-                    SELECT * FROM camera_statistics WHERE camera_id = ?
-                """, (camera_id,))
-                stats_row = cursor.fetchone()
-                if stats_row:
-                    camera_data['statistics'] = dict(zip(
-                        [col[0] for col in cursor.description], stats_row
-                    ))
-                
-                return camera_data
+            cursor = self._db_connection.cursor()
+            
+            # Obtener datos básicos
+            cursor.execute("""
+                SELECT * FROM cameras WHERE camera_id = ?
+            """, (camera_id,))
+            camera_row = cursor.fetchone()
+            
+            if not camera_row:
+                return None
+            
+            # Convertir a diccionario
+            camera_data = dict(zip([col[0] for col in cursor.description], camera_row))
+            
+            # Obtener credenciales
+            cursor.execute("""
+                SELECT username, password_encrypted 
+                FROM camera_credentials 
+                WHERE camera_id = ? AND is_default = 1
+            """, (camera_id,))
+            cred_row = cursor.fetchone()
+            
+            if cred_row:
+                from .encryption_service_v2 import encryption_service_v2
+                camera_data['credentials'] = {
+                    'username': cred_row[0],
+                    'password': encryption_service_v2.decrypt(cred_row[1]) if cred_row[1] else ''
+                }
+            
+            # Obtener protocolos
+            cursor.execute("""
+                SELECT protocol_type, port, is_primary 
+                FROM camera_protocols 
+                WHERE camera_id = ? AND is_enabled = 1
+                ORDER BY is_primary DESC
+            """, (camera_id,))
+            protocols = []
+            for row in cursor.fetchall():
+                protocols.append({
+                    'type': row[0],
+                    'port': row[1],
+                    'is_primary': bool(row[2])
+                })
+            camera_data['protocols'] = protocols
+            
+            # Obtener endpoints
+            cursor.execute("""
+                SELECT endpoint_type, url, is_verified, priority 
+                FROM camera_endpoints 
+                WHERE camera_id = ?
+                ORDER BY priority ASC, is_verified DESC
+            """, (camera_id,))
+            endpoints = []
+            for row in cursor.fetchall():
+                endpoints.append({
+                    'type': row[0],
+                    'url': row[1],
+                    'verified': bool(row[2]),
+                    'priority': row[3]
+                })
+            camera_data['endpoints'] = endpoints
+            
+            # Obtener estadísticas
+            cursor.execute("""
+                SELECT * FROM camera_statistics WHERE camera_id = ?
+            """, (camera_id,))
+            stats_row = cursor.fetchone()
+            if stats_row:
+                camera_data['statistics'] = dict(zip(
+                    [col[0] for col in cursor.description], stats_row
+                ))
+            
+            return camera_data
                 
         except Exception as e:
             self.logger.error(f"Error obteniendo configuración completa: {e}")
             return None
     
-    async def save_discovered_endpoint(self, camera_id: str, endpoint_type: str, 
+    @db_write
+    def save_discovered_endpoint(self, camera_id: str, endpoint_type: str, 
                                      url: str, verified: bool = False) -> bool:
         """
         Guarda un endpoint/URL descubierto para una cámara.
@@ -1246,7 +1262,7 @@ class DataService:
             return False
             
         try:
-            with self._db_lock:
+            with self._write_lock:
                 cursor = self._db_connection.cursor()
                 
                 # Verificar si ya existe
@@ -1282,7 +1298,8 @@ class DataService:
             self.logger.error(f"Error guardando endpoint: {e}")
             return False
     
-    async def update_connection_stats(self, camera_id: str, success: bool, 
+    @db_write
+    def update_connection_stats(self, camera_id: str, success: bool, 
                                     duration_ms: int = 0) -> bool:
         """
         Actualiza las estadísticas de conexión de una cámara.
@@ -1299,7 +1316,7 @@ class DataService:
             return False
             
         try:
-            with self._db_lock:
+            with self._write_lock:
                 cursor = self._db_connection.cursor()
                 
                 # Actualizar estadísticas
@@ -1395,7 +1412,8 @@ class DataService:
         }
         return default_ports.get(protocol_lower, 80)
     
-    async def get_all_camera_ids(self) -> List[str]:
+    @db_read
+    def get_all_camera_ids(self) -> List[str]:
         """
         Obtiene todos los IDs de cámaras activas.
         
@@ -1406,13 +1424,12 @@ class DataService:
             return []
             
         try:
-            with self._db_lock:
-                cursor = self._db_connection.cursor()
-                cursor.execute("""
-                    SELECT camera_id FROM cameras WHERE is_active = 1
-                """)
-                
-                return [row[0] for row in cursor.fetchall()]
+            cursor = self._db_connection.cursor()
+            cursor.execute("""
+                SELECT camera_id FROM cameras WHERE is_active = 1
+            """)
+            
+            return [row[0] for row in cursor.fetchall()]
                 
         except Exception as e:
             self.logger.error(f"Error obteniendo IDs de cámaras: {e}")
@@ -1420,7 +1437,8 @@ class DataService:
     
     # === Métodos de Gestión de Credenciales ===
     
-    async def get_camera_credentials(self, camera_id: str) -> List[Dict[str, Any]]:
+    @db_read
+    def get_camera_credentials(self, camera_id: str) -> List[Dict[str, Any]]:
         """
         Obtiene todas las credenciales de una cámara.
         
@@ -1434,47 +1452,47 @@ class DataService:
             return []
             
         try:
-            with self._db_lock:
-                cursor = self._db_connection.cursor()
-                cursor.execute("""
-                    SELECT 
-                        credential_id,
-                        credential_name,
-                        username,
-                        password_encrypted,
-                        auth_type,
-                        is_active,
-                        is_default,
-                        last_used,
-                        created_at,
-                        updated_at
-                    FROM camera_credentials
-                    WHERE camera_id = ?
-                    ORDER BY is_default DESC, credential_name
-                """, (camera_id,))
-                
-                credentials = []
-                for row in cursor.fetchall():
-                    credentials.append({
-                        'credential_id': row[0],
-                        'credential_name': row[1],
-                        'username': row[2],
-                        'password_encrypted': row[3],
-                        'auth_type': row[4],
-                        'is_active': bool(row[5]),
-                        'is_default': bool(row[6]),
-                        'last_used': row[7],
-                        'created_at': row[8],
-                        'updated_at': row[9]
-                    })
-                
-                return credentials
+            cursor = self._db_connection.cursor()
+            cursor.execute("""
+                SELECT 
+                    credential_id,
+                    credential_name,
+                    username,
+                    password_encrypted,
+                    auth_type,
+                    is_active,
+                    is_default,
+                    last_used,
+                    created_at,
+                    updated_at
+                FROM camera_credentials
+                WHERE camera_id = ?
+                ORDER BY is_default DESC, credential_name
+            """, (camera_id,))
+            
+            credentials = []
+            for row in cursor.fetchall():
+                credentials.append({
+                    'credential_id': row[0],
+                    'credential_name': row[1],
+                    'username': row[2],
+                    'password_encrypted': row[3],
+                    'auth_type': row[4],
+                    'is_active': bool(row[5]),
+                    'is_default': bool(row[6]),
+                    'last_used': row[7],
+                    'created_at': row[8],
+                    'updated_at': row[9]
+                })
+            
+            return credentials
                 
         except Exception as e:
             self.logger.error(f"Error obteniendo credenciales de {camera_id}: {e}")
             return []
     
-    async def get_credential_by_id(self, camera_id: str, credential_id: int) -> Optional[Dict[str, Any]]:
+    @db_read
+    def get_credential_by_id(self, camera_id: str, credential_id: int) -> Optional[Dict[str, Any]]:
         """
         Obtiene una credencial específica.
         
@@ -1489,46 +1507,46 @@ class DataService:
             return None
             
         try:
-            with self._db_lock:
-                cursor = self._db_connection.cursor()
-                cursor.execute("""
-                    SELECT 
-                        credential_id,
-                        credential_name,
-                        username,
-                        password_encrypted,
-                        auth_type,
-                        is_active,
-                        is_default,
-                        last_used,
-                        created_at,
-                        updated_at
-                    FROM camera_credentials
-                    WHERE camera_id = ? AND credential_id = ?
-                """, (camera_id, credential_id))
-                
-                row = cursor.fetchone()
-                if row:
-                    return {
-                        'credential_id': row[0],
-                        'credential_name': row[1],
-                        'username': row[2],
-                        'password_encrypted': row[3],
-                        'auth_type': row[4],
-                        'is_active': bool(row[5]),
-                        'is_default': bool(row[6]),
-                        'last_used': row[7],
-                        'created_at': row[8],
-                        'updated_at': row[9]
-                    }
-                
-                return None
+            cursor = self._db_connection.cursor()
+            cursor.execute("""
+                SELECT 
+                    credential_id,
+                    credential_name,
+                    username,
+                    password_encrypted,
+                    auth_type,
+                    is_active,
+                    is_default,
+                    last_used,
+                    created_at,
+                    updated_at
+                FROM camera_credentials
+                WHERE camera_id = ? AND credential_id = ?
+            """, (camera_id, credential_id))
+            
+            row = cursor.fetchone()
+            if row:
+                return {
+                    'credential_id': row[0],
+                    'credential_name': row[1],
+                    'username': row[2],
+                    'password_encrypted': row[3],
+                    'auth_type': row[4],
+                    'is_active': bool(row[5]),
+                    'is_default': bool(row[6]),
+                    'last_used': row[7],
+                    'created_at': row[8],
+                    'updated_at': row[9]
+                }
+            
+            return None
                 
         except Exception as e:
             self.logger.error(f"Error obteniendo credencial {credential_id}: {e}")
             return None
     
-    async def add_camera_credential(self, camera_id: str, credential_data: Dict[str, Any]) -> int:
+    @db_write
+    def add_camera_credential(self, camera_id: str, credential_data: Dict[str, Any]) -> int:
         """
         Agrega una nueva credencial a una cámara.
         
@@ -1561,7 +1579,7 @@ class DataService:
                 credential_data['password']
             )
             
-            with self._db_lock:
+            with self._write_lock:
                 cursor = self._db_connection.cursor()
                 
                 # Verificar si ya existe una credencial con el mismo nombre
@@ -1608,7 +1626,8 @@ class DataService:
                 self._db_connection.rollback()
             raise Exception(f"Error al agregar credencial: {str(e)}")
     
-    async def update_credential(self, camera_id: str, credential_id: int, updates: Dict[str, Any]) -> bool:
+    @db_write
+    def update_credential(self, camera_id: str, credential_id: int, updates: Dict[str, Any]) -> bool:
         """
         Actualiza una credencial existente.
         
@@ -1663,7 +1682,7 @@ class DataService:
                 WHERE camera_id = ? AND credential_id = ?
             """
             
-            with self._db_lock:
+            with self._write_lock:
                 cursor = self._db_connection.cursor()
                 cursor.execute(query, params)
                 self._db_connection.commit()
@@ -1673,7 +1692,8 @@ class DataService:
             self.logger.error(f"Error actualizando credencial: {e}")
             return False
     
-    async def delete_credential(self, camera_id: str, credential_id: int) -> bool:
+    @db_write
+    def delete_credential(self, camera_id: str, credential_id: int) -> bool:
         """
         Elimina una credencial.
         
@@ -1688,7 +1708,7 @@ class DataService:
             return False
             
         try:
-            with self._db_lock:
+            with self._write_lock:
                 cursor = self._db_connection.cursor()
                 cursor.execute("""
                     DELETE FROM camera_credentials
@@ -1702,7 +1722,8 @@ class DataService:
             self.logger.error(f"Error eliminando credencial: {e}")
             return False
     
-    async def clear_default_credentials(self, camera_id: str) -> bool:
+    @db_write
+    def clear_default_credentials(self, camera_id: str) -> bool:
         """
         Quita el flag de default de todas las credenciales de una cámara.
         
@@ -1716,7 +1737,7 @@ class DataService:
             return False
             
         try:
-            with self._db_lock:
+            with self._write_lock:
                 cursor = self._db_connection.cursor()
                 cursor.execute("""
                     UPDATE camera_credentials
@@ -1731,7 +1752,8 @@ class DataService:
             self.logger.error(f"Error limpiando credenciales default: {e}")
             return False
     
-    async def set_credential_as_default(self, camera_id: str, credential_id: int) -> bool:
+    @db_write
+    def set_credential_as_default(self, camera_id: str, credential_id: int) -> bool:
         """
         Establece una credencial como predeterminada.
         
@@ -1746,7 +1768,7 @@ class DataService:
             return False
             
         try:
-            with self._db_lock:
+            with self._write_lock:
                 # Primero quitar default de todas
                 cursor = self._db_connection.cursor()
                 cursor.execute("""
@@ -1771,7 +1793,8 @@ class DataService:
     
     # === Métodos de Gestión de Stream Profiles ===
     
-    async def get_stream_profiles(self, camera_id: str) -> List[Dict[str, Any]]:
+    @db_read
+    def get_stream_profiles(self, camera_id: str) -> List[Dict[str, Any]]:
         """
         Obtiene todos los perfiles de streaming de una cámara.
         
@@ -1785,61 +1808,61 @@ class DataService:
             return []
             
         try:
-            with self._db_lock:
-                cursor = self._db_connection.cursor()
-                cursor.execute("""
-                    SELECT 
-                        profile_id,
-                        profile_name,
-                        profile_token,
-                        stream_type,
-                        encoding,
-                        resolution,
-                        framerate,
-                        bitrate,
-                        quality,
-                        gop_interval,
-                        channel,
-                        subtype,
-                        is_default,
-                        is_active,
-                        endpoint_id,
-                        created_at,
-                        updated_at
-                    FROM camera_stream_profiles
-                    WHERE camera_id = ?
-                    ORDER BY is_default DESC, stream_type, profile_name
-                """, (camera_id,))
-                
-                profiles = []
-                for row in cursor.fetchall():
-                    profiles.append({
-                        'profile_id': row[0],
-                        'profile_name': row[1],
-                        'profile_token': row[2],
-                        'stream_type': row[3],
-                        'encoding': row[4],
-                        'resolution': row[5],
-                        'framerate': row[6],
-                        'bitrate': row[7],
-                        'quality': row[8],
-                        'gop_interval': row[9],
-                        'channel': row[10],
-                        'subtype': row[11],
-                        'is_default': bool(row[12]),
-                        'is_active': bool(row[13]),
-                        'endpoint_id': row[14],
-                        'created_at': row[15],
-                        'updated_at': row[16]
-                    })
-                
-                return profiles
+            cursor = self._db_connection.cursor()
+            cursor.execute("""
+                SELECT 
+                    profile_id,
+                    profile_name,
+                    profile_token,
+                    stream_type,
+                    encoding,
+                    resolution,
+                    framerate,
+                    bitrate,
+                    quality,
+                    gop_interval,
+                    channel,
+                    subtype,
+                    is_default,
+                    is_active,
+                    endpoint_id,
+                    created_at,
+                    updated_at
+                FROM camera_stream_profiles
+                WHERE camera_id = ?
+                ORDER BY is_default DESC, stream_type, profile_name
+            """, (camera_id,))
+            
+            profiles = []
+            for row in cursor.fetchall():
+                profiles.append({
+                    'profile_id': row[0],
+                    'profile_name': row[1],
+                    'profile_token': row[2],
+                    'stream_type': row[3],
+                    'encoding': row[4],
+                    'resolution': row[5],
+                    'framerate': row[6],
+                    'bitrate': row[7],
+                    'quality': row[8],
+                    'gop_interval': row[9],
+                    'channel': row[10],
+                    'subtype': row[11],
+                    'is_default': bool(row[12]),
+                    'is_active': bool(row[13]),
+                    'endpoint_id': row[14],
+                    'created_at': row[15],
+                    'updated_at': row[16]
+                })
+            
+            return profiles
                 
         except Exception as e:
             self.logger.error(f"Error obteniendo perfiles de streaming de {camera_id}: {e}")
             return []
     
-    async def get_stream_profile_by_id(self, camera_id: str, profile_id: int) -> Optional[Dict[str, Any]]:
+    @db_read
+    def get_stream_profile_by_id(self, camera_id: str, profile_id: int) -> Optional[Dict[str, Any]]:
         """
         Obtiene un perfil de streaming específico.
         
@@ -1854,59 +1877,59 @@ class DataService:
             return None
             
         try:
-            with self._db_lock:
-                cursor = self._db_connection.cursor()
-                cursor.execute("""
-                    SELECT 
-                        profile_id,
-                        profile_name,
-                        profile_token,
-                        stream_type,
-                        encoding,
-                        resolution,
-                        framerate,
-                        bitrate,
-                        quality,
-                        gop_interval,
-                        channel,
-                        subtype,
-                        is_default,
-                        is_active,
-                        endpoint_id,
-                        created_at,
-                        updated_at
-                    FROM camera_stream_profiles
-                    WHERE camera_id = ? AND profile_id = ?
-                """, (camera_id, profile_id))
-                
-                row = cursor.fetchone()
-                if row:
-                    return {
-                        'profile_id': row[0],
-                        'profile_name': row[1],
-                        'profile_token': row[2],
-                        'stream_type': row[3],
-                        'encoding': row[4],
-                        'resolution': row[5],
-                        'framerate': row[6],
-                        'bitrate': row[7],
-                        'quality': row[8],
-                        'gop_interval': row[9],
-                        'channel': row[10],
-                        'subtype': row[11],
-                        'is_default': bool(row[12]),
-                        'is_active': bool(row[13]),
-                        'endpoint_id': row[14],
-                        'created_at': row[15],
-                        'updated_at': row[16]
-                    }
-                return None
+            cursor = self._db_connection.cursor()
+            cursor.execute("""
+                SELECT 
+                    profile_id,
+                    profile_name,
+                    profile_token,
+                    stream_type,
+                    encoding,
+                    resolution,
+                    framerate,
+                    bitrate,
+                    quality,
+                    gop_interval,
+                    channel,
+                    subtype,
+                    is_default,
+                    is_active,
+                    endpoint_id,
+                    created_at,
+                    updated_at
+                FROM camera_stream_profiles
+                WHERE camera_id = ? AND profile_id = ?
+            """, (camera_id, profile_id))
+            
+            row = cursor.fetchone()
+            if row:
+                return {
+                    'profile_id': row[0],
+                    'profile_name': row[1],
+                    'profile_token': row[2],
+                    'stream_type': row[3],
+                    'encoding': row[4],
+                    'resolution': row[5],
+                    'framerate': row[6],
+                    'bitrate': row[7],
+                    'quality': row[8],
+                    'gop_interval': row[9],
+                    'channel': row[10],
+                    'subtype': row[11],
+                    'is_default': bool(row[12]),
+                    'is_active': bool(row[13]),
+                    'endpoint_id': row[14],
+                    'created_at': row[15],
+                    'updated_at': row[16]
+                }
+            return None
                 
         except Exception as e:
             self.logger.error(f"Error obteniendo perfil {profile_id}: {e}")
             return None
     
-    async def add_stream_profile(self, camera_id: str, profile_data: Dict[str, Any]) -> int:
+    @db_write
+    def add_stream_profile(self, camera_id: str, profile_data: Dict[str, Any]) -> int:
         """
         Agrega un nuevo perfil de streaming.
         
@@ -1941,7 +1964,7 @@ class DataService:
             
         try:
             # Verificar si ya existe un perfil con el mismo nombre
-            with self._db_lock:
+            with self._write_lock:
                 cursor = self._db_connection.cursor()
                 cursor.execute("""
                     SELECT COUNT(*) FROM camera_stream_profiles
@@ -2000,7 +2023,8 @@ class DataService:
             self.logger.error(f"Error creando perfil de streaming: {e}")
             raise
     
-    async def update_stream_profile(self, camera_id: str, profile_id: int, updates: Dict[str, Any]) -> bool:
+    @db_write
+    def update_stream_profile(self, camera_id: str, profile_id: int, updates: Dict[str, Any]) -> bool:
         """
         Actualiza un perfil de streaming existente.
         
@@ -2019,7 +2043,7 @@ class DataService:
             return False
             
         try:
-            with self._db_lock:
+            with self._write_lock:
                 # Verificar que el perfil existe
                 cursor = self._db_connection.cursor()
                 cursor.execute("""
@@ -2082,7 +2106,8 @@ class DataService:
             self.logger.error(f"Error actualizando perfil {profile_id}: {e}")
             raise
     
-    async def delete_stream_profile(self, camera_id: str, profile_id: int) -> bool:
+    @db_write
+    def delete_stream_profile(self, camera_id: str, profile_id: int) -> bool:
         """
         Elimina un perfil de streaming.
         
@@ -2100,7 +2125,7 @@ class DataService:
             return False
             
         try:
-            with self._db_lock:
+            with self._write_lock:
                 cursor = self._db_connection.cursor()
                 
                 # Verificar que el perfil existe y obtener info
@@ -2162,7 +2187,8 @@ class DataService:
             self.logger.error(f"Error eliminando perfil {profile_id}: {e}")
             raise
     
-    async def clear_default_profiles(self, camera_id: str, stream_type: str) -> bool:
+    @db_write
+    def clear_default_profiles(self, camera_id: str, stream_type: str) -> bool:
         """
         Quita el flag de default de todos los perfiles de un tipo específico.
         
@@ -2177,7 +2203,7 @@ class DataService:
             return False
             
         try:
-            with self._db_lock:
+            with self._write_lock:
                 cursor = self._db_connection.cursor()
                 cursor.execute("""
                     UPDATE camera_stream_profiles
@@ -2192,7 +2218,8 @@ class DataService:
             self.logger.error(f"Error limpiando perfiles default: {e}")
             return False
     
-    async def set_stream_profile_as_default(self, camera_id: str, profile_id: int) -> bool:
+    @db_write
+    def set_stream_profile_as_default(self, camera_id: str, profile_id: int) -> bool:
         """
         Establece un perfil como predeterminado.
         
@@ -2207,7 +2234,7 @@ class DataService:
             return False
             
         try:
-            with self._db_lock:
+            with self._write_lock:
                 # Obtener el tipo de stream del perfil
                 cursor = self._db_connection.cursor()
                 cursor.execute("""
@@ -2248,7 +2275,8 @@ class DataService:
     
     # === Métodos de Gestión de Protocolos ===
     
-    async def get_camera_protocols(self, camera_id: str) -> List[Dict[str, Any]]:
+    @db_read
+    def get_camera_protocols(self, camera_id: str) -> List[Dict[str, Any]]:
         """
         Obtiene todos los protocolos configurados de una cámara.
         
@@ -2262,60 +2290,59 @@ class DataService:
             return []
             
         try:
-            with self._db_lock:
-                cursor = self._db_connection.cursor()
+            cursor = self._db_connection.cursor()
+            cursor.execute("""
+                SELECT 
+                    p.protocol_id,
+                    p.protocol_type,
+                    p.port,
+                    p.is_enabled,
+                    p.is_primary,
+                    p.is_verified,
+                    p.version,
+                    p.path,
+                    p.last_tested,
+                    p.last_error,
+                    p.response_time_ms,
+                    p.created_at,
+                    p.updated_at
+                FROM camera_protocols p
+                WHERE p.camera_id = ?
+                ORDER BY p.is_primary DESC, p.protocol_type
+            """, (camera_id,))
+            
+            protocols = []
+            for row in cursor.fetchall():
+                # Obtener capacidades si existen
                 cursor.execute("""
-                    SELECT 
-                        p.protocol_id,
-                        p.protocol_type,
-                        p.port,
-                        p.is_enabled,
-                        p.is_primary,
-                        p.is_verified,
-                        p.version,
-                        p.path,
-                        p.last_tested,
-                        p.last_error,
-                        p.response_time_ms,
-                        p.created_at,
-                        p.updated_at
-                    FROM camera_protocols p
-                    WHERE p.camera_id = ?
-                    ORDER BY p.is_primary DESC, p.protocol_type
-                """, (camera_id,))
-                
-                protocols = []
-                for row in cursor.fetchall():
-                    # Obtener capacidades si existen
-                    cursor.execute("""
-                        SELECT capability_name, capability_value
-                        FROM protocol_capabilities
-                        WHERE protocol_id = ?
-                    """, (row[0],))
-                    
-                    capabilities = {}
-                    for cap in cursor.fetchall():
-                        capabilities[cap[0]] = cap[1]
-                    
-                    protocols.append({
-                        'protocol_id': row[0],
-                        'protocol_type': row[1],
-                        'port': row[2],
-                        'is_enabled': bool(row[3]),
-                        'is_primary': bool(row[4]),
-                        'is_verified': bool(row[5]),
-                        'version': row[6],
-                        'path': row[7],
-                        'last_tested': row[8],
-                        'last_error': row[9],
-                        'response_time_ms': row[10],
-                        'created_at': row[11],
-                        'updated_at': row[12],
-                        'status': self._determine_protocol_status(row),
-                        'capabilities': capabilities if capabilities else None
-                    })
-                
-                return protocols
+                    SELECT capability_name, capability_value
+                    FROM protocol_capabilities
+                    WHERE protocol_id = ?
+                """, (row[0],))
+                
+                capabilities = {}
+                for cap in cursor.fetchall():
+                    capabilities[cap[0]] = cap[1]
+                
+                protocols.append({
+                    'protocol_id': row[0],
+                    'protocol_type': row[1],
+                    'port': row[2],
+                    'is_enabled': bool(row[3]),
+                    'is_primary': bool(row[4]),
+                    'is_verified': bool(row[5]),
+                    'version': row[6],
+                    'path': row[7],
+                    'last_tested': row[8],
+                    'last_error': row[9],
+                    'response_time_ms': row[10],
+                    'created_at': row[11],
+                    'updated_at': row[12],
+                    'status': self._determine_protocol_status(row),
+                    'capabilities': capabilities if capabilities else None
+                })
+            
+            return protocols
                 
         except Exception as e:
             self.logger.error(f"Error obteniendo protocolos de {camera_id}: {e}")
@@ -2354,7 +2381,7 @@ class DataService:
         Returns:
             Protocolo o None si no existe
         """
-        if not self._db_connection:
+        if not self._database_ready:
             return None
             
         try:
@@ -2365,7 +2392,8 @@ class DataService:
             self.logger.error(f"Error obteniendo protocolo {protocol_type}: {e}")
             return None
     
-    async def add_camera_protocol(self, camera_id: str, protocol_data: Dict[str, Any]) -> int:
+    @db_write
+    def add_camera_protocol(self, camera_id: str, protocol_data: Dict[str, Any]) -> int:
         """
         Agrega un nuevo protocolo a una cámara.
         
@@ -2394,7 +2422,7 @@ class DataService:
             raise ValueError("Sin conexión a base de datos")
             
         try:
-            with self._db_lock:
+            with self._write_lock:
                 cursor = self._db_connection.cursor()
                 
                 # Verificar que no exista
@@ -2442,7 +2470,8 @@ class DataService:
             self.logger.error(f"Error agregando protocolo: {e}")
             raise
     
-    async def update_protocol_config(self, camera_id: str, protocol_id: int, updates: Dict[str, Any]) -> bool:
+    @db_write
+    def update_protocol_config(self, camera_id: str, protocol_id: int, updates: Dict[str, Any]) -> bool:
         """
         Actualiza la configuración de un protocolo.
         
@@ -2458,7 +2487,7 @@ class DataService:
             return False
             
         try:
-            with self._db_lock:
+            with self._write_lock:
                 # Si se marca como primary, quitar primary de otros
                 if updates.get('is_primary', False):
                     cursor = self._db_connection.cursor()
@@ -2501,7 +2530,8 @@ class DataService:
             self.logger.error(f"Error actualizando protocolo: {e}")
             return False
     
-    async def clear_primary_protocols(self, camera_id: str) -> bool:
+    @db_write
+    def clear_primary_protocols(self, camera_id: str) -> bool:
         """
         Quita el flag de primary de todos los protocolos.
         
@@ -2515,7 +2545,7 @@ class DataService:
             return False
             
         try:
-            with self._db_lock:
+            with self._write_lock:
                 cursor = self._db_connection.cursor()
                 cursor.execute("""
                     UPDATE camera_protocols
@@ -2530,7 +2560,8 @@ class DataService:
             self.logger.error(f"Error limpiando protocolos primary: {e}")
             return False
     
-    async def update_protocol_test_result(self, camera_id: str, protocol_id: int,
+    @db_write
+    def update_protocol_test_result(self, camera_id: str, protocol_id: int,
                                         success: bool, response_time_ms: int = None,
                                         version: str = None, error: str = None) -> bool:
         """
@@ -2551,7 +2582,7 @@ class DataService:
             return False
             
         try:
-            with self._db_lock:
+            with self._write_lock:
                 cursor = self._db_connection.cursor()
                 cursor.execute("""
                     UPDATE camera_protocols
@@ -2578,7 +2609,8 @@ class DataService:
             self.logger.error(f"Error actualizando resultado de test: {e}")
             return False
     
-    async def update_camera_discovery_status(self, camera_id: str, status: str, message: str) -> bool:
+    @db_write
+    def update_camera_discovery_status(self, camera_id: str, status: str, message: str) -> bool:
         """
         Actualiza el estado del discovery de protocolos.
         
@@ -2594,7 +2626,7 @@ class DataService:
             return False
             
         try:
-            with self._db_lock:
+            with self._write_lock:
                 cursor = self._db_connection.cursor()
                 cursor.execute("""
                     UPDATE cameras
@@ -2614,6 +2646,32 @@ class DataService:
     
     # === Métodos de Solo Lectura (Fase 4) ===
     
+    @db_read
+    def execute_query(self, query: str, params: Union[Tuple, List] = (),
+                      fetch_one: bool = False, fetch_all: bool = False) -> Any:
+        """
+        Ejecuta una consulta de lectura en un hilo lector del executor de BD.
+        
+        Args:
+            query: Consulta SQL parametrizada
+            params: Parámetros de la consulta
+            fetch_one: Devolver solo la primera fila
+            fetch_all: Devolver todas las filas
+            
+        Returns:
+            Fila, lista de filas o None según ``fetch_one``/``fetch_all``
+        """
+        if not self._db_connection:
+            raise RuntimeError("Base de datos no inicializada")
+        
+        cursor = self._db_connection.cursor()
+        cursor.execute(query, tuple(params))
+        if fetch_one:
+            return cursor.fetchone()
+        if fetch_all:
+            return cursor.fetchall()
+        return None
+    
     async def get_camera_capabilities_detail(self, camera_id: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene las capacidades detalladas de una cámara.
@@ -3011,10 +3069,13 @@ class DataService:
     
     async def _close_database(self) -> None:
         """Cierra la conexión a la base de datos."""
-        if self._db_connection:
-            with self._db_lock:
-                self._db_connection.close()
-                self._db_connection = None
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+        if self._direct_connection is not None:
+            with self._direct_lock:
+                self._direct_connection.close()
+                self._direct_connection = None
     
     async def cleanup(self) -> None:
         """
@@ -0,0 +1,191 @@
+"""
+Pool compartido de conexiones SQLite.
+
+Cada hilo obtiene su propia conexión persistente a la base de datos,
+configurada una sola vez con:
+
+- ``journal_mode=WAL``: las lecturas no bloquean a la escritura ni al revés.
+- ``synchronous=NORMAL``: en WAL es seguro ante caídas del proceso y evita
+  un fsync por commit.
+- ``mmap_size`` y ``cache_size``: lecturas desde memoria mapeada y un cache
+  de páginas mayor que el de por defecto.
+- Cache de sentencias preparadas del módulo ``sqlite3``
+  (``cached_statements``), que solo sirve si la conexión sobrevive entre
+  consultas.
+
+Todos los servicios que usan el mismo fichero comparten el pool a través de
+``get_connection_pool``; las escrituras de un mismo proceso se ordenan con
+``write_lock`` para no competir por el lock de SQLite.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from config.settings import settings
+from services.logging_service import get_secure_logger
+
+
+logger = get_secure_logger("services.database.connection_pool")
+
+
+class SQLiteConnectionPool:
+    """
+    Conexiones SQLite por hilo con pragmas de rendimiento.
+    """
+
+    def __init__(self,
+                 db_path: Union[str, Path],
+                 mmap_size_mb: int = settings.DB_MMAP_SIZE_MB,
+                 cache_size_mb: int = settings.DB_CACHE_SIZE_MB,
+                 busy_timeout_ms: int = settings.DB_BUSY_TIMEOUT_MS,
+                 cached_statements: int = 256):
+        """
+        Inicializa el pool.
+
+        Args:
+            db_path: Ruta a la base de datos (``:memory:`` para una base
+                en memoria compartida entre hilos)
+            mmap_size_mb: Tamaño del mapeo en memoria
+            cache_size_mb: Cache de páginas por conexión
+            busy_timeout_ms: Espera máxima por el lock de escritura
+            cached_statements: Sentencias preparadas a conservar por conexión
+        """
+        self.db_path = str(db_path)
+        self.mmap_size_mb = mmap_size_mb
+        self.cache_size_mb = cache_size_mb
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self.write_lock = threading.RLock()
+
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self.connections_opened = 0
+
+        # Base en memoria: todas las conexiones deben ver la misma base
+        self._uri = self.db_path == ":memory:"
+        if self._uri:
+            self.db_path = f"file:pool_{id(self)}?mode=memory&cache=shared"
+            # Mantener viva la base mientras exista el pool
+            self._keepalive = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre y configura una conexión nueva."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+            uri=self._uri
+        )
+        conn.row_factory = sqlite3.Row
+        if not self._uri:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(f"PRAGMA mmap_size = {self.mmap_size_mb * 1024 * 1024}")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        # Valor negativo: tamaño en KiB
+        conn.execute(f"PRAGMA cache_size = -{self.cache_size_mb * 1024}")
+        conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms}")
+        conn.execute("PRAGMA foreign_keys = ON")
+
+        with self._connections_lock:
+            self._connections.append(conn)
+            self.connections_opened += 1
+        return conn
+
+    def get(self) -> sqlite3.Connection:
+        """
+        Obtiene la conexión del hilo actual, creándola si no existe.
+
+        Returns:
+            Conexión persistente del hilo
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Context manager transaccional sobre la conexión del hilo.
+
+        Hace commit al salir sin errores y rollback si hay excepción; la
+        conexión no se cierra.
+
+        Yields:
+            sqlite3.Connection: Conexión del hilo actual
+        """
+        conn = self.get()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtiene estadísticas del pool."""
+        with self._connections_lock:
+            open_connections = len(self._connections)
+        return {
+            'db_path': self.db_path,
+            'open_connections': open_connections,
+            'connections_opened': self.connections_opened
+        }
+
+    def close(self) -> None:
+        """
+        Cierra todas las conexiones abiertas.
+
+        Las siguientes llamadas a ``get`` vuelven a conectar bajo demanda.
+        """
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.debug(f"Error cerrando conexión: {e}")
+        self._local = threading.local()
+
+
+_pools: Dict[str, SQLiteConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(db_path: Optional[Union[str, Path]] = None) -> SQLiteConnectionPool:
+    """
+    Obtiene el pool compartido de una base de datos.
+
+    Args:
+        db_path: Ruta a la base de datos (por defecto ``settings.DATABASE_PATH``)
+
+    Returns:
+        Pool único por ruta absoluta; ``:memory:`` crea siempre un pool nuevo
+    """
+    if str(db_path) == ":memory:":
+        return SQLiteConnectionPool(":memory:")
+    key = str(Path(db_path or settings.DATABASE_PATH).resolve())
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = SQLiteConnectionPool(key)
+            _pools[key] = pool
+            logger.info(f"Pool SQLite creado para {key}")
+        return pool
+
+
+def close_all_pools() -> None:
+    """Cierra todos los pools compartidos."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
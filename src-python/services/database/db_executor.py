@@ -0,0 +1,256 @@
+"""
+Executor dedicado para las operaciones de base de datos.
+
+Sustituye al executor por defecto del event loop (``run_in_executor(None,
+...)``), que comparten las llamadas ONVIF/zeep, la resolución DNS o las
+aperturas de OpenCV, por dos pools propios:
+
+- Un único hilo escritor: las escrituras se serializan en el proceso antes
+  de llegar al lock de SQLite, sin esperas por ``busy_timeout``.
+- N hilos lectores: en WAL las lecturas no bloquean a la escritura.
+
+Cada cola mide profundidad (trabajos enviados pendientes de empezar) y
+tiempo de espera en cola, para detectar saturación bajo carga de ingesta.
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+from config.settings import settings
+from services.logging_service import get_secure_logger
+
+
+logger = get_secure_logger("services.database.db_executor")
+
+T = TypeVar("T")
+
+
+class _QueueStats:
+    """Contadores y tiempos de una cola del executor."""
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.pending = 0
+        self.max_pending = 0
+        self.running = 0
+        self._wait_times: Deque[float] = deque(maxlen=window)
+        self._run_times: Deque[float] = deque(maxlen=window)
+
+    def on_submit(self) -> None:
+        with self._lock:
+            self.submitted += 1
+            self.pending += 1
+            self.max_pending = max(self.max_pending, self.pending)
+
+    def on_start(self, wait: float) -> None:
+        with self._lock:
+            self.pending -= 1
+            self.running += 1
+            self._wait_times.append(wait)
+
+    def on_finish(self, duration: float, failed: bool) -> None:
+        with self._lock:
+            self.running -= 1
+            self._run_times.append(duration)
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def on_cancel(self) -> None:
+        with self._lock:
+            self.pending -= 1
+            self.cancelled += 1
+
+    @staticmethod
+    def _summary(samples: Deque[float]) -> Dict[str, float]:
+        if not samples:
+            return {'avg_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+        ordered = sorted(samples)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return {
+            'avg_ms': round(sum(ordered) / len(ordered) * 1000, 3),
+            'p95_ms': round(p95 * 1000, 3),
+            'max_ms': round(ordered[-1] * 1000, 3)
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'cancelled': self.cancelled,
+                'queue_depth': self.pending,
+                'max_queue_depth': self.max_pending,
+                'running': self.running,
+                'wait_time': self._summary(self._wait_times),
+                'run_time': self._summary(self._run_times)
+            }
+
+
+class DatabaseExecutor:
+    """
+    Executor de BD con un hilo escritor y N hilos lectores.
+    """
+
+    def __init__(self, readers: int = settings.DB_READER_THREADS, name: str = "db"):
+        """
+        Inicializa el executor.
+
+        Args:
+            readers: Número de hilos lectores
+            name: Prefijo de los nombres de hilo
+        """
+        self.readers = max(1, readers)
+        self.name = name
+        self._workers = {'read': self.readers, 'write': 1}
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+        self._pools_lock = threading.Lock()
+        self._stats = {'read': _QueueStats(), 'write': _QueueStats()}
+
+    def _get_pool(self, kind: str) -> ThreadPoolExecutor:
+        """Obtiene el pool de hilos de un tipo, creándolo si no existe."""
+        with self._pools_lock:
+            pool = self._pools.get(kind)
+            if pool is None:
+                prefix = f"{self.name}_{'writer' if kind == 'write' else 'reader'}"
+                pool = ThreadPoolExecutor(max_workers=self._workers[kind], thread_name_prefix=prefix)
+                self._pools[kind] = pool
+            return pool
+
+    async def read(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Ejecuta una función de solo lectura en un hilo lector.
+
+        Args:
+            func: Función síncrona que accede a la BD
+            *args: Argumentos posicionales de ``func``
+            **kwargs: Argumentos con nombre de ``func``
+
+        Returns:
+            Resultado de ``func``
+        """
+        return await self._run('read', func, args, kwargs)
+
+    async def write(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Ejecuta una función que escribe en la BD en el hilo escritor.
+
+        Args:
+            func: Función síncrona que accede a la BD
+            *args: Argumentos posicionales de ``func``
+            **kwargs: Argumentos con nombre de ``func``
+
+        Returns:
+            Resultado de ``func``
+        """
+        return await self._run('write', func, args, kwargs)
+
+    async def _run(self, kind: str, func: Callable[..., T], args: tuple, kwargs: dict) -> T:
+        stats = self._stats[kind]
+        submitted_at = time.perf_counter()
+
+        def job() -> T:
+            started_at = time.perf_counter()
+            stats.on_start(started_at - submitted_at)
+            failed = True
+            try:
+                result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                stats.on_finish(time.perf_counter() - started_at, failed)
+
+        stats.on_submit()
+        future: Future = self._get_pool(kind).submit(job)
+        # Si el llamante se cancela antes de que empiece, el trabajo no corre
+        future.add_done_callback(lambda f: stats.on_cancel() if f.cancelled() else None)
+        return await asyncio.wrap_future(future)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Obtiene métricas de las colas de lectura y escritura.
+
+        Returns:
+            Diccionario con profundidad de cola, tiempos de espera en cola y
+            de ejecución por tipo de operación
+        """
+        return {
+            'reader_threads': self.readers,
+            'writer_threads': 1,
+            'read': self._stats['read'].snapshot(),
+            'write': self._stats['write'].snapshot()
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Detiene los hilos del executor.
+
+        Las siguientes operaciones vuelven a crear los hilos bajo demanda.
+
+        Args:
+            wait: Esperar a que terminen los trabajos en curso
+        """
+        with self._pools_lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.shutdown(wait=wait)
+
+
+_executor: Optional[DatabaseExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> DatabaseExecutor:
+    """
+    Obtiene el executor de BD compartido del proceso.
+
+    Returns:
+        Instancia única de DatabaseExecutor
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = DatabaseExecutor()
+            logger.info(f"Executor de BD creado: 1 escritor, {_executor.readers} lectores")
+        return _executor
+
+
+def shutdown_db_executor() -> None:
+    """Detiene los hilos del executor compartido."""
+    with _executor_lock:
+        executor = _executor
+    if executor is not None:
+        executor.shutdown()
+
+
+def db_read(func: Callable[..., T]) -> Callable[..., Any]:
+    """
+    Convierte un método síncrono de lectura en una corrutina que se ejecuta
+    en los hilos lectores de ``self._db_executor``.
+    """
+    @functools.wraps(func)
+    async def wrapper(self, *args: Any, **kwargs: Any) -> T:
+        return await self._db_executor.read(func, self, *args, **kwargs)
+    return wrapper
+
+
+def db_write(func: Callable[..., T]) -> Callable[..., Any]:
+    """
+    Convierte un método síncrono de escritura en una corrutina que se
+    ejecuta en el hilo escritor de ``self._db_executor``.
+    """
+    @functools.wraps(func)
+    async def wrapper(self, *args: Any, **kwargs: Any) -> T:
+        return await self._db_executor.write(func, self, *args, **kwargs)
+    return wrapper
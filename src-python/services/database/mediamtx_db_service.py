@@ -15,6 +15,8 @@ import asyncio
 from pathlib import Path
 
 from services.database.publishing_db_service import PublishingDatabaseService
+from services.database.metrics_rollup import MetricsRollup
+from services.database.metrics_sink import PublicationMetricsSink
 from api.schemas.requests.mediamtx_requests import (
     PublicationStatus, TerminationReason, ViewerProtocol, PathSourceType,
     GetMetricsRequest, GetHistoryRequest, GetViewersRequest
@@ -25,6 +27,9 @@ from services.logging_service import get_secure_logger
 
 logger = get_secure_logger("services.database.mediamtx_db_service")
 
+# Puntos por defecto de una serie leída desde los rollups
+DEFAULT_MAX_POINTS = 500
+
 
 class MediaMTXDatabaseService(PublishingDatabaseService):
     """
@@ -51,6 +56,12 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
         super().__init__(db_path)
         self.logger = logger
         self._lock = asyncio.Lock()  # Inicializar lock para operaciones asíncronas
+        # Rollups por minuto/hora/día, actualizados con cada lote de métricas
+        self._rollups = MetricsRollup()
+        # Buffer write-behind de las métricas de publicación
+        self.metrics_sink = PublicationMetricsSink(
+            self._pool, self._db_executor, after_write=self._rollups.refresh
+        )
         
     # === Métodos de Métricas ===
     
@@ -62,6 +73,10 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
         """
         Obtiene métricas de publicación para una cámara.
         
+        Con ``request.max_points`` o ``request.aggregate_interval`` la serie
+        y el resumen salen de los rollups, con el tamaño de cubo elegido a
+        partir del rango; sin ellos se devuelven las filas crudas.
+        
         Args:
             camera_id: ID de la cámara
             request: Parámetros de la consulta
@@ -75,6 +90,8 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                 
                 # Determinar rango de tiempo
                 end_time = datetime.utcnow()
+                if request.time_range.value == "custom" and request.end_time:
+                    end_time = request.end_time
                 start_time = self._calculate_start_time(request.time_range, request.start_time, end_time)
                 
                 # Obtener publication_id activa
@@ -91,11 +108,32 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                         'publication_id': None,
                         'time_range': request.time_range.value,
                         'data_points': [],
-                        'summary': self._empty_metrics_summary()
+                        'summary': self._empty_metrics_summary(),
+                        'bucket_seconds': None
                     }
                 
                 publication_id = pub_row['publication_id']
                 
+                if request.max_points or request.aggregate_interval:
+                    # Serie reducida desde los rollups
+                    rollup = self._rollups.query(
+                        conn, publication_id, start_time, end_time,
+                        max_points=request.max_points or DEFAULT_MAX_POINTS,
+                        interval=request.aggregate_interval
+                    )
+                    viewer_stats = None
+                    if request.include_viewers:
+                        viewer_stats = self._get_viewer_stats(conn, publication_id, start_time, end_time)
+                    return {
+                        'camera_id': camera_id,
+                        'publication_id': publication_id,
+                        'time_range': request.time_range.value,
+                        'data_points': rollup['data_points'],
+                        'summary': rollup['summary'],
+                        'viewer_stats': viewer_stats,
+                        'bucket_seconds': rollup['bucket_seconds']
+                    }
+                
                 # Consultar métricas
                 query = """
                     SELECT 
@@ -129,10 +167,11 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                     'time_range': request.time_range.value,
                     'data_points': data_points,
                     'summary': summary,
-                    'viewer_stats': viewer_stats
+                    'viewer_stats': viewer_stats,
+                    'bucket_seconds': None
                 }
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
     
     async def get_latest_publication_metric(self, camera_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -180,7 +219,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                     
                 return dict(row)
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
     
     async def save_publication_metrics(
         self,
@@ -219,8 +258,26 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                     metrics.get('cpu_usage_percent'),
                     metrics.get('memory_usage_mb')
                 ))
+                self._rollups.refresh(conn)
                 
-        await asyncio.get_event_loop().run_in_executor(None, _save)
+        await self._db_executor.write(_save)
+        
+    async def save_publication_metric(self, camera_id: str, metrics: Dict[str, Any]) -> None:
+        """
+        Encola una muestra de métricas de la publicación activa de una cámara.
+        
+        La fila se escribe en lote desde ``metrics_sink``; si la cámara no
+        tiene publicación activa al volcar, la muestra se descarta.
+        
+        Args:
+            camera_id: ID de la cámara
+            metrics: Diccionario con métricas (``timestamp`` de la muestra)
+        """
+        self.metrics_sink.add(camera_id, metrics)
+        
+    async def flush_publication_metrics(self) -> None:
+        """Vuelca las métricas pendientes y detiene el volcado periódico."""
+        await self.metrics_sink.stop()
         
     async def get_global_metrics_summary(self) -> Dict[str, Any]:
         """
@@ -303,7 +360,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                     'alerts_count': 0  # TODO: Implementar sistema de alertas
                 }
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
     
     # === Métodos de Historial ===
     
@@ -421,7 +478,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                     }
                 }
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
     
     async def get_session_detail(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -510,7 +567,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                     'metadata': json.loads(session_row['metadata']) if session_row['metadata'] else {}
                 }
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
     
     async def cleanup_old_history(
         self,
@@ -655,6 +712,12 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                                 WHERE publication_id IN ({placeholders})
                             """, pub_ids)
                             
+                            self._rollups.ensure_tables(conn)
+                            cursor.execute(f"""
+                                DELETE FROM publication_metrics_rollup
+                                WHERE publication_id IN ({placeholders})
+                            """, pub_ids)
+                            
                             # Eliminar viewers
                             cursor.execute(f"""
                                 DELETE FROM publication_viewers
@@ -695,7 +758,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                     'details': details
                 }
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _cleanup)
+        return await self._db_executor.write(_cleanup)
     
     # === Métodos de Historial ===
     
@@ -822,7 +885,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                     }
                 }
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
     
     async def get_session_detail(
         self,
@@ -969,7 +1032,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                     'metadata': session_info.get('metadata')
                 }
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
     
     async def move_publication_to_history(
         self,
@@ -1081,7 +1144,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                 
                 return True
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _move)
+        return await self._db_executor.write(_move)
     
     # === Métodos de Viewers ===
     
@@ -1204,7 +1267,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                     'protocol_breakdown': protocol_breakdown
                 }
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
     
     async def track_viewer(
         self,
@@ -1242,7 +1305,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                 ))
                 return cursor.lastrowid
                 
-        viewer_id = await asyncio.get_event_loop().run_in_executor(None, _track)
+        viewer_id = await self._db_executor.write(_track)
         self.logger.debug(f"Viewer {viewer_ip} registrado con ID {viewer_id}")
         return viewer_id
     
@@ -1283,7 +1346,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                     viewer_id
                 ))
                 
-        await asyncio.get_event_loop().run_in_executor(None, _update)
+        await self._db_executor.write(_update)
     
     # === Métodos de Paths MediaMTX ===
     
@@ -1359,7 +1422,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                 
                 return paths
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
     
     async def create_mediamtx_path(
         self,
@@ -1433,7 +1496,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                 
                 return cursor.lastrowid
                 
-        path_id = await asyncio.get_event_loop().run_in_executor(None, _create)
+        path_id = await self._db_executor.write(_create)
         self.logger.info(f"Path MediaMTX creado con ID {path_id}")
         return path_id
     
@@ -1489,7 +1552,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                 cursor.execute(query, params)
                 return cursor.rowcount > 0
                 
-        updated = await asyncio.get_event_loop().run_in_executor(None, _update)
+        updated = await self._db_executor.write(_update)
         if updated:
             self.logger.info(f"Path {path_id} actualizado")
         return updated
@@ -1525,7 +1588,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                 cursor.execute("DELETE FROM mediamtx_paths WHERE path_id = ?", (path_id,))
                 return cursor.rowcount > 0
                 
-        deleted = await asyncio.get_event_loop().run_in_executor(None, _delete)
+        deleted = await self._db_executor.write(_delete)
         if deleted:
             self.logger.info(f"Path {path_id} eliminado")
         return deleted
@@ -1611,7 +1674,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                     'warnings': warnings
                 }
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
     
     async def update_server_health_check(
         self,
@@ -1642,7 +1705,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                     server_id
                 ))
                 
-        await asyncio.get_event_loop().run_in_executor(None, _update)
+        await self._db_executor.write(_update)
     
     # === Métodos de Auth Tokens ===
     
@@ -1700,7 +1763,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                     conn.rollback()
                     raise e
                 
-        token_id = await asyncio.get_event_loop().run_in_executor(None, _save)
+        token_id = await self._db_executor.write(_save)
         self.logger.info(f"Token guardado con ID {token_id} para servidor {token_data['server_id']}")
         return token_id
     
@@ -1727,7 +1790,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                 row = cursor.fetchone()
                 return dict(row) if row else None
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
     
     async def get_server_by_id(self, server_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -1750,7 +1813,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                 row = cursor.fetchone()
                 return dict(row) if row else None
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
     
     async def get_all_servers(self) -> List[Dict[str, Any]]:
         """
@@ -1769,7 +1832,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                 
                 return [dict(row) for row in cursor.fetchall()]
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
     
     # Alias para compatibilidad con el presenter
     async def get_servers(self) -> List[Dict[str, Any]]:
@@ -1858,7 +1921,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                 
                 return cursor.lastrowid
                 
-        server_id = await asyncio.get_event_loop().run_in_executor(None, _create)
+        server_id = await self._db_executor.write(_create)
         self.logger.info(f"Servidor MediaMTX creado con ID {server_id}")
         return server_id
     
@@ -1965,7 +2028,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                 cursor.execute(query, params)
                 return cursor.rowcount > 0
                 
-        updated = await asyncio.get_event_loop().run_in_executor(None, _update)
+        updated = await self._db_executor.write(_update)
         if updated:
             self.logger.info(f"Servidor {server_id} actualizado")
         return updated
@@ -2028,7 +2091,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                 
                 return cursor.rowcount > 0
                 
-        deleted = await asyncio.get_event_loop().run_in_executor(None, _delete)
+        deleted = await self._db_executor.write(_delete)
         if deleted:
             self.logger.info(f"Servidor {server_id} eliminado junto con sus datos relacionados")
         return deleted
@@ -2103,7 +2166,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                     }
                 }
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
     
     async def get_active_auth_tokens(self) -> List[Dict[str, Any]]:
         """
@@ -2123,7 +2186,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                 
                 return [dict(row) for row in cursor.fetchall()]
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
     
     async def update_token_last_used(self, server_id: int) -> None:
         """
@@ -2141,7 +2204,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                     WHERE server_id = ? AND is_active = 1
                 """, (server_id,))
                 
-        await asyncio.get_event_loop().run_in_executor(None, _update)
+        await self._db_executor.write(_update)
     
     async def deactivate_auth_token(self, server_id: int) -> None:
         """
@@ -2159,7 +2222,7 @@ class MediaMTXDatabaseService(PublishingDatabaseService):
                     WHERE server_id = ? AND is_active = 1
                 """, (server_id,))
                 
-        await asyncio.get_event_loop().run_in_executor(None, _deactivate)
+        await self._db_executor.write(_deactivate)
         self.logger.info(f"Token desactivado para servidor {server_id}")
     
     # === Métodos auxiliares privados ===
@@ -2563,4 +2626,10 @@ def get_mediamtx_db_service(db_path: Optional[str] = None) -> MediaMTXDatabaseSe
             db_path = str(Path(__file__).parent.parent.parent / "data" / "camera_data.db")
         _mediamtx_db_service = MediaMTXDatabaseService(db_path)
         
-    return _mediamtx_db_service
\ No newline at end of file
+    return _mediamtx_db_service
+
+
+async def flush_mediamtx_metrics() -> None:
+    """Vuelca las métricas pendientes del singleton si ya fue creado."""
+    if _mediamtx_db_service is not None:
+        await _mediamtx_db_service.flush_publication_metrics()
@@ -0,0 +1,492 @@
+"""
+Rollups temporales de ``publication_metrics``.
+
+Mantiene agregados por publicación en cubos de 1 minuto, 1 hora y 1 día
+(media, mínimo, máximo y p95 de fps, bitrate, viewers y quality score) en
+la tabla ``publication_metrics_rollup``:
+
+- Incremental: cada ``refresh`` procesa solo las filas crudas con
+  ``metric_id`` mayor que la marca guardada en
+  ``publication_metrics_rollup_state`` y recalcula únicamente los cubos que
+  esas filas tocan.
+- Los cubos de minuto se calculan desde las filas crudas (p95 exacto); los
+  de hora se combinan desde los de minuto y los de día desde los de hora
+  (p95 aproximado como percentil ponderado de los p95 hijos).
+
+``query`` elige la resolución a partir del rango pedido y del número
+máximo de puntos, de modo que un gráfico de 30 días no lee ni envía
+cientos de miles de filas, y nunca lee una resolución ya podada para el
+inicio del rango.
+"""
+
+import calendar
+import math
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from services.database.schema.mediamtx_tables import (
+    PUBLICATION_METRICS_ROLLUP_STATE_TABLE,
+    PUBLICATION_METRICS_ROLLUP_TABLE,
+)
+from services.logging_service import get_secure_logger
+
+
+logger = get_secure_logger("services.database.metrics_rollup")
+
+
+# Resoluciones mantenidas, de la más fina a la más gruesa
+ROLLUP_RESOLUTIONS = (60, 3600, 86400)
+
+# Intervalos de agregación aceptados por la API
+AGGREGATE_INTERVALS = {'1m': 60, '5m': 300, '15m': 900, '1h': 3600, '1d': 86400}
+
+# Métricas agregadas: nombre en el rollup -> (columna cruda, ignorar ceros)
+ROLLUP_METRICS = {
+    'fps': ('fps', True),
+    'bitrate': ('bitrate_kbps', True),
+    'viewers': ('viewer_count', False),
+    'quality': ('quality_score', True),
+}
+
+_ROLLUP_COLUMNS = [
+    'samples', 'active_samples',
+    *[f"{name}_{part}" for name in ROLLUP_METRICS for part in ('count', 'sum', 'min', 'max', 'p95')],
+    'frames_sum', 'dropped_frames_sum', 'size_kb_sum',
+    'cpu_count', 'cpu_sum', 'memory_count', 'memory_sum'
+]
+
+
+def to_epoch(value: Any) -> int:
+    """
+    Convierte un ``metric_time`` (datetime o texto ISO, en UTC) a epoch.
+
+    Args:
+        value: Valor de la columna o datetime
+
+    Returns:
+        Segundos desde epoch
+    """
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    return calendar.timegm(value.utctimetuple())
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Percentil por rango más cercano de una lista sin ordenar."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _weighted_percentile(pairs: List[Tuple[float, int]], pct: float) -> Optional[float]:
+    """Percentil de valores con peso (p95 de cubos hijos ponderado por muestras)."""
+    pairs = [(value, weight) for value, weight in pairs if value is not None and weight]
+    if not pairs:
+        return None
+    pairs.sort()
+    threshold = pct / 100 * sum(weight for _, weight in pairs)
+    accumulated = 0
+    for value, weight in pairs:
+        accumulated += weight
+        if accumulated >= threshold:
+            return value
+    return pairs[-1][0]
+
+
+def aggregate_raw(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Agrega filas crudas de ``publication_metrics`` en un cubo.
+
+    Args:
+        rows: Filas con las columnas de la tabla cruda
+
+    Returns:
+        Diccionario con las columnas de ``publication_metrics_rollup``
+    """
+    rows = list(rows)
+    bucket: Dict[str, Any] = {
+        'samples': len(rows),
+        'active_samples': sum(1 for r in rows if (r['fps'] or 0) > 0),
+        'frames_sum': sum(r['frames'] or 0 for r in rows),
+        'dropped_frames_sum': sum(r['dropped_frames'] or 0 for r in rows),
+        'size_kb_sum': sum(r['size_kb'] or 0 for r in rows),
+    }
+    for name, (column, skip_zero) in ROLLUP_METRICS.items():
+        values = [r[column] for r in rows if (r[column] if skip_zero else r[column] is not None)]
+        bucket[f"{name}_count"] = len(values)
+        bucket[f"{name}_sum"] = sum(values) if values else None
+        bucket[f"{name}_min"] = min(values) if values else None
+        bucket[f"{name}_max"] = max(values) if values else None
+        bucket[f"{name}_p95"] = percentile(values, 95)
+    for name, column in (('cpu', 'cpu_usage_percent'), ('memory', 'memory_usage_mb')):
+        values = [r[column] for r in rows if r[column] is not None]
+        bucket[f"{name}_count"] = len(values)
+        bucket[f"{name}_sum"] = sum(values) if values else None
+    return bucket
+
+
+def combine_buckets(children: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combina cubos en uno de resolución mayor.
+
+    Sumas, conteos, mínimos y máximos son exactos; el p95 es el percentil
+    ponderado de los p95 hijos.
+
+    Args:
+        children: Cubos con las columnas de ``publication_metrics_rollup``
+
+    Returns:
+        Cubo combinado
+    """
+    def total(column: str) -> Any:
+        values = [c[column] for c in children if c[column] is not None]
+        return sum(values) if values else None
+
+    bucket: Dict[str, Any] = {
+        'samples': total('samples') or 0,
+        'active_samples': total('active_samples') or 0,
+        'frames_sum': total('frames_sum') or 0,
+        'dropped_frames_sum': total('dropped_frames_sum') or 0,
+        'size_kb_sum': total('size_kb_sum') or 0,
+    }
+    for name in ROLLUP_METRICS:
+        mins = [c[f"{name}_min"] for c in children if c[f"{name}_min"] is not None]
+        maxs = [c[f"{name}_max"] for c in children if c[f"{name}_max"] is not None]
+        bucket[f"{name}_count"] = total(f"{name}_count") or 0
+        bucket[f"{name}_sum"] = total(f"{name}_sum")
+        bucket[f"{name}_min"] = min(mins) if mins else None
+        bucket[f"{name}_max"] = max(maxs) if maxs else None
+        bucket[f"{name}_p95"] = _weighted_percentile(
+            [(c[f"{name}_p95"], c[f"{name}_count"]) for c in children], 95
+        )
+    for name in ('cpu', 'memory'):
+        bucket[f"{name}_count"] = total(f"{name}_count") or 0
+        bucket[f"{name}_sum"] = total(f"{name}_sum")
+    return bucket
+
+
+def choose_step(span_seconds: float, max_points: int,
+                interval: Optional[str] = None,
+                min_base: int = ROLLUP_RESOLUTIONS[0]) -> Tuple[int, int]:
+    """
+    Elige el tamaño de cubo de una consulta.
+
+    Un intervalo explícito se amplía si con él se superaría ``max_points``.
+
+    Args:
+        span_seconds: Duración del rango pedido
+        max_points: Máximo de puntos a devolver
+        interval: Intervalo explícito (``1m``, ``5m``, ``15m``, ``1h``, ``1d``)
+        min_base: Resolución más fina que aún se conserva para el rango
+
+    Returns:
+        (step, base): segundos por punto devuelto y resolución del rollup
+        que se lee; ``step`` es múltiplo de ``base``
+    """
+    step = math.ceil(span_seconds / max(1, max_points))
+    if interval in AGGREGATE_INTERVALS:
+        step = max(step, AGGREGATE_INTERVALS[interval])
+    step = max(step, min_base)
+    base = max(r for r in ROLLUP_RESOLUTIONS if min_base <= r <= step)
+    return math.ceil(step / base) * base, base
+
+
+class MetricsRollup:
+    """
+    Mantenimiento y consulta de los rollups de métricas de publicación.
+
+    Todos los métodos reciben la conexión del llamante y no hacen commit:
+    ``refresh`` debe ejecutarse dentro de la transacción de escritura que
+    insertó las filas crudas.
+    """
+
+    STATE_KEY = 'publication_metrics'
+    # Retención de los cubos finos; los diarios se conservan
+    RETENTION_SECONDS = {60: 7 * 86400, 3600: 90 * 86400}
+    PRUNE_INTERVAL_SECONDS = 3600
+    # Filas crudas nuevas procesadas por iteración en el backfill inicial
+    CHUNK_ROWS = 20000
+
+    def __init__(self):
+        """Inicializa el gestor de rollups."""
+        self._tables_ready = False
+        self._tables_lock = threading.Lock()
+        self._last_prune = 0.0
+
+    def ensure_tables(self, conn: sqlite3.Connection) -> None:
+        """Crea las tablas de rollup que falten en bases de datos antiguas."""
+        if self._tables_ready:
+            return
+        with self._tables_lock:
+            if self._tables_ready:
+                return
+            for create_sql in (PUBLICATION_METRICS_ROLLUP_TABLE, PUBLICATION_METRICS_ROLLUP_STATE_TABLE):
+                conn.execute(create_sql.replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1))
+            self._tables_ready = True
+
+    def refresh(self, conn: sqlite3.Connection) -> int:
+        """
+        Incorpora a los rollups las filas crudas nuevas.
+
+        Args:
+            conn: Conexión con una transacción de escritura abierta o libre
+
+        Returns:
+            Número de filas crudas procesadas
+        """
+        self.ensure_tables(conn)
+        row = conn.execute(
+            "SELECT last_metric_id FROM publication_metrics_rollup_state WHERE state_key = ?",
+            (self.STATE_KEY,)
+        ).fetchone()
+        last_id = row[0] if row else 0
+        processed = 0
+
+        while True:
+            new_rows = conn.execute("""
+                SELECT metric_id, publication_id, metric_time
+                FROM publication_metrics
+                WHERE metric_id > ?
+                ORDER BY metric_id
+                LIMIT ?
+            """, (last_id, self.CHUNK_ROWS)).fetchall()
+            if not new_rows:
+                break
+
+            minute_keys = {
+                (r[1], to_epoch(r[2]) // 60 * 60) for r in new_rows
+            }
+            self._rebuild_minutes(conn, minute_keys)
+            keys = minute_keys
+            for child, parent in zip(ROLLUP_RESOLUTIONS, ROLLUP_RESOLUTIONS[1:]):
+                keys = {(pub, start // parent * parent) for pub, start in keys}
+                self._rebuild_from_children(conn, keys, child, parent)
+
+            last_id = new_rows[-1][0]
+            processed += len(new_rows)
+            if len(new_rows) < self.CHUNK_ROWS:
+                break
+
+        if processed:
+            conn.execute("""
+                INSERT INTO publication_metrics_rollup_state (state_key, last_metric_id, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(state_key) DO UPDATE SET
+                    last_metric_id = excluded.last_metric_id,
+                    updated_at = excluded.updated_at
+            """, (self.STATE_KEY, last_id))
+
+        if time.monotonic() - self._last_prune > self.PRUNE_INTERVAL_SECONDS:
+            self.prune(conn)
+        return processed
+
+    def _rebuild_minutes(self, conn: sqlite3.Connection, keys: set) -> None:
+        """Recalcula cubos de minuto desde las filas crudas."""
+        by_publication: Dict[int, List[int]] = {}
+        for publication_id, start in keys:
+            by_publication.setdefault(publication_id, []).append(start)
+
+        for publication_id, starts in by_publication.items():
+            # Un único rango por publicación; se agrupa en Python
+            low = datetime.utcfromtimestamp(min(starts))
+            high = datetime.utcfromtimestamp(max(starts) + 60)
+            rows = conn.execute("""
+                SELECT metric_time, fps, bitrate_kbps, frames, dropped_frames,
+                       quality_score, viewer_count, size_kb,
+                       cpu_usage_percent, memory_usage_mb
+                FROM publication_metrics
+                WHERE publication_id = ? AND metric_time >= ? AND metric_time < ?
+            """, (publication_id, low, high)).fetchall()
+
+            grouped: Dict[int, List[sqlite3.Row]] = {}
+            wanted = set(starts)
+            for raw in rows:
+                start = to_epoch(raw['metric_time']) // 60 * 60
+                if start in wanted:
+                    grouped.setdefault(start, []).append(raw)
+            for start, bucket_rows in grouped.items():
+                self._upsert(conn, publication_id, 60, start, aggregate_raw(bucket_rows))
+
+    def _rebuild_from_children(self, conn: sqlite3.Connection, keys: set,
+                               child_seconds: int, parent_seconds: int) -> None:
+        """Recalcula cubos de una resolución desde los de la inferior."""
+        for publication_id, start in keys:
+            children = conn.execute("""
+                SELECT * FROM publication_metrics_rollup
+                WHERE publication_id = ? AND bucket_seconds = ?
+                AND bucket_start >= ? AND bucket_start < ?
+            """, (publication_id, child_seconds, start, start + parent_seconds)).fetchall()
+            if children:
+                self._upsert(conn, publication_id, parent_seconds, start, combine_buckets(children))
+
+    def _upsert(self, conn: sqlite3.Connection, publication_id: int,
+                bucket_seconds: int, bucket_start: int, bucket: Dict[str, Any]) -> None:
+        columns = ', '.join(_ROLLUP_COLUMNS)
+        placeholders = ', '.join('?' * len(_ROLLUP_COLUMNS))
+        conn.execute(f"""
+            INSERT OR REPLACE INTO publication_metrics_rollup (
+                publication_id, bucket_seconds, bucket_start, {columns}, updated_at
+            ) VALUES (?, ?, ?, {placeholders}, CURRENT_TIMESTAMP)
+        """, (publication_id, bucket_seconds, bucket_start,
+              *[bucket[column] for column in _ROLLUP_COLUMNS]))
+
+    def prune(self, conn: sqlite3.Connection, now: Optional[float] = None) -> int:
+        """
+        Elimina cubos finos fuera de su ventana de retención.
+
+        Args:
+            conn: Conexión de escritura
+            now: Epoch de referencia (por defecto ahora)
+
+        Returns:
+            Cubos eliminados
+        """
+        self.ensure_tables(conn)
+        now = time.time() if now is None else now
+        deleted = 0
+        for bucket_seconds, retention in self.RETENTION_SECONDS.items():
+            cursor = conn.execute("""
+                DELETE FROM publication_metrics_rollup
+                WHERE bucket_seconds = ? AND bucket_start < ?
+            """, (bucket_seconds, int(now - retention)))
+            deleted += cursor.rowcount
+        self._last_prune = time.monotonic()
+        return deleted
+
+    def finest_retained(self, start: int, now: Optional[float] = None) -> int:
+        """
+        Resolución más fina cuyos cubos aún cubren ``start``.
+
+        Args:
+            start: Epoch del inicio del rango
+            now: Epoch de referencia (por defecto ahora)
+
+        Returns:
+            Segundos por cubo de esa resolución
+        """
+        now = time.time() if now is None else now
+        for resolution in ROLLUP_RESOLUTIONS:
+            retention = self.RETENTION_SECONDS.get(resolution)
+            if retention is None or start >= now - retention:
+                return resolution
+        return ROLLUP_RESOLUTIONS[-1]
+
+    def query(self, conn: sqlite3.Connection, publication_id: int,
+              start_time: datetime, end_time: datetime,
+              max_points: int = 500, interval: Optional[str] = None,
+              now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Obtiene la serie reducida y el resumen de un rango.
+
+        Args:
+            conn: Conexión de lectura
+            publication_id: ID de la publicación
+            start_time: Inicio del rango (UTC)
+            end_time: Fin del rango (UTC)
+            max_points: Máximo de puntos de la serie
+            interval: Intervalo explícito (``1m``, ``5m``, ``15m``, ``1h``, ``1d``)
+            now: Epoch de referencia para la retención (por defecto ahora)
+
+        Returns:
+            Diccionario con ``data_points``, ``summary`` y
+            ``bucket_seconds``
+        """
+        self.ensure_tables(conn)
+        start, end = to_epoch(start_time), to_epoch(end_time)
+        step, base = choose_step(end - start, max_points, interval,
+                                 min_base=self.finest_retained(start, now))
+
+        rows = conn.execute("""
+            SELECT * FROM publication_metrics_rollup
+            WHERE publication_id = ? AND bucket_seconds = ?
+            AND bucket_start >= ? AND bucket_start <= ?
+            ORDER BY bucket_start
+        """, (publication_id, base, start // base * base, end)).fetchall()
+
+        grouped: Dict[int, List[sqlite3.Row]] = {}
+        for row in rows:
+            grouped.setdefault(row['bucket_start'] // step * step, []).append(row)
+
+        data_points = []
+        for bucket_start, children in grouped.items():
+            bucket = children[0] if len(children) == 1 else combine_buckets(children)
+            data_points.append(self._to_point(bucket_start, bucket))
+
+        return {
+            'data_points': data_points,
+            'summary': self._to_summary(combine_buckets(rows) if rows else None),
+            'bucket_seconds': step
+        }
+
+    @staticmethod
+    def _stats(bucket: Any, name: str) -> Optional[Dict[str, Optional[float]]]:
+        count = bucket[f"{name}_count"]
+        if not count:
+            return None
+        return {
+            'avg': bucket[f"{name}_sum"] / count,
+            'min': bucket[f"{name}_min"],
+            'max': bucket[f"{name}_max"],
+            'p95': bucket[f"{name}_p95"]
+        }
+
+    def _to_point(self, bucket_start: int, bucket: Any) -> Dict[str, Any]:
+        """Convierte un cubo en un punto de la serie."""
+        stats = {name: self._stats(bucket, name) for name in ROLLUP_METRICS}
+
+        def avg(name: str) -> Optional[float]:
+            return stats[name]['avg'] if stats[name] else None
+
+        def mean(name: str) -> Optional[float]:
+            count = bucket[f"{name}_count"]
+            return bucket[f"{name}_sum"] / count if count else None
+
+        viewers = avg('viewers')
+        return {
+            'timestamp': datetime.utcfromtimestamp(bucket_start),
+            'fps': avg('fps'),
+            'bitrate_kbps': avg('bitrate'),
+            'frames': bucket['frames_sum'],
+            'dropped_frames': bucket['dropped_frames_sum'],
+            'quality_score': avg('quality'),
+            'viewer_count': round(viewers) if viewers is not None else None,
+            'cpu_usage_percent': mean('cpu'),
+            'memory_usage_mb': mean('memory'),
+            'size_kb': bucket['size_kb_sum'],
+            'samples': bucket['samples'],
+            'fps_stats': stats['fps'],
+            'bitrate_stats': stats['bitrate'],
+            'viewers_stats': stats['viewers'],
+            'quality_stats': stats['quality']
+        }
+
+    def _to_summary(self, bucket: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Resumen del rango con las mismas claves que el cálculo sobre filas crudas."""
+        if not bucket or not bucket['samples']:
+            return {
+                'avg_fps': 0, 'min_fps': 0, 'max_fps': 0, 'avg_bitrate_kbps': 0,
+                'total_frames': 0, 'total_dropped_frames': 0, 'avg_quality_score': 0,
+                'peak_viewers': 0, 'avg_viewers': 0, 'total_data_mb': 0, 'uptime_percent': 0
+            }
+        fps = self._stats(bucket, 'fps') or {}
+        bitrate = self._stats(bucket, 'bitrate') or {}
+        quality = self._stats(bucket, 'quality') or {}
+        viewers = self._stats(bucket, 'viewers') or {}
+        return {
+            'avg_fps': fps.get('avg', 0),
+            'min_fps': fps.get('min', 0),
+            'max_fps': fps.get('max', 0),
+            'avg_bitrate_kbps': bitrate.get('avg', 0),
+            'total_frames': bucket['frames_sum'],
+            'total_dropped_frames': bucket['dropped_frames_sum'],
+            'avg_quality_score': quality.get('avg', 0),
+            'peak_viewers': int(viewers.get('max') or 0),
+            'avg_viewers': viewers.get('avg', 0),
+            'total_data_mb': bucket['size_kb_sum'] / 1024,
+            'uptime_percent': bucket['active_samples'] / bucket['samples'] * 100
+        }
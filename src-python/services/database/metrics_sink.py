@@ -0,0 +1,231 @@
+"""
+Buffer write-behind para las filas de ``publication_metrics``.
+
+La recolección de métricas genera una fila pequeña por cámara y
+intervalo; escribir cada una con su propio commit supone un fsync por
+fila. El sink las acumula en memoria y las vuelca con ``executemany`` en
+una sola transacción cuando se alcanzan N filas o pasan T milisegundos.
+
+El buffer está acotado: si la BD no da abasto se descartan las filas más
+antiguas en lugar de crecer sin límite. ``stop`` vuelca lo pendiente.
+"""
+
+import asyncio
+import sqlite3
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from services.database.connection_pool import SQLiteConnectionPool
+from services.database.db_executor import DatabaseExecutor
+from services.logging_service import get_secure_logger
+
+
+logger = get_secure_logger("services.database.metrics_sink")
+
+
+# La publicación activa se resuelve en el propio INSERT: las filas de
+# cámaras sin publicación activa no insertan nada
+INSERT_METRIC_SQL = """
+    INSERT INTO publication_metrics (
+        publication_id, metric_time, fps, bitrate_kbps,
+        frames, speed, quality_score, size_kb, time_seconds,
+        dropped_frames, viewer_count, cpu_usage_percent,
+        memory_usage_mb
+    )
+    SELECT publication_id, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+    FROM camera_publications
+    WHERE camera_id = ? AND is_active = 1
+    LIMIT 1
+"""
+
+
+def metric_row(camera_id: str, metrics: Dict[str, Any]) -> Tuple:
+    """
+    Convierte un diccionario de métricas en los parámetros del INSERT.
+
+    Args:
+        camera_id: ID de la cámara
+        metrics: Métricas de la muestra (``timestamp`` opcional)
+
+    Returns:
+        Tupla en el orden de ``INSERT_METRIC_SQL``
+    """
+    return (
+        metrics.get('timestamp') or datetime.utcnow(),
+        metrics.get('fps'),
+        metrics.get('bitrate_kbps'),
+        metrics.get('frames'),
+        metrics.get('speed'),
+        metrics.get('quality_score'),
+        metrics.get('size_kb'),
+        metrics.get('time_seconds'),
+        metrics.get('dropped_frames', 0),
+        metrics.get('viewer_count', 0),
+        metrics.get('cpu_usage_percent'),
+        metrics.get('memory_usage_mb'),
+        camera_id
+    )
+
+
+class PublicationMetricsSink:
+    """
+    Sink acotado que agrupa las escrituras de métricas de publicación.
+    """
+
+    def __init__(self,
+                 pool: SQLiteConnectionPool,
+                 executor: DatabaseExecutor,
+                 batch_rows: int = settings.METRICS_BATCH_ROWS,
+                 flush_interval_ms: int = settings.METRICS_FLUSH_INTERVAL_MS,
+                 max_buffered_rows: int = settings.METRICS_BUFFER_MAX_ROWS,
+                 after_write: Optional[Callable[[sqlite3.Connection], Any]] = None):
+        """
+        Inicializa el sink.
+
+        Args:
+            pool: Pool de conexiones de la BD de métricas
+            executor: Executor de BD donde corren los volcados
+            batch_rows: Filas que disparan un volcado inmediato
+            flush_interval_ms: Tiempo máximo que una fila espera en memoria
+            max_buffered_rows: Capacidad del buffer; al llenarse se
+                descartan las filas más antiguas
+            after_write: Función que se ejecuta en la misma transacción
+                tras insertar cada lote (p. ej. actualizar rollups)
+        """
+        self._pool = pool
+        self._executor = executor
+        self.batch_rows = max(1, batch_rows)
+        self.flush_interval = max(1, flush_interval_ms) / 1000
+        self.max_buffered_rows = max(self.batch_rows, max_buffered_rows)
+        self._after_write = after_write
+
+        self._buffer: Deque[Tuple] = deque(maxlen=self.max_buffered_rows)
+        self._flush_lock = asyncio.Lock()
+        self._batch_ready: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._stats = {
+            'rows_received': 0,
+            'rows_written': 0,
+            'rows_dropped': 0,
+            'rows_failed': 0,
+            'batches_flushed': 0,
+            'last_flush_ms': 0.0,
+            'last_batch_rows': 0
+        }
+
+    def add(self, camera_id: str, metrics: Dict[str, Any]) -> None:
+        """
+        Encola una muestra de métricas sin bloquear.
+
+        Args:
+            camera_id: ID de la cámara
+            metrics: Métricas de la muestra
+        """
+        if len(self._buffer) == self.max_buffered_rows:
+            # deque con maxlen expulsa la más antigua al añadir
+            self._stats['rows_dropped'] += 1
+        self._buffer.append(metric_row(camera_id, metrics))
+        self._stats['rows_received'] += 1
+
+        self._ensure_flusher()
+        if len(self._buffer) >= self.batch_rows and self._batch_ready is not None:
+            self._batch_ready.set()
+
+    def _ensure_flusher(self) -> None:
+        """Arranca la tarea de volcado periódico si no está activa."""
+        if self._stopping:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._flusher is not None and not self._flusher.done() and self._flusher.get_loop() is loop:
+            return
+        self._batch_ready = asyncio.Event()
+        self._flusher = loop.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        """Vuelca el buffer cada ``flush_interval`` o al completar un lote."""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error volcando métricas de publicación: {e}")
+
+    async def flush(self) -> int:
+        """
+        Escribe todas las filas pendientes en una transacción.
+
+        Returns:
+            Número de filas enviadas a la BD
+        """
+        async with self._flush_lock:
+            written = 0
+            while self._buffer:
+                rows = list(self._buffer)
+                self._buffer.clear()
+                started = time.perf_counter()
+                try:
+                    await self._executor.write(self._write_rows, rows)
+                except Exception:
+                    self._stats['rows_failed'] += len(rows)
+                    raise
+                self._stats['rows_written'] += len(rows)
+                self._stats['batches_flushed'] += 1
+                self._stats['last_batch_rows'] = len(rows)
+                self._stats['last_flush_ms'] = round((time.perf_counter() - started) * 1000, 3)
+                written += len(rows)
+            return written
+
+    def _write_rows(self, rows: List[Tuple]) -> None:
+        """Inserta un lote con un único commit (hilo escritor)."""
+        with self._pool.write_lock, self._pool.connection() as conn:
+            conn.executemany(INSERT_METRIC_SQL, rows)
+            if self._after_write is not None:
+                self._after_write(conn)
+
+    async def stop(self) -> None:
+        """
+        Detiene el volcado periódico y escribe lo pendiente.
+
+        Una muestra posterior vuelve a arrancar el volcado periódico.
+        """
+        self._stopping = True
+        if self._flusher is not None:
+            # Despertar la tarea sin cancelarla: un lote en curso termina
+            self._batch_ready.set()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Error en el volcado final de métricas: {e}")
+        finally:
+            self._stopping = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas del sink.
+
+        Returns:
+            Filas recibidas, escritas, descartadas y fallidas, lotes
+            volcados y filas pendientes en memoria
+        """
+        batches = self._stats['batches_flushed']
+        return {
+            **self._stats,
+            'buffered_rows': len(self._buffer),
+            'avg_rows_per_commit': round(self._stats['rows_written'] / batches, 2) if batches else 0.0,
+            'batch_rows': self.batch_rows,
+            'flush_interval_ms': int(self.flush_interval * 1000),
+            'max_buffered_rows': self.max_buffered_rows
+        }
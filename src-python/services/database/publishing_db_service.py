@@ -11,7 +11,6 @@ import json
 from typing import Optional, Dict, List, Any
 from datetime import datetime
 from contextlib import contextmanager
-import asyncio
 from pathlib import Path
 import hashlib
 import base64
@@ -21,6 +20,8 @@ import os
 from models.publishing import PublishConfiguration, PublishStatus, PublisherProcess
 from utils.exceptions import ServiceError
 from services.logging_service import get_secure_logger
+from services.database.connection_pool import get_connection_pool
+from services.database.db_executor import get_db_executor
 
 
 logger = get_secure_logger("services.database.publishing_db_service")
@@ -49,6 +50,10 @@ class PublishingDatabaseService:
             db_path = str(Path(__file__).parent.parent.parent / "data" / "camera_data.db")
         self.db_path = Path(db_path)
         self.logger = logger
+        # Conexiones persistentes por hilo compartidas con el resto de servicios
+        self._pool = get_connection_pool(self.db_path)
+        # Executor de BD dedicado (un escritor, N lectores)
+        self._db_executor = get_db_executor()
         self._initialized = False
         # Generar clave de encriptación o cargar desde variable de entorno
         self._init_encryption_key()
@@ -58,27 +63,21 @@ class PublishingDatabaseService:
         """
         Context manager para conexiones a BD.
         
+        Usa la conexión del hilo actual del pool compartido (WAL, pragmas
+        ya aplicados); hace commit al salir y rollback si hay error.
+        
         Yields:
             sqlite3.Connection: Conexión a la base de datos
             
         Raises:
             ServiceError: Si hay error de conexión
         """
-        conn = None
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            conn.row_factory = sqlite3.Row  # Para acceso por nombre de columna
-            conn.execute("PRAGMA foreign_keys = ON")
-            yield conn
-            conn.commit()
+            with self._pool.connection() as conn:
+                yield conn
         except sqlite3.Error as e:
-            if conn:
-                conn.rollback()
             self.logger.error(f"Error de base de datos: {e}")
             raise ServiceError(f"Error de base de datos: {e}", error_code="DB_ERROR")
-        finally:
-            if conn:
-                conn.close()
                 
     async def initialize(self) -> None:
         """
@@ -92,10 +91,8 @@ class PublishingDatabaseService:
             
         self.logger.info("Inicializando PublishingDatabaseService")
         
-        # Ejecutar en thread pool para no bloquear
-        await asyncio.get_event_loop().run_in_executor(
-            None, self._create_tables_if_needed
-        )
+        # Ejecutar en el hilo escritor para no bloquear
+        await self._db_executor.write(self._create_tables_if_needed)
         
         self._initialized = True
         self.logger.info("PublishingDatabaseService inicializado")
@@ -276,7 +273,7 @@ class PublishingDatabaseService:
                     'updated_at': row['updated_at']
                 }
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
         
     async def get_configuration_by_name(self, name: str) -> Optional[PublishConfiguration]:
         """
@@ -302,7 +299,7 @@ class PublishingDatabaseService:
                     
                 return self._row_to_config(row)
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
         
     async def get_all_configurations(self) -> List[Dict[str, Any]]:
         """
@@ -359,7 +356,7 @@ class PublishingDatabaseService:
                     
                 return configs
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
         
     async def save_configuration(
         self,
@@ -460,7 +457,7 @@ class PublishingDatabaseService:
                     
                     return cursor.lastrowid
                     
-        config_id = await asyncio.get_event_loop().run_in_executor(None, _save)
+        config_id = await self._db_executor.write(_save)
         self.logger.info(f"Configuración '{name}' guardada con ID {config_id}")
         return config_id
         
@@ -500,7 +497,7 @@ class PublishingDatabaseService:
                 cursor.execute("DELETE FROM publishing_configurations WHERE config_name = ?", (name,))
                 return cursor.rowcount > 0
                 
-        deleted = await asyncio.get_event_loop().run_in_executor(None, _delete)
+        deleted = await self._db_executor.write(_delete)
         if deleted:
             self.logger.info(f"Configuración '{name}' eliminada")
         return deleted
@@ -531,13 +528,11 @@ class PublishingDatabaseService:
         def _save():
             conn = None
             try:
-                conn = sqlite3.connect(str(self.db_path))
-                conn.row_factory = sqlite3.Row
-                conn.execute("PRAGMA foreign_keys = ON")
+                conn = self._pool.get()
                 cursor = conn.cursor()
                 
                 # Usar transacción explícita para evitar condiciones de carrera
-                cursor.execute("BEGIN EXCLUSIVE TRANSACTION")
+                cursor.execute("BEGIN IMMEDIATE TRANSACTION")
                 
                 # Desactivar estados previos
                 cursor.execute("""
@@ -569,15 +564,12 @@ class PublishingDatabaseService:
                 return last_id
                 
             except Exception as e:
-                if conn:
+                if conn and conn.in_transaction:
                     conn.rollback()
                 self.logger.error(f"Error guardando estado de publicación: {e}")
                 raise ServiceError(f"Error guardando estado: {e}", error_code="DB_STATE_ERROR")
-            finally:
-                if conn:
-                    conn.close()
                 
-        state_id = await asyncio.get_event_loop().run_in_executor(None, _save)
+        state_id = await self._db_executor.write(_save)
         self.logger.debug(f"Estado de publicación guardado para {camera_id}: {status.value}")
         return state_id
         
@@ -633,7 +625,7 @@ class PublishingDatabaseService:
                 cursor.execute(query, params)
                 return cursor.rowcount > 0
                 
-        updated = await asyncio.get_event_loop().run_in_executor(None, _update)
+        updated = await self._db_executor.write(_update)
         if updated:
             self.logger.debug(f"Estado actualizado para {camera_id}")
         return updated
@@ -674,7 +666,7 @@ class PublishingDatabaseService:
                     
                 return states
                 
-        return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+        return await self._db_executor.read(_fetch)
         
     async def save_publishing_metrics(
         self,
@@ -712,7 +704,7 @@ class PublishingDatabaseService:
                     metrics.get('time_seconds')
                 ))
                 
-        await asyncio.get_event_loop().run_in_executor(None, _save)
+        await self._db_executor.write(_save)
         
     async def finalize_publishing_session(
         self,
@@ -777,7 +769,7 @@ class PublishingDatabaseService:
                     json.dumps(metrics_summary)
                 ))
                 
-        await asyncio.get_event_loop().run_in_executor(None, _save)
+        await self._db_executor.write(_save)
         self.logger.info(f"Sesión {session_id} finalizada para cámara {camera_id}")
         
     def _row_to_config(self, row: sqlite3.Row) -> PublishConfiguration:
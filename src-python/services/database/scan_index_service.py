@@ -0,0 +1,445 @@
+"""
+Índice persistente de resultados de escaneo de red.
+
+Guarda cada escaneo en ``network_scans``/``scan_results`` y mantiene un
+índice por (IP, puerto) en ``scan_host_ports`` con la última vez que el
+puerto se vio abierto y la última vez que se sondeó de verdad. Con él,
+``ScanService`` puede:
+
+- Responder un sub-rango de un escaneo reciente sin tocar la red.
+- Reutilizar los hosts que no cambiaron y sondear solo los nuevos,
+  los modificados o aquellos cuya entrada está caducada.
+"""
+
+import ipaddress
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from models.camera_model import ProtocolType
+from models.scan_model import ProtocolDetectionResult, ScanRange, ScanResult
+from services.database.connection_pool import get_connection_pool
+from services.database.schema import scanning_tables
+from services.logging_service import get_secure_logger
+from utils.exceptions import ServiceError
+
+
+logger = get_secure_logger("services.database.scan_index_service")
+
+
+class ScanIndexService:
+    """
+    Índice SQLite de hosts y puertos descubiertos.
+
+    Los métodos son síncronos: ``ScanService`` los ejecuta en su executor
+    para no bloquear el event loop.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Inicializa el índice.
+
+        Args:
+            db_path: Ruta a la base de datos SQLite
+        """
+        if db_path is None:
+            # Usar ruta absoluta basada en src-python
+            db_path = str(Path(__file__).parent.parent.parent / "data" / "camera_data.db")
+        self.db_path = Path(db_path)
+        self.logger = logger
+        self._pool = get_connection_pool(self.db_path)
+        self._tables_ready = False
+        self._tables_lock = threading.Lock()
+
+    @contextmanager
+    def _get_connection(self):
+        """
+        Context manager para conexiones a BD.
+
+        Yields:
+            sqlite3.Connection: Conexión a la base de datos
+
+        Raises:
+            ServiceError: Si hay error de conexión
+        """
+        try:
+            with self._pool.connection() as conn:
+                self._ensure_tables(conn)
+                yield conn
+        except sqlite3.Error as e:
+            self.logger.error(f"Error de base de datos: {e}")
+            raise ServiceError(f"Error de base de datos: {e}", error_code="DB_ERROR")
+
+    def _ensure_tables(self, conn: sqlite3.Connection) -> None:
+        """Crea las tablas de escaneo que falten en bases de datos antiguas."""
+        if self._tables_ready:
+            return
+        with self._tables_lock:
+            if self._tables_ready:
+                return
+            for _, create_sql in scanning_tables.get_scanning_tables():
+                conn.execute(create_sql.replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1))
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_scans_time ON network_scans(start_time)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_scan_results_scan ON scan_results(scan_id)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_scan_host_ports_ip_int ON scan_host_ports(ip_int)"
+            )
+            conn.commit()
+            self._tables_ready = True
+
+    # === Escritura ===
+
+    def record_scan(self,
+                    scan_id: str,
+                    scan_range: ScanRange,
+                    methods: List[str],
+                    started_at: datetime,
+                    finished_at: datetime,
+                    results: List[Dict[str, Any]]) -> None:
+        """
+        Registra un escaneo completado y actualiza el índice de puertos.
+
+        Los puertos del rango que este escaneo no vio abiertos se eliminan
+        del índice (host apagado o puerto cerrado). Los hosts reutilizados
+        del índice solo actualizan ``last_seen``.
+
+        Args:
+            scan_id: ID del escaneo
+            scan_range: Rango escaneado
+            methods: Métodos de escaneo utilizados
+            started_at: Inicio del escaneo
+            finished_at: Fin del escaneo
+            results: Resultados de ``ScanModel.get_all_results()``
+        """
+        started = started_at.isoformat()
+        finished = finished_at.isoformat()
+        start_int = int(ipaddress.ip_address(scan_range.start_ip))
+        end_int = int(ipaddress.ip_address(scan_range.end_ip))
+        ports = sorted(set(scan_range.ports))
+        # Solo un port scan completo permite afirmar qué puertos están cerrados
+        authoritative = 'port_scan' in methods
+        alive = [r for r in results if r.get('is_alive')]
+        cameras = [r for r in results if r.get('has_camera_protocols')]
+
+        network_scan = (
+            scan_id,
+            'single' if start_int == end_int else 'custom',
+            self._target_network(scan_range),
+            json.dumps(ports),
+            json.dumps(methods),
+            started,
+            finished,
+            (finished_at - started_at).total_seconds(),
+            scan_range.ip_count,
+            len(alive),
+            len(cameras),
+            'completed',
+            json.dumps({
+                'start_ip': scan_range.start_ip,
+                'end_ip': scan_range.end_ip,
+                'authoritative': authoritative,
+                'reused_hosts': sum(1 for r in results if r.get('from_index'))
+            })
+        )
+
+        result_rows = []
+        probed_ports = []
+        reused_ports = []
+        for result in alive:
+            detections = [d for d in result.get('detection_results', []) if d.get('detected')]
+            brand = next((d['details'].get('brand') for d in detections
+                          if d.get('details', {}).get('brand')), None)
+            result_rows.append((
+                scan_id,
+                result['ip'],
+                result.get('mac_address'),
+                result.get('hostname'),
+                True,
+                bool(result.get('has_camera_protocols')),
+                100.0 if result.get('has_camera_protocols') else 0.0,
+                brand,
+                json.dumps(detections),
+                json.dumps(result.get('open_ports', [])),
+                int(result.get('scan_duration_ms') or 0),
+                json.dumps({'from_index': bool(result.get('from_index'))})
+            ))
+
+            ip_int = int(ipaddress.ip_address(result['ip']))
+            for port in result.get('open_ports', []):
+                if result.get('from_index'):
+                    reused_ports.append((finished, scan_id, result['ip'], port))
+                    continue
+                port_detections = [d for d in detections if d.get('port') == port]
+                probed_ports.append((
+                    result['ip'], ip_int, port, result.get('mac_address'),
+                    json.dumps(port_detections), finished, finished, finished, scan_id
+                ))
+
+        with self._get_connection() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO network_scans (
+                    scan_id, scan_type, target_network, port_list, protocol_list,
+                    start_time, end_time, duration_seconds, total_hosts_scanned,
+                    hosts_alive, cameras_found, status, configuration
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, network_scan)
+            conn.executemany("""
+                INSERT OR REPLACE INTO scan_results (
+                    scan_id, ip_address, mac_address, hostname, is_alive, is_camera,
+                    confidence_score, detected_brand, detected_services, open_ports,
+                    response_time_ms, metadata
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, result_rows)
+            conn.executemany("""
+                INSERT INTO scan_host_ports (
+                    ip_address, ip_int, port, mac_address, detections,
+                    first_seen, last_seen, last_probed, last_scan_id
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(ip_address, port) DO UPDATE SET
+                    mac_address = COALESCE(excluded.mac_address, mac_address),
+                    detections = excluded.detections,
+                    last_seen = excluded.last_seen,
+                    last_probed = excluded.last_probed,
+                    last_scan_id = excluded.last_scan_id
+            """, probed_ports)
+            conn.executemany("""
+                UPDATE scan_host_ports SET last_seen = ?, last_scan_id = ?
+                WHERE ip_address = ? AND port = ?
+            """, reused_ports)
+
+            if authoritative:
+                placeholders = ",".join("?" * len(ports))
+                conn.execute(f"""
+                    DELETE FROM scan_host_ports
+                    WHERE ip_int BETWEEN ? AND ? AND port IN ({placeholders})
+                      AND last_scan_id != ?
+                """, (start_int, end_int, *ports, scan_id))
+
+        self.logger.info(
+            f"Scan {scan_id} indexed: {len(alive)} hosts, "
+            f"{len(probed_ports)} probed ports, {len(reused_ports)} reused ports"
+        )
+
+    def purge(self, older_than_days: int) -> int:
+        """
+        Elimina escaneos y entradas del índice antiguos.
+
+        Args:
+            older_than_days: Antigüedad máxima en días
+
+        Returns:
+            Número de escaneos eliminados
+        """
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+        with self._get_connection() as conn:
+            deleted = conn.execute(
+                "DELETE FROM network_scans WHERE start_time < ?", (cutoff,)
+            ).rowcount
+            conn.execute("DELETE FROM scan_host_ports WHERE last_seen < ?", (cutoff,))
+        return deleted
+
+    # === Consultas ===
+
+    def lookup_range(self,
+                     scan_range: ScanRange,
+                     methods: List[str],
+                     max_age: timedelta) -> Optional[Dict[str, ScanResult]]:
+        """
+        Responde un rango desde el índice si un escaneo reciente lo cubre.
+
+        Args:
+            scan_range: Rango solicitado (puede ser un sub-rango)
+            methods: Métodos que debe haber usado el escaneo que lo cubre
+            max_age: Antigüedad máxima del escaneo
+
+        Returns:
+            Resultados por IP, o None si ningún escaneo reciente cubre
+            todo el rango con esos puertos y métodos
+        """
+        start_int = int(ipaddress.ip_address(scan_range.start_ip))
+        end_int = int(ipaddress.ip_address(scan_range.end_ip))
+
+        with self._get_connection() as conn:
+            covering = self._covering_scans(conn, scan_range, methods, max_age, contains_range=True)
+            if not covering:
+                return None
+            scan = covering[0]
+
+            hosts = {}
+            for row in conn.execute(
+                "SELECT ip_address, mac_address, hostname FROM scan_results "
+                "WHERE scan_id = ? AND is_alive = 1", (scan['scan_id'],)
+            ):
+                if start_int <= int(ipaddress.ip_address(row['ip_address'])) <= end_int:
+                    hosts[row['ip_address']] = ScanResult(
+                        ip=row['ip_address'],
+                        hostname=row['hostname'],
+                        mac_address=row['mac_address'],
+                        is_alive=True
+                    )
+
+            port_rows = self._port_rows(conn, start_int, end_int, scan_range.ports,
+                                        since=scan['start_time'])
+
+        for row in port_rows:
+            result = hosts.get(row['ip_address'])
+            if result is not None:
+                self._add_port(result, row)
+        return hosts
+
+    def get_known_hosts(self,
+                        scan_range: ScanRange,
+                        methods: List[str],
+                        max_age: timedelta) -> Dict[str, ScanResult]:
+        """
+        Obtiene los hosts del rango con entradas frescas en el índice.
+
+        Un host es reutilizable si un escaneo reciente con los mismos
+        puertos y métodos lo cubrió y todos sus puertos se sondearon
+        dentro de ``max_age``.
+
+        Args:
+            scan_range: Rango a escanear
+            methods: Métodos del escaneo
+            max_age: Antigüedad máxima de la última sonda real
+
+        Returns:
+            Resultados indexados por IP
+        """
+        start_int = int(ipaddress.ip_address(scan_range.start_ip))
+        end_int = int(ipaddress.ip_address(scan_range.end_ip))
+        cutoff = (datetime.now() - max_age).isoformat()
+
+        with self._get_connection() as conn:
+            covering = self._covering_scans(conn, scan_range, methods, max_age, contains_range=False)
+            if not covering:
+                return {}
+            port_rows = self._port_rows(conn, start_int, end_int, scan_range.ports, since=cutoff)
+
+        covered = [
+            (int(ipaddress.ip_address(c['start_ip'])), int(ipaddress.ip_address(c['end_ip'])))
+            for c in covering
+        ]
+        known: Dict[str, ScanResult] = {}
+        stale = set()
+        for row in port_rows:
+            ip = row['ip_address']
+            if row['last_probed'] < cutoff:
+                stale.add(ip)
+                continue
+            if not any(low <= row['ip_int'] <= high for low, high in covered):
+                continue
+            result = known.setdefault(ip, ScanResult(ip=ip, mac_address=row['mac_address'], is_alive=True))
+            self._add_port(result, row)
+
+        for ip in stale:
+            known.pop(ip, None)
+        return known
+
+    def get_index_stats(self) -> Dict[str, Any]:
+        """Obtiene estadísticas del índice."""
+        with self._get_connection() as conn:
+            scans = conn.execute("SELECT COUNT(*) FROM network_scans").fetchone()[0]
+            hosts, ports = conn.execute(
+                "SELECT COUNT(DISTINCT ip_address), COUNT(*) FROM scan_host_ports"
+            ).fetchone()
+        return {'scans': scans, 'hosts': hosts, 'open_ports': ports}
+
+    # === Helpers ===
+
+    @staticmethod
+    def _target_network(scan_range: ScanRange) -> str:
+        """Rango como lista de CIDRs (``target_network``)."""
+        networks = ipaddress.summarize_address_range(
+            ipaddress.ip_address(scan_range.start_ip),
+            ipaddress.ip_address(scan_range.end_ip)
+        )
+        return ",".join(str(network) for network in networks)
+
+    def _covering_scans(self,
+                        conn: sqlite3.Connection,
+                        scan_range: ScanRange,
+                        methods: List[str],
+                        max_age: timedelta,
+                        contains_range: bool) -> List[Dict[str, Any]]:
+        """
+        Escaneos completos recientes compatibles con el rango solicitado.
+
+        Args:
+            conn: Conexión abierta
+            scan_range: Rango solicitado
+            methods: Métodos requeridos
+            max_age: Antigüedad máxima
+            contains_range: Exigir que el escaneo contenga todo el rango
+                (si no, basta con que se solape)
+
+        Returns:
+            Escaneos del más reciente al más antiguo
+        """
+        start_int = int(ipaddress.ip_address(scan_range.start_ip))
+        end_int = int(ipaddress.ip_address(scan_range.end_ip))
+        cutoff = (datetime.now() - max_age).isoformat()
+        ports = set(scan_range.ports)
+        required_methods = set(methods)
+
+        covering = []
+        for row in conn.execute("""
+            SELECT scan_id, port_list, protocol_list, start_time, configuration
+            FROM network_scans
+            WHERE status = 'completed' AND start_time >= ?
+            ORDER BY start_time DESC
+        """, (cutoff,)):
+            config = json.loads(row['configuration'] or '{}')
+            if not config.get('authoritative'):
+                continue
+            if not ports <= set(json.loads(row['port_list'] or '[]')):
+                continue
+            if not required_methods <= set(json.loads(row['protocol_list'] or '[]')):
+                continue
+
+            low = int(ipaddress.ip_address(config['start_ip']))
+            high = int(ipaddress.ip_address(config['end_ip']))
+            if contains_range:
+                matches = low <= start_int and end_int <= high
+            else:
+                matches = low <= end_int and start_int <= high
+            if matches:
+                covering.append({
+                    'scan_id': row['scan_id'],
+                    'start_time': row['start_time'],
+                    'start_ip': config['start_ip'],
+                    'end_ip': config['end_ip']
+                })
+        return covering
+
+    @staticmethod
+    def _port_rows(conn: sqlite3.Connection, start_int: int, end_int: int,
+                   ports: List[int], since: str) -> List[sqlite3.Row]:
+        """Entradas del índice de puertos del rango vistas desde ``since``."""
+        ports = sorted(set(ports))
+        placeholders = ",".join("?" * len(ports))
+        return conn.execute(f"""
+            SELECT ip_address, ip_int, port, mac_address, detections, last_seen, last_probed
+            FROM scan_host_ports
+            WHERE ip_int BETWEEN ? AND ? AND port IN ({placeholders}) AND last_seen >= ?
+            ORDER BY ip_int, port
+        """, (start_int, end_int, *ports, since)).fetchall()
+
+    @staticmethod
+    def _add_port(result: ScanResult, row: sqlite3.Row) -> None:
+        """Añade un puerto indexado y sus detecciones a un resultado."""
+        if row['port'] not in result.open_ports:
+            result.open_ports.append(row['port'])
+        for detection in json.loads(row['detections'] or '[]'):
+            result.detected_protocols.append(ProtocolDetectionResult(
+                ip=result.ip,
+                port=row['port'],
+                protocol=ProtocolType(detection['protocol']),
+                detected=True,
+                response_time_ms=detection.get('response_time_ms', 0.0),
+                details=detection.get('details', {})
+            ))
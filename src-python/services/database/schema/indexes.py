@@ -65,6 +65,9 @@ def get_scanning_indexes():
         "CREATE INDEX idx_scan_results_scan ON scan_results(scan_id)",
         "CREATE INDEX idx_scan_results_ip ON scan_results(ip_address)",
         "CREATE INDEX idx_scan_results_camera ON scan_results(is_camera)",
+        
+        # Índices para el índice de puertos
+        "CREATE INDEX idx_scan_host_ports_ip_int ON scan_host_ports(ip_int)",
     ]
 
 
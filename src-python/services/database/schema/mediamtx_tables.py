@@ -6,6 +6,8 @@ Contiene las definiciones para publicación RTSP a MediaMTX:
 - camera_publications: Publicaciones activas
 - publication_history: Historial de publicaciones
 - publication_metrics: Métricas en tiempo real
+- publication_metrics_rollup: Agregados de métricas por minuto, hora y día
+- publication_metrics_rollup_state: Última métrica incorporada a los rollups
 - publication_viewers: Tracking de consumidores
 - mediamtx_paths: Configuración de paths
 """
@@ -120,6 +122,56 @@ PUBLICATION_METRICS_TABLE = """
     )
 """
 
+# Rollups de métricas (bucket_start en epoch UTC)
+PUBLICATION_METRICS_ROLLUP_TABLE = """
+    CREATE TABLE publication_metrics_rollup (
+        publication_id INTEGER NOT NULL,
+        bucket_seconds INTEGER NOT NULL CHECK (bucket_seconds IN (60, 3600, 86400)),
+        bucket_start INTEGER NOT NULL,
+        samples INTEGER NOT NULL,
+        active_samples INTEGER NOT NULL DEFAULT 0,
+        fps_count INTEGER NOT NULL DEFAULT 0,
+        fps_sum REAL,
+        fps_min REAL,
+        fps_max REAL,
+        fps_p95 REAL,
+        bitrate_count INTEGER NOT NULL DEFAULT 0,
+        bitrate_sum REAL,
+        bitrate_min REAL,
+        bitrate_max REAL,
+        bitrate_p95 REAL,
+        viewers_count INTEGER NOT NULL DEFAULT 0,
+        viewers_sum REAL,
+        viewers_min REAL,
+        viewers_max REAL,
+        viewers_p95 REAL,
+        quality_count INTEGER NOT NULL DEFAULT 0,
+        quality_sum REAL,
+        quality_min REAL,
+        quality_max REAL,
+        quality_p95 REAL,
+        frames_sum INTEGER DEFAULT 0,
+        dropped_frames_sum INTEGER DEFAULT 0,
+        size_kb_sum REAL DEFAULT 0,
+        cpu_count INTEGER NOT NULL DEFAULT 0,
+        cpu_sum REAL,
+        memory_count INTEGER NOT NULL DEFAULT 0,
+        memory_sum REAL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (publication_id, bucket_seconds, bucket_start),
+        FOREIGN KEY (publication_id) REFERENCES camera_publications (publication_id) ON DELETE CASCADE
+    )
+"""
+
+# Marca de agua de los rollups
+PUBLICATION_METRICS_ROLLUP_STATE_TABLE = """
+    CREATE TABLE publication_metrics_rollup_state (
+        state_key TEXT PRIMARY KEY,
+        last_metric_id INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
 # Viewers/Consumidores
 PUBLICATION_VIEWERS_TABLE = """
     CREATE TABLE publication_viewers (
@@ -198,6 +250,8 @@ def get_mediamtx_tables():
         ('camera_publications', CAMERA_PUBLICATIONS_TABLE),
         ('publication_history', PUBLICATION_HISTORY_TABLE),
         ('publication_metrics', PUBLICATION_METRICS_TABLE),
+        ('publication_metrics_rollup', PUBLICATION_METRICS_ROLLUP_TABLE),
+        ('publication_metrics_rollup_state', PUBLICATION_METRICS_ROLLUP_STATE_TABLE),
         ('publication_viewers', PUBLICATION_VIEWERS_TABLE),
         ('mediamtx_auth_tokens', MEDIAMTX_AUTH_TOKENS_TABLE),
         ('mediamtx_paths', MEDIAMTX_PATHS_TABLE)
@@ -4,6 +4,7 @@ Tablas de escaneo de red.
 Contiene las definiciones para funcionalidad de descubrimiento:
 - network_scans: Registro de escaneos
 - scan_results: Resultados de cada escaneo
+- scan_host_ports: Índice de puertos abiertos por IP con última detección
 """
 
 # Tabla de escaneos de red
@@ -53,11 +54,29 @@ SCAN_RESULTS_TABLE = """
 """
 
 
+# Índice de puertos abiertos por IP (última vez visto y sondeado)
+SCAN_HOST_PORTS_TABLE = """
+    CREATE TABLE scan_host_ports (
+        ip_address TEXT NOT NULL,
+        ip_int INTEGER NOT NULL,        -- IP numérica para consultas por rango
+        port INTEGER NOT NULL,
+        mac_address TEXT,
+        detections JSON,                -- Protocolos detectados en el puerto
+        first_seen TIMESTAMP NOT NULL,
+        last_seen TIMESTAMP NOT NULL,   -- Último escaneo que vio el puerto abierto
+        last_probed TIMESTAMP NOT NULL, -- Última sonda real (no reutilizada)
+        last_scan_id TEXT,
+        PRIMARY KEY (ip_address, port)
+    )
+"""
+
+
 def get_scanning_tables():
     """Retorna lista de tuplas (nombre_tabla, sql_create)."""
     return [
         ('network_scans', NETWORK_SCANS_TABLE),
-        ('scan_results', SCAN_RESULTS_TABLE)
+        ('scan_results', SCAN_RESULTS_TABLE),
+        ('scan_host_ports', SCAN_HOST_PORTS_TABLE)
     ]
 
 
@@ -15,7 +15,7 @@ import aiohttp
 from asyncio import Lock
 
 from services.base_service import BaseService
-from services.database.mediamtx_db_service import get_mediamtx_db_service
+from services.database.mediamtx_db_service import get_mediamtx_db_service, flush_mediamtx_metrics
 from utils.exceptions import ServiceError, MediaMTXAPIError
 from models.publishing import PublishStatus
 from services.logging_service import get_secure_logger
@@ -171,6 +171,9 @@ class MediaMTXMetricsService(BaseService):
         # Esperar a que terminen
         if self._collection_tasks:
             await asyncio.gather(*self._collection_tasks.values(), return_exceptions=True)
+
+        # Escribir las métricas que queden en el buffer
+        await flush_mediamtx_metrics()
         
         # Cerrar sesión HTTP
         if self._session:
@@ -0,0 +1,253 @@
+"""
+Planificador concurrente de descubrimiento de protocolos por cámara.
+
+Sustituye el recorrido secuencial puerto × credencial × protocolo por tres
+fases:
+
+1. Alcanzabilidad TCP de todos los puertos en paralelo (barata, sin
+   credenciales).
+2. Pruebas de protocolo solo en puertos abiertos, con concurrencia acotada
+   y un intervalo mínimo entre intentos al mismo host para no disparar
+   bloqueos de cuenta.
+3. Por cada (protocolo, puerto) las credenciales se prueban en orden,
+   una tras otra, y se para en la primera que funciona; los distintos
+   (protocolo, puerto) sí se prueban en paralelo.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.logging_service import get_secure_logger
+
+
+# Firma de ProtocolService.test_protocol
+ProtocolTester = Callable[..., Awaitable[Dict[str, Any]]]
+
+
+def protocols_for_port(port: int) -> List[str]:
+    """
+    Protocolos candidatos para un puerto.
+
+    Args:
+        port: Puerto TCP
+
+    Returns:
+        Protocolos a probar en orden de preferencia
+    """
+    if port in (80, 81, 8080, 8081, 2020, 2021):
+        return ['onvif', 'http']
+    if port in (443, 8443):
+        return ['https']
+    if port in (554, 555):
+        return ['rtsp']
+    if port == 37777:
+        return ['amcrest']
+    return ['http', 'rtsp']
+
+
+@dataclass
+class DiscoveryCredential:
+    """Credencial ya desencriptada para el discovery."""
+    credential_id: int
+    username: str
+    password: str = field(repr=False)
+
+
+@dataclass
+class DiscoveryReport:
+    """Resultado del discovery de una cámara."""
+    open_ports: List[int] = field(default_factory=list)
+    closed_ports: List[int] = field(default_factory=list)
+    found: List[Dict[str, Any]] = field(default_factory=list)
+    attempts: int = 0
+    # Credenciales que no llegaron a probarse porque una anterior funcionó
+    cancelled_attempts: int = 0
+    timed_out: bool = False
+
+
+class HostRateLimiter:
+    """Intervalo mínimo entre el inicio de intentos a un mismo host."""
+
+    def __init__(self, min_interval: float):
+        """
+        Inicializa el limitador.
+
+        Args:
+            min_interval: Segundos mínimos entre intentos al mismo host
+        """
+        self.min_interval = min_interval
+        self._next_slot: Dict[str, float] = {}
+
+    async def acquire(self, host: str) -> None:
+        """Espera el siguiente turno libre del host."""
+        if self.min_interval <= 0:
+            return
+        now = time.monotonic()
+        # Reservar el turno antes de esperar: sin lock, el loop es único
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class ProtocolDiscoveryPlanner:
+    """
+    Ejecuta el discovery de protocolos de un host con concurrencia acotada.
+    """
+
+    def __init__(self,
+                 tester: ProtocolTester,
+                 max_concurrency: int = 8,
+                 host_min_interval: float = 0.1,
+                 connect_timeout: float = 1.5,
+                 attempt_timeout: float = 5.0):
+        """
+        Inicializa el planificador.
+
+        Args:
+            tester: Corrutina con la firma de ``ProtocolService.test_protocol``
+            max_concurrency: Pruebas de protocolo simultáneas
+            host_min_interval: Segundos mínimos entre intentos al mismo host
+            connect_timeout: Timeout de la comprobación TCP por puerto
+            attempt_timeout: Timeout de cada prueba de protocolo
+        """
+        self.logger = get_secure_logger("services.protocol_discovery")
+        self.tester = tester
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = HostRateLimiter(host_min_interval)
+        self.connect_timeout = connect_timeout
+        self.attempt_timeout = attempt_timeout
+
+    async def check_ports(self, ip: str, ports: List[int]) -> Tuple[List[int], List[int]]:
+        """
+        Comprueba en paralelo qué puertos aceptan conexión TCP.
+
+        Args:
+            ip: Host
+            ports: Puertos a comprobar
+
+        Returns:
+            (abiertos, cerrados) conservando el orden de ``ports``
+        """
+        ports = list(dict.fromkeys(ports))
+        reachable = await asyncio.gather(*(self._is_port_open(ip, port) for port in ports))
+        open_ports = [port for port, is_open in zip(ports, reachable) if is_open]
+        closed_ports = [port for port, is_open in zip(ports, reachable) if not is_open]
+        return open_ports, closed_ports
+
+    async def _is_port_open(self, ip: str, port: int) -> bool:
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(ip, port), timeout=self.connect_timeout
+            )
+        except (asyncio.TimeoutError, OSError):
+            return False
+        writer.close()
+        return True
+
+    async def run(self, ip: str, ports: List[int], credentials: List[DiscoveryCredential],
+                  timeout: float = 30.0) -> DiscoveryReport:
+        """
+        Ejecuta el discovery completo de un host.
+
+        Args:
+            ip: Host
+            ports: Puertos candidatos
+            credentials: Credenciales desencriptadas, en orden de preferencia
+            timeout: Tiempo total máximo en segundos
+
+        Returns:
+            DiscoveryReport con los protocolos verificados; ``timed_out``
+            indica que el tiempo se agotó, incluso durante la comprobación
+            de puertos
+        """
+        report = DiscoveryReport()
+        deadline = time.monotonic() + timeout
+
+        try:
+            report.open_ports, report.closed_ports = await asyncio.wait_for(
+                self.check_ports(ip, ports), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            report.timed_out = True
+            return report
+        if not report.open_ports or not credentials:
+            return report
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        groups = [
+            self._run_group(ip, port, protocol, credentials, semaphore, report)
+            for port in report.open_ports
+            for protocol in protocols_for_port(port)
+        ]
+
+        remaining = deadline - time.monotonic()
+        tasks = [asyncio.create_task(group) for group in groups]
+        try:
+            _, pending = await asyncio.wait(tasks, timeout=max(0.0, remaining))
+            if pending:
+                report.timed_out = True
+                for task in pending:
+                    task.cancel()
+        finally:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        return report
+
+    async def _run_group(self, ip: str, port: int, protocol: str,
+                         credentials: List[DiscoveryCredential],
+                         semaphore: asyncio.Semaphore,
+                         report: DiscoveryReport) -> None:
+        """
+        Prueba un (protocolo, puerto) con las credenciales una tras otra.
+
+        Se respeta el orden recibido (la default primero) y se para en la
+        primera que funciona, para no enviar credenciales incorrectas a la
+        cámara en paralelo y arriesgar el bloqueo de la cuenta. La
+        concurrencia se da entre grupos.
+        """
+        for index, credential in enumerate(credentials):
+            result = await self._attempt(ip, port, protocol, credential, semaphore, report)
+            if not result:
+                continue
+
+            report.cancelled_attempts += len(credentials) - index - 1
+            report.found.append({
+                'protocol_type': protocol,
+                'port': port,
+                'version': result.get('version'),
+                'verified': True,
+                'credential_id': credential.credential_id
+            })
+            self.logger.info(f"Protocolo {protocol} verificado en {ip}:{port}")
+            return
+
+    async def _attempt(self, ip: str, port: int, protocol: str,
+                       credential: DiscoveryCredential,
+                       semaphore: asyncio.Semaphore,
+                       report: DiscoveryReport) -> Optional[Dict[str, Any]]:
+        """Un intento de protocolo con una credencial; devuelve el resultado si tuvo éxito."""
+        async with semaphore:
+            await self.rate_limiter.acquire(ip)
+            report.attempts += 1
+            try:
+                result = await asyncio.wait_for(
+                    self.tester(
+                        ip=ip,
+                        port=port,
+                        protocol_type=protocol,
+                        username=credential.username,
+                        password=credential.password,
+                        timeout=self.attempt_timeout
+                    ),
+                    timeout=self.attempt_timeout + 1
+                )
+            except asyncio.TimeoutError:
+                return None
+            except Exception as e:
+                self.logger.debug(f"Error probando {protocol} en puerto {port}: {e}")
+                return None
+
+        return result if result.get('success') else None
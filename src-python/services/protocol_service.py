@@ -1142,6 +1142,58 @@ class ProtocolService:
             self.logger.error(f"Error testing connection for {ip}: {e}")
             return False
 
+    async def test_protocol(self, ip: str, port: int, protocol_type: str,
+                            username: str, password: str, timeout: float = 5) -> Dict[str, Any]:
+        """
+        Prueba un protocolo en un puerto concreto con unas credenciales.
+        
+        Args:
+            ip: Dirección IP de la cámara
+            port: Puerto del protocolo
+            protocol_type: Protocolo ('onvif', 'rtsp', 'amcrest')
+            username: Usuario
+            password: Contraseña en claro
+            timeout: Timeout en segundos
+            
+        Returns:
+            Diccionario con 'success', 'error' y 'message'
+        """
+        try:
+            protocol = ProtocolType(protocol_type.lower())
+        except ValueError:
+            protocol = None
+        
+        if protocol not in self._protocol_handlers:
+            return {
+                'success': False,
+                'error': 'Protocol not supported',
+                'message': f'Protocolo {protocol_type} no soportado para pruebas'
+            }
+        
+        try:
+            config = ConnectionConfig(ip=ip, username=username, password=password)
+            if protocol == ProtocolType.ONVIF:
+                config.onvif_port = port
+            else:
+                config.rtsp_port = port
+            handler = self._create_handler(protocol, config)
+            
+            success = await asyncio.wait_for(handler.test_connection(), timeout=timeout)
+            return {
+                'success': bool(success),
+                'error': None if success else 'Connection failed',
+                'message': 'Conexión exitosa' if success else 'No se pudo conectar'
+            }
+        except asyncio.TimeoutError:
+            return {
+                'success': False,
+                'error': 'Timeout',
+                'message': f'Timeout después de {timeout} segundos'
+            }
+        except Exception as e:
+            self.logger.debug(f"Error probando {protocol_type} en {ip}:{port}: {e}")
+            return {'success': False, 'error': str(e), 'message': 'Error al probar protocolo'}
+
     async def get_device_info_async(self, ip: str, protocol: str, credentials: dict) -> Optional[Dict[str, Any]]:
         """
         Obtiene información del dispositivo de forma asíncrona.
@@ -1245,4 +1297,8 @@ class ProtocolService:
         """Obtiene manejador Amcrest."""
         # Por ahora retornar RTSP como fallback para Amcrest
         # TODO: Implementar AmcrestProtocolHandler específico
-        return RTSPProtocolHandler 
\ No newline at end of file
+        return RTSPProtocolHandler
+
+
+# Instancia global del servicio
+protocol_service = ProtocolService()
\ No newline at end of file
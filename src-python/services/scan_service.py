@@ -29,6 +29,7 @@ from enum import Enum
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Callable, Any, Tuple
 from services.logging_service import get_secure_logger
+from services.database.scan_index_service import ScanIndexService
 
 try:
     from ..models.scan_model import ScanModel, ScanStatus, ScanMethod, ScanRange, ScanResult, ProtocolDetectionResult
@@ -72,6 +73,9 @@ class ScanServiceConfig:
     max_cache_entries: int = 1000
     scan_history_retention_days: int = 30
     enable_network_analysis: bool = True
+    enable_scan_index: bool = True
+    index_max_age_hours: int = 24  # Antigüedad máxima para reutilizar un host indexado
+    scan_index_path: Optional[str] = None  # Por defecto data/camera_data.db
     discovery_methods: List[ScanMethod] = field(
         default_factory=lambda: [
             ScanMethod.PING_SWEEP,
@@ -89,6 +93,8 @@ class ScanServiceConfig:
             raise ValueError("default_timeout debe ser mayor a 0")
         if self.cache_expiry_hours <= 0:
             raise ValueError("cache_expiry_hours debe ser mayor a 0")
+        if self.index_max_age_hours <= 0:
+            raise ValueError("index_max_age_hours debe ser mayor a 0")
 
 
 @dataclass
@@ -160,6 +166,7 @@ class ScanJob:
     completed_time: Optional[datetime] = None
     scan_model: Optional[ScanModel] = None
     result_cache_key: Optional[str] = None
+    incremental: bool = False
     
     @property
     def is_ready(self) -> bool:
@@ -220,6 +227,13 @@ class ScanService:
         self.network_analysis = NetworkAnalysis()
         self.analysis_lock = threading.Lock()
         
+        # Índice persistente de resultados (SQLite)
+        self.scan_index: Optional[ScanIndexService] = (
+            ScanIndexService(self.config.scan_index_path)
+            if self.config.enable_scan_index else None
+        )
+        self.index_stats = {'range_hits': 0, 'incremental_scans': 0, 'reused_hosts': 0}
+        
         # Threading
         self.executor = ThreadPoolExecutor(
             max_workers=self.config.max_concurrent_scans,
@@ -383,7 +397,8 @@ class ScanService:
     async def start_scan_async(self, scan_range: ScanRange, 
                              methods: Optional[List[ScanMethod]] = None,
                              priority: ScanPriority = ScanPriority.NORMAL,
-                             use_cache: bool = True) -> str:
+                             use_cache: bool = True,
+                             incremental: bool = False) -> str:
         """
         Inicia un escaneo de forma asíncrona.
         
@@ -392,6 +407,9 @@ class ScanService:
             methods: Métodos de escaneo (opcional)
             priority: Prioridad del escaneo
             use_cache: Usar cache si está disponible
+            incremental: Responder desde el índice si un escaneo reciente
+                cubre el rango; si no, sondear solo hosts nuevos, cambiados
+                o con entradas caducadas
             
         Returns:
             ID del escaneo iniciado
@@ -406,6 +424,14 @@ class ScanService:
                     self.on_scan_completed(cached_result.scan_id, cached_result.results)
                 return cached_result.scan_id
         
+        methods = methods or self.config.discovery_methods
+        
+        # Sub-rango de un escaneo reciente: responder sin tocar la red
+        if incremental and self.scan_index:
+            scan_id = await self._answer_from_index(scan_range, methods)
+            if scan_id:
+                return scan_id
+        
         # Verificar límite de escaneos concurrentes
         if len(self.active_scans) >= self.config.max_concurrent_scans:
             # Agregar a cola
@@ -413,9 +439,10 @@ class ScanService:
             job = ScanJob(
                 job_id=job_id,
                 scan_range=scan_range,
-                methods=methods or self.config.discovery_methods,
+                methods=methods,
                 priority=priority,
-                scheduled_time=datetime.now()
+                scheduled_time=datetime.now(),
+                incremental=incremental
             )
             
             # Insertar según prioridad
@@ -424,13 +451,25 @@ class ScanService:
             self.logger.info(f"Scan queued: {job_id} (queue size: {len(self.scan_queue)})")
             return job_id
         
+        # Hosts recientes del índice que no hace falta volver a sondear
+        known_results = None
+        if incremental and self.scan_index:
+            known_results = await self._run_index(
+                self.scan_index.get_known_hosts,
+                scan_range,
+                [method.value for method in methods],
+                timedelta(hours=self.config.index_max_age_hours)
+            )
+            self.index_stats['incremental_scans'] += 1
+        
         # Crear y ejecutar escaneo inmediatamente
         scan_id = f"scan_{int(time.time())}_{len(self.active_scans)}"
         scan_model = ScanModel(
             scan_id=scan_id,
             scan_range=scan_range,
-            methods=methods or self.config.discovery_methods,
-            timeout=self.config.default_timeout
+            methods=methods,
+            timeout=self.config.default_timeout,
+            known_results=known_results
         )
         
         # Configurar callbacks
@@ -451,14 +490,15 @@ class ScanService:
     def start_scan(self, scan_range: ScanRange, 
                   methods: Optional[List[ScanMethod]] = None,
                   priority: ScanPriority = ScanPriority.NORMAL,
-                  use_cache: bool = True) -> str:
+                  use_cache: bool = True,
+                  incremental: bool = False) -> str:
         """Inicia un escaneo de forma síncrona."""
         try:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
             try:
                 return loop.run_until_complete(
-                    self.start_scan_async(scan_range, methods, priority, use_cache)
+                    self.start_scan_async(scan_range, methods, priority, use_cache, incremental)
                 )
             finally:
                 loop.close()
@@ -481,6 +521,19 @@ class ScanService:
                 if self.config.enable_scan_cache:
                     self._cache_scan_result(scan_id, scan_model, all_results)
                 
+                # Actualizar índice persistente
+                if self.scan_index:
+                    self.index_stats['reused_hosts'] += len(scan_model.reused_ips)
+                    await self._run_index(
+                        self.scan_index.record_scan,
+                        scan_id,
+                        scan_model.scan_range,
+                        [method.value for method in scan_model.methods],
+                        scan_model.start_time,
+                        scan_model.end_time,
+                        all_results
+                    )
+                
                 # Actualizar historial
                 self._add_to_history(scan_id, scan_model, camera_results)
                 
@@ -506,23 +559,7 @@ class ScanService:
         finally:
             # Guardar resultados antes de eliminar el modelo
             if scan_id in self.active_scans:
-                scan_model = self.active_scans[scan_id]
-                
-                # Guardar resultados completos
-                self.completed_scans[scan_id] = {
-                    'scan_id': scan_id,
-                    'status': scan_model.status.value,
-                    'results': scan_model.get_all_results(),
-                    'camera_results': scan_model.get_camera_results(),
-                    'stats': scan_model.get_scan_stats(),
-                    'completed_at': datetime.now()
-                }
-                
-                # Limpiar escaneos antiguos si excede el límite
-                if len(self.completed_scans) > self.max_completed_scans:
-                    oldest_id = min(self.completed_scans.keys(), 
-                                  key=lambda k: self.completed_scans[k]['completed_at'])
-                    del self.completed_scans[oldest_id]
+                self._store_completed_scan(scan_id, self.active_scans[scan_id])
                 
                 # Ahora sí eliminar el modelo activo
                 del self.active_scans[scan_id]
@@ -534,6 +571,23 @@ class ScanService:
             # Procesar siguiente trabajo en cola
             await self._process_next_queued_job()
     
+    def _store_completed_scan(self, scan_id: str, scan_model: ScanModel):
+        """Guarda los resultados completos de un escaneo terminado."""
+        self.completed_scans[scan_id] = {
+            'scan_id': scan_id,
+            'status': scan_model.status.value,
+            'results': scan_model.get_all_results(),
+            'camera_results': scan_model.get_camera_results(),
+            'stats': scan_model.get_scan_stats(),
+            'completed_at': datetime.now()
+        }
+        
+        # Limpiar escaneos antiguos si excede el límite
+        if len(self.completed_scans) > self.max_completed_scans:
+            oldest_id = min(self.completed_scans.keys(), 
+                          key=lambda k: self.completed_scans[k]['completed_at'])
+            del self.completed_scans[oldest_id]
+    
     async def cancel_scan(self, scan_id: str) -> bool:
         """
         Cancela un escaneo activo.
@@ -628,7 +682,8 @@ class ScanService:
                 ready_job.scan_range,
                 ready_job.methods,
                 ready_job.priority,
-                use_cache=True
+                use_cache=True,
+                incremental=ready_job.incremental
             )
             
             ready_job.started_time = datetime.now()
@@ -742,6 +797,10 @@ class ScanService:
                 # Limpiar historial antiguo
                 self._cleanup_history()
                 
+                # Purgar escaneos antiguos del índice
+                if self.scan_index and self.config.scan_history_retention_days:
+                    await self._run_index(self.scan_index.purge, self.config.scan_history_retention_days)
+                
                 await asyncio.sleep(3600)  # Cleanup cada hora
                 
             except asyncio.CancelledError:
@@ -752,6 +811,69 @@ class ScanService:
         
         self.logger.debug("Cleanup loop stopped")
     
+    # === Índice Persistente ===
+    
+    async def _run_index(self, func: Callable, *args):
+        """
+        Ejecuta una operación del índice en el executor del servicio.
+        
+        Un fallo del índice nunca interrumpe el escaneo: se registra y se
+        devuelve None.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        except Exception as e:
+            self.logger.warning(f"Scan index operation {func.__name__} failed: {e}")
+            return None
+    
+    async def _answer_from_index(self, scan_range: ScanRange, methods: List[ScanMethod]) -> Optional[str]:
+        """
+        Responde un rango desde el índice si un escaneo reciente lo cubre.
+        
+        Args:
+            scan_range: Rango solicitado
+            methods: Métodos de escaneo solicitados
+            
+        Returns:
+            ID del escaneo resuelto o None si el índice no cubre el rango
+        """
+        indexed = await self._run_index(
+            self.scan_index.lookup_range,
+            scan_range,
+            [method.value for method in methods],
+            timedelta(hours=self.config.index_max_age_hours)
+        )
+        if indexed is None:
+            return None
+        
+        scan_id = f"scan_{int(time.time())}_index_{len(self.completed_scans)}"
+        scan_model = ScanModel(
+            scan_id=scan_id,
+            scan_range=scan_range,
+            methods=methods,
+            timeout=self.config.default_timeout
+        )
+        scan_model.complete_from_index(indexed)
+        self.index_stats['range_hits'] += 1
+        
+        camera_results = scan_model.get_camera_results()
+        self._store_completed_scan(scan_id, scan_model)
+        self._add_to_history(scan_id, scan_model, camera_results)
+        
+        self.logger.info(
+            f"Scan range {scan_range.start_ip}-{scan_range.end_ip} answered from index "
+            f"({len(indexed)} hosts, {len(camera_results)} cameras)"
+        )
+        
+        if self.on_scan_completed:
+            self.on_scan_completed(scan_id, camera_results)
+        if self.on_camera_discovered:
+            for camera in camera_results:
+                self.on_camera_discovered(scan_id, camera)
+        
+        return scan_id
+    
     # === Historial y Análisis ===
     
     def _add_to_history(self, scan_id: str, scan_model: ScanModel, camera_results: List[Dict[str, Any]]):
@@ -886,13 +1008,18 @@ class ScanService:
             self.logger.error(f"Error loading persistent data: {e}")
     
     def _save_persistent_data(self):
-        """Guarda datos persistentes a archivos."""
+        """
+        Guarda datos persistentes a archivos.
+        
+        Con el índice habilitado los resultados ya están en SQLite, así que
+        el cache de resultados no se vuelca a JSON.
+        """
         try:
             # Guardar cache
             cache_data = {}
             with self.cache_lock:
                 for key, cached in self.result_cache.items():
-                    if not cached.is_expired:
+                    if self.scan_index is None and not cached.is_expired:
                         cache_data[key] = {
                             'scan_id': cached.scan_id,
                             'timestamp': cached.timestamp.isoformat(),
@@ -903,11 +1030,11 @@ class ScanService:
                         }
             
             with open(self.cache_file, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+                json.dump(cache_data, f)
             
             # Guardar historial
             with open(self.history_file, 'w') as f:
-                json.dump(self.scan_history, f, indent=2)
+                json.dump(self.scan_history, f)
             
             # Guardar análisis
             with self.analysis_lock:
@@ -915,7 +1042,7 @@ class ScanService:
                 analysis_data['last_analysis'] = self.network_analysis.last_analysis.isoformat()
                 
                 with open(self.analysis_file, 'w') as f:
-                    json.dump(analysis_data, f, indent=2)
+                    json.dump(analysis_data, f)
                     
         except Exception as e:
             self.logger.error(f"Error saving persistent data: {e}")
@@ -1023,6 +1150,10 @@ class ScanService:
                 entry.get('cameras_found', 0) for entry in self.scan_history
             ),
             'cache_hit_rate': self._calculate_cache_hit_rate(),
+            'scan_index': {
+                'enabled': self.scan_index is not None,
+                **self.index_stats
+            },
             'configuration': {
                 'max_concurrent_scans': self.config.max_concurrent_scans,
                 'cache_enabled': self.config.enable_scan_cache,
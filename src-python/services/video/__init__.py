@@ -8,10 +8,23 @@ streams de video en tiempo real.
 from services.video.video_stream_service import VideoStreamService
 from services.video.stream_manager import StreamManager, StreamManagerFactory
 from services.video.frame_processor import FrameProcessor
+from services.video.frame_broadcast_hub import FrameBroadcastHub, FrameSubscription
+from services.video.decode_backends import (
+    DecodeBackend,
+    OpenCVDecodeBackend,
+    FFmpegPipeBackend,
+    create_decode_backend
+)
 
 __all__ = [
     'VideoStreamService',
     'StreamManager',
     'StreamManagerFactory',
-    'FrameProcessor'
+    'FrameProcessor',
+    'FrameBroadcastHub',
+    'FrameSubscription',
+    'DecodeBackend',
+    'OpenCVDecodeBackend',
+    'FFmpegPipeBackend',
+    'create_decode_backend'
 ]
\ No newline at end of file
@@ -0,0 +1,460 @@
+"""
+Backends de decodificación de video para los stream managers RTSP.
+
+Separan la lectura/decodificación del stream de la lógica de captura:
+
+- ``OpenCVDecodeBackend``: ``cv2.VideoCapture`` (comportamiento histórico,
+  usado como fallback).
+- ``FFmpegPipeBackend``: proceso ``ffmpeg`` que entrega frames BGR crudos
+  por un pipe. Permite fijar los threads del decodificador, decodificar
+  solo keyframes (``-skip_frame nokey``) y conocer el PTS de cada frame.
+"""
+
+import json
+import re
+import shutil
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.logging_service import get_secure_logger
+from utils.sanitizers import sanitize_url
+
+
+DECODE_BACKENDS = ("opencv", "ffmpeg")
+
+# Línea del filtro showinfo: "n:  12 pts:  43200 pts_time:0.48 ..."
+_SHOWINFO_PATTERN = re.compile(r"n:\s*(\d+)\s+pts:\s*(-?\d+)\s+pts_time:\s*(-?[\d.]+)")
+
+
+class DecodeBackend(ABC):
+    """
+    Interfaz común de los backends de decodificación.
+
+    Sigue el modelo grab/retrieve de OpenCV: ``grab`` avanza al siguiente
+    frame y ``retrieve`` entrega el último obtenido como array BGR.
+    """
+
+    name = "base"
+
+    def __init__(self, keyframes_only: bool = False):
+        """
+        Inicializa el backend.
+
+        Args:
+            keyframes_only: Decodificar solo keyframes (si el backend lo soporta)
+        """
+        self.keyframes_only = keyframes_only
+        self.width = 0
+        self.height = 0
+        self.native_fps = 0.0
+        self.codec = "unknown"
+        self.logger = get_secure_logger(f"services.video.decode.{self.name}")
+
+    @abstractmethod
+    def open(self, url: str, timeout_ms: int = 10000) -> bool:
+        """
+        Abre el stream.
+
+        Args:
+            url: URL del stream
+            timeout_ms: Timeout de apertura y lectura
+
+        Returns:
+            True si el stream quedó abierto
+        """
+
+    @abstractmethod
+    def is_opened(self) -> bool:
+        """Indica si el stream está abierto."""
+
+    @abstractmethod
+    def grab(self) -> bool:
+        """Avanza al siguiente frame del stream."""
+
+    @abstractmethod
+    def retrieve(self) -> Optional[np.ndarray]:
+        """Entrega el último frame obtenido con ``grab``."""
+
+    @abstractmethod
+    def release(self) -> None:
+        """Libera el stream."""
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Equivalente a ``grab`` + ``retrieve``."""
+        if not self.grab():
+            return False, None
+        frame = self.retrieve()
+        return frame is not None, frame
+
+    @property
+    def last_pts_ms(self) -> Optional[float]:
+        """PTS del último frame entregado en milisegundos (None si no se conoce)."""
+        return None
+
+    def get_info(self) -> Dict[str, Any]:
+        """Obtiene información del stream abierto."""
+        return {
+            'backend': self.name,
+            'width': self.width,
+            'height': self.height,
+            'native_fps': self.native_fps,
+            'codec': self.codec,
+            'keyframes_only': self.keyframes_only
+        }
+
+
+class OpenCVDecodeBackend(DecodeBackend):
+    """Backend basado en ``cv2.VideoCapture``."""
+
+    name = "opencv"
+
+    def __init__(self, keyframes_only: bool = False):
+        super().__init__(keyframes_only)
+        self._capture = None
+
+    def open(self, url: str, timeout_ms: int = 10000) -> bool:
+        import cv2
+
+        if self.keyframes_only:
+            self.logger.debug("OpenCV no soporta decodificar solo keyframes, se ignora")
+
+        self._capture = cv2.VideoCapture(url)
+
+        # Configurar buffer para reducir latencia
+        self._capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        # Configurar timeout (si está soportado)
+        if hasattr(cv2, 'CAP_PROP_OPEN_TIMEOUT_MSEC'):
+            self._capture.set(cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms)
+        if hasattr(cv2, 'CAP_PROP_READ_TIMEOUT_MSEC'):
+            self._capture.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms)
+
+        if not self._capture.isOpened():
+            return False
+
+        self.width = int(self._capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self._capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.native_fps = float(self._capture.get(cv2.CAP_PROP_FPS) or 0)
+
+        fourcc = int(self._capture.get(cv2.CAP_PROP_FOURCC))
+        if fourcc > 0:
+            self.codec = "".join(chr((fourcc >> 8 * i) & 0xFF) for i in range(4)).strip()
+
+        return True
+
+    def is_opened(self) -> bool:
+        return self._capture is not None and self._capture.isOpened()
+
+    def grab(self) -> bool:
+        return self._capture is not None and self._capture.grab()
+
+    def retrieve(self) -> Optional[np.ndarray]:
+        if self._capture is None:
+            return None
+        ret, frame = self._capture.retrieve()
+        return frame if ret else None
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self._capture is None:
+            return False, None
+        return self._capture.read()
+
+    @property
+    def last_pts_ms(self) -> Optional[float]:
+        if self._capture is None:
+            return None
+        import cv2
+        pts = self._capture.get(cv2.CAP_PROP_POS_MSEC)
+        return float(pts) if pts and pts > 0 else None
+
+    def release(self) -> None:
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+
+class FFmpegPipeBackend(DecodeBackend):
+    """
+    Backend que decodifica con un proceso ``ffmpeg`` y lee frames BGR crudos.
+
+    Los frames se leen con ``readinto`` directamente sobre un array NumPy
+    pendiente. ``grab`` escribe siempre en ese array y solo ``retrieve`` lo
+    entrega y reserva uno nuevo: los frames descartados reutilizan la misma
+    memoria y un frame entregado es propiedad de quien lo recibe (p. ej.
+    como ``EncodedFrame.source``), sin copias posteriores.
+    """
+
+    name = "ffmpeg"
+
+    def __init__(
+        self,
+        keyframes_only: bool = False,
+        threads: int = 0,
+        ffmpeg_path: str = "ffmpeg",
+        ffprobe_path: str = "ffprobe"
+    ):
+        """
+        Inicializa el backend.
+
+        Args:
+            keyframes_only: Añadir ``-skip_frame nokey`` (miniaturas)
+            threads: Threads del decodificador (0 = automático)
+            ffmpeg_path: Ejecutable de ffmpeg
+            ffprobe_path: Ejecutable de ffprobe
+        """
+        super().__init__(keyframes_only)
+        self.threads = threads
+        self.ffmpeg_path = ffmpeg_path
+        self.ffprobe_path = ffprobe_path
+
+        self._process: Optional[subprocess.Popen] = None
+        self._stderr_thread: Optional[threading.Thread] = None
+        self._frame_bytes = 0
+        self._pending: Optional[np.ndarray] = None
+        self._frames_read = 0
+        self._last_frame_index = -1
+
+        # PTS por índice de frame, publicado por el hilo lector de stderr
+        self._pts_by_frame: "OrderedDict[int, float]" = OrderedDict()
+        self._pts_lock = threading.Lock()
+        self._stderr_tail: Deque[str] = deque(maxlen=20)
+
+    @staticmethod
+    def is_available(ffmpeg_path: str = "ffmpeg", ffprobe_path: str = "ffprobe") -> bool:
+        """Indica si ffmpeg y ffprobe están instalados."""
+        return shutil.which(ffmpeg_path) is not None and shutil.which(ffprobe_path) is not None
+
+    def open(self, url: str, timeout_ms: int = 10000) -> bool:
+        self._frames_read = 0
+        self._last_frame_index = -1
+        with self._pts_lock:
+            self._pts_by_frame.clear()
+        self._stderr_tail.clear()
+
+        try:
+            self._probe(url, timeout_ms)
+        except Exception as e:
+            self.logger.error(f"ffprobe falló para {sanitize_url(url)}: {e}")
+            return False
+
+        if self.width <= 0 or self.height <= 0:
+            self.logger.error("ffprobe no devolvió el tamaño del stream")
+            return False
+
+        self._allocate_frame()
+
+        command = self._build_command(url, timeout_ms)
+        self.logger.debug(f"Iniciando ffmpeg para {sanitize_url(url)}")
+
+        try:
+            self._process = subprocess.Popen(
+                command,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                bufsize=self._frame_bytes
+            )
+        except OSError as e:
+            self.logger.error(f"No se pudo iniciar ffmpeg: {e}")
+            self._process = None
+            return False
+
+        self._stderr_thread = threading.Thread(
+            target=self._read_stderr,
+            name="ffmpeg_stderr",
+            daemon=True
+        )
+        self._stderr_thread.start()
+        return True
+
+    def _probe(self, url: str, timeout_ms: int) -> None:
+        """Obtiene tamaño, FPS y codec del primer stream de video."""
+        command = [self.ffprobe_path, "-v", "error"]
+        if url.startswith("rtsp://"):
+            command += ["-rtsp_transport", "tcp"]
+        command += [
+            "-select_streams", "v:0",
+            "-show_entries", "stream=width,height,codec_name,avg_frame_rate,r_frame_rate",
+            "-of", "json",
+            url
+        ]
+
+        result = subprocess.run(
+            command,
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            timeout=timeout_ms / 1000.0,
+            check=True
+        )
+        streams = json.loads(result.stdout or b"{}").get("streams") or []
+        if not streams:
+            raise ValueError("Sin stream de video")
+
+        stream = streams[0]
+        self.width = int(stream.get("width") or 0)
+        self.height = int(stream.get("height") or 0)
+        self.codec = stream.get("codec_name") or "unknown"
+        self.native_fps = self._parse_rate(stream.get("avg_frame_rate")) or self._parse_rate(stream.get("r_frame_rate"))
+
+    @staticmethod
+    def _parse_rate(rate: Optional[str]) -> float:
+        """Convierte una fracción de ffprobe ("25/1") a float."""
+        if not rate:
+            return 0.0
+        num, _, den = rate.partition("/")
+        try:
+            return float(num) / float(den or 1) if float(den or 1) else 0.0
+        except ValueError:
+            return 0.0
+
+    def _build_command(self, url: str, timeout_ms: int) -> List[str]:
+        """Construye la línea de comandos de ffmpeg."""
+        command = [self.ffmpeg_path, "-hide_banner", "-nostdin", "-loglevel", "info"]
+
+        if url.startswith("rtsp://"):
+            # Timeout de socket en microsegundos
+            command += ["-rtsp_transport", "tcp", "-timeout", str(timeout_ms * 1000)]
+
+        command += ["-fflags", "nobuffer", "-flags", "low_delay"]
+        command += ["-threads", str(self.threads)]
+
+        if self.keyframes_only:
+            command += ["-skip_frame", "nokey"]
+
+        command += [
+            "-i", url,
+            "-an", "-sn", "-dn",
+            # showinfo publica el PTS de cada frame en stderr
+            "-vf", "showinfo",
+            "-vsync", "0",
+            "-f", "rawvideo",
+            "-pix_fmt", "bgr24",
+            "pipe:1"
+        ]
+        return command
+
+    def _allocate_frame(self) -> None:
+        """Reserva el array en el que ``grab`` lee el siguiente frame."""
+        self._frame_bytes = self.width * self.height * 3
+        self._pending = np.empty((self.height, self.width, 3), dtype=np.uint8)
+
+    def _read_stderr(self) -> None:
+        """Drena stderr de ffmpeg y extrae el PTS de cada frame."""
+        process = self._process
+        if process is None or process.stderr is None:
+            return
+
+        for raw_line in iter(process.stderr.readline, b""):
+            line = raw_line.decode("utf-8", errors="replace").rstrip()
+            match = _SHOWINFO_PATTERN.search(line)
+            if match:
+                with self._pts_lock:
+                    self._pts_by_frame[int(match.group(1))] = float(match.group(3)) * 1000
+                    while len(self._pts_by_frame) > 256:
+                        self._pts_by_frame.popitem(last=False)
+            elif line:
+                self._stderr_tail.append(line)
+
+    def is_opened(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def grab(self) -> bool:
+        process = self._process
+        if process is None or process.stdout is None:
+            return False
+
+        view = memoryview(self._pending.reshape(-1))
+        offset = 0
+        while offset < self._frame_bytes:
+            read = process.stdout.readinto(view[offset:])
+            if not read:
+                if self._stderr_tail:
+                    self.logger.warning(f"ffmpeg terminó: {self._stderr_tail[-1]}")
+                return False
+            offset += read
+
+        self._frames_read += 1
+        return True
+
+    def retrieve(self) -> Optional[np.ndarray]:
+        if self._frames_read == 0:
+            return None
+
+        frame = self._pending
+        self._last_frame_index = self._frames_read - 1
+        self._allocate_frame()
+        return frame
+
+    @property
+    def last_pts_ms(self) -> Optional[float]:
+        if self._last_frame_index < 0:
+            return None
+        with self._pts_lock:
+            pts = self._pts_by_frame.get(self._last_frame_index)
+            if pts is None and self._pts_by_frame:
+                # La línea de showinfo puede llegar después del frame
+                pts = next(reversed(self._pts_by_frame.values()))
+        return pts
+
+    def release(self) -> None:
+        process, self._process = self._process, None
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=2.0)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            for pipe in (process.stdout, process.stderr):
+                if pipe is not None:
+                    pipe.close()
+
+        if self._stderr_thread is not None:
+            self._stderr_thread.join(timeout=1.0)
+            self._stderr_thread = None
+
+    def get_info(self) -> Dict[str, Any]:
+        info = super().get_info()
+        info.update({
+            'decoder_threads': self.threads
+        })
+        return info
+
+
+def create_decode_backend(
+    name: str,
+    keyframes_only: bool = False,
+    threads: int = 0
+) -> DecodeBackend:
+    """
+    Crea un backend de decodificación.
+
+    Si se pide ffmpeg y no está instalado se usa OpenCV.
+
+    Args:
+        name: "opencv" o "ffmpeg"
+        keyframes_only: Decodificar solo keyframes
+        threads: Threads del decodificador (solo ffmpeg)
+
+    Returns:
+        Backend listo para ``open``
+
+    Raises:
+        ValueError: Si el backend no es válido
+    """
+    if name not in DECODE_BACKENDS:
+        raise ValueError(f"Backend de decodificación no soportado: {name}")
+
+    if name == "ffmpeg":
+        if FFmpegPipeBackend.is_available():
+            return FFmpegPipeBackend(keyframes_only=keyframes_only, threads=threads)
+        get_secure_logger("services.video.decode").warning(
+            "ffmpeg/ffprobe no encontrados, usando OpenCV"
+        )
+
+    return OpenCVDecodeBackend(keyframes_only=keyframes_only)
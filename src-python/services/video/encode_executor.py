@@ -0,0 +1,234 @@
+"""
+Ejecutor de codificación de frames fuera del event loop.
+
+Ejecuta el redimensionado y la codificación JPEG/PNG en un pool de
+threads (por defecto; OpenCV libera el GIL) o en un pool de procesos
+transfiriendo el frame por memoria compartida.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from utils.video import FrameConverter
+from utils.video import frame_converter as frame_converter_module
+from utils.video.latency_tracker import LatencyTracker
+from services.logging_service import get_secure_logger
+
+
+ENCODE_MODES = ("thread", "process")
+
+# Convertidores reutilizados dentro de cada proceso de trabajo
+_worker_converters: Dict[str, FrameConverter] = {}
+
+
+def _encode_shared_frame(
+    shm_name: str,
+    shape: Tuple[int, ...],
+    dtype: str,
+    strategy_name: str,
+    resize: Optional[Tuple[int, int]],
+    quality: Optional[int]
+) -> Tuple[Any, Dict[str, float]]:
+    """
+    Codifica un frame publicado en memoria compartida (proceso de trabajo).
+
+    Args:
+        shm_name: Nombre del bloque de memoria compartida
+        shape: Forma del array
+        dtype: Tipo del array (``np.dtype.str``)
+        strategy_name: Nombre de la clase de estrategia de conversión
+        resize: Tamaño objetivo (width, height) o None
+        quality: Calidad de compresión
+
+    Returns:
+        Frame codificado según la estrategia y duración de sus etapas
+    """
+    from multiprocessing import shared_memory
+
+    converter = _worker_converters.get(strategy_name)
+    if converter is None:
+        strategy_cls = getattr(frame_converter_module, strategy_name)
+        converter = FrameConverter(strategy_cls())
+        _worker_converters[strategy_name] = converter
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        frame = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        try:
+            timings: Dict[str, float] = {}
+            result = converter.convert_frame(frame, resize=resize, quality=quality, timings=timings)
+            return result, timings
+        finally:
+            del frame
+    finally:
+        shm.close()
+
+
+class FrameEncodeExecutor:
+    """
+    Pool configurable para codificar frames sin bloquear el event loop.
+
+    Cada stream procesa sus frames de uno en uno: mientras una codificación
+    está en curso los frames nuevos reemplazan al pendiente en el slot de
+    captura, por lo que una codificación lenta descarta frames obsoletos
+    en lugar de encolarlos.
+    """
+
+    def __init__(self, mode: str = "thread", max_workers: Optional[int] = None):
+        """
+        Inicializa el ejecutor.
+
+        Args:
+            mode: "thread" (por defecto) o "process"
+            max_workers: Número de workers (por defecto min(4, CPUs))
+
+        Raises:
+            ValueError: Si el modo no es válido
+        """
+        if mode not in ENCODE_MODES:
+            raise ValueError(f"Modo de codificación no soportado: {mode}")
+
+        self.mode = mode
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.logger = get_secure_logger("services.video.encode_executor")
+
+        self._executor: Optional[Executor] = None
+        self._latency = LatencyTracker()
+        self._in_flight = 0
+
+    def _get_executor(self) -> Executor:
+        """Crea el pool de forma diferida."""
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="frame_encode"
+                )
+            self.logger.info(
+                f"Pool de codificación iniciado: {self.mode} x{self.max_workers}"
+            )
+        return self._executor
+
+    @property
+    def in_flight(self) -> int:
+        """Codificaciones en curso."""
+        return self._in_flight
+
+    async def encode(
+        self,
+        camera_id: str,
+        converter: FrameConverter,
+        frame: np.ndarray,
+        resize: Optional[Tuple[int, int]] = None,
+        quality: Optional[int] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Any:
+        """
+        Codifica un frame en el pool.
+
+        Args:
+            camera_id: ID de la cámara (para métricas)
+            converter: Convertidor con la estrategia a usar
+            frame: Frame BGR
+            resize: Tamaño objetivo (width, height)
+            quality: Calidad de compresión
+            timings: Diccionario donde anotar la duración en ms de las
+                etapas ``resize`` y ``encode`` (opcional)
+
+        Returns:
+            Frame codificado según la estrategia del convertidor
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        start = time.perf_counter()
+        self._in_flight += 1
+
+        try:
+            if self.mode == "process":
+                result, worker_timings = await self._encode_in_process(
+                    loop, executor, converter, frame, resize, quality
+                )
+                if timings is not None:
+                    timings.update(worker_timings)
+            else:
+                result = await loop.run_in_executor(
+                    executor,
+                    converter.convert_frame,
+                    frame,
+                    resize,
+                    quality,
+                    timings
+                )
+        finally:
+            self._in_flight -= 1
+
+        self._latency.record(camera_id, (time.perf_counter() - start) * 1000)
+        return result
+
+    async def _encode_in_process(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        executor: Executor,
+        converter: FrameConverter,
+        frame: np.ndarray,
+        resize: Optional[Tuple[int, int]],
+        quality: Optional[int]
+    ) -> Tuple[Any, Dict[str, float]]:
+        """Copia el frame a memoria compartida y lo codifica en otro proceso."""
+        from multiprocessing import shared_memory
+
+        frame = np.ascontiguousarray(frame)
+        shm = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+        try:
+            shared = np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf)
+            shared[:] = frame
+            del shared
+
+            return await loop.run_in_executor(
+                executor,
+                _encode_shared_frame,
+                shm.name,
+                frame.shape,
+                frame.dtype.str,
+                type(converter.strategy).__name__,
+                resize,
+                quality
+            )
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def get_latency(self, camera_id: str) -> Optional[Dict[str, float]]:
+        """
+        Obtiene percentiles de latencia de codificación de una cámara.
+
+        Args:
+            camera_id: ID de la cámara
+
+        Returns:
+            Resumen con p50/p95/p99 o None si no hay muestras
+        """
+        return self._latency.get_summary(camera_id)
+
+    def reset_camera(self, camera_id: str) -> None:
+        """Elimina las métricas de una cámara."""
+        self._latency.reset(camera_id)
+
+    def shutdown(self, wait: bool = False) -> None:
+        """
+        Detiene el pool.
+
+        Args:
+            wait: Esperar a que terminen las codificaciones en curso
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+            self.logger.info("Pool de codificación detenido")
@@ -0,0 +1,249 @@
+"""
+Hub de difusión de frames por cámara.
+
+Permite que múltiples consumidores (clientes WebSocket) compartan una única
+captura y codificación por cámara. Cada suscriptor tiene su propia cola
+acotada; si un consumidor es lento se descarta su frame más antiguo en lugar
+de bloquear al resto.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class FrameSubscription:
+    """
+    Suscripción de un consumidor a los frames de una cámara.
+
+    Attributes:
+        camera_id: ID de la cámara suscrita
+        subscriber_id: ID del consumidor (normalmente el client_id)
+        frames_received: Frames entregados a la cola del suscriptor
+        dropped_frames: Frames descartados por cola llena
+    """
+
+    def __init__(self, camera_id: str, subscriber_id: str, max_queue_size: int = 2):
+        """
+        Inicializa la suscripción.
+
+        Args:
+            camera_id: ID de la cámara
+            subscriber_id: ID del consumidor
+            max_queue_size: Frames máximos pendientes antes de descartar
+        """
+        self.camera_id = camera_id
+        self.subscriber_id = subscriber_id
+        self.frames_received = 0
+        self.dropped_frames = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._closed = False
+
+    @property
+    def is_closed(self) -> bool:
+        """Indica si la suscripción fue cerrada."""
+        return self._closed
+
+    @property
+    def pending_frames(self) -> int:
+        """Frames pendientes de consumir."""
+        return self._queue.qsize()
+
+    def offer(self, frame_data: Any) -> None:
+        """
+        Entrega un frame a la cola descartando el más antiguo si está llena.
+
+        Debe llamarse desde el event loop.
+
+        Args:
+            frame_data: Frame ya codificado
+        """
+        if self._closed:
+            return
+
+        if self._queue.full():
+            try:
+                self._queue.get_nowait()
+                self.dropped_frames += 1
+            except asyncio.QueueEmpty:
+                pass
+
+        self._queue.put_nowait(frame_data)
+        self.frames_received += 1
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Espera el siguiente frame.
+
+        Args:
+            timeout: Tiempo máximo de espera en segundos
+
+        Returns:
+            Frame codificado o None si expira el timeout o se cerró
+        """
+        if self._closed and self._queue.empty():
+            return None
+
+        try:
+            if timeout is None:
+                frame_data = await self._queue.get()
+            else:
+                frame_data = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+        return frame_data
+
+    def close(self) -> None:
+        """Cierra la suscripción y descarta frames pendientes."""
+        self._closed = True
+        while not self._queue.empty():
+            try:
+                self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtiene estadísticas de la suscripción."""
+        return {
+            'subscriber_id': self.subscriber_id,
+            'frames_received': self.frames_received,
+            'dropped_frames': self.dropped_frames,
+            'pending_frames': self.pending_frames
+        }
+
+
+class FrameBroadcastHub:
+    """
+    Difusor de frames con conteo de referencias por cámara.
+
+    Un frame publicado para una cámara se entrega a todas sus suscripciones
+    sin volver a codificarlo. El hub solo mantiene el registro; iniciar y
+    detener la captura queda en manos del servicio que lo utiliza según
+    el conteo de suscriptores.
+    """
+
+    def __init__(self, max_queue_size: int = 2):
+        """
+        Inicializa el hub.
+
+        Args:
+            max_queue_size: Tamaño de cola por suscriptor
+        """
+        self.max_queue_size = max_queue_size
+        self._subscriptions: Dict[str, Dict[str, FrameSubscription]] = {}
+        self.frames_published: Dict[str, int] = {}
+
+    def subscribe(self, camera_id: str, subscriber_id: str) -> FrameSubscription:
+        """
+        Registra un suscriptor para una cámara.
+
+        Si el suscriptor ya existía se reemplaza su suscripción anterior.
+
+        Args:
+            camera_id: ID de la cámara
+            subscriber_id: ID del consumidor
+
+        Returns:
+            Nueva suscripción
+        """
+        subscribers = self._subscriptions.setdefault(camera_id, {})
+
+        previous = subscribers.pop(subscriber_id, None)
+        if previous:
+            previous.close()
+
+        subscription = FrameSubscription(camera_id, subscriber_id, self.max_queue_size)
+        subscribers[subscriber_id] = subscription
+
+        logger.debug(
+            f"Suscriptor {subscriber_id} agregado a {camera_id} "
+            f"({len(subscribers)} activos)"
+        )
+        return subscription
+
+    def unsubscribe(self, subscription: FrameSubscription) -> int:
+        """
+        Elimina una suscripción.
+
+        Args:
+            subscription: Suscripción a eliminar
+
+        Returns:
+            Suscriptores restantes para la cámara
+        """
+        subscription.close()
+
+        subscribers = self._subscriptions.get(subscription.camera_id)
+        if not subscribers:
+            return 0
+
+        if subscribers.get(subscription.subscriber_id) is subscription:
+            del subscribers[subscription.subscriber_id]
+
+        remaining = len(subscribers)
+        if remaining == 0:
+            del self._subscriptions[subscription.camera_id]
+            self.frames_published.pop(subscription.camera_id, None)
+
+        logger.debug(
+            f"Suscriptor {subscription.subscriber_id} removido de "
+            f"{subscription.camera_id} ({remaining} restantes)"
+        )
+        return remaining
+
+    def publish(self, camera_id: str, frame_data: Any) -> int:
+        """
+        Publica un frame a todos los suscriptores de la cámara.
+
+        Tiene la firma de los callbacks de frame de VideoStreamService
+        para poder registrarse directamente.
+
+        Args:
+            camera_id: ID de la cámara
+            frame_data: Frame codificado
+
+        Returns:
+            Número de suscriptores que recibieron el frame
+        """
+        subscribers = self._subscriptions.get(camera_id)
+        if not subscribers:
+            return 0
+
+        self.frames_published[camera_id] = self.frames_published.get(camera_id, 0) + 1
+
+        for subscription in list(subscribers.values()):
+            subscription.offer(frame_data)
+
+        return len(subscribers)
+
+    def subscriber_count(self, camera_id: str) -> int:
+        """Obtiene el número de suscriptores de una cámara."""
+        return len(self._subscriptions.get(camera_id, {}))
+
+    def get_stats(self, camera_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas del hub.
+
+        Args:
+            camera_id: Limitar a una cámara específica
+
+        Returns:
+            Estadísticas por cámara
+        """
+        camera_ids = [camera_id] if camera_id else list(self._subscriptions.keys())
+
+        return {
+            cam_id: {
+                'subscribers': self.subscriber_count(cam_id),
+                'frames_published': self.frames_published.get(cam_id, 0),
+                'subscriptions': [
+                    sub.get_stats()
+                    for sub in self._subscriptions.get(cam_id, {}).values()
+                ]
+            }
+            for cam_id in camera_ids
+        }
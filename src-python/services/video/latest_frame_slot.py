@@ -0,0 +1,118 @@
+"""
+Buffer de un solo frame para pasar frames del thread de captura al event loop.
+
+Sustituye a ``asyncio.run_coroutine_threadsafe(queue.put(...))`` por frame:
+el productor deja el frame más reciente en un slot y solo despierta al
+event loop cuando no hay ya un despertar pendiente. Si el consumidor va
+atrasado, el frame anterior se reemplaza ("el último gana") y se contabiliza
+como descartado.
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Optional
+
+
+class LatestFrameSlot:
+    """
+    Slot "latest frame wins" entre un thread productor y el event loop.
+
+    El slot es un ``deque(maxlen=1)``: ``append`` y ``popleft`` son atómicos
+    en CPython, por lo que productor y consumidor no necesitan lock. Los
+    descartes se calculan a partir de contadores que solo escribe un lado
+    cada uno (producidos por el productor, consumidos por el consumidor).
+
+    Attributes:
+        produced: Frames entregados por el productor
+        consumed: Frames retirados por el consumidor
+    """
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Inicializa el slot.
+
+        Args:
+            loop: Event loop del consumidor (se puede asignar después con bind)
+        """
+        self._loop = loop
+        self._slot: deque = deque(maxlen=1)
+        self._event = asyncio.Event()
+        self._wakeup_pending = False
+        self.produced = 0
+        self.consumed = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Asocia el slot al event loop consumidor."""
+        self._loop = loop
+
+    @property
+    def dropped(self) -> int:
+        """Frames reemplazados antes de ser consumidos."""
+        return max(0, self.produced - self.consumed - len(self._slot))
+
+    def put(self, frame: Any) -> bool:
+        """
+        Publica un frame desde el thread de captura.
+
+        Args:
+            frame: Frame capturado
+
+        Returns:
+            False si el event loop no está disponible
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return False
+
+        self._slot.append(frame)
+        self.produced += 1
+
+        # Un único despertar pendiente basta; el consumidor siempre toma el último
+        if not self._wakeup_pending:
+            self._wakeup_pending = True
+            try:
+                loop.call_soon_threadsafe(self._event.set)
+            except RuntimeError:
+                # Loop cerrado entre la verificación y la llamada
+                self._wakeup_pending = False
+                return False
+
+        return True
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Espera y retira el frame más reciente.
+
+        Args:
+            timeout: Tiempo máximo de espera en segundos
+
+        Returns:
+            Frame o None si expira el timeout
+        """
+        while True:
+            # Rearmar el despertar antes de vaciar el slot para no perder frames
+            self._wakeup_pending = False
+            self._event.clear()
+
+            try:
+                frame = self._slot.popleft()
+            except IndexError:
+                frame = None
+
+            if frame is not None:
+                self.consumed += 1
+                return frame
+
+            try:
+                if timeout is None:
+                    await self._event.wait()
+                else:
+                    await asyncio.wait_for(self._event.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return None
+
+    def clear(self) -> None:
+        """Descarta el frame pendiente sin contarlo como descartado."""
+        if self._slot:
+            self._slot.clear()
+            self.consumed += 1
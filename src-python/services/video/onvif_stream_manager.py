@@ -8,7 +8,7 @@ primero la URL RTSP del stream y luego delegando a RTSP.
 import asyncio
 from typing import Optional
 
-from services.video.rtsp_stream_manager import RTSPStreamManager
+from services.video.rtsp_stream_manager import RTSPStreamManager, to_substream_path
 from services.protocol_handlers.onvif_handler import ONVIFHandler
 from models.streaming import StreamStatus
 from utils.sanitizers import sanitize_url
@@ -285,6 +285,8 @@ class ONVIFStreamManager(RTSPStreamManager):
             URL RTSP obtenida via ONVIF
         """
         if self._rtsp_url:
+            if getattr(self.connection_config, 'subtype', 0) == 1:
+                return to_substream_path(self._rtsp_url)
             return self._rtsp_url
         else:
             # Fallback al método base si no tenemos URL de ONVIF
@@ -1,65 +1,115 @@
 """
 Stream Manager específico para protocolo RTSP.
 
-Implementa la captura de video desde streams RTSP usando OpenCV.
+Implementa la captura de video desde streams RTSP con un backend de
+decodificación intercambiable (OpenCV por defecto, ffmpeg opcional).
 """
 
-import cv2
 import numpy as np
 from typing import Optional
 import asyncio
+import re
 import time
 
 from services.video.stream_manager import StreamManager
+from services.video.decode_backends import DecodeBackend, OpenCVDecodeBackend
 from models.streaming import StreamStatus
 from utils.sanitizers import sanitize_url
 
 
+# Patrones de path del stream principal → substream (subtype=1) por fabricante
+_SUBSTREAM_PATTERNS = (
+    # Dahua: /cam/realmonitor?channel=1&subtype=0
+    (re.compile(r'subtype=\d+'), 'subtype=1'),
+    # Hikvision: /Streaming/Channels/101 → 102
+    (re.compile(r'(/Streaming/Channels/\d+)01(?=$|[/?])', re.IGNORECASE), r'\g<1>02'),
+    # TP-Link y genéricos: /stream1 → /stream2
+    (re.compile(r'/stream1(?=$|[/?])'), '/stream2'),
+)
+
+
+def to_substream_path(path: str) -> str:
+    """
+    Convierte el path (o URL) del stream principal al substream.
+    
+    Args:
+        path: Path o URL RTSP del stream principal
+        
+    Returns:
+        Path del substream, o el original si no se reconoce el formato
+    """
+    for pattern, replacement in _SUBSTREAM_PATTERNS:
+        if pattern.search(path):
+            return pattern.sub(replacement, path, count=1)
+    return path
+
+
 class RTSPStreamManager(StreamManager):
     """
     Stream Manager para protocolo RTSP.
     
-    Utiliza OpenCV VideoCapture para conectar y capturar
-    frames desde streams RTSP.
+    Delega la lectura y decodificación en un ``DecodeBackend``
+    (``cv2.VideoCapture`` por defecto, o un proceso ffmpeg por pipe).
     """
     
+    # Evita programar varias reconexiones simultáneas desde el thread de captura
+    _reconnecting: bool = False
+    
+    def __init__(self, *args, decode_backend: Optional[DecodeBackend] = None, **kwargs):
+        """
+        Inicializa el manager RTSP.
+        
+        Args:
+            decode_backend: Backend de decodificación (OpenCV si es None)
+        """
+        super().__init__(*args, **kwargs)
+        self._decode_backend: DecodeBackend = decode_backend or OpenCVDecodeBackend()
+        
+        # Referencia de PTS para medir el retraso de decodificación
+        self._pts_origin: Optional[tuple] = None
+    
     async def _initialize_connection(self) -> None:
         """Inicializa la conexión RTSP."""
         try:
             # Construir URL RTSP
             rtsp_url = self._build_rtsp_url()
             
-            self.logger.info(f"Conectando a RTSP: {sanitize_url(rtsp_url)}")
+            self.logger.info(
+                f"Conectando a RTSP ({self._decode_backend.name}): {sanitize_url(rtsp_url)}"
+            )
             
-            # Crear VideoCapture
-            self._connection = cv2.VideoCapture(rtsp_url)
+            # Abrir fuera del event loop: la apertura puede tardar segundos
+            loop = asyncio.get_running_loop()
+            opened = await loop.run_in_executor(None, self._decode_backend.open, rtsp_url)
             
-            # Configurar buffer para reducir latencia
-            self._connection.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            if not opened and not isinstance(self._decode_backend, OpenCVDecodeBackend):
+                self.logger.warning(
+                    f"Backend {self._decode_backend.name} no pudo abrir el stream, usando OpenCV"
+                )
+                self._decode_backend.release()
+                self._decode_backend = OpenCVDecodeBackend(self._decode_backend.keyframes_only)
+                opened = await loop.run_in_executor(None, self._decode_backend.open, rtsp_url)
             
-            # Configurar timeout (si está soportado)
-            if hasattr(cv2, 'CAP_PROP_OPEN_TIMEOUT_MSEC'):
-                self._connection.set(cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, 10000)
-            if hasattr(cv2, 'CAP_PROP_READ_TIMEOUT_MSEC'):
-                self._connection.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, 10000)
+            self._connection = self._decode_backend
             
             # Verificar que se abrió correctamente
-            if not self._connection.isOpened():
+            if not opened:
                 raise ConnectionError("No se pudo abrir el stream RTSP")
             
-            # Obtener información del stream
-            width = int(self._connection.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(self._connection.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            fps = int(self._connection.get(cv2.CAP_PROP_FPS))
-            
-            self.logger.info(f"Stream RTSP conectado: {width}x{height} @ {fps}fps")
+            info = self._decode_backend.get_info()
+            self.logger.info(
+                f"Stream RTSP conectado: {info['width']}x{info['height']} "
+                f"@ {info['native_fps']:.0f}fps ({info['backend']})"
+            )
             
             # Actualizar metadata
             self.stream_model.metadata.update({
-                'width': width,
-                'height': height,
-                'native_fps': fps,
-                'codec': self._get_codec_info()
+                'width': info['width'],
+                'height': info['height'],
+                'native_fps': int(info['native_fps']),
+                'codec': info['codec'],
+                'decode_backend': info['backend'],
+                'keyframes_only': info['keyframes_only']
             })
             
         except Exception as e:
@@ -68,7 +118,7 @@ class RTSPStreamManager(StreamManager):
     
     async def _validate_stream(self) -> None:
         """Valida que el stream RTSP es válido."""
-        if not self._connection or not self._connection.isOpened():
+        if not self._connection or not self._connection.is_opened():
             raise ValueError("Conexión RTSP no válida")
         
         # Intentar leer un frame de prueba
@@ -85,25 +135,96 @@ class RTSPStreamManager(StreamManager):
         Returns:
             Frame como numpy array o None si falla
         """
-        if not self._connection or not self._connection.isOpened():
+        if not self._connection or not self._connection.is_opened():
             return None
         
         try:
             ret, frame = self._connection.read()
             
             if ret and frame is not None:
+                self._record_pts()
                 return frame
             else:
                 # Intentar reconectar si falla
-                if self._is_streaming:
-                    # Crear tarea asíncrona para reconexión
-                    asyncio.create_task(self._attempt_reconnect())
+                self._schedule_reconnect()
                 return None
                 
         except Exception as e:
             self.logger.error(f"Error capturando frame RTSP: {e}")
             return None
     
+    def _grab_frame(self) -> Optional[bool]:
+        """
+        Obtiene el siguiente frame del stream sin convertirlo a BGR.
+        
+        Returns:
+            True si se obtuvo un frame
+        """
+        if not self._connection or not self._connection.is_opened():
+            return False
+        
+        try:
+            if self._connection.grab():
+                return True
+            
+            self._schedule_reconnect()
+            return False
+            
+        except Exception as e:
+            self.logger.error(f"Error obteniendo frame RTSP: {e}")
+            return False
+    
+    def _retrieve_frame(self) -> Optional[np.ndarray]:
+        """
+        Convierte el último frame obtenido con grab().
+        
+        Returns:
+            Frame como numpy array o None si falla
+        """
+        if not self._connection:
+            return None
+        
+        try:
+            frame = self._connection.retrieve()
+            if frame is not None:
+                self._record_pts()
+            return frame
+        except Exception as e:
+            self.logger.error(f"Error convirtiendo frame RTSP: {e}")
+            return None
+    
+    def _record_pts(self) -> None:
+        """
+        Registra el PTS del último frame y el retraso respecto al reloj.
+        
+        ``decode_lag_ms`` es cuánto se ha retrasado la entrega de frames
+        respecto a su PTS desde el primer frame: crece si la red o el
+        decodificador acumulan buffer.
+        """
+        pts_ms = self._decode_backend.last_pts_ms
+        if pts_ms is None:
+            return
+        
+        now_ms = time.monotonic() * 1000
+        if self._pts_origin is None or pts_ms < self._pts_origin[0]:
+            # Primer frame o PTS reiniciado (reconexión)
+            self._pts_origin = (pts_ms, now_ms)
+        
+        pts_base, wall_base = self._pts_origin
+        metadata = self.stream_model.metadata
+        metadata['last_pts_ms'] = round(pts_ms, 1)
+        metadata['decode_lag_ms'] = round((now_ms - wall_base) - (pts_ms - pts_base), 1)
+    
+    def _schedule_reconnect(self) -> None:
+        """Programa una reconexión en el event loop desde el thread de captura."""
+        if not self._is_streaming or self._reconnecting:
+            return
+        
+        loop = self._main_loop
+        if loop and not loop.is_closed():
+            self._reconnecting = True
+            asyncio.run_coroutine_threadsafe(self._attempt_reconnect(), loop)
+    
     async def _close_connection(self) -> None:
         """Cierra la conexión RTSP."""
         if self._connection:
@@ -120,9 +241,12 @@ class RTSPStreamManager(StreamManager):
         """
         config = self.connection_config
         
+        # Substream (subtype=1) para miniaturas del mosaico
+        substream = getattr(config, 'subtype', 0) == 1
+        
         # Si ya hay una URL completa, usarla
         if hasattr(config, 'rtsp_url') and config.rtsp_url:
-            return config.rtsp_url
+            return to_substream_path(config.rtsp_url) if substream else config.rtsp_url
         
         # Construir URL desde componentes
         if config.username and config.password:
@@ -151,13 +275,16 @@ class RTSPStreamManager(StreamManager):
             # ya que es la cámara que estamos probando
             path = '/cam/realmonitor?channel=1&subtype=0'
         
+        if substream:
+            path = to_substream_path(path)
+        
         # Construir URL completa
         rtsp_url = f"rtsp://{auth}{config.ip}:{port}{path}"
         
         self.logger.debug(f"URL RTSP construida: {sanitize_url(rtsp_url)}")
         self.logger.debug(f"  - IP: {config.ip}")
         self.logger.debug(f"  - Puerto: {port}")
-        self.logger.debug(f"  - Path: {path}")
+        self.logger.debug(f"  - Path: {path}{' (substream)' if substream else ''}")
         self.logger.debug(f"  - Marca: {getattr(config, 'brand', 'unknown')}")
         
         return rtsp_url
@@ -166,18 +293,7 @@ class RTSPStreamManager(StreamManager):
     
     def _get_codec_info(self) -> str:
         """Obtiene información del codec del stream."""
-        if not self._connection:
-            return "unknown"
-        
-        # Obtener fourcc
-        fourcc = int(self._connection.get(cv2.CAP_PROP_FOURCC))
-        
-        # Convertir a string
-        if fourcc > 0:
-            codec = "".join([chr((fourcc >> 8 * i) & 0xFF) for i in range(4)])
-            return codec.strip()
-        
-        return "unknown"
+        return self._decode_backend.codec
     
     async def _attempt_reconnect(self) -> None:
         """Intenta reconectar al stream RTSP de forma asíncrona."""
@@ -185,22 +301,24 @@ class RTSPStreamManager(StreamManager):
         
         try:
             # Cerrar conexión actual
-            if self._connection:
-                self._connection.release()
+            self._decode_backend.release()
             
             # Esperar un momento de forma asíncrona
             await asyncio.sleep(1)
             
-            # Reintentar conexión
+            # Reintentar conexión con el mismo backend
             rtsp_url = self._build_rtsp_url()
-            self._connection = cv2.VideoCapture(rtsp_url)
-            self._connection.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            loop = asyncio.get_running_loop()
+            opened = await loop.run_in_executor(None, self._decode_backend.open, rtsp_url)
+            self._connection = self._decode_backend
             
-            if self._connection.isOpened():
+            if opened:
                 self.logger.info("Reconexión RTSP exitosa")
                 self.stream_model.reconnect_attempts += 1
             else:
                 self.logger.error("Fallo la reconexión RTSP")
                 
         except Exception as e:
-            self.logger.error(f"Error en reconexión RTSP: {e}")
\ No newline at end of file
+            self.logger.error(f"Error en reconexión RTSP: {e}")
+        finally:
+            self._reconnecting = False
\ No newline at end of file
@@ -9,15 +9,38 @@ import asyncio
 import threading
 import time
 from abc import ABC, abstractmethod
-from typing import Optional, Callable, Any, Dict
+from typing import Optional, Callable, Any, Dict, NamedTuple, TYPE_CHECKING
 import numpy as np
 
 from datetime import datetime
 
-from models.streaming import StreamModel, StreamProtocol, StreamStatus
+from models.streaming import StreamModel, StreamProtocol, StreamStatus, EncodedFrame
 from models import ConnectionConfig
 from utils.video import FrameConverter
 from services.logging_service import get_secure_logger
+from services.video.latest_frame_slot import LatestFrameSlot
+from config.settings import settings
+
+if TYPE_CHECKING:
+    from services.video.encode_executor import FrameEncodeExecutor
+    from services.video.decode_backends import DecodeBackend
+    from utils.video.latency_tracker import LatencyTracker
+
+
+class CapturedFrame(NamedTuple):
+    """
+    Frame sellado en el thread de captura.
+    
+    Attributes:
+        image: Frame BGR decodificado
+        sequence: Número secuencial asignado al capturarlo
+        captured_at: Instante de captura según ``time.monotonic()``
+        capture_timestamp: Instante de captura en ms desde epoch (para el cliente)
+    """
+    image: np.ndarray
+    sequence: int
+    captured_at: float
+    capture_timestamp: float
 
 
 class StreamManager(ABC):
@@ -50,11 +73,21 @@ class StreamManager(ABC):
         # Control de streaming
         self._is_streaming = False
         self._capture_thread: Optional[threading.Thread] = None
-        self._frame_queue: asyncio.Queue = asyncio.Queue(maxsize=stream_model.buffer_size)
+        self._capture_stop = threading.Event()
+        # Handoff captura → event loop: solo importa el frame más reciente
+        self._frame_slot = LatestFrameSlot()
+        self._reported_drops = 0
+        self._sequence = 0
         
         # Callback para notificar frames
         self._frame_callback: Optional[Callable[[str, str], None]] = None
         
+        # Pool de codificación (None = codificar en el event loop)
+        self._encode_executor: Optional['FrameEncodeExecutor'] = None
+        
+        # Latencias por etapa del pipeline (None = no se registran)
+        self._latency: Optional['LatencyTracker'] = None
+        
         # Recursos específicos del protocolo
         self._connection: Any = None
         
@@ -67,11 +100,21 @@ class StreamManager(ABC):
             self.logger.warning("No se pudo obtener el event loop actual")
         else:
             self.logger = get_secure_logger("services.video.stream_manager")
+        
+        self._frame_slot.bind(self._main_loop)
     
     def set_frame_callback(self, callback: Callable[[str, str], None]) -> None:
         """Establece el callback para notificar frames."""
         self._frame_callback = callback
     
+    def set_encode_executor(self, executor: 'FrameEncodeExecutor') -> None:
+        """Establece el pool donde se codifican los frames."""
+        self._encode_executor = executor
+    
+    def set_latency_tracker(self, tracker: 'LatencyTracker') -> None:
+        """Establece dónde se registran las latencias por etapa del stream."""
+        self._latency = tracker
+    
     async def start_streaming(self) -> None:
         """
         Template method para iniciar streaming.
@@ -80,6 +123,11 @@ class StreamManager(ABC):
         en métodos abstractos.
         """
         try:
+            # Asegurar que el slot despierta al loop que procesa los frames
+            if self._main_loop is None:
+                self._main_loop = asyncio.get_running_loop()
+                self._frame_slot.bind(self._main_loop)
+            
             # 1. Inicializar conexión específica
             await self._initialize_connection()
             
@@ -88,6 +136,7 @@ class StreamManager(ABC):
             
             # 3. Iniciar captura en thread separado
             self._is_streaming = True
+            self._capture_stop.clear()
             self._start_capture_thread()
             
             # 4. Iniciar loop de procesamiento async
@@ -102,17 +151,14 @@ class StreamManager(ABC):
     async def stop(self) -> None:
         """Detiene el streaming y libera recursos."""
         self._is_streaming = False
+        self._capture_stop.set()
         
         # Detener thread de captura
         if self._capture_thread and self._capture_thread.is_alive():
             self._capture_thread.join(timeout=5.0)
         
-        # Limpiar cola
-        while not self._frame_queue.empty():
-            try:
-                self._frame_queue.get_nowait()
-            except asyncio.QueueEmpty:
-                break
+        # Descartar frame pendiente
+        self._frame_slot.clear()
         
         # Cerrar conexión específica
         await self._close_connection()
@@ -144,6 +190,28 @@ class StreamManager(ABC):
         """Cierra la conexión específica del protocolo."""
         pass
     
+    def _grab_frame(self) -> Optional[bool]:
+        """
+        Avanza el stream al siguiente frame sin convertirlo.
+        
+        Los protocolos que distinguen entre obtener el paquete y
+        convertirlo (p.ej. ``VideoCapture.grab``/``retrieve``) lo
+        sobrescriben para poder descartar frames sin pagar la conversión.
+        
+        Returns:
+            True/False según el resultado, o None si no está soportado
+        """
+        return None
+    
+    def _retrieve_frame(self) -> Optional[np.ndarray]:
+        """
+        Convierte el último frame obtenido con ``_grab_frame``.
+        
+        Returns:
+            Frame como numpy array o None si falla
+        """
+        return self._capture_frame()
+    
     def _start_capture_thread(self) -> None:
         """Inicia el thread de captura de frames."""
         self._capture_thread = threading.Thread(
@@ -155,94 +223,182 @@ class StreamManager(ABC):
         self.logger.debug(f"Thread de captura iniciado para {self.stream_model.camera_id}")
     
     def _capture_loop(self) -> None:
-        """Loop de captura que corre en thread separado."""
+        """
+        Loop de captura que corre en thread separado.
+        
+        Decima a ``target_fps`` por deadlines: si el protocolo soporta
+        ``_grab_frame`` se drenan los frames intermedios (la llamada bloquea
+        hasta que llega el siguiente del stream) y solo se convierten los
+        que se van a emitir; si no, el thread duerme hasta el siguiente
+        deadline en lugar de hacer polling.
+        """
         frame_interval = 1.0 / self.stream_model.target_fps
-        last_frame_time = 0
+        next_deadline = time.monotonic()
+        frames_grabbed = 0
+        frames_decoded = 0
         
         while self._is_streaming:
             try:
-                current_time = time.time()
+                grabbed = self._grab_frame()
                 
-                # Limitar FPS
-                if current_time - last_frame_time < frame_interval:
-                    time.sleep(0.001)
-                    continue
+                if grabbed is None:
+                    # Sin soporte de grab: esperar al deadline y capturar
+                    if self._wait_until(next_deadline):
+                        break
+                    frame = self._capture_frame()
+                else:
+                    if not grabbed:
+                        # Stream caído o sin datos: backoff sin girar en vacío
+                        if self._capture_stop.wait(0.1):
+                            break
+                        continue
+                    
+                    frames_grabbed += 1
+                    if time.monotonic() < next_deadline:
+                        # Frame descartado sin convertir
+                        continue
+                    
+                    frame = self._retrieve_frame()
                 
-                # Capturar frame
-                frame = self._capture_frame()
                 if frame is not None:
-                    # Intentar agregar a la cola (no bloqueante)
-                    try:
-                        # Obtener el loop actual del hilo principal
-                        loop = self._main_loop
-                        if loop and not loop.is_closed():
-                            asyncio.run_coroutine_threadsafe(
-                                self._frame_queue.put(frame),
-                                loop
-                            )
-                            last_frame_time = current_time
-                        else:
-                            self.logger.warning("Event loop no disponible")
-                    except Exception as e:
-                        # Cola llena o error, descartar frame
-                        self.stream_model.dropped_frames += 1
-                        self.logger.debug(f"Frame descartado: {e}")
+                    frames_decoded += 1
+                    if isinstance(frame, np.ndarray) and not frame.flags.owndata:
+                        # Vista sobre un buffer reutilizable del backend: el
+                        # frame sale del thread y se conserva como ``source`` para
+                        # recodificaciones, así que necesita memoria propia
+                        frame = frame.copy()
+                    # Sellar secuencia e instante de captura antes de cualquier cola
+                    self._sequence += 1
+                    captured = CapturedFrame(
+                        image=frame,
+                        sequence=self._sequence,
+                        captured_at=time.monotonic(),
+                        capture_timestamp=time.time() * 1000
+                    )
+                    # Dejar el frame en el slot; el anterior no consumido se reemplaza
+                    if not self._frame_slot.put(captured):
+                        self.logger.warning("Event loop no disponible")
+                
+                # Programar el siguiente deadline sin acumular atraso
+                now = time.monotonic()
+                next_deadline += frame_interval
+                if next_deadline < now:
+                    next_deadline = now + frame_interval
+                
+                if frames_decoded % 100 == 0:
+                    self.stream_model.metadata['frames_grabbed'] = frames_grabbed
+                    self.stream_model.metadata['frames_decoded'] = frames_decoded
                 
             except Exception as e:
                 self.logger.error(f"Error en captura de frame: {e}")
-                time.sleep(0.1)  # Evitar loop rápido en caso de error
+                if self._capture_stop.wait(0.1):  # Evitar loop rápido en caso de error
+                    break
+    
+    def _wait_until(self, deadline: float) -> bool:
+        """
+        Duerme hasta el deadline (reloj monotónico) o hasta que se detenga.
+        
+        Args:
+            deadline: Instante objetivo según ``time.monotonic()``
+            
+        Returns:
+            True si se solicitó detener la captura durante la espera
+        """
+        delay = deadline - time.monotonic()
+        if delay <= 0:
+            return self._capture_stop.is_set()
+        return self._capture_stop.wait(delay)
     
     async def _processing_loop(self) -> None:
-        """Loop async para procesar frames de la cola."""
+        """Loop async para procesar el frame más reciente del slot."""
         while self._is_streaming:
             try:
-                # Obtener frame de la cola con timeout
-                frame = await asyncio.wait_for(
-                    self._frame_queue.get(),
-                    timeout=1.0
-                )
+                captured = await self._frame_slot.get(timeout=1.0)
+                
+                # Contabilizar frames reemplazados antes de ser procesados
+                self._update_dropped_frames()
+                
+                if captured is None:
+                    # Normal cuando no hay frames
+                    continue
                 
                 # Procesar frame
-                await self._process_frame(frame)
+                await self._process_frame(captured)
                 
-            except asyncio.TimeoutError:
-                # Normal cuando no hay frames
-                continue
             except Exception as e:
                 self.logger.error(f"Error procesando frame: {e}")
     
-    async def _process_frame(self, frame: np.ndarray) -> None:
+    def _update_dropped_frames(self) -> None:
+        """Traslada al modelo los descartes contabilizados por el slot."""
+        dropped = self._frame_slot.dropped
+        if dropped > self._reported_drops:
+            self.stream_model.dropped_frames += dropped - self._reported_drops
+            self._reported_drops = dropped
+    
+    def _record_latency(self, stage: str, latency_ms: float) -> None:
+        """Registra la latencia de una etapa si hay tracker configurado."""
+        if self._latency is not None:
+            self._latency.record(stage, latency_ms)
+    
+    async def _process_frame(self, captured: CapturedFrame) -> None:
         """
         Procesa un frame capturado.
         
         Args:
-            frame: Frame a procesar
+            captured: Frame sellado por el thread de captura
         """
         try:
+            frame = captured.image
+            
             # Convertir frame según configuración
             start_time = time.time()
+            self._record_latency('queue_wait', (time.monotonic() - captured.captured_at) * 1000)
             
             # Redimensionar si es necesario para optimizar
-            max_width = 1280  # TODO: Hacer configurable
-            height, width = frame.shape[:2]
-            if width > max_width:
-                resize_to = (max_width, int(height * max_width / width))
+            resize_to = FrameConverter.size_for_max_width(frame, self.stream_model.max_width)
+            quality = self.stream_model.jpeg_quality
+            timings: Dict[str, float] = {}
+            
+            # Codificar fuera del event loop si hay pool configurado
+            if self._encode_executor:
+                frame_base64 = await self._encode_executor.encode(
+                    self.stream_model.camera_id,
+                    self.frame_converter,
+                    frame,
+                    resize=resize_to,
+                    quality=quality,
+                    timings=timings
+                )
             else:
-                resize_to = None
+                frame_base64 = self.frame_converter.convert_frame(
+                    frame,
+                    resize=resize_to,
+                    quality=quality,
+                    timings=timings
+                )
             
-            # Convertir a base64
-            frame_base64 = self.frame_converter.convert_frame(
-                frame,
-                resize=resize_to,
-                quality=85  # TODO: Hacer configurable
-            )
+            for stage, latency_ms in timings.items():
+                self._record_latency(stage, latency_ms)
+            
+            # En modo bytes se conserva el frame original para recodificaciones por cliente
+            if isinstance(frame_base64, bytes):
+                frame_base64 = EncodedFrame(
+                    camera_id=self.stream_model.camera_id,
+                    payload=frame_base64,
+                    sequence=captured.sequence,
+                    capture_timestamp=captured.capture_timestamp,
+                    quality=quality,
+                    source=frame,
+                    captured_at=captured.captured_at,
+                    encoded_at=time.monotonic()
+                )
             
             processing_time = (time.time() - start_time) * 1000
             
             # Notificar frame si hay callback
             if self._frame_callback:
                 self._frame_callback(self.stream_model.camera_id, frame_base64)
-                self.logger.debug(f"Frame enviado para {self.stream_model.camera_id}, tamaño: {len(frame_base64)} bytes")
+                self.logger.debug(f"Frame enviado para {self.stream_model.camera_id}")
             else:
                 self.logger.warning(f"No hay callback configurado para notificar frames")
             
@@ -270,7 +426,9 @@ class StreamManagerFactory:
         protocol: StreamProtocol,
         stream_model: StreamModel,
         connection_config: ConnectionConfig,
-        frame_converter: FrameConverter
+        frame_converter: FrameConverter,
+        decode_backend: Optional[str] = None,
+        keyframes_only: bool = False
     ) -> StreamManager:
         """
         Crea un stream manager específico para el protocolo.
@@ -280,6 +438,9 @@ class StreamManagerFactory:
             stream_model: Modelo del stream
             connection_config: Configuración de conexión
             frame_converter: Convertidor de frames
+            decode_backend: Backend de decodificación RTSP ("opencv" o "ffmpeg";
+                por defecto ``settings.VIDEO_DECODE_BACKEND``)
+            keyframes_only: Decodificar solo keyframes (miniaturas)
             
         Returns:
             StreamManager específico para el protocolo
@@ -294,13 +455,19 @@ class StreamManagerFactory:
                 self.logger.debug("Importing RTSPStreamManager...")
                 from services.video.rtsp_stream_manager import RTSPStreamManager
                 self.logger.debug("RTSPStreamManager imported successfully")
-                return RTSPStreamManager(stream_model, connection_config, frame_converter)
+                return RTSPStreamManager(
+                    stream_model, connection_config, frame_converter,
+                    decode_backend=self._create_decode_backend(decode_backend, keyframes_only)
+                )
             
             elif protocol == StreamProtocol.ONVIF:
                 self.logger.debug("Importing ONVIFStreamManager...")
                 from services.video.onvif_stream_manager import ONVIFStreamManager
                 self.logger.debug("ONVIFStreamManager imported successfully")
-                return ONVIFStreamManager(stream_model, connection_config, frame_converter)
+                return ONVIFStreamManager(
+                    stream_model, connection_config, frame_converter,
+                    decode_backend=self._create_decode_backend(decode_backend, keyframes_only)
+                )
                 
             elif protocol == StreamProtocol.HTTP:
                 self.logger.debug("Importing HTTPStreamManager...")
@@ -313,7 +480,10 @@ class StreamManagerFactory:
                 self.logger.debug("Importing RTSPStreamManager for GENERIC...")
                 from services.video.rtsp_stream_manager import RTSPStreamManager
                 self.logger.debug("RTSPStreamManager imported successfully for GENERIC")
-                return RTSPStreamManager(stream_model, connection_config, frame_converter)
+                return RTSPStreamManager(
+                    stream_model, connection_config, frame_converter,
+                    decode_backend=self._create_decode_backend(decode_backend, keyframes_only)
+                )
                 
             else:
                 raise ValueError(f"Protocolo no soportado: {protocol.value}")
@@ -330,6 +500,31 @@ class StreamManagerFactory:
             self.logger.error(f"Traceback: {traceback.format_exc()}")
             raise
     
+    def _create_decode_backend(
+        self,
+        name: Optional[str],
+        keyframes_only: bool
+    ) -> 'DecodeBackend':
+        """
+        Crea el backend de decodificación para managers basados en RTSP.
+        
+        Args:
+            name: Backend solicitado (None = configuración global)
+            keyframes_only: Decodificar solo keyframes
+            
+        Returns:
+            Backend de decodificación (OpenCV si ffmpeg no está disponible)
+        """
+        from services.video.decode_backends import create_decode_backend
+        
+        backend = create_decode_backend(
+            name or settings.VIDEO_DECODE_BACKEND,
+            keyframes_only=keyframes_only,
+            threads=settings.VIDEO_DECODER_THREADS
+        )
+        self.logger.debug(f"Decode backend: {backend.name} (keyframes_only={keyframes_only})")
+        return backend
+    
     @staticmethod
     def get_supported_protocols() -> list[StreamProtocol]:
         """Obtiene la lista de protocolos soportados."""
@@ -12,14 +12,23 @@ from datetime import datetime
 import uuid
 
 from services.base_service import BaseService
-from models.streaming import StreamModel, StreamStatus, StreamProtocol
+from models.streaming import StreamModel, StreamStatus, StreamProtocol, EncodedFrame
 from models import ConnectionConfig
-from utils.video import FrameConverter, Base64JPEGStrategy
+from utils.video import FrameConverter, Base64JPEGStrategy, BytesJPEGStrategy, EncodedFrameCache
 from utils.video.performance_monitor import StreamPerformanceMonitor
+from utils.video.latency_tracker import LatencyTracker
 from services.video.stream_manager import StreamManagerFactory, StreamManager
+from services.video.encode_executor import FrameEncodeExecutor
+from config.settings import settings
 from services.logging_service import get_secure_logger
 
 
+# Etapas medidas por frame, en el orden en que ocurren: espera en el slot
+# de captura, redimensionado, codificación, reparto hasta el visor,
+# base64 (solo transporte JSON), envío por el socket y total de extremo a extremo
+LATENCY_STAGES = ("queue_wait", "resize", "encode", "dispatch", "base64", "send", "total")
+
+
 class VideoStreamService(BaseService):
     """
     Servicio singleton para gestión de streams de video.
@@ -49,12 +58,25 @@ class VideoStreamService(BaseService):
             # Callbacks para notificar frames
             self._frame_callbacks: Dict[str, List[Callable]] = {}
             
-            # Conversión de frames
+            # Conversión de frames (base64 por defecto, bytes para transporte binario)
             self._frame_converter = FrameConverter(Base64JPEGStrategy())
+            self._bytes_frame_converter = FrameConverter(BytesJPEGStrategy(), cache=EncodedFrameCache())
+            
+            # Recodificaciones en curso por clave, para no repetir el mismo escalón
+            self._pending_variants: Dict[tuple, asyncio.Future] = {}
+            
+            # Pool de codificación compartido por todos los streams
+            self._encode_executor = FrameEncodeExecutor(
+                mode=settings.VIDEO_ENCODE_EXECUTOR,
+                max_workers=settings.VIDEO_ENCODE_WORKERS or None
+            )
             
             # Monitor de performance
             self._performance_monitor = StreamPerformanceMonitor()
             
+            # Latencias por etapa del pipeline, por cámara
+            self._stage_latency: Dict[str, LatencyTracker] = {}
+            
             # Control de tareas async
             self._tasks: Dict[str, asyncio.Task] = {}
             
@@ -71,7 +93,11 @@ class VideoStreamService(BaseService):
         protocol: StreamProtocol = StreamProtocol.RTSP,
         on_frame_callback: Optional[Callable[[str, str], None]] = None,
         target_fps: int = 30,
-        buffer_size: int = 5
+        buffer_size: int = 5,
+        frame_format: str = "base64",
+        jpeg_quality: int = 85,
+        max_width: int = 1280,
+        keyframes_only: bool = False
     ) -> StreamModel:
         """
         Inicia un nuevo stream de video.
@@ -83,6 +109,10 @@ class VideoStreamService(BaseService):
             on_frame_callback: Callback para notificar frames (camera_id, frame_base64)
             target_fps: FPS objetivo
             buffer_size: Tamaño del buffer de frames
+            frame_format: Formato entregado a los callbacks ("base64" o "bytes")
+            jpeg_quality: Calidad JPEG de la codificación
+            max_width: Ancho máximo de los frames codificados
+            keyframes_only: Decodificar solo keyframes (miniaturas)
             
         Returns:
             StreamModel con información del stream iniciado
@@ -101,7 +131,9 @@ class VideoStreamService(BaseService):
                 camera_id=camera_id,
                 protocol=protocol,
                 target_fps=target_fps,
-                buffer_size=buffer_size
+                buffer_size=buffer_size,
+                jpeg_quality=jpeg_quality,
+                max_width=max_width
             )
             stream_model.start()
             
@@ -116,7 +148,12 @@ class VideoStreamService(BaseService):
                     protocol=protocol,
                     stream_model=stream_model,
                     connection_config=connection_config,
-                    frame_converter=self._frame_converter
+                    frame_converter=(
+                        self._bytes_frame_converter
+                        if frame_format == "bytes"
+                        else self._frame_converter
+                    ),
+                    keyframes_only=keyframes_only
                 )
                 self.logger.info(f"Stream manager created successfully")
             except Exception as e:
@@ -128,6 +165,9 @@ class VideoStreamService(BaseService):
             
             # Configurar callback interno para recibir frames
             stream_manager.set_frame_callback(self._on_frame_received)
+            stream_manager.set_encode_executor(self._encode_executor)
+            self._stage_latency[camera_id] = LatencyTracker()
+            stream_manager.set_latency_tracker(self._stage_latency[camera_id])
             
             # Guardar referencias
             self._active_streams[camera_id] = stream_manager
@@ -235,6 +275,34 @@ class VideoStreamService(BaseService):
                 callbacks.remove(callback)
                 self.logger.debug(f"Callback removido para cámara {camera_id}")
     
+    def set_manager_factory(self, factory: StreamManagerFactory) -> None:
+        """
+        Reemplaza la factory de stream managers de los streams nuevos.
+        
+        Permite conectar fuentes alternativas (p.ej. fuentes sintéticas de
+        benchmark) sin cambiar el resto del pipeline.
+        
+        Args:
+            factory: Factory a usar en los próximos ``start_stream``
+        """
+        self._manager_factory = factory
+    
+    def is_stream_running(self, camera_id: str) -> bool:
+        """
+        Indica si la tarea de captura de la cámara sigue viva.
+        
+        Un stream cuya tarea terminó con error sigue registrado hasta que se
+        detiene explícitamente, pero ya no produce frames.
+        
+        Args:
+            camera_id: ID de la cámara
+            
+        Returns:
+            True si el stream está registrado y su tarea no ha terminado
+        """
+        task = self._tasks.get(camera_id)
+        return camera_id in self._active_streams and task is not None and not task.done()
+    
     def get_stream_model(self, camera_id: str) -> Optional[StreamModel]:
         """Obtiene el modelo de stream para una cámara."""
         return self._stream_models.get(camera_id)
@@ -268,9 +336,119 @@ class VideoStreamService(BaseService):
             'frame_count': stream_model.frame_count,
             'dropped_frames': stream_model.dropped_frames,
             'uptime_seconds': stream_model.get_uptime_seconds(),
-            'error_message': stream_model.error_message
+            'error_message': stream_model.error_message,
+            'encode_latency': self._encode_executor.get_latency(camera_id),
+            'latency': self.get_latency_breakdown(camera_id)
         }
     
+    def record_stage_latency(self, camera_id: str, stage: str, latency_ms: float) -> None:
+        """
+        Registra la latencia de una etapa medida fuera del stream manager.
+        
+        Args:
+            camera_id: ID de la cámara (clave del stream)
+            stage: Etapa de ``LATENCY_STAGES``
+            latency_ms: Latencia en milisegundos
+        """
+        tracker = self._stage_latency.get(camera_id)
+        if tracker is not None:
+            tracker.record(stage, latency_ms)
+    
+    def get_latency_breakdown(self, camera_id: str) -> Dict[str, Dict[str, float]]:
+        """
+        Obtiene los percentiles de latencia de cada etapa del pipeline.
+        
+        Args:
+            camera_id: ID de la cámara (clave del stream)
+            
+        Returns:
+            Resumen (count, avg, max, p50/p95/p99) por etapa con muestras,
+            en el orden de ``LATENCY_STAGES``
+        """
+        tracker = self._stage_latency.get(camera_id)
+        if tracker is None:
+            return {}
+        summaries = tracker.get_all_summaries()
+        return {stage: summaries[stage] for stage in LATENCY_STAGES if stage in summaries}
+    
+    async def encode_frame_variant(
+        self,
+        frame: EncodedFrame,
+        quality: int,
+        max_width: int
+    ) -> EncodedFrame:
+        """
+        Recodifica un frame compartido con otra calidad y ancho máximo.
+        
+        Usa el pool de codificación, por lo que no bloquea el event loop.
+        
+        Args:
+            frame: Frame compartido con su frame original en ``source``
+            quality: Calidad JPEG objetivo
+            max_width: Ancho máximo objetivo
+            
+        Returns:
+            Nuevo frame codificado (o el mismo si no hay frame original)
+        """
+        if frame.source is None:
+            return frame
+        
+        converter = self._bytes_frame_converter
+        resize_to = FrameConverter.size_for_max_width(frame.source, max_width)
+        key = converter.cache_key(frame.camera_id, resize_to, quality)
+        
+        # Un escalón ya codificado para este frame se reutiliza
+        payload = converter.cache.get(key, frame.sequence)
+        
+        if payload is None:
+            pending_key = (key, frame.sequence)
+            pending = self._pending_variants.get(pending_key)
+            
+            if pending is not None:
+                # Otro cliente ya está codificando este mismo escalón
+                await asyncio.wait({pending})
+                if pending.cancelled() or pending.exception() is not None:
+                    return frame
+                payload = pending.result()
+            else:
+                pending = asyncio.get_running_loop().create_future()
+                self._pending_variants[pending_key] = pending
+                try:
+                    payload = await self._encode_executor.encode(
+                        frame.camera_id,
+                        converter,
+                        frame.source,
+                        resize=resize_to,
+                        quality=quality
+                    )
+                    converter.cache.put(key, frame.sequence, payload)
+                    pending.set_result(payload)
+                except BaseException as e:
+                    if isinstance(e, asyncio.CancelledError):
+                        pending.cancel()
+                    else:
+                        pending.set_exception(e)
+                        # Evitar "exception was never retrieved" si nadie más esperaba
+                        pending.exception()
+                    raise
+                finally:
+                    self._pending_variants.pop(pending_key, None)
+        
+        return EncodedFrame(
+            camera_id=frame.camera_id,
+            payload=payload,
+            sequence=frame.sequence,
+            capture_timestamp=frame.capture_timestamp,
+            encoding=frame.encoding,
+            quality=quality,
+            captured_at=frame.captured_at,
+            encoded_at=frame.encoded_at
+        )
+    
+    def get_encode_cache_stats(self) -> Dict[str, Any]:
+        """Obtiene estadísticas de la cache de recodificaciones."""
+        return self._bytes_frame_converter.cache.get_stats()
+    
     def get_performance_metrics(self) -> Dict[str, Any]:
         """Obtiene métricas globales de performance."""
         return self._performance_monitor.get_current_metrics()
@@ -347,6 +525,11 @@ class VideoStreamService(BaseService):
         
         # Limpiar callbacks
         self._frame_callbacks.pop(camera_id, None)
+        
+        # Limpiar métricas de codificación y de latencia
+        self._encode_executor.reset_camera(camera_id)
+        self._stage_latency.pop(camera_id, None)
+        self._bytes_frame_converter.cache.invalidate_camera(camera_id)
     
     async def _notify_stream_error(self, camera_id: str, error_message: str) -> None:
         """Notifica error a callbacks con frame de error."""
@@ -403,6 +586,7 @@ class VideoStreamService(BaseService):
         """Limpieza completa del servicio."""
         await self.stop_all_streams()
         self._performance_monitor.stop_monitoring()
+        self._encode_executor.shutdown()
         
         # Reset singleton
         VideoStreamService._instance = None
@@ -6,6 +6,7 @@ y los presenters, manteniendo la arquitectura MVP.
 """
 
 import asyncio
+import time
 
 from typing import Dict, Any, Optional, Callable
 from datetime import datetime
@@ -15,9 +16,10 @@ import platform
 
 from services.base_service import BaseService
 from services.camera_manager_service import camera_manager_service
+from services.video.frame_broadcast_hub import FrameBroadcastHub, FrameSubscription
 from presenters.streaming.video_stream_presenter import VideoStreamPresenter
 from models import ConnectionConfig
-from models.streaming import StreamProtocol
+from models.streaming import StreamProtocol, EncodedFrame
 from config.settings import settings
 from utils.exceptions import StreamingError
 from services.logging_service import get_secure_logger
@@ -30,6 +32,35 @@ from utils.sanitizers import sanitize_url, sanitize_command
 
 
 
+# Preset de calidad → (calidad JPEG, ancho máximo) de la codificación compartida
+QUALITY_PRESETS = {
+    'low': (70, 854),
+    'medium': (85, 1280),
+    'high': (95, 1920),
+    'thumbnail': (60, 320)
+}
+
+# Variantes de stream por cámara: principal y miniatura (substream)
+STREAM_VARIANTS = ('main', 'thumbnail')
+THUMBNAIL_KEY_SUFFIX = '#thumb'
+
+
+def stream_key(camera_id: str, variant: str = 'main') -> str:
+    """
+    Obtiene la clave del stream compartido de una variante.
+    
+    Args:
+        camera_id: ID de la cámara
+        variant: 'main' o 'thumbnail'
+        
+    Returns:
+        camera_id para el stream principal, o camera_id con sufijo para miniaturas
+    """
+    if variant == 'thumbnail':
+        return f"{camera_id}{THUMBNAIL_KEY_SUFFIX}"
+    return camera_id
+
+
 class WebSocketStreamService(BaseService):
     """
     Servicio que gestiona el streaming de video a través de WebSocket.
@@ -47,8 +78,17 @@ class WebSocketStreamService(BaseService):
         self._presenter: Optional[VideoStreamPresenter] = None
         self._active_streams: Dict[str, Dict[str, Any]] = {}
         
+        # Difusión compartida: una captura por cámara para N visores
+        self._broadcast_hub = FrameBroadcastHub()
+        self._subscription_locks: Dict[str, asyncio.Lock] = {}
+        
     async def initialize(self) -> None:
         """Inicializa el servicio y sus dependencias."""
+        # Varios handlers comparten el servicio: reutilizar el presenter existente
+        # para no perder el registro de streams activos
+        if self._presenter is not None:
+            return
+        
         self.logger.info("Initializing WebSocketStreamService")
         self._presenter = VideoStreamPresenter()
         await self._presenter.initialize()
@@ -57,7 +97,9 @@ class WebSocketStreamService(BaseService):
         """Limpia recursos del servicio."""
         if self._presenter:
             await self._presenter.cleanup()
+            self._presenter = None
         self._active_streams.clear()
+        self._subscription_locks.clear()
         
     async def check_camera_connectivity(self, ip: str, port: int = 554) -> bool:
         """
@@ -123,7 +165,9 @@ class WebSocketStreamService(BaseService):
         self,
         camera_id: str,
         stream_config: Dict[str, Any],
-        on_frame_callback: Optional[Callable[[str, str], None]] = None
+        on_frame_callback: Optional[Callable[[str, str], None]] = None,
+        key: Optional[str] = None,
+        substream: bool = False
     ) -> Dict[str, Any]:
         """
         Inicia el streaming de una cámara.
@@ -132,10 +176,14 @@ class WebSocketStreamService(BaseService):
             camera_id: ID de la cámara
             stream_config: Configuración del stream
             on_frame_callback: Callback para frames recibidos
+            key: Clave del stream (por defecto camera_id)
+            substream: Conectar al substream de la cámara (subtype=1)
             
         Returns:
             Diccionario con el resultado de la operación
         """
+        key = key or camera_id
+        
         try:
             # Validar parámetros
             if not camera_id:
@@ -158,22 +206,35 @@ class WebSocketStreamService(BaseService):
                         'camera_id': camera_id
                     }
             
+            if substream:
+                camera_config['subtype'] = 1
+            
             # Crear configuración de conexión
             connection_config = self._create_connection_config(camera_config)
             
             # Determinar protocolo
             protocol = StreamProtocol(camera_config.get('protocol', 'rtsp').lower())
             
+            # Calidad de la codificación compartida según el preset solicitado
+            jpeg_quality, max_width = QUALITY_PRESETS.get(
+                stream_config.get('quality', 'medium'),
+                QUALITY_PRESETS['medium']
+            )
+            
             # Opciones del stream
             options = {
                 'targetFps': stream_config.get('fps', 30),
                 'bufferSize': stream_config.get('buffer_size', 5),
-                'quality': stream_config.get('quality', 'medium')
+                'quality': stream_config.get('quality', 'medium'),
+                'frameFormat': stream_config.get('frame_format', 'base64'),
+                'jpegQuality': jpeg_quality,
+                'maxWidth': max_width,
+                'keyframesOnly': stream_config.get('keyframes_only', False)
             }
             
             # Iniciar stream a través del presenter
             success = await self._presenter.start_camera_stream(
-                camera_id=camera_id,
+                camera_id=key,
                 connection_config=connection_config,
                 protocol=protocol,
                 options=options,
@@ -182,11 +243,13 @@ class WebSocketStreamService(BaseService):
             
             if success:
                 # Guardar información del stream activo
-                self._active_streams[camera_id] = {
+                self._active_streams[key] = {
+                    'camera_id': camera_id,
                     'config': camera_config,
                     'stream_config': stream_config,
                     'started_at': datetime.utcnow(),
-                    'protocol': protocol.value
+                    'protocol': protocol.value,
+                    'substream': substream
                 }
                 
                 return {
@@ -226,6 +289,190 @@ class WebSocketStreamService(BaseService):
                 'camera_id': camera_id
             }
             
+    async def subscribe_camera_stream(
+        self,
+        camera_id: str,
+        subscriber_id: str,
+        stream_config: Dict[str, Any],
+        variant: str = 'main'
+    ) -> Dict[str, Any]:
+        """
+        Suscribe un visor al stream compartido de una cámara.
+        
+        El primer suscriptor inicia la captura con su configuración; los
+        siguientes reutilizan la misma captura y codificación. La variante
+        'thumbnail' usa una captura independiente desde el substream.
+        
+        Args:
+            camera_id: ID de la cámara
+            subscriber_id: ID del visor (client_id)
+            stream_config: Configuración del stream (solo aplica al primero)
+            variant: 'main' o 'thumbnail'
+            
+        Returns:
+            Diccionario con el resultado y la suscripción en 'subscription'
+        """
+        if variant not in STREAM_VARIANTS:
+            raise ValueError(f"Variante de stream no soportada: {variant}")
+        
+        key = stream_key(camera_id, variant)
+        lock = self._subscription_locks.setdefault(key, asyncio.Lock())
+        
+        async with lock:
+            subscription = self._broadcast_hub.subscribe(key, subscriber_id)
+            
+            if key in self._active_streams and not self.is_streaming(key):
+                # La captura murió (p. ej. error en el loop): limpiar y reiniciar
+                self.logger.warning(f"Stream de {key} detenido inesperadamente, reiniciando captura")
+                await self.stop_camera_stream(key)
+                self._active_streams.pop(key, None)
+            
+            if self.is_streaming(key):
+                stream_info = self._active_streams[key]
+                self.logger.info(
+                    f"Visor {subscriber_id} reutiliza stream de {key} "
+                    f"({self._broadcast_hub.subscriber_count(key)} visores)"
+                )
+                return {
+                    'success': True,
+                    'camera_id': camera_id,
+                    'protocol': stream_info['protocol'],
+                    'shared': True,
+                    'subscription': subscription
+                }
+            
+            # La captura compartida entrega bytes; cada visor decide su transporte
+            shared_config = dict(stream_config, frame_format='bytes')
+            
+            result = await self.start_camera_stream(
+                camera_id=camera_id,
+                stream_config=shared_config,
+                on_frame_callback=self._publish_frame,
+                key=key,
+                substream=variant == 'thumbnail' and settings.GRID_USE_SUBSTREAM
+            )
+            
+            if (
+                not result['success']
+                and variant == 'thumbnail'
+                and settings.GRID_USE_SUBSTREAM
+                and result.get('error') != 'Camera not accessible on network'
+            ):
+                # Cámaras sin substream: miniaturas desde el stream principal
+                self.logger.warning(
+                    f"Substream no disponible para {camera_id}, usando stream principal"
+                )
+                result = await self.start_camera_stream(
+                    camera_id=camera_id,
+                    stream_config=dict(shared_config, check_connectivity=False),
+                    on_frame_callback=self._publish_frame,
+                    key=key
+                )
+            
+            if not result['success']:
+                self._broadcast_hub.unsubscribe(subscription)
+                return result
+            
+            result['shared'] = False
+            result['subscription'] = subscription
+            return result
+    
+    async def unsubscribe_camera_stream(self, subscription: FrameSubscription) -> None:
+        """
+        Elimina un visor del stream compartido.
+        
+        La captura se detiene solo cuando sale el último visor.
+        
+        Args:
+            subscription: Suscripción devuelta por subscribe_camera_stream
+        """
+        camera_id = subscription.camera_id
+        lock = self._subscription_locks.setdefault(camera_id, asyncio.Lock())
+        
+        async with lock:
+            remaining = self._broadcast_hub.unsubscribe(subscription)
+            
+            if remaining == 0:
+                # También se limpian capturas muertas; el lock se conserva
+                # porque puede haber suscriptores esperando en él
+                if camera_id in self._active_streams:
+                    await self.stop_camera_stream(camera_id)
+            else:
+                self.logger.info(
+                    f"Visor {subscription.subscriber_id} salió de {camera_id}, "
+                    f"quedan {remaining} visores"
+                )
+    
+    def _publish_frame(self, camera_id: str, frame_data: Any) -> None:
+        """
+        Difunde el frame codificado a los visores de la cámara.
+        
+        Args:
+            camera_id: ID de la cámara
+            frame_data: EncodedFrame del pipeline (o base64 en frames de error)
+        """
+        if isinstance(frame_data, EncodedFrame):
+            frame = frame_data
+        else:
+            frame = EncodedFrame(
+                camera_id=camera_id,
+                payload=frame_data,
+                capture_timestamp=time.time() * 1000
+            )
+        self._broadcast_hub.publish(camera_id, frame)
+    
+    async def encode_frame_variant(
+        self,
+        frame: EncodedFrame,
+        quality: int,
+        max_width: int
+    ) -> EncodedFrame:
+        """
+        Obtiene una versión del frame con otra calidad/resolución para un visor.
+        
+        Args:
+            frame: Frame compartido
+            quality: Calidad JPEG objetivo
+            max_width: Ancho máximo objetivo
+            
+        Returns:
+            Frame recodificado
+        """
+        return await self._presenter.video_service.encode_frame_variant(frame, quality, max_width)
+    
+    def record_frame_latency(self, camera_id: str, stage: str, latency_ms: float) -> None:
+        """
+        Registra la latencia de una etapa de entrega de frames al visor.
+        
+        Args:
+            camera_id: Clave del stream (``EncodedFrame.camera_id``)
+            stage: Etapa del pipeline (dispatch, base64, send, total)
+            latency_ms: Latencia en milisegundos
+        """
+        if self._presenter is not None:
+            self._presenter.video_service.record_stage_latency(camera_id, stage, latency_ms)
+    
+    def get_latency_breakdown(self, camera_id: str) -> Dict[str, Dict[str, float]]:
+        """Obtiene los percentiles de latencia por etapa del stream de una cámara."""
+        if self._presenter is None:
+            return {}
+        return self._presenter.video_service.get_latency_breakdown(camera_id)
+    
+    def get_stream_quality(self, camera_id: str) -> Optional[str]:
+        """Obtiene el preset de calidad de la codificación compartida activa."""
+        stream_info = self._active_streams.get(camera_id)
+        if stream_info is None:
+            return None
+        return stream_info['stream_config'].get('quality', 'medium')
+    
+    def get_viewer_count(self, camera_id: str) -> int:
+        """Obtiene el número de visores suscritos a una cámara."""
+        return self._broadcast_hub.subscriber_count(camera_id)
+    
+    def get_broadcast_stats(self, camera_id: Optional[str] = None) -> Dict[str, Any]:
+        """Obtiene estadísticas de difusión por cámara."""
+        return self._broadcast_hub.get_stats(camera_id)
+    
     async def stop_camera_stream(self, camera_id: str) -> Dict[str, Any]:
         """
         Detiene el streaming de una cámara.
@@ -311,6 +558,7 @@ class WebSocketStreamService(BaseService):
             metrics['uptime_seconds'] = (
                 datetime.utcnow() - stream_info['started_at']
             ).total_seconds()
+            metrics['viewers'] = self.get_viewer_count(camera_id)
             
             return metrics
             
@@ -416,8 +664,12 @@ class WebSocketStreamService(BaseService):
         return self._active_streams.copy()
         
     def is_streaming(self, camera_id: str) -> bool:
-        """Verifica si una cámara está transmitiendo."""
-        return camera_id in self._active_streams
+        """Verifica si una cámara está transmitiendo y su captura sigue viva."""
+        if camera_id not in self._active_streams:
+            return False
+        if self._presenter is None:
+            return True
+        return self._presenter.video_service.is_stream_running(camera_id)
 
 
 # Instancia singleton del servicio
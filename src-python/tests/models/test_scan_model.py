@@ -0,0 +1,175 @@
+"""
+Tests para el motor de escaneo de ScanModel.
+
+Verifica que los rangos de IPs se generan de forma perezosa, que el pool de
+workers respeta el límite de concurrencia y que el progreso se notifica
+por lotes.
+"""
+
+import asyncio
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from models.camera_model import ProtocolType
+from models.scan_model import (
+    IPRangeSequence,
+    ProtocolDetectionResult,
+    ScanMethod,
+    ScanModel,
+    ScanRange,
+    ScanResult,
+)
+
+
+class TestScanRange:
+    """Tests para la generación perezosa de objetivos."""
+
+    def test_ips_is_lazy_sequence(self):
+        """Un /16 no materializa sus IPs."""
+        scan_range = ScanRange(start_ip="10.0.0.0", end_ip="10.0.255.255", ports=[554])
+        ips = scan_range.ips
+
+        assert isinstance(ips, IPRangeSequence)
+        assert len(ips) == 65536
+        assert ips[0] == "10.0.0.0"
+        assert ips[-1] == "10.0.255.255"
+        assert ips[256] == "10.0.1.0"
+        assert "10.0.128.7" in ips
+        assert "10.1.0.0" not in ips
+
+    def test_iter_targets_groups_ports_by_host(self):
+        """Los puertos de cada IP se generan consecutivos."""
+        scan_range = ScanRange(start_ip="192.168.1.1", end_ip="192.168.1.2", ports=[80, 554])
+
+        assert list(scan_range.iter_targets()) == [
+            ("192.168.1.1", 80),
+            ("192.168.1.1", 554),
+            ("192.168.1.2", 80),
+            ("192.168.1.2", 554),
+        ]
+        assert scan_range.get_ip_list() == ["192.168.1.1", "192.168.1.2"]
+
+
+class TestScanEngine:
+    """Tests para el pool de workers del escaneo."""
+
+    @pytest.mark.asyncio
+    async def test_worker_pool_bounds_concurrency(self):
+        """Nunca hay más sondeos en vuelo que workers."""
+        scan_range = ScanRange(start_ip="10.0.0.0", end_ip="10.0.3.255", ports=[80, 554])
+        model = ScanModel("test", scan_range, max_concurrent=8)
+        in_flight = 0
+        peak = 0
+
+        async def probe(ip, port):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+
+        processed = await model._run_worker_pool(scan_range.iter_targets(), probe)
+
+        assert processed == scan_range.total_combinations
+        assert peak <= 8
+        model.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_port_scan_streams_results_and_batches_progress(self):
+        """Los puertos abiertos llegan a results y el progreso va por lotes."""
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen(16)
+        open_port = server.getsockname()[1]
+
+        closed_ports = []
+        for _ in range(40):
+            closed = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            closed.bind(("127.0.0.1", 0))
+            closed_ports.append(closed.getsockname()[1])
+            closed.close()
+
+        ports = [open_port] + closed_ports
+        scan_range = ScanRange(start_ip="127.0.0.1", end_ip="127.0.0.1", ports=ports)
+        model = ScanModel("test", scan_range, methods=[ScanMethod.PORT_SCAN], max_concurrent=4, timeout=1.0)
+        model.PROGRESS_BATCH_SIZE = 16
+        model.PROGRESS_INTERVAL = 60.0
+        notifications = []
+        model.add_progress_callback(lambda progress: notifications.append(progress.scanned_ports))
+
+        try:
+            assert await model.start_scan_async()
+        finally:
+            server.close()
+
+        assert open_port in model.results["127.0.0.1"].open_ports
+        assert model.results["127.0.0.1"].is_alive
+        assert model.progress.scanned_ports == len(ports)
+        # 41 sondeos: el primero, dos lotes completos, el resto y el cierre
+        assert len(notifications) <= 5
+        assert notifications[-1] == len(ports)
+        model.cleanup()
+
+
+class TestIncrementalScan:
+    """Tests para la reutilización de resultados del índice."""
+
+    @staticmethod
+    def _known(ip, port, mac=None):
+        return ScanResult(
+            ip=ip,
+            mac_address=mac,
+            is_alive=True,
+            open_ports=[port],
+            detected_protocols=[ProtocolDetectionResult(
+                ip=ip, port=port, protocol=ProtocolType.RTSP,
+                detected=True, response_time_ms=3.0
+            )]
+        )
+
+    @pytest.mark.asyncio
+    async def test_unchanged_hosts_are_not_probed_again(self):
+        """Un host activo sin cambios reutiliza puertos y protocolos indexados."""
+        scan_range = ScanRange(start_ip="10.0.0.1", end_ip="10.0.0.2", ports=[554])
+        model = ScanModel(
+            "test", scan_range,
+            methods=[ScanMethod.PORT_SCAN, ScanMethod.PROTOCOL_DETECTION],
+            known_results={"10.0.0.1": self._known("10.0.0.1", 554)}
+        )
+        probed = []
+
+        async def scan_port(ip, port):
+            probed.append(ip)
+
+        model._scan_port = scan_port
+        model._alive_known = True
+        model.results = {ip: ScanResult(ip=ip, is_alive=True) for ip in ("10.0.0.1", "10.0.0.2")}
+
+        await model._port_scan(scan_range.ips)
+
+        assert probed == ["10.0.0.2"]
+        assert model.reused_ips == {"10.0.0.1"}
+        assert model.results["10.0.0.1"].best_protocol == ProtocolType.RTSP
+        assert model.get_all_results()[0]["from_index"]
+        model.cleanup()
+
+    def test_changed_hosts_are_probed_again(self):
+        """Otra MAC o un puerto nuevo obligan a sondear el host."""
+        scan_range = ScanRange(start_ip="10.0.0.1", end_ip="10.0.0.2", ports=[80, 554])
+        model = ScanModel("test", scan_range, known_results={
+            "10.0.0.1": self._known("10.0.0.1", 554, mac="aa:aa:aa:aa:aa:aa"),
+            "10.0.0.2": self._known("10.0.0.2", 554)
+        })
+        model.results = {
+            "10.0.0.1": ScanResult(ip="10.0.0.1", is_alive=True, mac_address="bb:bb:bb:bb:bb:bb"),
+            "10.0.0.2": ScanResult(ip="10.0.0.2", is_alive=True, open_ports=[80])
+        }
+
+        assert model._reuse_known_results() == 0
+        model.cleanup()
@@ -0,0 +1,110 @@
+"""
+Tests para el snapshot del listado de cámaras.
+
+Verifica que el cuerpo serializado se reutiliza mientras nada cambia,
+que una invalidación solo rehace la cámara afectada y que los cambios de
+estado hechos sobre el modelo también se detectan.
+"""
+
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from services.camera_list_snapshot import CameraListSnapshot
+
+
+def _camera(camera_id, name):
+    return SimpleNamespace(camera_id=camera_id, display_name=name, status="disconnected",
+                           is_streaming=False, is_active=True,
+                           last_updated=datetime(2024, 5, 1))
+
+
+class _Renderer:
+    """Render que cuenta las cámaras construidas."""
+
+    def __init__(self):
+        self.rendered = []
+
+    def __call__(self, camera):
+        if camera.display_name is None:
+            raise ValueError("cámara inválida")
+        self.rendered.append(camera.camera_id)
+        return {"camera_id": camera.camera_id, "display_name": camera.display_name,
+                "status": camera.status, "updated_at": camera.last_updated}
+
+
+class TestCameraListSnapshot:
+    """Tests para CameraListSnapshot."""
+
+    def test_body_is_reused_until_something_changes(self):
+        """Sin cambios se devuelve el mismo cuerpo y ETag sin reconstruir."""
+        snapshot = CameraListSnapshot()
+        render = _Renderer()
+        cameras = [_camera("cam-1", "Entrada"), _camera("cam-2", "Patio")]
+
+        first = snapshot.get(cameras, render)
+        second = snapshot.get(cameras, render)
+
+        assert second is first
+        assert render.rendered == ["cam-1", "cam-2"]
+        assert json.loads(first.body) == {
+            "total": 2,
+            "cameras": [
+                {"camera_id": "cam-1", "display_name": "Entrada", "status": "disconnected",
+                 "updated_at": "2024-05-01T00:00:00"},
+                {"camera_id": "cam-2", "display_name": "Patio", "status": "disconnected",
+                 "updated_at": "2024-05-01T00:00:00"},
+            ]
+        }
+        assert snapshot.get_stats()["hits"] == 1
+
+    def test_invalidation_rebuilds_only_the_changed_camera(self):
+        """Tras editar una cámara solo se vuelve a serializar esa entrada."""
+        snapshot = CameraListSnapshot()
+        render = _Renderer()
+        cameras = [_camera("cam-1", "Entrada"), _camera("cam-2", "Patio")]
+        before = snapshot.get(cameras, render)
+
+        cameras[1].display_name = "Jardín"
+        snapshot.invalidate("cam-2")
+        after = snapshot.get(cameras, render)
+
+        assert render.rendered == ["cam-1", "cam-2", "cam-2"]
+        assert after.etag != before.etag
+        assert after.version == before.version + 1
+        assert json.loads(after.body)["cameras"][1]["display_name"] == "Jardín"
+
+    def test_model_state_changes_are_detected(self):
+        """Un cambio de estado sobre el modelo rehace la entrada sin invalidar."""
+        snapshot = CameraListSnapshot()
+        render = _Renderer()
+        cameras = [_camera("cam-1", "Entrada"), _camera("cam-2", "Patio")]
+        before = snapshot.get(cameras, render)
+
+        cameras[0].status = "connected"
+        cameras[0].last_updated += timedelta(seconds=5)
+        after = snapshot.get(cameras, render)
+
+        assert render.rendered == ["cam-1", "cam-2", "cam-1"]
+        assert after.etag != before.etag
+        assert json.loads(after.body)["cameras"][0]["status"] == "connected"
+
+    def test_filters_are_cached_separately_and_invalid_cameras_skipped(self):
+        """Cada combinación de filtros tiene su cuerpo; las inválidas se omiten."""
+        snapshot = CameraListSnapshot()
+        render = _Renderer()
+        cameras = [_camera("cam-1", "Entrada"), _camera("cam-2", None)]
+
+        everything = snapshot.get(cameras, render, key=(False, None))
+        first_only = snapshot.get(cameras[:1], render, key=(True, None))
+
+        assert everything.total == 1
+        assert first_only.total == 1
+        # cam-1 se serializa una vez y se comparte entre filtros
+        assert render.rendered == ["cam-1"]
+        assert snapshot.get_stats()["cached_bodies"] == 2
@@ -0,0 +1,121 @@
+"""
+Tests para el pool compartido de conexiones SQLite.
+
+Verifica los pragmas aplicados, la reutilización de conexiones por hilo,
+el commit/rollback del context manager y que las lecturas no esperan a
+una escritura en curso.
+"""
+
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from services.database.connection_pool import SQLiteConnectionPool, get_connection_pool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SQLiteConnectionPool(tmp_path / "test.db")
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    yield pool
+    pool.close()
+
+
+class TestSQLiteConnectionPool:
+    """Tests para SQLiteConnectionPool."""
+
+    def test_pragmas_are_applied(self, pool):
+        """WAL, synchronous=NORMAL y claves foráneas en cada conexión."""
+        conn = pool.get()
+
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] < 0
+
+    def test_connection_is_reused_per_thread(self, pool):
+        """Un hilo reutiliza su conexión; otro hilo obtiene la suya."""
+        main = pool.get()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other = executor.submit(pool.get).result()
+            again = executor.submit(pool.get).result()
+
+        assert pool.get() is main
+        assert other is again
+        assert other is not main
+        assert pool.get_stats()['open_connections'] == 2
+
+    def test_connection_commits_and_rolls_back(self, pool):
+        """Commit al salir; rollback si hay excepción."""
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('ok')")
+        with pytest.raises(RuntimeError):
+            with pool.connection() as conn:
+                conn.execute("INSERT INTO items (name) VALUES ('bad')")
+                raise RuntimeError("fallo")
+
+        rows = pool.get().execute("SELECT name FROM items").fetchall()
+        assert [row['name'] for row in rows] == ['ok']
+
+    def test_reads_do_not_wait_for_open_write(self, pool):
+        """Con WAL una lectura avanza mientras otra conexión escribe."""
+        write_started = threading.Event()
+        release_write = threading.Event()
+
+        def writer():
+            with pool.connection() as conn:
+                conn.execute("INSERT INTO items (name) VALUES ('pending')")
+                write_started.set()
+                release_write.wait(5)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        write_started.wait(5)
+        try:
+            count = pool.get().execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        finally:
+            release_write.set()
+            thread.join()
+
+        assert count == 0
+        assert pool.get().execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
+
+    def test_close_reconnects_on_demand(self, pool):
+        """Tras cerrar, la siguiente consulta abre una conexión nueva."""
+        first = pool.get()
+        pool.close()
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            first.execute("SELECT 1")
+        assert pool.get().execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+
+    def test_shared_pool_per_path(self, tmp_path):
+        """Los servicios de una misma BD comparten pool; :memory: no."""
+        path = tmp_path / "shared.db"
+
+        assert get_connection_pool(path) is get_connection_pool(str(path))
+        assert get_connection_pool(":memory:") is not get_connection_pool(":memory:")
+        get_connection_pool(path).close()
+
+    def test_memory_pool_is_shared_between_threads(self):
+        """Una base en memoria es la misma para todos los hilos."""
+        pool = SQLiteConnectionPool(":memory:")
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.execute("INSERT INTO t VALUES (1)")
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            count = executor.submit(
+                lambda: pool.get().execute("SELECT COUNT(*) FROM t").fetchone()[0]
+            ).result()
+
+        assert count == 1
+        pool.close()
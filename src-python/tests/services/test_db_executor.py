@@ -0,0 +1,122 @@
+"""
+Tests para el executor dedicado de base de datos.
+
+Verifica que las escrituras se serializan en un único hilo, que las
+lecturas corren en paralelo fuera del event loop y que se registran la
+profundidad de cola y los tiempos de espera.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from services.database.db_executor import DatabaseExecutor, db_read, db_write
+
+
+class _Repository:
+    """Servicio mínimo con métodos decorados."""
+
+    def __init__(self, executor):
+        self._db_executor = executor
+
+    @db_read
+    def current_thread(self):
+        return threading.current_thread().name
+
+    @db_write
+    def store(self, value, suffix=""):
+        return f"{value}{suffix}@{threading.current_thread().name}"
+
+
+class TestDatabaseExecutor:
+    """Tests para DatabaseExecutor."""
+
+    @pytest.mark.asyncio
+    async def test_writes_share_a_single_thread(self):
+        """Todas las escrituras corren en el mismo hilo escritor."""
+        executor = DatabaseExecutor(readers=2, name="test_db")
+        try:
+            threads = await asyncio.gather(
+                *(executor.write(lambda: threading.current_thread().name) for _ in range(10))
+            )
+        finally:
+            executor.shutdown()
+
+        assert len(set(threads)) == 1
+        assert threads[0].startswith("test_db_writer")
+
+    @pytest.mark.asyncio
+    async def test_reads_run_in_parallel_off_the_loop(self):
+        """Las lecturas usan varios hilos lectores sin bloquear el loop."""
+        executor = DatabaseExecutor(readers=4, name="test_db")
+        loop_thread = threading.current_thread().name
+        try:
+            start = time.perf_counter()
+            threads = await asyncio.gather(
+                *(executor.read(lambda: (time.sleep(0.1), threading.current_thread().name)[1])
+                  for _ in range(4))
+            )
+            elapsed = time.perf_counter() - start
+        finally:
+            executor.shutdown()
+
+        assert loop_thread not in threads
+        assert all(name.startswith("test_db_reader") for name in threads)
+        assert elapsed < 0.3
+
+    @pytest.mark.asyncio
+    async def test_queue_depth_and_wait_time(self):
+        """Una escritura lenta deja en cola a las siguientes."""
+        executor = DatabaseExecutor(readers=1, name="test_db")
+        try:
+            await asyncio.gather(*(executor.write(time.sleep, 0.05) for _ in range(3)))
+            metrics = executor.get_metrics()
+        finally:
+            executor.shutdown()
+
+        write = metrics['write']
+        assert write['completed'] == 3
+        assert write['queue_depth'] == 0
+        assert write['max_queue_depth'] >= 2
+        # La última esperó a las dos anteriores
+        assert write['wait_time']['max_ms'] >= 90
+        assert metrics['read']['submitted'] == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_and_are_counted(self):
+        """Las excepciones llegan al llamante y cuentan como fallos."""
+        executor = DatabaseExecutor(readers=1, name="test_db")
+
+        def fail():
+            raise ValueError("boom")
+
+        try:
+            with pytest.raises(ValueError):
+                await executor.read(fail)
+            metrics = executor.get_metrics()
+        finally:
+            executor.shutdown()
+
+        assert metrics['read']['failed'] == 1
+        assert metrics['read']['running'] == 0
+
+    @pytest.mark.asyncio
+    async def test_decorators_and_restart_after_shutdown(self):
+        """Los decoradores envían al pool correcto y el executor se reabre."""
+        executor = DatabaseExecutor(readers=1, name="test_db")
+        repository = _Repository(executor)
+        try:
+            assert (await repository.current_thread()).startswith("test_db_reader")
+            executor.shutdown()
+            stored = await repository.store("value", suffix="!")
+        finally:
+            executor.shutdown()
+
+        assert stored.startswith("value!@test_db_writer")
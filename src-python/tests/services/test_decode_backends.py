@@ -0,0 +1,132 @@
+"""
+Tests para los backends de decodificación.
+
+La lectura de frames de ffmpeg se prueba con un proceso que escribe frames
+crudos conocidos en stdout, sin necesidad de ffmpeg ni de una cámara.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from services.video.decode_backends import (
+    FFmpegPipeBackend,
+    OpenCVDecodeBackend,
+    create_decode_backend
+)
+
+
+WIDTH, HEIGHT = 4, 2
+FRAME_BYTES = WIDTH * HEIGHT * 3
+
+
+def _raw_frames_process(count: int) -> subprocess.Popen:
+    """Proceso que escribe ``count`` frames crudos rellenos con su índice."""
+    script = (
+        "import sys\n"
+        f"for i in range({count}):\n"
+        f"    sys.stdout.buffer.write(bytes([i]) * {FRAME_BYTES})\n"
+    )
+    return subprocess.Popen(
+        [sys.executable, "-c", script],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+
+
+def _backend_with_process(count: int) -> FFmpegPipeBackend:
+    backend = FFmpegPipeBackend()
+    backend.width, backend.height = WIDTH, HEIGHT
+    backend._allocate_frame()
+    backend._process = _raw_frames_process(count)
+    return backend
+
+
+class TestFFmpegPipeBackend:
+    """Tests para FFmpegPipeBackend."""
+
+    def test_command_skips_non_keyframes_before_input(self):
+        """-skip_frame nokey es opción del decodificador (antes de -i)."""
+        backend = FFmpegPipeBackend(keyframes_only=True, threads=2)
+        command = backend._build_command("rtsp://cam/stream", 5000)
+
+        assert command.index("-skip_frame") < command.index("-i")
+        assert command[command.index("-skip_frame") + 1] == "nokey"
+        assert command[command.index("-threads") + 1] == "2"
+        assert command[-3:] == ["-pix_fmt", "bgr24", "pipe:1"]
+
+    def test_command_without_keyframes_only(self):
+        """Sin keyframes_only no se descartan frames en el decodificador."""
+        command = FFmpegPipeBackend()._build_command("file.mp4", 5000)
+
+        assert "-skip_frame" not in command
+        assert "-rtsp_transport" not in command
+
+    def test_parse_rate(self):
+        """Las fracciones de ffprobe se convierten a FPS."""
+        assert FFmpegPipeBackend._parse_rate("25/1") == 25.0
+        assert FFmpegPipeBackend._parse_rate("30000/1001") == pytest.approx(29.97, 0.01)
+        assert FFmpegPipeBackend._parse_rate("0/0") == 0.0
+        assert FFmpegPipeBackend._parse_rate(None) == 0.0
+
+    def test_delivered_frames_own_their_memory(self):
+        """retrieve() entrega el array leído, que no se reutiliza después."""
+        backend = _backend_with_process(8)
+        try:
+            delivered = []
+            for _ in range(8):
+                assert backend.grab()
+                delivered.append(backend.retrieve())
+
+            assert delivered[0].shape == (HEIGHT, WIDTH, 3)
+            assert all(frame.flags.owndata for frame in delivered)
+            assert [int(frame[0, 0, 0]) for frame in delivered] == list(range(8))
+        finally:
+            backend.release()
+
+    def test_discarded_frames_reuse_the_pending_array(self):
+        """Los frames descartados con grab() no reservan memoria ni tocan los entregados."""
+        backend = _backend_with_process(5)
+        try:
+            backend.grab()
+            first = backend.retrieve()
+            pending = backend._pending
+
+            # Tres frames descartados sin retrieve reutilizan el mismo array
+            for _ in range(3):
+                assert backend.grab()
+
+            assert backend._pending is pending
+            assert int(first[0, 0, 0]) == 0
+            second = backend.retrieve()
+            assert second is pending
+            assert int(second[0, 0, 0]) == 3
+        finally:
+            backend.release()
+
+    def test_grab_fails_at_end_of_stream(self):
+        """grab() devuelve False cuando el proceso termina."""
+        backend = _backend_with_process(1)
+        try:
+            assert backend.grab()
+            assert not backend.grab()
+        finally:
+            backend.release()
+
+
+class TestCreateDecodeBackend:
+    """Tests para create_decode_backend."""
+
+    def test_invalid_backend(self):
+        """Un backend desconocido es un error."""
+        with pytest.raises(ValueError):
+            create_decode_backend("gstreamer")
+
+    def test_opencv_backend(self):
+        """El backend por defecto es OpenCV."""
+        assert isinstance(create_decode_backend("opencv"), OpenCVDecodeBackend)
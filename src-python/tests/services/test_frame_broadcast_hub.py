@@ -0,0 +1,70 @@
+"""
+Tests para el hub de difusión de frames.
+
+Verifica el conteo de referencias por cámara y la semántica de
+descarte del frame más antiguo en las colas de cada suscriptor.
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from services.video.frame_broadcast_hub import FrameBroadcastHub
+
+
+class TestFrameBroadcastHub:
+    """Tests para FrameBroadcastHub."""
+
+    @pytest.mark.asyncio
+    async def test_publish_reaches_all_subscribers(self):
+        """Un frame publicado llega a todos los suscriptores de la cámara."""
+        hub = FrameBroadcastHub()
+        sub_a = hub.subscribe("cam_1", "client_a")
+        sub_b = hub.subscribe("cam_1", "client_b")
+        other = hub.subscribe("cam_2", "client_c")
+
+        delivered = hub.publish("cam_1", "frame_1")
+
+        assert delivered == 2
+        assert await sub_a.get(timeout=0.1) == "frame_1"
+        assert await sub_b.get(timeout=0.1) == "frame_1"
+        assert await other.get(timeout=0.01) is None
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_drops_oldest(self):
+        """Un suscriptor lento pierde los frames más antiguos."""
+        hub = FrameBroadcastHub(max_queue_size=2)
+        sub = hub.subscribe("cam_1", "client_a")
+
+        for i in range(5):
+            hub.publish("cam_1", f"frame_{i}")
+
+        assert sub.dropped_frames == 3
+        assert await sub.get(timeout=0.1) == "frame_3"
+        assert await sub.get(timeout=0.1) == "frame_4"
+
+    def test_unsubscribe_returns_remaining(self):
+        """El conteo de referencias baja hasta cero con el último visor."""
+        hub = FrameBroadcastHub()
+        sub_a = hub.subscribe("cam_1", "client_a")
+        sub_b = hub.subscribe("cam_1", "client_b")
+
+        assert hub.unsubscribe(sub_a) == 1
+        assert hub.unsubscribe(sub_b) == 0
+        assert hub.subscriber_count("cam_1") == 0
+        assert hub.publish("cam_1", "frame") == 0
+
+    def test_resubscribe_replaces_previous(self):
+        """Suscribir dos veces el mismo cliente no duplica la referencia."""
+        hub = FrameBroadcastHub()
+        first = hub.subscribe("cam_1", "client_a")
+        second = hub.subscribe("cam_1", "client_a")
+
+        assert first.is_closed
+        assert hub.subscriber_count("cam_1") == 1
+        # Eliminar la suscripción obsoleta no afecta a la vigente
+        assert hub.unsubscribe(first) == 1
+        assert hub.unsubscribe(second) == 0
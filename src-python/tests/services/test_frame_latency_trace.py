@@ -0,0 +1,168 @@
+"""
+Tests para el trazado de latencia de frames.
+
+Verifica que la secuencia y el instante de captura se sellan en el thread
+de captura y viajan hasta el envío, y que se registran las latencias de
+cada etapa del pipeline.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from models import ConnectionConfig
+from models.streaming import EncodedFrame, StreamModel, StreamProtocol
+from services.video.stream_manager import StreamManager
+from utils.video import BytesJPEGStrategy, FrameConverter
+from utils.video.latency_tracker import LatencyTracker
+
+
+class _SyntheticStreamManager(StreamManager):
+    """Stream manager que genera frames sin cámara."""
+
+    async def _initialize_connection(self) -> None:
+        pass
+
+    async def _validate_stream(self) -> None:
+        pass
+
+    def _capture_frame(self):
+        return np.full((240, 640, 3), 128, dtype=np.uint8)
+
+    async def _close_connection(self) -> None:
+        pass
+
+
+class TestCaptureToEncodeTrace:
+    """Tests del tramo captura → codificación."""
+
+    @pytest.mark.asyncio
+    async def test_frames_carry_capture_stamp_and_stage_latencies(self):
+        """Los frames llevan secuencia e instante de captura; se miden las etapas."""
+        stream_model = StreamModel(camera_id="cam_trace", protocol=StreamProtocol.GENERIC,
+                                   target_fps=30, max_width=320)
+        manager = _SyntheticStreamManager(
+            stream_model,
+            ConnectionConfig(ip="127.0.0.1", username="test", password=""),
+            FrameConverter(BytesJPEGStrategy())
+        )
+        tracker = LatencyTracker()
+        frames = []
+        manager.set_latency_tracker(tracker)
+        manager.set_frame_callback(lambda camera_id, frame: frames.append(frame))
+
+        started_ms = time.time() * 1000
+        task = asyncio.create_task(manager.start_streaming())
+        await asyncio.sleep(0.4)
+        await manager.stop()
+        await asyncio.gather(task, return_exceptions=True)
+
+        assert len(frames) >= 3
+        assert all(isinstance(frame, EncodedFrame) for frame in frames)
+        sequences = [frame.sequence for frame in frames]
+        assert sequences == sorted(sequences) and len(set(sequences)) == len(sequences)
+        for frame in frames:
+            assert frame.captured_at <= frame.encoded_at <= time.monotonic()
+            assert started_ms <= frame.capture_timestamp <= time.time() * 1000
+
+        summaries = tracker.get_all_summaries()
+        assert {"queue_wait", "resize", "encode"} <= set(summaries)
+        assert summaries["encode"]["count"] == len(frames)
+
+
+class _RingStreamManager(_SyntheticStreamManager):
+    """Stream manager que entrega vistas sobre un único buffer reutilizado."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._buffer = bytearray(240 * 640 * 3)
+        self._value = 0
+
+    def _capture_frame(self):
+        self._value = (self._value + 1) % 256
+        self._buffer[:] = bytes([self._value]) * len(self._buffer)
+        return np.frombuffer(self._buffer, dtype=np.uint8).reshape(240, 640, 3)
+
+
+class TestCapturedFrameOwnership:
+    """Tests de la vida útil del frame original conservado en ``source``."""
+
+    @pytest.mark.asyncio
+    async def test_borrowed_frames_are_copied_before_leaving_capture(self):
+        """Un frame prestado por el backend no cambia al reutilizarse el buffer."""
+        stream_model = StreamModel(camera_id="cam_ring", protocol=StreamProtocol.GENERIC,
+                                   target_fps=30, max_width=320)
+        manager = _RingStreamManager(
+            stream_model,
+            ConnectionConfig(ip="127.0.0.1", username="test", password=""),
+            FrameConverter(BytesJPEGStrategy())
+        )
+        frames = []
+        manager.set_frame_callback(lambda camera_id, frame: frames.append(frame))
+
+        task = asyncio.create_task(manager.start_streaming())
+        await asyncio.sleep(0.3)
+        await manager.stop()
+        await asyncio.gather(task, return_exceptions=True)
+
+        assert len(frames) >= 3
+        values = [int(frame.source[0, 0, 0]) for frame in frames]
+        assert len(set(values)) == len(values)
+        assert all(frame.source.flags.owndata for frame in frames)
+
+
+class TestDeliveryTrace:
+    """Tests del tramo reparto → envío en StreamHandler."""
+
+    @pytest.mark.asyncio
+    async def test_send_records_base64_send_and_total(self):
+        """El envío JSON registra base64, envío y total con el sello de captura."""
+        from websocket.connection_manager import manager
+        from websocket.stream_handler import StreamHandler
+
+        class _WebSocket:
+            client_state = SimpleNamespace(value=1)
+
+            def __init__(self):
+                self.texts = []
+
+            async def accept(self):
+                pass
+
+            async def send_text(self, text):
+                self.texts.append(text)
+
+        websocket = _WebSocket()
+        await manager.connect(websocket, "trace_client")
+        handler = StreamHandler("cam_trace", websocket, "trace_client")
+        frame = EncodedFrame(camera_id="cam_trace", payload=b"\xff\xd8jpeg", sequence=42,
+                             capture_timestamp=1700000000000.0,
+                             captured_at=time.monotonic() - 0.05,
+                             encoded_at=time.monotonic())
+        recorded = {}
+
+        def record(camera_id, stage, latency_ms):
+            recorded[(camera_id, stage)] = latency_ms
+
+        try:
+            with patch("websocket.stream_handler.websocket_stream_service") as service:
+                service.record_frame_latency.side_effect = record
+                await handler.send_frame(frame, frame.capture_timestamp)
+                await asyncio.sleep(0.05)
+        finally:
+            await manager.disconnect("trace_client")
+
+        message = websocket.texts[-1]
+        assert '"sequence":42' in message
+        assert '"capture_timestamp":"2023-11-14T22:13:20+00:00"' in message
+        assert {stage for _, stage in recorded} == {"base64", "send", "total"}
+        assert recorded[("cam_trace", "total")] >= 50
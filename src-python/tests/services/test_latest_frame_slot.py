@@ -0,0 +1,50 @@
+"""
+Tests para el slot de último frame entre captura y event loop.
+
+Verifica la semántica "el último gana" y el conteo exacto de descartes.
+"""
+
+import asyncio
+import threading
+import pytest
+from pathlib import Path
+import sys
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from services.video.latest_frame_slot import LatestFrameSlot
+
+
+class TestLatestFrameSlot:
+    """Tests para LatestFrameSlot."""
+
+    @pytest.mark.asyncio
+    async def test_latest_frame_wins(self):
+        """Solo se entrega el frame más reciente y el resto cuenta como descarte."""
+        slot = LatestFrameSlot(asyncio.get_running_loop())
+
+        for i in range(5):
+            assert slot.put(i)
+
+        assert await slot.get(timeout=0.1) == 4
+        assert slot.dropped == 4
+        assert await slot.get(timeout=0.01) is None
+
+    @pytest.mark.asyncio
+    async def test_wakeup_from_capture_thread(self):
+        """Un frame puesto desde otro thread despierta al consumidor."""
+        slot = LatestFrameSlot(asyncio.get_running_loop())
+
+        producer = threading.Timer(0.05, slot.put, args=("frame",))
+        producer.start()
+
+        assert await slot.get(timeout=1.0) == "frame"
+        assert slot.dropped == 0
+        producer.join()
+
+    def test_put_without_loop_fails(self):
+        """Sin event loop asociado el productor no puede entregar frames."""
+        slot = LatestFrameSlot()
+        assert slot.put("frame") is False
+        assert slot.produced == 0
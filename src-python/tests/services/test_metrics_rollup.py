@@ -0,0 +1,179 @@
+"""
+Tests para los rollups de publication_metrics.
+
+Verifica la agregación por minuto, la propagación a hora y día, el
+refresco incremental y la elección del tamaño de cubo en las consultas.
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from services.database.connection_pool import SQLiteConnectionPool
+from services.database.metrics_rollup import MetricsRollup, choose_step, percentile, to_epoch
+from services.database.schema.mediamtx_tables import PUBLICATION_METRICS_TABLE
+
+
+# Reciente para que la retención no pode los cubos durante el refresco
+BASE = (datetime.utcnow() - timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    pool = SQLiteConnectionPool(tmp_path / "rollup.db")
+    conn = pool.get()
+    conn.execute("""
+        CREATE TABLE camera_publications (
+            publication_id INTEGER PRIMARY KEY,
+            camera_id TEXT NOT NULL,
+            is_active BOOLEAN DEFAULT 1
+        )
+    """)
+    conn.execute(PUBLICATION_METRICS_TABLE)
+    conn.execute("INSERT INTO camera_publications VALUES (1, 'cam-1', 1)")
+    conn.commit()
+    yield conn
+    pool.close()
+
+
+def _insert(conn, offset_seconds, fps, viewers=1, quality=80.0):
+    conn.execute("""
+        INSERT INTO publication_metrics (
+            publication_id, metric_time, fps, bitrate_kbps, frames,
+            dropped_frames, quality_score, viewer_count, size_kb
+        ) VALUES (1, ?, ?, 1000.0, 100, 1, ?, ?, 10)
+    """, (BASE + timedelta(seconds=offset_seconds), fps, quality, viewers))
+
+
+def _bucket(conn, bucket_seconds, start):
+    return conn.execute("""
+        SELECT * FROM publication_metrics_rollup
+        WHERE publication_id = 1 AND bucket_seconds = ? AND bucket_start = ?
+    """, (bucket_seconds, start)).fetchone()
+
+
+class TestMetricsRollup:
+    """Tests para MetricsRollup."""
+
+    def test_minute_hour_and_day_buckets(self, conn):
+        """Las filas crudas se agregan por minuto y se propagan a hora y día."""
+        rollup = MetricsRollup()
+        for offset, fps in ((5, 20.0), (25, 25.0), (45, 30.0), (70, 10.0)):
+            _insert(conn, offset, fps, viewers=int(fps // 10))
+
+        assert rollup.refresh(conn) == 4
+        conn.commit()
+
+        start = to_epoch(BASE)
+        minute = _bucket(conn, 60, start)
+        assert minute['samples'] == 3
+        assert minute['fps_sum'] / minute['fps_count'] == pytest.approx(25.0)
+        assert (minute['fps_min'], minute['fps_max'], minute['fps_p95']) == (20.0, 30.0, 30.0)
+        assert minute['viewers_max'] == 3
+
+        hour = _bucket(conn, 3600, start)
+        assert hour['samples'] == 4
+        assert hour['fps_min'] == 10.0
+        assert hour['frames_sum'] == 400
+        assert _bucket(conn, 86400, start // 86400 * 86400)['samples'] == 4
+
+    def test_refresh_is_incremental(self, conn):
+        """Cada refresco procesa solo las filas nuevas y actualiza sus cubos."""
+        rollup = MetricsRollup()
+        _insert(conn, 70, 10.0)
+        rollup.refresh(conn)
+
+        _insert(conn, 90, 30.0)
+        assert rollup.refresh(conn) == 1
+        assert rollup.refresh(conn) == 0
+        conn.commit()
+
+        result = rollup.query(conn, 1, BASE, BASE + timedelta(minutes=5), max_points=100)
+        assert result['bucket_seconds'] == 60
+        assert len(result['data_points']) == 1
+        point = result['data_points'][0]
+        assert point['samples'] == 2
+        assert point['fps'] == pytest.approx(20.0)
+        assert point['fps_stats']['max'] == 30.0
+
+    def test_query_summary_matches_raw_rows(self, conn):
+        """El resumen desde rollups coincide con el calculado sobre filas crudas."""
+        rollup = MetricsRollup()
+        for minute in range(0, 180):
+            _insert(conn, minute * 60 + 1, 0.0 if minute % 10 == 0 else 25.0, viewers=minute % 5)
+        rollup.refresh(conn)
+        conn.commit()
+
+        result = rollup.query(conn, 1, BASE, BASE + timedelta(hours=3), max_points=10)
+        summary = result['summary']
+
+        # 3 horas en 10 puntos: cubos de 18 minutos leídos de la tabla de minuto
+        assert result['bucket_seconds'] == 1080
+        assert len(result['data_points']) <= 11
+        assert summary['avg_fps'] == pytest.approx(25.0)
+        assert summary['min_fps'] == 25.0
+        assert summary['peak_viewers'] == 4
+        assert summary['avg_viewers'] == pytest.approx(2.0)
+        assert summary['total_frames'] == 18000
+        assert summary['uptime_percent'] == pytest.approx(90.0)
+
+    def test_prune_keeps_daily_buckets(self, conn):
+        """La retención elimina cubos finos antiguos y conserva los diarios."""
+        rollup = MetricsRollup()
+        _insert(conn, 0, 25.0)
+        rollup.refresh(conn)
+
+        deleted = rollup.prune(conn, now=to_epoch(BASE) + 365 * 86400)
+        remaining = conn.execute(
+            "SELECT bucket_seconds FROM publication_metrics_rollup"
+        ).fetchall()
+
+        assert deleted == 2
+        assert [row[0] for row in remaining] == [86400]
+
+    def test_query_uses_finest_retained_resolution(self, conn):
+        """Un rango que empieza fuera de la retención de minutos lee cubos de hora."""
+        rollup = MetricsRollup()
+        for minute in range(0, 120):
+            _insert(conn, minute * 60 + 1, 25.0)
+        rollup.refresh(conn)
+        now = to_epoch(BASE) + 10 * 86400
+        rollup.prune(conn, now=now)
+        conn.commit()
+
+        result = rollup.query(conn, 1, BASE, BASE + timedelta(hours=2),
+                              max_points=500, now=now)
+
+        assert rollup.finest_retained(to_epoch(BASE), now) == 3600
+        assert result['bucket_seconds'] == 3600
+        assert len(result['data_points']) == 2
+        assert result['summary']['avg_fps'] == pytest.approx(25.0)
+
+
+class TestChooseStep:
+    """Tests para la elección del tamaño de cubo."""
+
+    def test_step_from_range_and_max_points(self):
+        assert choose_step(3600, 500) == (60, 60)
+        assert choose_step(30 * 86400, 500) == (7200, 3600)
+        assert choose_step(365 * 86400, 100) == (345600, 86400)
+
+    def test_explicit_interval(self):
+        assert choose_step(86400, 500, interval='5m') == (300, 60)
+        assert choose_step(3600, 500, interval='1d') == (86400, 86400)
+
+    def test_explicit_interval_is_clamped_by_max_points(self):
+        assert choose_step(30 * 86400, 500, interval='1m') == (7200, 3600)
+
+    def test_step_never_reads_a_pruned_resolution(self):
+        assert choose_step(3600, 500, min_base=3600) == (3600, 3600)
+        assert choose_step(86400, 500, interval='5m', min_base=3600) == (3600, 3600)
+
+    def test_percentile_nearest_rank(self):
+        assert percentile(list(range(1, 21)), 95) == 19
+        assert percentile([], 95) is None
@@ -0,0 +1,136 @@
+"""
+Tests para el buffer write-behind de publication_metrics.
+
+Verifica el volcado por tamaño de lote y por intervalo, el descarte de las
+filas más antiguas al desbordar y el volcado final al detener el sink.
+"""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from services.database.connection_pool import SQLiteConnectionPool
+from services.database.db_executor import DatabaseExecutor
+from services.database.metrics_rollup import MetricsRollup
+from services.database.metrics_sink import PublicationMetricsSink
+from services.database.schema.mediamtx_tables import PUBLICATION_METRICS_TABLE
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SQLiteConnectionPool(tmp_path / "metrics.db")
+    with pool.connection() as conn:
+        conn.execute("""
+            CREATE TABLE camera_publications (
+                publication_id INTEGER PRIMARY KEY,
+                camera_id TEXT NOT NULL,
+                is_active BOOLEAN DEFAULT 1
+            )
+        """)
+        conn.execute(PUBLICATION_METRICS_TABLE)
+        conn.execute("INSERT INTO camera_publications VALUES (1, 'cam-1', 1), (2, 'cam-2', 0)")
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def executor():
+    executor = DatabaseExecutor(readers=1, name="test_sink")
+    yield executor
+    executor.shutdown()
+
+
+BASE = (datetime.utcnow() - timedelta(hours=1)).replace(second=0, microsecond=0)
+
+
+def _metrics(fps):
+    return {'fps': fps, 'bitrate_kbps': 1500.0, 'viewer_count': 1,
+            'quality_score': 90.0, 'timestamp': BASE + timedelta(seconds=int(fps))}
+
+
+def _stored(pool):
+    rows = pool.get().execute(
+        "SELECT publication_id, fps FROM publication_metrics ORDER BY metric_time"
+    ).fetchall()
+    return [tuple(row) for row in rows]
+
+
+class TestPublicationMetricsSink:
+    """Tests para PublicationMetricsSink."""
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_flushed_in_one_commit(self, pool, executor):
+        """Al completar un lote se escribe con un único volcado."""
+        sink = PublicationMetricsSink(pool, executor, batch_rows=5, flush_interval_ms=60000)
+        for fps in range(5):
+            sink.add('cam-1', _metrics(fps))
+        await asyncio.sleep(0.2)
+
+        stats = sink.get_stats()
+        await sink.stop()
+
+        assert stats['rows_written'] == 5
+        assert stats['batches_flushed'] == 1
+        assert stats['avg_rows_per_commit'] == 5
+        assert len(_stored(pool)) == 5
+
+    @pytest.mark.asyncio
+    async def test_partial_batch_is_flushed_after_interval(self, pool, executor):
+        """Un lote incompleto se escribe al vencer el intervalo."""
+        sink = PublicationMetricsSink(pool, executor, batch_rows=100, flush_interval_ms=50)
+        sink.add('cam-1', _metrics(1))
+        sink.add('cam-1', _metrics(2))
+        await asyncio.sleep(0.3)
+
+        stored = _stored(pool)
+        await sink.stop()
+
+        assert stored == [(1, 1.0), (1, 2.0)]
+
+    @pytest.mark.asyncio
+    async def test_overflow_drops_oldest_rows(self, pool, executor):
+        """Con el buffer lleno se descartan las filas más antiguas."""
+        sink = PublicationMetricsSink(pool, executor, batch_rows=3,
+                                      flush_interval_ms=60000, max_buffered_rows=3)
+        # Sin ceder el loop, el volcador no llega a correr entre añadidos
+        for fps in range(5):
+            sink.add('cam-1', _metrics(fps))
+        await sink.stop()
+
+        assert sink.get_stats()['rows_dropped'] == 2
+        assert _stored(pool) == [(1, 2.0), (1, 3.0), (1, 4.0)]
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending_rows(self, pool, executor):
+        """Al detener se escriben las filas pendientes de cámaras activas."""
+        sink = PublicationMetricsSink(pool, executor, batch_rows=100, flush_interval_ms=60000)
+        sink.add('cam-1', _metrics(1))
+        # Sin publicación activa: la fila no se inserta
+        sink.add('cam-2', _metrics(2))
+        await sink.stop()
+
+        stats = sink.get_stats()
+        assert _stored(pool) == [(1, 1.0)]
+        assert stats['buffered_rows'] == 0
+        assert stats['rows_written'] == 2
+
+    @pytest.mark.asyncio
+    async def test_after_write_runs_in_the_batch_transaction(self, pool, executor):
+        """Los rollups se actualizan con cada lote volcado."""
+        sink = PublicationMetricsSink(pool, executor, batch_rows=100, flush_interval_ms=60000,
+                                      after_write=MetricsRollup().refresh)
+        sink.add('cam-1', _metrics(1))
+        sink.add('cam-1', _metrics(3))
+        await sink.stop()
+
+        row = pool.get().execute("""
+            SELECT samples, fps_max FROM publication_metrics_rollup
+            WHERE bucket_seconds = 60
+        """).fetchone()
+        assert tuple(row) == (2, 3.0)
@@ -0,0 +1,162 @@
+"""
+Tests para el planificador de discovery de protocolos.
+
+Verifica que solo se prueban puertos abiertos, que las credenciales de
+un mismo grupo se prueban en orden hasta la primera válida y que se
+respetan la concurrencia y el intervalo por host.
+"""
+
+import asyncio
+import socket
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from services.protocol_discovery import (
+    DiscoveryCredential,
+    HostRateLimiter,
+    ProtocolDiscoveryPlanner,
+    protocols_for_port,
+)
+
+
+def _closed_port() -> int:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+CREDENTIALS = [
+    DiscoveryCredential(credential_id=1, username="admin", password="wrong"),
+    DiscoveryCredential(credential_id=2, username="admin", password="secret"),
+    DiscoveryCredential(credential_id=3, username="viewer", password="other"),
+]
+
+
+class TestProtocolDiscoveryPlanner:
+    """Tests para ProtocolDiscoveryPlanner."""
+
+    def test_protocols_for_port(self):
+        """Los puertos conocidos tienen sus protocolos candidatos."""
+        assert protocols_for_port(80) == ['onvif', 'http']
+        assert protocols_for_port(554) == ['rtsp']
+        assert protocols_for_port(37777) == ['amcrest']
+
+    @pytest.mark.asyncio
+    async def test_only_open_ports_are_tested(self):
+        """Los puertos cerrados no llegan a probarse con credenciales."""
+        server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+        open_port = server.sockets[0].getsockname()[1]
+        closed_port = _closed_port()
+        tested_ports = set()
+
+        async def tester(ip, port, protocol_type, username, password, timeout):
+            tested_ports.add(port)
+            return {'success': False}
+
+        planner = ProtocolDiscoveryPlanner(tester, host_min_interval=0)
+        async with server:
+            report = await planner.run("127.0.0.1", [open_port, closed_port], CREDENTIALS)
+
+        assert report.open_ports == [open_port]
+        assert report.closed_ports == [closed_port]
+        assert tested_ports == {open_port}
+        assert report.found == []
+
+    @pytest.mark.asyncio
+    async def test_budget_spent_during_port_check_reports_timeout(self):
+        """Si el tiempo se agota comprobando puertos se devuelve el informe."""
+        async def tester(ip, port, protocol_type, username, password, timeout):
+            return {'success': True}
+
+        planner = ProtocolDiscoveryPlanner(tester, host_min_interval=0, connect_timeout=5.0)
+
+        async def silent_port(ip, port):
+            await asyncio.sleep(5.0)
+            return False
+
+        planner._is_port_open = silent_port
+        report = await planner.run("127.0.0.1", [554], CREDENTIALS, timeout=0.05)
+
+        assert report.timed_out
+        assert report.open_ports == []
+        assert report.attempts == 0
+
+    @pytest.mark.asyncio
+    async def test_credentials_are_tried_in_order_until_one_works(self):
+        """En cada grupo se prueba una credencial tras otra y se para en la válida."""
+        server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        tried = {}
+        in_flight = {}
+        overlapped = False
+
+        async def tester(ip, port, protocol_type, username, password, timeout):
+            nonlocal overlapped
+            overlapped = overlapped or in_flight.get(protocol_type, 0) > 0
+            in_flight[protocol_type] = in_flight.get(protocol_type, 0) + 1
+            tried.setdefault(protocol_type, []).append(password)
+            await asyncio.sleep(0.02)
+            in_flight[protocol_type] -= 1
+            return {'success': password == "secret", 'version': '2.0'}
+
+        planner = ProtocolDiscoveryPlanner(tester, max_concurrency=8, host_min_interval=0)
+        async with server:
+            report = await planner.run("127.0.0.1", [port], CREDENTIALS)
+
+        # Puerto no estándar: http y rtsp, ambos verificados con la credencial 2
+        assert {(f['protocol_type'], f['credential_id']) for f in report.found} == {
+            ('http', 2), ('rtsp', 2)
+        }
+        assert tried == {'http': ["wrong", "secret"], 'rtsp': ["wrong", "secret"]}
+        assert not overlapped
+        assert report.attempts == 4
+        assert report.cancelled_attempts == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """Nunca hay más pruebas simultáneas que max_concurrency."""
+        server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        in_flight = 0
+        peak = 0
+
+        async def tester(ip, port, protocol_type, username, password, timeout):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            return {'success': False}
+
+        planner = ProtocolDiscoveryPlanner(tester, max_concurrency=2, host_min_interval=0)
+        async with server:
+            report = await planner.run("127.0.0.1", [port], CREDENTIALS)
+
+        assert report.attempts == 6
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_host_rate_limiter_spaces_attempts(self):
+        """Los turnos de un mismo host quedan separados por el intervalo."""
+        limiter = HostRateLimiter(min_interval=0.05)
+        starts = []
+
+        async def attempt():
+            await limiter.acquire("10.0.0.1")
+            starts.append(time.monotonic())
+
+        await asyncio.gather(*(attempt() for _ in range(3)))
+        # Otro host no espera
+        other_start = time.monotonic()
+        await limiter.acquire("10.0.0.2")
+
+        assert starts[2] - starts[0] >= 0.09
+        assert time.monotonic() - other_start < 0.01
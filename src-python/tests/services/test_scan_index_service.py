@@ -0,0 +1,147 @@
+"""
+Tests para el índice persistente de resultados de escaneo.
+
+Usa una base de datos temporal para verificar el registro de escaneos,
+las respuestas por sub-rango y la caducidad de las entradas por host.
+"""
+
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from models.camera_model import ProtocolType
+from models.scan_model import ScanRange
+from services.database.scan_index_service import ScanIndexService
+
+
+METHODS = ["ping_sweep", "port_scan", "protocol_detection"]
+
+
+def _result(ip, ports, camera=False, from_index=False):
+    return {
+        'ip': ip,
+        'hostname': None,
+        'mac_address': None,
+        'is_alive': True,
+        'open_ports': ports,
+        'has_camera_protocols': camera,
+        'from_index': from_index,
+        'scan_duration_ms': 12.0,
+        'detection_results': [
+            {
+                'protocol': 'rtsp',
+                'port': 554,
+                'detected': True,
+                'response_time_ms': 4.0,
+                'details': {'brand': 'dahua'}
+            }
+        ] if camera else []
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ScanIndexService(str(tmp_path / "scans.db"))
+
+
+def _record(index, scan_id, results, start="192.168.1.1", end="192.168.1.254",
+            ports=(80, 554), methods=METHODS, started_at=None):
+    started_at = started_at or datetime.now()
+    index.record_scan(
+        scan_id,
+        ScanRange(start_ip=start, end_ip=end, ports=list(ports)),
+        methods,
+        started_at,
+        started_at + timedelta(seconds=30),
+        results
+    )
+
+
+class TestScanIndexService:
+    """Tests para ScanIndexService."""
+
+    def test_sub_range_is_answered_from_index(self, index):
+        """Un sub-rango de un escaneo reciente no necesita red."""
+        _record(index, "scan_1", [
+            _result("192.168.1.10", [554], camera=True),
+            _result("192.168.1.20", [80]),
+            _result("192.168.1.200", [80]),
+        ])
+
+        results = index.lookup_range(
+            ScanRange(start_ip="192.168.1.1", end_ip="192.168.1.50", ports=[554]),
+            ["port_scan"],
+            timedelta(hours=24)
+        )
+
+        assert set(results) == {"192.168.1.10", "192.168.1.20"}
+        assert results["192.168.1.10"].open_ports == [554]
+        assert results["192.168.1.10"].best_protocol == ProtocolType.RTSP
+        # El puerto 80 no se pidió
+        assert results["192.168.1.20"].open_ports == []
+
+    def test_uncovered_range_is_not_answered(self, index):
+        """Otros puertos, métodos o un rango mayor requieren escanear."""
+        _record(index, "scan_1", [_result("192.168.1.10", [554], camera=True)])
+        max_age = timedelta(hours=24)
+
+        assert index.lookup_range(
+            ScanRange(start_ip="192.168.1.1", end_ip="192.168.2.1", ports=[554]), METHODS, max_age
+        ) is None
+        assert index.lookup_range(
+            ScanRange(start_ip="192.168.1.1", end_ip="192.168.1.9", ports=[8000]), METHODS, max_age
+        ) is None
+        assert index.lookup_range(
+            ScanRange(start_ip="192.168.1.1", end_ip="192.168.1.9", ports=[554]),
+            METHODS + ["onvif_discovery"], max_age
+        ) is None
+
+    def test_closed_ports_and_gone_hosts_leave_the_index(self, index):
+        """Un escaneo completo elimina lo que ya no está abierto."""
+        _record(index, "scan_1", [_result("192.168.1.10", [80, 554]), _result("192.168.1.20", [80])])
+        _record(index, "scan_2", [_result("192.168.1.10", [554])])
+
+        known = index.get_known_hosts(
+            ScanRange(start_ip="192.168.1.1", end_ip="192.168.1.254", ports=[80, 554]),
+            METHODS, timedelta(hours=24)
+        )
+
+        assert set(known) == {"192.168.1.10"}
+        assert known["192.168.1.10"].open_ports == [554]
+        assert index.get_index_stats() == {'scans': 2, 'hosts': 1, 'open_ports': 1}
+
+    def test_stale_hosts_are_not_reused(self, index, tmp_path):
+        """Un host reutilizado sin sondear desde hace tiempo caduca."""
+        _record(index, "scan_1", [_result("192.168.1.10", [554]), _result("192.168.1.20", [554])])
+        # Simular una sonda antigua de 192.168.1.20
+        old = (datetime.now() - timedelta(hours=48)).isoformat()
+        with sqlite3.connect(str(tmp_path / "scans.db")) as conn:
+            conn.execute("UPDATE scan_host_ports SET last_probed = ? WHERE ip_address = ?",
+                         (old, "192.168.1.20"))
+        # Un escaneo incremental lo reutilizó: last_seen es reciente
+        _record(index, "scan_2", [
+            _result("192.168.1.10", [554]),
+            _result("192.168.1.20", [554], from_index=True)
+        ])
+
+        known = index.get_known_hosts(
+            ScanRange(start_ip="192.168.1.1", end_ip="192.168.1.254", ports=[554]),
+            METHODS, timedelta(hours=24)
+        )
+
+        assert set(known) == {"192.168.1.10"}
+
+    def test_purge_removes_old_scans(self, index):
+        """Los escaneos fuera de retención se eliminan con sus resultados."""
+        _record(index, "old", [_result("192.168.1.10", [554])],
+                started_at=datetime.now() - timedelta(days=40))
+        _record(index, "new", [_result("192.168.1.20", [554])], start="192.168.1.20", end="192.168.1.20")
+
+        assert index.purge(30) == 1
+        assert index.get_index_stats()['scans'] == 1
@@ -0,0 +1,93 @@
+"""
+Tests para la suscripción al stream compartido de una cámara.
+
+Verifica que una captura muerta no se reutiliza y que la salida del
+último visor no rompe la exclusión entre suscriptores concurrentes.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from services.websocket_stream_service import WebSocketStreamService
+
+
+class _FakePresenter:
+    """Presenter falso que registra arranques y paradas."""
+
+    def __init__(self):
+        self.running = set()
+        self.started = []
+        self.video_service = SimpleNamespace(is_stream_running=lambda key: key in self.running)
+
+    async def start_camera_stream(self, camera_id, **kwargs):
+        await asyncio.sleep(0.01)
+        self.started.append(camera_id)
+        self.running.add(camera_id)
+        return True
+
+    async def stop_camera_stream(self, camera_id):
+        await asyncio.sleep(0.01)
+        self.running.discard(camera_id)
+        return True
+
+
+def _service():
+    service = WebSocketStreamService()
+    service._presenter = _FakePresenter()
+    service._get_camera_configuration = AsyncMock(return_value={
+        'ip': '127.0.0.1', 'username': 'admin', 'password': 'test', 'protocol': 'rtsp'
+    })
+    return service
+
+
+CONFIG = {'check_connectivity': False}
+
+
+class TestSharedStreamSubscription:
+    """Tests para subscribe/unsubscribe_camera_stream."""
+
+    @pytest.mark.asyncio
+    async def test_dead_capture_is_restarted(self):
+        """Si la captura murió, el siguiente visor la reinicia en vez de compartirla."""
+        service = _service()
+        first = await service.subscribe_camera_stream("cam1", "a", CONFIG)
+        # El loop de captura termina con error
+        service._presenter.running.discard("cam1")
+
+        second = await service.subscribe_camera_stream("cam1", "b", CONFIG)
+
+        assert first['shared'] is False
+        assert second['shared'] is False
+        assert service._presenter.started == ["cam1", "cam1"]
+        assert service.is_streaming("cam1")
+
+    @pytest.mark.asyncio
+    async def test_last_unsubscribe_keeps_the_lock(self):
+        """Un visor que espera al salir el último no provoca una segunda captura."""
+        service = _service()
+        first = await service.subscribe_camera_stream("cam1", "a", CONFIG)
+        lock = service._subscription_locks["cam1"]
+
+        async def late_subscriber():
+            # Llega cuando el último visor ya soltó el lock
+            await asyncio.sleep(0.015)
+            return await service.subscribe_camera_stream("cam1", "c", CONFIG)
+
+        _, waiting, late = await asyncio.gather(
+            service.unsubscribe_camera_stream(first['subscription']),
+            service.subscribe_camera_stream("cam1", "b", CONFIG),
+            late_subscriber()
+        )
+        results = [waiting, late]
+
+        assert service._subscription_locks["cam1"] is lock
+        assert sorted(r['shared'] for r in results) == [False, True]
+        assert service._presenter.started == ["cam1", "cam1"]
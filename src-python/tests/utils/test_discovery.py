@@ -0,0 +1,137 @@
+"""
+Tests para el descubrimiento WS-Discovery y SSDP.
+
+Usa un responder UDP local en lugar del grupo multicast para verificar
+el envío del probe, la correlación por MessageID y el parseo de XAddrs.
+"""
+
+import asyncio
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from utils.network.discovery import (
+    parse_probe_matches,
+    parse_ssdp_response,
+    ssdp_discovery,
+    ws_discovery,
+)
+
+
+PROBE_MATCH = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<SOAP-ENV:Envelope xmlns:SOAP-ENV="http://www.w3.org/2003/05/soap-envelope" '
+    'xmlns:wsa="http://schemas.xmlsoap.org/ws/2004/08/addressing" '
+    'xmlns:d="http://schemas.xmlsoap.org/ws/2005/04/discovery">'
+    '<SOAP-ENV:Header><wsa:RelatesTo>{relates_to}</wsa:RelatesTo></SOAP-ENV:Header>'
+    '<SOAP-ENV:Body><d:ProbeMatches><d:ProbeMatch>'
+    '<wsa:EndpointReference><wsa:Address>urn:uuid:cam-{index}</wsa:Address></wsa:EndpointReference>'
+    '<d:Types>dn:NetworkVideoTransmitter</d:Types>'
+    '<d:Scopes>onvif://www.onvif.org/name/IPC-HDW2831T onvif://www.onvif.org/hardware/DH%20IPC</d:Scopes>'
+    '<d:XAddrs>http://169.254.1.1/onvif/device_service http://{ip}:8899/onvif/device_service</d:XAddrs>'
+    '</d:ProbeMatch></d:ProbeMatches></SOAP-ENV:Body></SOAP-ENV:Envelope>'
+)
+
+
+class _Responder(asyncio.DatagramProtocol):
+    """Responde a cada datagrama con las respuestas configuradas."""
+
+    def __init__(self, build_replies):
+        self.build_replies = build_replies
+        self.received = []
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.received.append(data)
+        for reply in self.build_replies(data):
+            self.transport.sendto(reply, addr)
+
+
+async def _start_responder(build_replies):
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        lambda: _Responder(build_replies), local_addr=("127.0.0.1", 0)
+    )
+    return transport, protocol, transport.get_extra_info("sockname")
+
+
+def _probe_matches(data):
+    message_id = re.search(rb"<w:MessageID>([^<]+)</w:MessageID>", data).group(1).decode()
+    return [
+        PROBE_MATCH.format(relates_to=message_id, index=1, ip="127.0.0.1").encode(),
+        # Respuesta a otro probe: debe descartarse
+        PROBE_MATCH.format(relates_to="urn:uuid:other", index=2, ip="127.0.0.1").encode(),
+    ]
+
+
+class TestParsing:
+    """Tests para el parseo de respuestas."""
+
+    def test_probe_match_prefers_xaddr_of_source(self):
+        """Se usa la XAddr que coincide con la IP de origen y sus scopes."""
+        payload = PROBE_MATCH.format(relates_to="urn:uuid:x", index=1, ip="192.168.1.20").encode()
+
+        devices = parse_probe_matches(payload, "192.168.1.20", "urn:uuid:x")
+
+        assert len(devices) == 1
+        device = devices[0]
+        assert (device.ip, device.port) == ("192.168.1.20", 8899)
+        assert device.endpoint == "urn:uuid:cam-1"
+        assert device.scope_values["hardware"] == "DH IPC"
+        assert device.to_details()["name"] == "IPC-HDW2831T"
+
+    def test_ssdp_response(self):
+        """El puerto sale del header LOCATION."""
+        payload = (
+            b"HTTP/1.1 200 OK\r\nCACHE-CONTROL: max-age=1800\r\n"
+            b"LOCATION: http://192.168.1.30:49152/rootDesc.xml\r\n"
+            b"SERVER: Linux/3.10 UPnP/1.0 Hikvision-Webs/1.0\r\n"
+            b"ST: upnp:rootdevice\r\nUSN: uuid:abc::upnp:rootdevice\r\n\r\n"
+        )
+
+        device = parse_ssdp_response(payload, "192.168.1.30")
+
+        assert device.port == 49152
+        assert device.server.endswith("Hikvision-Webs/1.0")
+        assert parse_ssdp_response(b"NOTIFY * HTTP/1.1\r\n\r\n", "192.168.1.30") is None
+
+
+class TestDiscoveryExchange:
+    """Tests de extremo a extremo contra un responder local."""
+
+    @pytest.mark.asyncio
+    async def test_ws_discovery_collects_matching_replies(self):
+        """Solo se aceptan respuestas al MessageID enviado."""
+        transport, responder, target = await _start_responder(_probe_matches)
+        try:
+            devices = await ws_discovery(window=0.3, target=target)
+        finally:
+            transport.close()
+
+        assert b"NetworkVideoTransmitter" in responder.received[0]
+        assert [d.endpoint for d in devices] == ["urn:uuid:cam-1"]
+        assert devices[0].ip == "127.0.0.1"
+
+    @pytest.mark.asyncio
+    async def test_ssdp_discovery_deduplicates_by_ip(self):
+        """Varias respuestas de un mismo equipo dan un único dispositivo."""
+        reply = (
+            b"HTTP/1.1 200 OK\r\nLOCATION: http://127.0.0.1:8080/desc.xml\r\n"
+            b"ST: upnp:rootdevice\r\nUSN: uuid:cam\r\n\r\n"
+        )
+        transport, responder, target = await _start_responder(lambda data: [reply, reply])
+        try:
+            devices = await ssdp_discovery(window=0.3, target=target)
+        finally:
+            transport.close()
+
+        assert responder.received[0].startswith(b"M-SEARCH * HTTP/1.1")
+        assert len(devices) == 1
+        assert devices[0].port == 8080
@@ -0,0 +1,70 @@
+"""
+Tests para la cache de frames codificados.
+
+Verifica la validez por secuencia de frame y la expulsión LRU por bytes.
+"""
+
+from pathlib import Path
+import sys
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from utils.video.frame_converter import EncodedFrameCache
+
+
+class TestEncodedFrameCache:
+    """Tests para EncodedFrameCache."""
+
+    def test_hit_only_for_same_sequence(self):
+        """Una entrada solo sirve para el frame con el que se codificó."""
+        cache = EncodedFrameCache()
+        key = cache.make_key("cam_1", (640, 360), 60, "BytesJPEGStrategy")
+
+        cache.put(key, 10, b"jpeg-10")
+
+        assert cache.get(key, 10) == b"jpeg-10"
+        assert cache.get(key, 11) is None
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_older_sequence_does_not_replace_newer(self):
+        """Una codificación tardía de un frame antiguo no pisa la reciente."""
+        cache = EncodedFrameCache()
+        key = cache.make_key("cam_1", None, 85, "BytesJPEGStrategy")
+
+        cache.put(key, 5, b"new")
+        cache.put(key, 4, b"old")
+
+        assert cache.get(key, 5) == b"new"
+
+    def test_lru_eviction_by_bytes(self):
+        """Se expulsan las entradas menos usadas al superar el límite."""
+        cache = EncodedFrameCache(max_bytes=10)
+        key_a = cache.make_key("cam_1", None, 85, "jpeg")
+        key_b = cache.make_key("cam_1", None, 60, "jpeg")
+        key_c = cache.make_key("cam_2", None, 85, "jpeg")
+
+        cache.put(key_a, 1, b"aaaa")
+        cache.put(key_b, 1, b"bbbb")
+        cache.get(key_a, 1)  # key_a pasa a ser la más reciente
+        cache.put(key_c, 1, b"cccc")
+
+        assert cache.get(key_b, 1) is None
+        assert cache.get(key_a, 1) == b"aaaa"
+        assert cache.get(key_c, 1) == b"cccc"
+        assert cache.evictions == 1
+
+    def test_invalidate_camera(self):
+        """Invalidar una cámara elimina solo sus entradas."""
+        cache = EncodedFrameCache()
+        key_a = cache.make_key("cam_1", None, 85, "jpeg")
+        key_b = cache.make_key("cam_2", None, 85, "jpeg")
+        cache.put(key_a, 1, b"a")
+        cache.put(key_b, 1, b"b")
+
+        cache.invalidate_camera("cam_1")
+
+        assert cache.get(key_a, 1) is None
+        assert cache.get(key_b, 1) == b"b"
+        assert cache.get_stats()["total_bytes"] == 1
@@ -0,0 +1,164 @@
+"""
+Tests para la identificación de protocolos de cámara.
+
+Levanta servidores stub locales (RTSP, HTTP/ONVIF y DVRIP) y verifica la
+detección, la marca obtenida del header Server y la salida anticipada.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from utils.network.fingerprint import ProtocolFingerprinter, parse_onvif_utc
+
+
+ONVIF_RESPONSE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<env:Envelope xmlns:env="http://www.w3.org/2003/05/soap-envelope" '
+    'xmlns:tt="http://www.onvif.org/ver10/schema">'
+    '<env:Body><tds:GetSystemDateAndTimeResponse><tds:SystemDateAndTime>'
+    '<tt:UTCDateTime><tt:Time><tt:Hour>10</tt:Hour><tt:Minute>30</tt:Minute>'
+    '<tt:Second>5</tt:Second></tt:Time><tt:Date><tt:Year>2024</tt:Year>'
+    '<tt:Month>3</tt:Month><tt:Day>15</tt:Day></tt:Date></tt:UTCDateTime>'
+    '</tds:SystemDateAndTime></tds:GetSystemDateAndTimeResponse></env:Body>'
+    '</env:Envelope>'
+)
+
+
+async def _start(handler):
+    server = await asyncio.start_server(handler, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def _http_camera(head_delay: float = 0.0):
+    """Stub HTTP keep-alive con device service ONVIF y Server de Hikvision."""
+    async def handler(reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode().split("\r\n")
+                method = lines[0].split(" ")[0]
+                length = 0
+                for line in lines[1:]:
+                    if line.lower().startswith("content-length:"):
+                        length = int(line.split(":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+
+                if method == "POST":
+                    body = ONVIF_RESPONSE.encode()
+                    writer.write(
+                        b"HTTP/1.1 200 OK\r\nContent-Type: application/soap+xml\r\n"
+                        b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+                    )
+                else:
+                    await asyncio.sleep(head_delay)
+                    writer.write(
+                        b"HTTP/1.1 401 Unauthorized\r\nServer: App-webs/\r\n"
+                        b"WWW-Authenticate: Digest realm=\"IP Camera\"\r\nContent-Length: 0\r\n\r\n"
+                    )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+    return handler
+
+
+async def _rtsp_camera(reader, writer):
+    await reader.readuntil(b"\r\n\r\n")
+    writer.write(
+        b"RTSP/1.0 200 OK\r\nCSeq: 1\r\nServer: Dahua Rtsp Server\r\n"
+        b"Public: OPTIONS, DESCRIBE, SETUP, PLAY, TEARDOWN\r\n\r\n"
+    )
+    await writer.drain()
+    writer.close()
+
+
+async def _dvrip_camera(reader, writer):
+    await reader.readexactly(32)
+    writer.write(b"\xb0" + b"\x00" * 31)
+    await writer.drain()
+    writer.close()
+
+
+class TestParseOnvifUtc:
+    """Tests para el parseo de la hora del dispositivo."""
+
+    def test_parses_utc_date_time(self):
+        """Se extrae la fecha UTC con prefijos de namespace."""
+        parsed = parse_onvif_utc(ONVIF_RESPONSE)
+
+        assert parsed.isoformat() == "2024-03-15T10:30:05+00:00"
+
+    def test_missing_utc_returns_none(self):
+        """Sin UTCDateTime no hay fecha."""
+        assert parse_onvif_utc("<Envelope/>") is None
+
+
+class TestProtocolFingerprinter:
+    """Tests contra servidores stub locales."""
+
+    @pytest.mark.asyncio
+    async def test_rtsp_options(self):
+        """OPTIONS identifica RTSP, sus métodos y la marca."""
+        server, port = await _start(_rtsp_camera)
+        async with server, ProtocolFingerprinter(timeout=2.0) as fingerprinter:
+            results = await fingerprinter.fingerprint("127.0.0.1", port, ["rtsp"])
+
+        assert len(results) == 1
+        assert results[0].detected
+        assert "DESCRIBE" in results[0].details["methods"]
+        assert results[0].details["brand"] == "dahua"
+
+    @pytest.mark.asyncio
+    async def test_onvif_and_http_on_same_port(self):
+        """ONVIF y HEAD comparten puerto; el header Server da la marca."""
+        server, port = await _start(_http_camera())
+        async with server, ProtocolFingerprinter(timeout=2.0) as fingerprinter:
+            results = {r.protocol: r for r in await fingerprinter.fingerprint(
+                "127.0.0.1", port, ["onvif", "http"]
+            )}
+
+        assert results["onvif"].detected
+        assert results["onvif"].details["device_time_utc"].startswith("2024-03-15")
+        # HTTP puede cancelarse al confirmarse ONVIF; si llegó, trae la marca
+        if "http" in results:
+            assert results["http"].details["brand"] == "hikvision"
+
+    @pytest.mark.asyncio
+    async def test_confirmed_protocol_cancels_lower_priority_probes(self):
+        """Un HEAD lento no retrasa el resultado si ONVIF ya respondió."""
+        server, port = await _start(_http_camera(head_delay=1.5))
+        async with server, ProtocolFingerprinter(timeout=3.0) as fingerprinter:
+            start = time.perf_counter()
+            results = await fingerprinter.fingerprint("127.0.0.1", port, ["onvif", "http"])
+            elapsed = time.perf_counter() - start
+
+        assert [r.protocol for r in results] == ["onvif"]
+        assert elapsed < 1.0
+
+    @pytest.mark.asyncio
+    async def test_dahua_sdk_banner(self):
+        """La respuesta DVRIP identifica el SDK de Dahua."""
+        server, port = await _start(_dvrip_camera)
+        async with server, ProtocolFingerprinter(timeout=2.0) as fingerprinter:
+            results = await fingerprinter.fingerprint("127.0.0.1", port, ["amcrest"])
+
+        assert results[0].detected
+        assert results[0].details["brand"] == "dahua"
+
+    @pytest.mark.asyncio
+    async def test_wrong_protocol_is_not_detected(self):
+        """Un servidor HTTP no pasa por RTSP."""
+        server, port = await _start(_http_camera())
+        async with server, ProtocolFingerprinter(timeout=1.0) as fingerprinter:
+            results = await fingerprinter.fingerprint("127.0.0.1", port, ["rtsp"])
+
+        assert not results[0].detected
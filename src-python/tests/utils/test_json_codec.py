@@ -0,0 +1,101 @@
+"""
+Tests para la serialización JSON de la API y los mensajes WebSocket.
+"""
+
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from pathlib import Path
+from unittest.mock import patch
+from uuid import UUID
+
+import numpy as np
+import pytest
+from pydantic import BaseModel
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from utils import json_codec
+from utils.json_codec import dumps, dumps_text
+
+
+class _Protocol(str, Enum):
+    RTSP = "rtsp"
+
+
+class _Level(Enum):
+    HIGH = 3
+
+
+class _Camera(BaseModel):
+    camera_id: str
+    protocol: _Protocol
+    created_at: datetime
+
+
+SAMPLE = {
+    "naive": datetime(2024, 5, 1, 12, 30, 0, 250000),
+    "aware": datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+    "offset": datetime(2024, 5, 1, 12, 30, tzinfo=timezone(timedelta(hours=-5))),
+    "protocol": _Protocol.RTSP,
+    "level": _Level.HIGH,
+    "id": UUID("12345678-1234-5678-1234-567812345678"),
+    "array": np.array([[1, 2], [3, 4]], dtype=np.uint8),
+    "fps": np.float32(12.5),
+    "frames": np.int64(7),
+    "camera": _Camera(camera_id="cam-1", protocol=_Protocol.RTSP,
+                      created_at=datetime(2024, 5, 1)),
+    "name": "cámara",
+}
+
+EXPECTED = {
+    "naive": "2024-05-01T12:30:00.250000",
+    "aware": "2024-05-01T12:30:00Z",
+    "offset": "2024-05-01T12:30:00-05:00",
+    "protocol": "rtsp",
+    "level": 3,
+    "id": "12345678-1234-5678-1234-567812345678",
+    "array": [[1, 2], [3, 4]],
+    "fps": 12.5,
+    "frames": 7,
+    "camera": {"camera_id": "cam-1", "protocol": "rtsp", "created_at": "2024-05-01T00:00:00"},
+    "name": "cámara",
+}
+
+
+class TestJsonCodec:
+    """Tests para utils.json_codec."""
+
+    def test_native_types(self):
+        """datetime, Enum, NumPy y Pydantic se serializan sin conversión previa."""
+        encoded = dumps(SAMPLE)
+
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded) == EXPECTED
+        assert dumps_text({"a": 1}) == '{"a":1}'
+
+    def test_stdlib_fallback_matches(self):
+        """Sin orjson la salida es equivalente."""
+        with patch.object(json_codec, "ORJSON_AVAILABLE", False):
+            assert json.loads(dumps(SAMPLE)) == EXPECTED
+            assert json.loads(dumps_text(SAMPLE)) == EXPECTED
+
+    def test_unsupported_type_raises(self):
+        """Un tipo desconocido produce TypeError."""
+        with pytest.raises(TypeError):
+            dumps({"value": object()})
+
+
+class TestFastJSONResponse:
+    """Tests para la clase de respuesta por defecto."""
+
+    def test_render(self):
+        """La respuesta usa el codec y conserva el media type."""
+        from api.responses import FastJSONResponse
+
+        response = FastJSONResponse({"created_at": datetime(2024, 5, 1), "total": 1})
+
+        assert response.media_type == "application/json"
+        assert response.body == b'{"created_at":"2024-05-01T00:00:00","total":1}'
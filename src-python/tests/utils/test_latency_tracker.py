@@ -0,0 +1,55 @@
+"""
+Tests para el tracker de latencias por etapa.
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from utils.video.latency_tracker import LatencyTracker, percentile
+
+
+class TestPercentile:
+    """Tests para el cálculo de percentiles."""
+
+    def test_interpolation(self):
+        """Interpola linealmente entre muestras."""
+        values = [10.0, 20.0, 30.0, 40.0, 50.0]
+        assert percentile(values, 0) == 10.0
+        assert percentile(values, 50) == 30.0
+        assert percentile(values, 100) == 50.0
+        assert percentile(values, 95) == pytest.approx(48.0)
+
+    def test_empty_and_single(self):
+        """Casos límite sin muestras o con una sola."""
+        assert percentile([], 95) == 0.0
+        assert percentile([7.0], 99) == 7.0
+
+
+class TestLatencyTracker:
+    """Tests para LatencyTracker."""
+
+    def test_summary_uses_window(self):
+        """El resumen solo considera la ventana pero cuenta todas las muestras."""
+        tracker = LatencyTracker(window_size=3)
+        for value in (100.0, 1.0, 2.0, 3.0):
+            tracker.record("encode", value)
+
+        summary = tracker.get_summary("encode")
+        assert summary["count"] == 4
+        assert summary["max_ms"] == 3.0
+        assert summary["p50_ms"] == 2.0
+
+    def test_reset(self):
+        """Reset elimina las muestras de una clave."""
+        tracker = LatencyTracker()
+        tracker.record("cam_1", 5.0)
+        tracker.record("cam_2", 5.0)
+
+        tracker.reset("cam_1")
+
+        assert tracker.get_summary("cam_1") is None
+        assert set(tracker.get_all_summaries()) == {"cam_2"}
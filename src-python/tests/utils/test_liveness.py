@@ -0,0 +1,113 @@
+"""
+Tests para la detección de hosts activos.
+
+Verifica el parseo de la caché ARP, la adaptación del timeout al RTT de
+cada subred y el sondeo TCP contra puertos locales.
+"""
+
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from utils.network.liveness import (
+    LivenessProber,
+    SubnetRTTEstimator,
+    parse_arp_output,
+    parse_proc_net_arp,
+)
+
+
+def _closed_port() -> int:
+    """Obtiene un puerto local sin listener."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class TestArpParsing:
+    """Tests para el parseo de la caché ARP."""
+
+    def test_proc_net_arp_keeps_complete_entries(self):
+        """Solo se aceptan entradas resueltas (flag 0x2)."""
+        text = (
+            "IP address       HW type     Flags       HW address            Mask     Device\n"
+            "192.168.1.10     0x1         0x2         a0:bd:1d:00:11:22     *        eth0\n"
+            "192.168.1.11     0x1         0x0         00:00:00:00:00:00     *        eth0\n"
+        )
+
+        assert parse_proc_net_arp(text) == {"192.168.1.10": "a0:bd:1d:00:11:22"}
+
+    def test_windows_arp_output(self):
+        """La salida de Windows usa guiones en la MAC."""
+        text = (
+            "Interface: 192.168.1.5 --- 0x7\n"
+            "  Internet Address      Physical Address      Type\n"
+            "  192.168.1.1           00-11-22-33-44-55     dynamic\n"
+            "  192.168.1.255         ff-ff-ff-ff-ff-ff     static\n"
+        )
+
+        assert parse_arp_output(text) == {"192.168.1.1": "00:11:22:33:44:55"}
+
+
+class TestSubnetRTTEstimator:
+    """Tests para el timeout adaptativo."""
+
+    def test_timeout_adapts_per_subnet(self):
+        """Una subred con muestras usa un timeout menor que otra sin ellas."""
+        estimator = SubnetRTTEstimator(min_timeout=0.05, max_timeout=2.0)
+        for _ in range(10):
+            estimator.record("10.0.0.5", 0.004)
+
+        assert estimator.timeout_for("10.0.0.200") == pytest.approx(0.05)
+        assert estimator.timeout_for("10.0.1.1") == 2.0
+        assert "10.0.0.0/24" in estimator.get_stats()
+
+
+class TestLivenessProber:
+    """Tests para el sondeo TCP."""
+
+    @pytest.mark.asyncio
+    async def test_open_port_marks_host_alive(self):
+        """Un puerto que acepta la conexión marca el host como activo."""
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen(4)
+        port = server.getsockname()[1]
+
+        prober = LivenessProber(ports=[_closed_port(), port], use_arp=False)
+        try:
+            result = await prober.probe("127.0.0.1")
+        finally:
+            server.close()
+
+        assert result.alive
+        assert result.method == "tcp"
+        assert result.rtt_ms is not None
+
+    @pytest.mark.asyncio
+    async def test_refused_connection_counts_as_alive(self):
+        """Un RST demuestra que el host existe."""
+        prober = LivenessProber(ports=[_closed_port()], use_arp=False)
+
+        result = await prober.probe("127.0.0.1")
+
+        assert result.alive
+        assert not result.port_open
+
+    @pytest.mark.asyncio
+    async def test_arp_entry_short_circuits_probe(self):
+        """Un host resuelto en ARP no necesita conexiones."""
+        prober = LivenessProber(ports=[], use_arp=False)
+        prober._arp = {"192.0.2.10": "00:11:22:33:44:55"}
+
+        result = await prober.probe("192.0.2.10")
+
+        assert result.alive
+        assert result.method == "arp"
@@ -0,0 +1,51 @@
+"""
+Tests para el protocolo binario de frames WebSocket.
+
+Verifica el empaquetado y la decodificación de la cabecera fija.
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from websocket.binary_frame import (
+    FRAME_HEADER_SIZE,
+    camera_id_hash,
+    pack_frame,
+    unpack_frame_header
+)
+
+
+class TestBinaryFrame:
+    """Tests para el formato binario de frames."""
+
+    def test_pack_and_unpack_roundtrip(self):
+        """La cabecera empaquetada se decodifica con los mismos valores."""
+        payload = b"\xff\xd8\xff\xe0jpeg-data"
+        message = pack_frame("cam_1", 42, 1700000000123.7, payload)
+
+        assert len(message) == FRAME_HEADER_SIZE + len(payload)
+        assert message[FRAME_HEADER_SIZE:] == payload
+
+        header = unpack_frame_header(message)
+        assert header.format == "jpeg"
+        assert header.camera_hash == camera_id_hash("cam_1")
+        assert header.sequence == 42
+        assert header.capture_timestamp == 1700000000123
+
+    def test_png_format_flag(self):
+        """El formato PNG se refleja en la cabecera."""
+        header = unpack_frame_header(pack_frame("cam_1", 1, None, b"png", "png"))
+        assert header.format == "png"
+        assert header.capture_timestamp == 0
+
+    def test_invalid_message_rejected(self):
+        """Mensajes cortos o con magic incorrecto generan ValueError."""
+        with pytest.raises(ValueError):
+            unpack_frame_header(b"short")
+
+        with pytest.raises(ValueError):
+            unpack_frame_header(b"XXXX" + bytes(FRAME_HEADER_SIZE))
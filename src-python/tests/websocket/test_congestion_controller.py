@@ -0,0 +1,104 @@
+"""
+Tests para el controlador de congestión por cliente WebSocket.
+"""
+
+from pathlib import Path
+import sys
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from websocket.congestion_controller import (
+    DEFAULT_LADDER, CongestionController, QualityLevel, ladder_index_for
+)
+
+
+LADDER = [
+    QualityLevel(quality=85, max_width=1280),
+    QualityLevel(quality=60, max_width=960),
+    QualityLevel(quality=40, max_width=480, frame_skip=1),
+]
+
+
+class TestCongestionController:
+    """Tests para CongestionController."""
+
+    def test_downgrades_after_congested_sends(self):
+        """Baja un escalón tras varios envíos lentos seguidos."""
+        controller = CongestionController(ladder=LADDER, target_latency_ms=100, downgrade_after=3)
+
+        assert controller.record_send(500) is None
+        assert controller.record_send(500) is None
+        new_level = controller.record_send(500)
+
+        assert new_level == LADDER[1]
+        assert controller.is_degraded
+
+    def test_outstanding_bytes_count_as_congestion(self):
+        """Los bytes pendientes por encima del límite también degradan."""
+        controller = CongestionController(
+            ladder=LADDER, max_outstanding_bytes=1000, downgrade_after=1
+        )
+
+        assert controller.record_send(1, outstanding_bytes=5000) == LADDER[1]
+
+    def test_upgrades_after_healthy_sends(self):
+        """Recupera calidad tras suficientes envíos sanos."""
+        controller = CongestionController(ladder=LADDER, downgrade_after=1, upgrade_after=5)
+        controller.record_send(1000)
+        assert controller.level_index == 1
+
+        results = [controller.record_send(1) for _ in range(5)]
+
+        assert results[-1] == LADDER[0]
+        assert controller.level_index == 0
+
+    def test_ceiling_limits_upgrade(self):
+        """No sube por encima del techo fijado por el cliente."""
+        controller = CongestionController(ladder=LADDER, upgrade_after=1)
+        controller.set_ceiling(1)
+
+        assert controller.level_index == 1
+        assert controller.record_send(1) is None
+        assert controller.level_index == 1
+
+    def test_frame_skip(self):
+        """Con frame_skip=1 se envía uno de cada dos frames."""
+        controller = CongestionController(ladder=LADDER)
+        controller.set_ceiling(2)
+
+        sent = [controller.should_send() for _ in range(6)]
+
+        assert sent.count(True) == 3
+
+    def test_lowering_ceiling_releases_pinned_level(self):
+        """Al bajar el techo se abandona el escalón fijado por el anterior."""
+        controller = CongestionController(ladder=LADDER)
+        controller.set_ceiling(2)
+
+        controller.set_ceiling(0)
+
+        assert controller.level_index == 0
+        assert not controller.is_degraded
+
+    def test_low_ceiling_matches_shared_low_preset(self):
+        """El techo de 'low' es el mismo ancho y calidad que el preset compartido."""
+        from services.websocket_stream_service import QUALITY_PRESETS
+        from websocket.stream_handler import QUALITY_CEILINGS
+
+        level = DEFAULT_LADDER[QUALITY_CEILINGS["low"]]
+
+        assert (level.quality, level.max_width) == QUALITY_PRESETS["low"]
+
+    def test_default_ladder_never_improves_downwards(self):
+        """Bajar un escalón nunca sube la calidad JPEG ni el ancho."""
+        for better, worse in zip(DEFAULT_LADDER, DEFAULT_LADDER[1:]):
+            assert worse.quality <= better.quality
+            assert worse.max_width <= better.max_width
+            assert worse.frame_skip >= better.frame_skip
+
+    def test_ladder_index_for_preset(self):
+        """Se elige el mejor escalón que no supera la calidad y el ancho dados."""
+        assert ladder_index_for(85, 1280, LADDER) == 0
+        assert ladder_index_for(70, 1280, LADDER) == 1
+        assert ladder_index_for(10, 100, LADDER) == 2
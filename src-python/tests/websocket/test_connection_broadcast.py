@@ -0,0 +1,113 @@
+"""
+Tests para el broadcast de ConnectionManager.
+
+Verifica que el mensaje se serializa una sola vez para toda la sala y que
+un socket lento no retiene el broadcast más allá del timeout por envío.
+"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from websocket import connection_manager as cm
+from websocket.connection_manager import ConnectionManager
+
+
+class _FakeWebSocket:
+    """WebSocket falso que registra lo enviado; opcionalmente no responde."""
+
+    def __init__(self, stalled=False):
+        self.client_state = SimpleNamespace(value=1)
+        self.stalled = stalled
+        self.texts = []
+        self.binaries = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.stalled:
+            await asyncio.Event().wait()
+        self.texts.append(text)
+
+    async def send_bytes(self, data):
+        self.binaries.append(data)
+
+
+async def _room(manager, sockets, room="camera_cam1"):
+    for index, websocket in enumerate(sockets):
+        client_id = f"client_{index}"
+        await manager.connect(websocket, client_id)
+        await manager.join_room(client_id, room)
+        websocket.texts.clear()
+    return room
+
+
+class TestConnectionManagerBroadcast:
+    """Tests para ConnectionManager.broadcast."""
+
+    @pytest.mark.asyncio
+    async def test_message_is_serialized_once_per_broadcast(self):
+        """Todos los clientes reciben el mismo texto serializado una vez."""
+        manager = ConnectionManager()
+        sockets = [_FakeWebSocket() for _ in range(50)]
+        room = await _room(manager, sockets)
+
+        with patch.object(cm, "encode_json", wraps=cm.encode_json) as encoder:
+            await manager.broadcast({"type": "metrics_update", "fps": 25}, room=room)
+
+        assert encoder.call_count == 1
+        assert all(ws.texts == [sockets[0].texts[0]] for ws in sockets)
+        assert json.loads(sockets[0].texts[0]) == {"type": "metrics_update", "fps": 25}
+        assert manager.get_stats()["total_broadcasts"] == 1
+
+        for index in range(len(sockets)):
+            await manager.disconnect(f"client_{index}")
+
+    @pytest.mark.asyncio
+    async def test_bytes_are_fanned_out_with_send_bytes(self):
+        """Un payload binario se reparte sin pasar por JSON."""
+        manager = ConnectionManager()
+        sockets = [_FakeWebSocket() for _ in range(3)]
+        await _room(manager, sockets)
+
+        await manager.broadcast(b"\x01\x02")
+
+        assert all(ws.binaries == [b"\x01\x02"] for ws in sockets)
+        for index in range(len(sockets)):
+            await manager.disconnect(f"client_{index}")
+
+    @pytest.mark.asyncio
+    async def test_slow_socket_does_not_hold_up_the_room(self):
+        """Un socket atascado solo consume su timeout y no bloquea al resto."""
+        manager = ConnectionManager()
+        manager.send_timeout = 0.1
+        healthy = _FakeWebSocket()
+        stalled = _FakeWebSocket()
+        room = await _room(manager, [healthy, stalled])
+        stalled.stalled = True
+
+        start = time.perf_counter()
+        await manager.broadcast({"type": "metrics_update"}, room=room)
+        await manager.broadcast({"type": "metrics_update"}, room=room)
+        elapsed = time.perf_counter() - start
+
+        stalled_stats = manager.get_connection("client_1").get_queue_stats()
+        assert elapsed < 0.5
+        assert len(healthy.texts) == 2
+        assert manager.total_messages_sent == 2
+        assert stalled_stats["send_timeouts"] == 2
+        # El segundo mensaje se retiró de la cola al vencer su timeout
+        assert stalled_stats["queue_depth"] == 0
+
+        await manager.disconnect("client_0")
+        await manager.disconnect("client_1")
@@ -0,0 +1,127 @@
+"""
+Tests para la cola de salida acotada de WebSocketConnection.
+
+Verifica que un cliente lento no acumula frames sin límite, que se
+descartan los frames más antiguos y nunca los mensajes de control, y que
+el cierre libera lo pendiente.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from websocket.connection_manager import WebSocketConnection
+
+
+class _SlowWebSocket:
+    """WebSocket falso cuyos envíos esperan a que se abra la compuerta."""
+
+    def __init__(self):
+        self.client_state = SimpleNamespace(value=1)
+        self.gate = asyncio.Event()
+        self.sent = []
+
+    async def send_text(self, text):
+        await self.gate.wait()
+        self.sent.append(json.loads(text))
+
+    async def send_bytes(self, data):
+        await self.gate.wait()
+        self.sent.append(data)
+
+
+def _frame(number):
+    return {"type": "frame", "frame_number": number, "data": "x" * 100}
+
+
+class TestConnectionSendQueue:
+    """Tests para la cola de salida por conexión."""
+
+    @pytest.mark.asyncio
+    async def test_stalled_client_keeps_only_newest_frames(self):
+        """Con el cliente parado la cola no pasa del máximo de frames."""
+        websocket = _SlowWebSocket()
+        connection = WebSocketConnection(websocket, "client", max_queued_frames=3,
+                                         max_queued_bytes=1024 * 1024)
+        connection.queue_frame(_frame(0))
+        # El primero sale hacia el socket y queda bloqueado en el envío
+        await asyncio.sleep(0)
+        for number in range(1, 20):
+            assert connection.queue_frame(_frame(number))
+
+        stats = connection.get_queue_stats()
+        assert stats["queued_frames"] == 3
+        assert stats["frames_dropped"] == 16
+
+        websocket.gate.set()
+        await asyncio.sleep(0.05)
+        await connection.close()
+
+        assert [m["frame_number"] for m in websocket.sent] == [0, 17, 18, 19]
+        assert connection.bytes_in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_byte_limit_drops_oldest_frames(self):
+        """El límite de bytes también descarta frames, conservando el último."""
+        websocket = _SlowWebSocket()
+        connection = WebSocketConnection(websocket, "client", max_queued_frames=100,
+                                         max_queued_bytes=250)
+        connection.queue_frame(b"a" * 10)
+        await asyncio.sleep(0)
+        for payload in (b"b" * 100, b"c" * 100, b"d" * 100, b"e" * 400):
+            connection.queue_frame(payload)
+
+        stats = connection.get_queue_stats()
+        assert stats["queued_frames"] == 1
+        assert stats["queued_bytes"] == 400
+        assert stats["frames_dropped"] == 3
+
+        websocket.gate.set()
+        await asyncio.sleep(0.05)
+        await connection.close()
+
+        assert websocket.sent == [b"a" * 10, b"e" * 400]
+
+    @pytest.mark.asyncio
+    async def test_control_messages_are_never_dropped(self):
+        """Los mensajes de control sobreviven a la presión y mantienen su orden."""
+        websocket = _SlowWebSocket()
+        connection = WebSocketConnection(websocket, "client", max_queued_frames=1,
+                                         max_queued_bytes=1024 * 1024)
+        connection.queue_frame(_frame(0))
+        status = asyncio.create_task(connection.send_json({"type": "status", "status": "a"}))
+        await asyncio.sleep(0)
+        for number in range(1, 6):
+            connection.queue_frame(_frame(number))
+
+        websocket.gate.set()
+        assert await status is True
+        await asyncio.sleep(0.05)
+        await connection.close()
+
+        kinds = [m.get("frame_number", m["type"]) for m in websocket.sent]
+        assert kinds == [0, "status", 5]
+        assert connection.get_queue_stats()["control_sent"] == 1
+
+    @pytest.mark.asyncio
+    async def test_close_releases_pending_messages(self):
+        """Al cerrar se resuelven los envíos pendientes y se rechazan nuevos."""
+        websocket = _SlowWebSocket()
+        connection = WebSocketConnection(websocket, "client")
+        connection.queue_frame(_frame(0))
+        pending = asyncio.create_task(connection.send_json({"type": "status"}))
+        await asyncio.sleep(0)
+
+        await connection.close()
+
+        assert await pending is False
+        assert connection.queue_frame(_frame(1)) is False
+        assert await connection.send_json({"type": "status"}) is False
+        assert connection.get_queue_stats()["queue_depth"] == 0
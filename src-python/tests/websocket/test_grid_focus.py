@@ -0,0 +1,76 @@
+"""
+Tests para el enfoque de tiles del mosaico.
+
+Verifica que un FPS inválido se rechaza con un error sin alterar el
+enfoque actual ni cerrar la conexión, y que reenfocar el mismo tile
+actualiza sus FPS.
+"""
+
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from websocket.connection_manager import manager
+from websocket.grid_handler import GridStreamHandler, GridTile
+
+
+class _WebSocket:
+    client_state = SimpleNamespace(value=1)
+
+    def __init__(self):
+        self.texts = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.texts.append(json.loads(text))
+
+
+class TestGridFocus:
+    """Tests para GridStreamHandler.focus."""
+
+    @pytest.mark.asyncio
+    async def test_invalid_fps_is_rejected_without_changing_focus(self):
+        """Un fps no numérico responde con error y conserva el estado."""
+        websocket = _WebSocket()
+        await manager.connect(websocket, "grid_focus_client")
+        handler = GridStreamHandler(websocket, "grid_focus_client")
+        handler.tiles["cam1"] = GridTile("cam1", 5)
+
+        try:
+            await handler.handle_message({"action": "focus", "params": {"camera_id": "cam1", "fps": "fast"}})
+        finally:
+            await manager.disconnect("grid_focus_client")
+
+        assert handler.focused is None
+        assert handler._focus_task is None
+        assert websocket.texts[-1]["type"] == "error"
+        assert "Invalid fps" in websocket.texts[-1]["error"]
+
+    @pytest.mark.asyncio
+    async def test_refocus_same_tile_updates_fps(self):
+        """Reenfocar el tile enfocado cambia los FPS y lo confirma."""
+        websocket = _WebSocket()
+        await manager.connect(websocket, "grid_refocus_client")
+        handler = GridStreamHandler(websocket, "grid_refocus_client")
+        handler.tiles["cam1"] = GridTile("cam1", 5)
+        handler.focused = "cam1"
+        focus_task = object()
+        handler._focus_task = focus_task
+
+        try:
+            await handler.handle_message({"action": "focus", "params": {"camera_id": "cam1", "fps": 60}})
+        finally:
+            await manager.disconnect("grid_refocus_client")
+
+        assert handler.focus_fps == 30
+        assert handler._focus_task is focus_task
+        assert websocket.texts[-1]["status"] == "tile_focused"
+        assert websocket.texts[-1]["data"]["fps"] == 30
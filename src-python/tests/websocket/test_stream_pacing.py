@@ -0,0 +1,81 @@
+"""
+Tests para el límite de FPS por cliente del stream compartido.
+
+Los frames de la captura compartida llegan con la cadencia de la cámara y
+con huecos irregulares; el cliente debe recibir los FPS que pidió.
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+# Configurar path para importar desde src-python
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from websocket.stream_handler import StreamHandler
+
+
+class _ScriptedSubscription:
+    """Suscripción que entrega un frame en cada instante del guion."""
+
+    camera_id = "cam_pacing"
+
+    def __init__(self, handler, clock, arrivals):
+        self.handler = handler
+        self.clock = clock
+        self.arrivals = iter(arrivals)
+
+    async def get(self, timeout=None):
+        arrival = next(self.arrivals, None)
+        if arrival is None:
+            self.handler.is_streaming = False
+            return None
+        self.clock.now = arrival
+        return "frame"
+
+
+def _arrivals(native_fps, seconds):
+    """Llegadas a ``native_fps`` con un jitter determinista de hasta 8 ms."""
+    jitter = (0.0, 0.006, -0.004, 0.008, -0.007, 0.002)
+    return [k / native_fps + jitter[k % len(jitter)] + 1.0
+            for k in range(int(native_fps * seconds))]
+
+
+async def _sent_frames(native_fps, client_fps, seconds=10):
+    handler = StreamHandler("cam_pacing", SimpleNamespace(), "pacing_client")
+    handler.connection = SimpleNamespace()
+    handler.adaptive = False
+    handler.is_streaming = True
+    handler.frame_interval = 1.0 / client_fps
+    handler._deliver_frame = AsyncMock()
+
+    clock = SimpleNamespace(now=0.0)
+    clock.time = lambda: clock.now
+    subscription = _ScriptedSubscription(handler, clock, _arrivals(native_fps, seconds))
+
+    with patch("websocket.stream_handler.asyncio.get_event_loop", return_value=clock), \
+            patch("websocket.stream_handler.websocket_stream_service", new_callable=AsyncMock):
+        await handler.consume_subscription(subscription)
+    return handler._deliver_frame.await_count
+
+
+class TestSharedStreamPacing:
+    """Tests para StreamHandler.consume_subscription."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("native_fps", [25, 30])
+    async def test_client_gets_requested_fps_from_uneven_arrivals(self, native_fps):
+        """Con la cámara a 25 o 30 fps, un cliente a 15 fps recibe ~15 fps."""
+        sent = await _sent_frames(native_fps, client_fps=15)
+
+        assert 148 <= sent <= 151
+
+    @pytest.mark.asyncio
+    async def test_client_at_capture_fps_gets_every_frame(self):
+        """Pedir los mismos FPS que la captura no descarta frames por el jitter."""
+        sent = await _sent_frames(native_fps=15, client_fps=15)
+
+        assert sent == 150
@@ -19,7 +19,7 @@ import logging
 import threading
 from pathlib import Path
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -45,6 +45,7 @@ class BrandInfo:
     rtsp_urls: List[str]
     protocols: List[str]
     models: List[ModelInfo]
+    http_signatures: List[str] = field(default_factory=list)
 
 
 class BrandManager:
@@ -151,7 +152,11 @@ class BrandManager:
                     default_ports=brand_data["default_ports"],
                     rtsp_urls=brand_data["rtsp_urls"],
                     protocols=brand_data["protocols"],
-                    models=models
+                    models=models,
+                    http_signatures=[
+                        signature.lower()
+                        for signature in brand_data.get("http_signatures", [])
+                    ]
                 )
                 
                 self._brands_cache[brand_id] = brand_info
@@ -293,6 +298,30 @@ class BrandManager:
         brand_info = self.get_brand_info(brand_id)
         return brand_info.default_ports if brand_info else {}
     
+    def match_http_signature(self, *header_values: str) -> Optional[str]:
+        """
+        Identifica la marca a partir de headers HTTP/RTSP.
+        
+        Compara ``Server``, ``WWW-Authenticate`` u otros valores contra las
+        ``http_signatures`` de cada marca; la marca genérica se evalúa al
+        final para no ocultar coincidencias más específicas.
+        
+        Args:
+            *header_values: Valores de headers a inspeccionar
+            
+        Returns:
+            ID de la marca o None si no hay coincidencia
+        """
+        text = " ".join(value for value in header_values if value).lower()
+        if not text:
+            return None
+        
+        brands = sorted(self._brands_cache.values(), key=lambda brand: brand.id == "generic")
+        for brand in brands:
+            if any(signature in text for signature in brand.http_signatures):
+                return brand.id
+        return None
+    
     def get_rtsp_urls(self, brand_id: str) -> List[str]:
         """
         Obtiene URLs RTSP de una marca.
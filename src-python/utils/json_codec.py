@@ -0,0 +1,121 @@
+"""
+Serialización JSON rápida para respuestas de la API y mensajes WebSocket.
+
+Usa orjson cuando está instalado y cae a la librería estándar si no. En
+ambos casos los tipos habituales del proyecto se serializan sin
+conversiones manuales:
+
+- ``datetime``: ISO 8601; las fechas UTC con zona se emiten con sufijo
+  ``Z`` y las naive sin zona, tal cual (el proyecto mezcla
+  ``datetime.now()`` local y ``datetime.utcnow()``, por lo que no se
+  puede suponer UTC)
+- ``Enum``: su valor
+- NumPy: arrays y escalares como listas y números nativos
+- Modelos Pydantic, dataclasses, ``UUID``, ``Decimal``, ``Path`` y sets
+"""
+
+import dataclasses
+import json
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from enum import Enum
+from pathlib import PurePath
+from typing import Any
+from uuid import UUID
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = (
+        orjson.OPT_UTC_Z
+        | orjson.OPT_SERIALIZE_NUMPY
+        | orjson.OPT_NON_STR_KEYS
+    )
+
+
+def _format_datetime(value: datetime) -> str:
+    """Formatea un datetime igual que orjson con las opciones del módulo."""
+    if value.tzinfo is None:
+        return value.isoformat()
+    if value.utcoffset() == timezone.utc.utcoffset(None):
+        return value.isoformat().replace("+00:00", "Z")
+    return value.isoformat()
+
+
+def _default(obj: Any) -> Any:
+    """
+    Convierte los tipos que el codificador no soporta de forma nativa.
+
+    Args:
+        obj: Objeto a convertir
+
+    Returns:
+        Representación serializable del objeto
+
+    Raises:
+        TypeError: Si el tipo no es serializable
+    """
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    if hasattr(obj, "dict") and hasattr(obj, "__fields__"):
+        return obj.dict()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, PurePath):
+        return str(obj)
+    if hasattr(obj, "tolist"):
+        # Arrays y escalares NumPy que orjson no cubre (p. ej. float16)
+        return obj.tolist()
+
+    # Tipos que orjson ya serializa y la librería estándar no
+    if isinstance(obj, datetime):
+        return _format_datetime(obj)
+    if isinstance(obj, (date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, UUID):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+
+    raise TypeError(f"Tipo no serializable a JSON: {type(obj).__name__}")
+
+
+def dumps(data: Any) -> bytes:
+    """
+    Serializa a JSON compacto en UTF-8.
+
+    Args:
+        data: Datos a serializar
+
+    Returns:
+        JSON codificado en bytes
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(
+        data, default=_default, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+def dumps_text(data: Any) -> str:
+    """
+    Serializa a JSON compacto como texto (p. ej. para ``send_text``).
+
+    Args:
+        data: Datos a serializar
+
+    Returns:
+        JSON como str
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS).decode("utf-8")
+    return json.dumps(data, default=_default, separators=(",", ":"), ensure_ascii=False)
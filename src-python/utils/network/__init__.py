@@ -0,0 +1,38 @@
+"""
+Utilidades de red para el descubrimiento de cámaras.
+
+Este módulo contiene herramientas para:
+- Detección de hosts activos sin privilegios (TCP + caché ARP)
+- Identificación de protocolos de cámara por puerto (RTSP, ONVIF, HTTP, DVRIP)
+- Descubrimiento multicast (WS-Discovery y SSDP)
+"""
+
+from .liveness import (
+    LIVENESS_PORTS,
+    LivenessProber,
+    LivenessResult,
+    SubnetRTTEstimator,
+    read_arp_cache
+)
+from .discovery import (
+    DiscoveredDevice,
+    ssdp_discovery,
+    ws_discovery
+)
+from .fingerprint import (
+    FingerprintResult,
+    ProtocolFingerprinter
+)
+
+__all__ = [
+    'LIVENESS_PORTS',
+    'LivenessProber',
+    'LivenessResult',
+    'SubnetRTTEstimator',
+    'read_arp_cache',
+    'DiscoveredDevice',
+    'ssdp_discovery',
+    'ws_discovery',
+    'FingerprintResult',
+    'ProtocolFingerprinter'
+]
@@ -0,0 +1,290 @@
+"""
+Descubrimiento multicast de cámaras (WS-Discovery y SSDP).
+
+Un único probe multicast a 239.255.255.250 basta para que todos los
+dispositivos del segmento respondan por unicast; las respuestas se
+recogen durante una ventana fija y se deduplican por dispositivo. Es
+mucho más rápido que sondear cada IP, aunque solo alcanza el dominio de
+broadcast local.
+"""
+
+import asyncio
+import socket
+import uuid
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+
+MULTICAST_ADDRESS = "239.255.255.250"
+WS_DISCOVERY_PORT = 3702
+SSDP_PORT = 1900
+
+WS_DISCOVERY_PROBE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<e:Envelope xmlns:e="http://www.w3.org/2003/05/soap-envelope" '
+    'xmlns:w="http://schemas.xmlsoap.org/ws/2004/08/addressing" '
+    'xmlns:d="http://schemas.xmlsoap.org/ws/2005/04/discovery" '
+    'xmlns:dn="http://www.onvif.org/ver10/network/wsdl">'
+    '<e:Header>'
+    '<w:MessageID>urn:uuid:{message_id}</w:MessageID>'
+    '<w:To e:mustUnderstand="true">urn:schemas-xmlsoap-org:ws:2005:04:discovery</w:To>'
+    '<w:Action e:mustUnderstand="true">'
+    'http://schemas.xmlsoap.org/ws/2005/04/discovery/Probe</w:Action>'
+    '</e:Header>'
+    '<e:Body><d:Probe><d:Types>dn:NetworkVideoTransmitter</d:Types></d:Probe></e:Body>'
+    '</e:Envelope>'
+)
+
+SSDP_SEARCH = (
+    "M-SEARCH * HTTP/1.1\r\n"
+    f"HOST: {MULTICAST_ADDRESS}:{SSDP_PORT}\r\n"
+    'MAN: "ssdp:discover"\r\n'
+    "MX: {mx}\r\n"
+    "ST: {search_target}\r\n"
+    "\r\n"
+)
+
+
+@dataclass
+class DiscoveredDevice:
+    """Dispositivo que respondió a un probe multicast."""
+    ip: str
+    port: int
+    method: str  # 'ws-discovery' | 'ssdp'
+    xaddrs: List[str] = field(default_factory=list)
+    scopes: List[str] = field(default_factory=list)
+    types: List[str] = field(default_factory=list)
+    endpoint: Optional[str] = None
+    location: Optional[str] = None
+    server: Optional[str] = None
+    search_target: Optional[str] = None
+
+    @property
+    def scope_values(self) -> Dict[str, str]:
+        """Valores de scopes ONVIF (``name``, ``hardware``, ``location``...)."""
+        values = {}
+        prefix = "onvif://www.onvif.org/"
+        for scope in self.scopes:
+            if not scope.startswith(prefix):
+                continue
+            key, _, value = scope[len(prefix):].partition("/")
+            if value and key not in values:
+                values[key] = unquote(value)
+        return values
+
+    def to_details(self) -> Dict[str, Any]:
+        """Detalles para ``ProtocolDetectionResult``."""
+        details: Dict[str, Any] = {"discovery_method": self.method}
+        if self.method == "ws-discovery":
+            details.update({
+                "xaddrs": self.xaddrs,
+                "types": self.types,
+                "endpoint": self.endpoint,
+                "device_type": "NetworkVideoTransmitter"
+            })
+            scopes = self.scope_values
+            for key in ("name", "hardware", "location"):
+                if key in scopes:
+                    details[key] = scopes[key]
+        else:
+            details.update({
+                "location": self.location,
+                "server": self.server,
+                "device_type": self.search_target
+            })
+        return details
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _url_host_port(url: str, default_port: int = 80) -> Tuple[Optional[str], int]:
+    try:
+        parsed = urlparse(url)
+        return parsed.hostname, parsed.port or (443 if parsed.scheme == "https" else default_port)
+    except ValueError:
+        return None, default_port
+
+
+def parse_probe_matches(payload: bytes, source_ip: str,
+                        message_id: Optional[str] = None) -> List[DiscoveredDevice]:
+    """
+    Parsea una respuesta ``ProbeMatches``.
+
+    Args:
+        payload: Datagrama recibido
+        source_ip: IP de origen del datagrama
+        message_id: MessageID del probe; descarta respuestas a otros probes
+
+    Returns:
+        Dispositivos encontrados en la respuesta
+    """
+    try:
+        root = ET.fromstring(payload)
+    except ET.ParseError:
+        return []
+
+    if message_id:
+        relates_to = next((el for el in root.iter() if _local_name(el.tag) == "RelatesTo"), None)
+        if relates_to is not None and (relates_to.text or "").strip() != message_id:
+            return []
+
+    devices = []
+    for match in root.iter():
+        if _local_name(match.tag) != "ProbeMatch":
+            continue
+        fields: Dict[str, List[str]] = {}
+        endpoint = None
+        for child in match.iter():
+            name = _local_name(child.tag)
+            if name in ("XAddrs", "Scopes", "Types"):
+                fields[name] = (child.text or "").split()
+            elif name == "Address" and child.text:
+                endpoint = child.text.strip()
+
+        xaddrs = fields.get("XAddrs", [])
+        # Preferir la XAddr que coincide con la IP de origen
+        host, port = None, 80
+        for xaddr in xaddrs:
+            host, port = _url_host_port(xaddr)
+            if host == source_ip:
+                break
+        else:
+            host = source_ip
+            if xaddrs:
+                port = _url_host_port(xaddrs[0])[1]
+
+        devices.append(DiscoveredDevice(
+            ip=host or source_ip,
+            port=port,
+            method="ws-discovery",
+            xaddrs=xaddrs,
+            scopes=fields.get("Scopes", []),
+            types=fields.get("Types", []),
+            endpoint=endpoint
+        ))
+    return devices
+
+
+def parse_ssdp_response(payload: bytes, source_ip: str) -> Optional[DiscoveredDevice]:
+    """
+    Parsea una respuesta SSDP a ``M-SEARCH``.
+
+    Args:
+        payload: Datagrama recibido
+        source_ip: IP de origen del datagrama
+
+    Returns:
+        Dispositivo o None si no es una respuesta SSDP válida
+    """
+    lines = payload.decode("latin-1", errors="replace").split("\r\n")
+    if not lines or not lines[0].upper().startswith("HTTP/1.1 200"):
+        return None
+
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+
+    location = headers.get("location")
+    port = _url_host_port(location)[1] if location else 80
+    return DiscoveredDevice(
+        ip=source_ip,
+        port=port,
+        method="ssdp",
+        endpoint=headers.get("usn"),
+        location=location,
+        server=headers.get("server"),
+        search_target=headers.get("st")
+    )
+
+
+class _CollectorProtocol(asyncio.DatagramProtocol):
+    """Acumula datagramas recibidos durante la ventana de escucha."""
+
+    def __init__(self):
+        self.datagrams: List[Tuple[bytes, str]] = []
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.datagrams.append((data, addr[0]))
+
+    def error_received(self, exc: Exception) -> None:
+        pass
+
+
+async def _multicast_exchange(message: bytes, target: Tuple[str, int],
+                              window: float, ttl: int) -> List[Tuple[bytes, str]]:
+    """Envía un datagrama y recoge las respuestas durante ``window`` segundos."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+    sock.setblocking(False)
+    sock.bind(("", 0))
+
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(_CollectorProtocol, sock=sock)
+    try:
+        # UDP sin confirmación: se repite el probe por si se pierde
+        transport.sendto(message, target)
+        await asyncio.sleep(min(0.1, window / 4))
+        transport.sendto(message, target)
+        await asyncio.sleep(window)
+    finally:
+        transport.close()
+    return protocol.datagrams
+
+
+async def ws_discovery(window: float = 3.0,
+                       target: Tuple[str, int] = (MULTICAST_ADDRESS, WS_DISCOVERY_PORT),
+                       ttl: int = 2) -> List[DiscoveredDevice]:
+    """
+    Descubre dispositivos ONVIF con un probe WS-Discovery.
+
+    Args:
+        window: Segundos de escucha de respuestas
+        target: Destino del probe (multicast por defecto)
+        ttl: TTL multicast
+
+    Returns:
+        Dispositivos únicos por endpoint (o IP)
+    """
+    message_id = f"urn:uuid:{uuid.uuid4()}"
+    probe = WS_DISCOVERY_PROBE.format(message_id=message_id.split(":", 2)[2]).encode()
+    datagrams = await _multicast_exchange(probe, target, window, ttl)
+
+    devices: Dict[str, DiscoveredDevice] = {}
+    for payload, source_ip in datagrams:
+        for device in parse_probe_matches(payload, source_ip, message_id):
+            devices.setdefault(device.endpoint or device.ip, device)
+    return list(devices.values())
+
+
+async def ssdp_discovery(window: float = 3.0,
+                         target: Tuple[str, int] = (MULTICAST_ADDRESS, SSDP_PORT),
+                         search_target: str = "ssdp:all",
+                         ttl: int = 2) -> List[DiscoveredDevice]:
+    """
+    Descubre dispositivos UPnP con ``M-SEARCH``.
+
+    Args:
+        window: Segundos de escucha de respuestas
+        target: Destino de la búsqueda (multicast por defecto)
+        search_target: Valor del header ST
+        ttl: TTL multicast
+
+    Returns:
+        Dispositivos únicos por IP
+    """
+    mx = max(1, int(window) - 1)
+    message = SSDP_SEARCH.format(mx=mx, search_target=search_target).encode()
+    datagrams = await _multicast_exchange(message, target, window, ttl)
+
+    devices: Dict[str, DiscoveredDevice] = {}
+    for payload, source_ip in datagrams:
+        device = parse_ssdp_response(payload, source_ip)
+        if device is not None:
+            devices.setdefault(device.ip, device)
+    return list(devices.values())
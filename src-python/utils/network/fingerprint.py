@@ -0,0 +1,323 @@
+"""
+Identificación de protocolos de cámara por puerto abierto.
+
+Cada protocolo candidato se confirma con una única sonda barata:
+
+- RTSP: ``OPTIONS`` y respuesta ``RTSP/1.0``
+- ONVIF: ``GetSystemDateAndTime`` (no requiere autenticación)
+- HTTP: ``HEAD /`` con el header ``Server`` y el realm comparados contra
+  las firmas de ``camera_brands.json``
+- Dahua SDK (37777): cabecera DVRIP y respuesta ``0xb0``
+
+Las sondas HTTP comparten una única sesión con keep-alive. En cuanto un
+protocolo se confirma se cancelan las sondas de menor prioridad.
+"""
+
+import asyncio
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+import aiohttp
+
+from utils.brand_manager import get_brand_manager
+
+
+# Orden de preferencia (igual que ScanResult.best_protocol)
+PROTOCOL_PRIORITY = ("onvif", "rtsp", "http", "amcrest")
+
+ONVIF_DEVICE_SERVICE = "/onvif/device_service"
+ONVIF_DATE_TIME_REQUEST = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<s:Envelope xmlns:s="http://www.w3.org/2003/05/soap-envelope">'
+    '<s:Body xmlns:tds="http://www.onvif.org/ver10/device/wsdl">'
+    '<tds:GetSystemDateAndTime/>'
+    '</s:Body>'
+    '</s:Envelope>'
+)
+
+# Cabecera DVRIP de 32 bytes; el equipo responde con 0xb0 (o 0xb1)
+DAHUA_DVRIP_PROBE = b"\xa0" + b"\x00" * 31
+DAHUA_DVRIP_REPLIES = (0xb0, 0xb1)
+
+_MAX_BODY_BYTES = 16384
+_UTC_FIELDS = ("Year", "Month", "Day", "Hour", "Minute", "Second")
+
+
+@dataclass
+class FingerprintResult:
+    """Resultado de una sonda de protocolo."""
+    protocol: str
+    port: int
+    detected: bool
+    response_time_ms: float
+    details: Dict[str, Any] = field(default_factory=dict)
+    error_message: Optional[str] = None
+
+
+def parse_onvif_utc(body: str) -> Optional[datetime]:
+    """
+    Extrae la hora UTC de una respuesta ``GetSystemDateAndTime``.
+
+    Args:
+        body: XML de la respuesta
+
+    Returns:
+        Fecha UTC del dispositivo o None si no viene
+    """
+    utc_start = body.find("UTCDateTime")
+    if utc_start < 0:
+        return None
+    section = body[utc_start:]
+    values = {}
+    for name in _UTC_FIELDS:
+        match = re.search(rf"<(?:\w+:)?{name}>(\d+)</", section)
+        if not match:
+            return None
+        values[name.lower()] = int(match.group(1))
+    try:
+        return datetime(tzinfo=timezone.utc, **values)
+    except ValueError:
+        return None
+
+
+class ProtocolFingerprinter:
+    """
+    Motor de sondas de protocolo con sesión HTTP compartida.
+
+    Usar como context manager asíncrono para abrir y cerrar la sesión::
+
+        async with ProtocolFingerprinter(timeout=2.0) as fingerprinter:
+            results = await fingerprinter.fingerprint(ip, 80, ["onvif", "http"])
+    """
+
+    def __init__(self, timeout: float = 2.0, max_connections: int = 100):
+        """
+        Inicializa el motor.
+
+        Args:
+            timeout: Timeout por sonda en segundos
+            max_connections: Conexiones HTTP simultáneas de la sesión
+        """
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._probes = {
+            "rtsp": self.probe_rtsp,
+            "onvif": self.probe_onvif,
+            "http": self.probe_http,
+            "amcrest": self.probe_dahua_sdk,
+        }
+
+    async def __aenter__(self) -> "ProtocolFingerprinter":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """Abre la sesión HTTP compartida (keep-alive)."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections,
+                    limit_per_host=2,
+                    keepalive_timeout=15,
+                    ssl=False
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"User-Agent": "UniversalCameraViewer/scan"}
+            )
+
+    async def close(self) -> None:
+        """Cierra la sesión HTTP."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def supported_protocols(self) -> List[str]:
+        """Protocolos con sonda disponible."""
+        return list(self._probes)
+
+    async def fingerprint(self, ip: str, port: int, protocols: Iterable[str]) -> List[FingerprintResult]:
+        """
+        Ejecuta en paralelo las sondas candidatas de un puerto.
+
+        Cuando un protocolo se confirma se cancelan las sondas pendientes de
+        menor prioridad; las de mayor prioridad siguen hasta terminar.
+
+        Args:
+            ip: Dirección del host
+            port: Puerto abierto
+            protocols: Protocolos candidatos
+
+        Returns:
+            Resultados de las sondas que llegaron a completarse
+        """
+        candidates = [p for p in dict.fromkeys(protocols) if p in self._probes]
+        tasks = {
+            asyncio.create_task(self._run_probe(protocol, ip, port)): protocol
+            for protocol in candidates
+        }
+        results: List[FingerprintResult] = []
+
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    results.append(result)
+                    if not result.detected:
+                        continue
+                    rank = self._priority(result.protocol)
+                    for other in list(pending):
+                        if self._priority(tasks[other]) > rank:
+                            other.cancel()
+                            pending.discard(other)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        return results
+
+    @staticmethod
+    def _priority(protocol: str) -> int:
+        try:
+            return PROTOCOL_PRIORITY.index(protocol)
+        except ValueError:
+            return len(PROTOCOL_PRIORITY)
+
+    async def _run_probe(self, protocol: str, ip: str, port: int) -> FingerprintResult:
+        """Ejecuta una sonda midiendo tiempo y capturando errores."""
+        start = time.perf_counter()
+        details: Optional[Dict[str, Any]] = None
+        error_message = None
+
+        try:
+            details = await asyncio.wait_for(self._probes[protocol](ip, port), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            error_message = "timeout"
+        except Exception as e:
+            error_message = str(e) or type(e).__name__
+
+        return FingerprintResult(
+            protocol=protocol,
+            port=port,
+            detected=details is not None,
+            response_time_ms=(time.perf_counter() - start) * 1000,
+            details=details or {},
+            error_message=error_message
+        )
+
+    # === Sondas ===
+
+    async def probe_rtsp(self, ip: str, port: int) -> Optional[Dict[str, Any]]:
+        """Envía ``OPTIONS`` y valida la línea de estado RTSP."""
+        reader, writer = await asyncio.open_connection(ip, port)
+        try:
+            writer.write(
+                f"OPTIONS rtsp://{ip}:{port}/ RTSP/1.0\r\n"
+                f"CSeq: 1\r\n"
+                f"User-Agent: UniversalCameraViewer/scan\r\n\r\n".encode()
+            )
+            await writer.drain()
+            raw = await reader.readuntil(b"\r\n\r\n")
+        finally:
+            writer.close()
+
+        lines = raw.decode("latin-1").split("\r\n")
+        status = lines[0].split(" ", 2)
+        if not status[0].startswith("RTSP/"):
+            return None
+
+        headers = self._parse_headers(lines[1:])
+        details: Dict[str, Any] = {"status": int(status[1]) if len(status) > 1 and status[1].isdigit() else None}
+        if "server" in headers:
+            details["server"] = headers["server"]
+        if "public" in headers:
+            details["methods"] = [m.strip() for m in headers["public"].split(",") if m.strip()]
+        brand = get_brand_manager().match_http_signature(headers.get("server", ""), headers.get("www-authenticate", ""))
+        if brand:
+            details["brand"] = brand
+        return details
+
+    async def probe_onvif(self, ip: str, port: int) -> Optional[Dict[str, Any]]:
+        """Llama a ``GetSystemDateAndTime`` en el device service."""
+        url = f"{self._scheme(port)}://{ip}:{port}{ONVIF_DEVICE_SERVICE}"
+        async with self._session.post(
+            url,
+            data=ONVIF_DATE_TIME_REQUEST,
+            headers={"Content-Type": "application/soap+xml; charset=utf-8"},
+            allow_redirects=False
+        ) as response:
+            body = (await response.content.read(_MAX_BODY_BYTES)).decode("utf-8", errors="replace")
+            status = response.status
+
+        # Solo un servidor SOAP responde con un Envelope (incluidos los Fault)
+        if "Envelope" not in body:
+            return None
+
+        details: Dict[str, Any] = {"status": status, "device_service": url}
+        device_time = parse_onvif_utc(body)
+        if device_time:
+            details["device_time_utc"] = device_time.isoformat()
+            details["clock_skew_s"] = round(
+                (device_time - datetime.now(timezone.utc)).total_seconds(), 1
+            )
+        if "GetSystemDateAndTimeResponse" not in body:
+            details["fault"] = True
+        return details
+
+    async def probe_http(self, ip: str, port: int) -> Optional[Dict[str, Any]]:
+        """Envía ``HEAD /`` y busca la marca en ``Server`` y en el realm."""
+        url = f"{self._scheme(port)}://{ip}:{port}/"
+        async with self._session.head(url, allow_redirects=False) as response:
+            server = response.headers.get("Server", "")
+            authenticate = response.headers.get("WWW-Authenticate", "")
+            status = response.status
+            # El parser HTTP acepta respuestas RTSP; solo estas llevan CSeq
+            is_rtsp = "CSeq" in response.headers
+
+        brand = get_brand_manager().match_http_signature(server, authenticate)
+        if brand is None or is_rtsp:
+            return None
+
+        details: Dict[str, Any] = {"status": status, "brand": brand}
+        if server:
+            details["server"] = server
+        if authenticate:
+            details["auth"] = authenticate.split(" ", 1)[0].lower()
+        return details
+
+    async def probe_dahua_sdk(self, ip: str, port: int) -> Optional[Dict[str, Any]]:
+        """Envía una cabecera DVRIP y valida la respuesta del SDK Dahua."""
+        reader, writer = await asyncio.open_connection(ip, port)
+        try:
+            writer.write(DAHUA_DVRIP_PROBE)
+            await writer.drain()
+            reply = await reader.read(32)
+        finally:
+            writer.close()
+
+        if not reply or reply[0] not in DAHUA_DVRIP_REPLIES:
+            return None
+        return {"service": "dvrip", "brand": "dahua"}
+
+    @staticmethod
+    def _scheme(port: int) -> str:
+        return "https" if port == 443 else "http"
+
+    @staticmethod
+    def _parse_headers(lines: List[str]) -> Dict[str, str]:
+        headers = {}
+        for line in lines:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        return headers
@@ -0,0 +1,301 @@
+"""
+Detección de hosts activos sin privilegios de root.
+
+En lugar de ICMP (que requiere sockets raw o lanzar ``ping`` por host) se
+lanzan en paralelo conexiones TCP a unos pocos puertos típicos de cámaras:
+basta con que uno acepte o responda con RST para saber que el host existe.
+Se complementa con la caché ARP del sistema cuando está disponible y con un
+timeout adaptado al RTT medido en cada subred.
+"""
+
+import asyncio
+import ipaddress
+import re
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+
+# RTSP, HTTP/ONVIF, HTTP alternativo (Hikvision/Steren) y SDK Dahua
+LIVENESS_PORTS: Tuple[int, ...] = (554, 80, 8000, 37777)
+
+_INCOMPLETE_MACS = {"00:00:00:00:00:00", "ff:ff:ff:ff:ff:ff"}
+_ARP_LINE = re.compile(
+    r"(?P<ip>\d{1,3}(?:\.\d{1,3}){3})\D+?"
+    r"(?P<mac>[0-9a-fA-F]{2}(?:[:-][0-9a-fA-F]{2}){5})"
+)
+
+
+@dataclass
+class LivenessResult:
+    """Resultado del sondeo de un host."""
+    ip: str
+    alive: bool
+    method: Optional[str] = None  # 'arp' | 'tcp'
+    port: Optional[int] = None
+    port_open: bool = False
+    rtt_ms: Optional[float] = None
+
+
+def parse_proc_net_arp(text: str) -> Dict[str, str]:
+    """
+    Parsea ``/proc/net/arp`` (Linux).
+
+    Args:
+        text: Contenido del archivo
+
+    Returns:
+        Diccionario IP -> MAC de las entradas completas
+    """
+    entries = {}
+    for line in text.splitlines()[1:]:
+        parts = line.split()
+        if len(parts) < 4:
+            continue
+        ip, _hw_type, flags, mac = parts[:4]
+        # ATF_COM (0x2): entrada resuelta
+        try:
+            complete = int(flags, 16) & 0x2
+        except ValueError:
+            continue
+        if complete and mac.lower() not in _INCOMPLETE_MACS:
+            entries[ip] = mac.lower()
+    return entries
+
+
+def parse_arp_output(text: str) -> Dict[str, str]:
+    """
+    Parsea la salida de ``arp -a`` (Windows y macOS/BSD).
+
+    Args:
+        text: Salida del comando
+
+    Returns:
+        Diccionario IP -> MAC de las entradas resueltas
+    """
+    entries = {}
+    for line in text.splitlines():
+        match = _ARP_LINE.search(line)
+        if not match:
+            continue
+        mac = match.group('mac').lower().replace('-', ':')
+        if mac not in _INCOMPLETE_MACS:
+            entries[match.group('ip')] = mac
+    return entries
+
+
+def read_arp_cache() -> Dict[str, str]:
+    """
+    Lee la caché ARP del sistema.
+
+    Returns:
+        Diccionario IP -> MAC; vacío si la plataforma no lo permite
+    """
+    if sys.platform.startswith('linux'):
+        try:
+            with open('/proc/net/arp', 'r') as f:
+                return parse_proc_net_arp(f.read())
+        except OSError:
+            return {}
+
+    try:
+        output = subprocess.run(
+            ['arp', '-a'],
+            capture_output=True,
+            text=True,
+            timeout=3
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return {}
+    return parse_arp_output(output)
+
+
+class SubnetRTTEstimator:
+    """
+    Estimación de RTT por subred (/24) al estilo RFC 6298.
+
+    Mientras no hay muestras de una subred se usa el timeout máximo; con
+    muestras el timeout baja a ``srtt + 4 * rttvar`` acotado.
+    """
+
+    ALPHA = 0.125
+    BETA = 0.25
+
+    def __init__(self, min_timeout: float = 0.25, max_timeout: float = 1.5, prefix: int = 24):
+        """
+        Inicializa el estimador.
+
+        Args:
+            min_timeout: Timeout mínimo en segundos
+            max_timeout: Timeout máximo (y sin muestras) en segundos
+            prefix: Longitud de prefijo que agrupa los hosts en subredes
+        """
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.prefix = prefix
+        self._stats: Dict[str, Tuple[float, float]] = {}
+
+    def subnet_of(self, ip: str) -> str:
+        """Clave de subred de una IP."""
+        return str(ipaddress.ip_network(f"{ip}/{self.prefix}", strict=False))
+
+    def record(self, ip: str, rtt: float) -> None:
+        """
+        Registra una muestra de RTT.
+
+        Args:
+            ip: IP que respondió
+            rtt: RTT en segundos
+        """
+        key = self.subnet_of(ip)
+        stats = self._stats.get(key)
+        if stats is None:
+            self._stats[key] = (rtt, rtt / 2)
+            return
+        srtt, rttvar = stats
+        rttvar = (1 - self.BETA) * rttvar + self.BETA * abs(srtt - rtt)
+        srtt = (1 - self.ALPHA) * srtt + self.ALPHA * rtt
+        self._stats[key] = (srtt, rttvar)
+
+    def timeout_for(self, ip: str) -> float:
+        """Timeout recomendado para sondear una IP."""
+        stats = self._stats.get(self.subnet_of(ip))
+        if stats is None:
+            return self.max_timeout
+        srtt, rttvar = stats
+        return min(self.max_timeout, max(self.min_timeout, srtt + 4 * rttvar))
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Estadísticas por subred en milisegundos."""
+        return {
+            subnet: {
+                'srtt_ms': round(srtt * 1000, 2),
+                'rttvar_ms': round(rttvar * 1000, 2),
+                'timeout_ms': round(
+                    min(self.max_timeout, max(self.min_timeout, srtt + 4 * rttvar)) * 1000, 2
+                )
+            }
+            for subnet, (srtt, rttvar) in self._stats.items()
+        }
+
+
+class LivenessProber:
+    """
+    Sondeo de hosts por carrera de conexiones TCP más caché ARP.
+
+    Un host se considera activo si está resuelto en la caché ARP o si
+    alguno de los puertos acepta la conexión o la rechaza (RST). Los
+    errores de red (host inalcanzable) y los timeouts cuentan como inactivo.
+    """
+
+    def __init__(self,
+                 ports: Iterable[int] = LIVENESS_PORTS,
+                 min_timeout: float = 0.25,
+                 max_timeout: float = 1.5,
+                 use_arp: bool = True):
+        """
+        Inicializa el prober.
+
+        Args:
+            ports: Puertos a sondear en paralelo
+            min_timeout: Timeout mínimo por host en segundos
+            max_timeout: Timeout máximo por host en segundos
+            use_arp: Consultar la caché ARP del sistema
+        """
+        self.ports = tuple(ports)
+        self.use_arp = use_arp
+        self.rtt = SubnetRTTEstimator(min_timeout=min_timeout, max_timeout=max_timeout)
+        self._arp: Dict[str, str] = {}
+
+    async def refresh_arp(self) -> int:
+        """
+        Recarga la caché ARP sin bloquear el loop.
+
+        Returns:
+            Número de entradas resueltas
+        """
+        if not self.use_arp:
+            return 0
+        loop = asyncio.get_running_loop()
+        self._arp = await loop.run_in_executor(None, read_arp_cache)
+        return len(self._arp)
+
+    def arp_entries(self) -> Dict[str, str]:
+        """Entradas ARP conocidas (IP -> MAC)."""
+        return dict(self._arp)
+
+    async def probe(self, ip: str) -> LivenessResult:
+        """
+        Determina si un host está activo.
+
+        Args:
+            ip: Dirección a sondear
+
+        Returns:
+            LivenessResult del host
+        """
+        if ip in self._arp:
+            return LivenessResult(ip=ip, alive=True, method='arp')
+
+        timeout = self.rtt.timeout_for(ip)
+        tasks = [asyncio.create_task(self._connect(ip, port)) for port in self.ports]
+        result = None
+
+        try:
+            pending = set(tasks)
+            deadline = time.perf_counter() + timeout
+            while pending and result is None:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    outcome = task.result()
+                    if outcome is not None:
+                        result = outcome
+                        break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if result is not None:
+            port, is_open, rtt = result
+            self.rtt.record(ip, rtt)
+            return LivenessResult(
+                ip=ip,
+                alive=True,
+                method='tcp',
+                port=port,
+                port_open=is_open,
+                rtt_ms=rtt * 1000
+            )
+
+        return LivenessResult(ip=ip, alive=False)
+
+    async def _connect(self, ip: str, port: int) -> Optional[Tuple[int, bool, float]]:
+        """
+        Intenta una conexión TCP.
+
+        Returns:
+            (puerto, abierto, rtt) si el host respondió; None si no
+        """
+        family = socket.AF_INET6 if ':' in ip else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        start = time.perf_counter()
+        try:
+            await asyncio.get_running_loop().sock_connect(sock, (ip, port))
+            return port, True, time.perf_counter() - start
+        except ConnectionRefusedError:
+            # RST: el host existe aunque el puerto esté cerrado
+            return port, False, time.perf_counter() - start
+        except OSError:
+            return None
+        finally:
+            sock.close()
@@ -9,16 +9,20 @@ Este módulo contiene herramientas para:
 
 from .frame_converter import (
     FrameConverter,
+    EncodedFrameCache,
     FrameConversionStrategy,
     Base64JPEGStrategy,
     Base64PNGStrategy,
     BytesJPEGStrategy
 )
+from .latency_tracker import LatencyTracker
 
 __all__ = [
     'FrameConverter',
+    'EncodedFrameCache',
     'FrameConversionStrategy',
     'Base64JPEGStrategy',
     'Base64PNGStrategy',
-    'BytesJPEGStrategy'
+    'BytesJPEGStrategy',
+    'LatencyTracker'
 ]
\ No newline at end of file
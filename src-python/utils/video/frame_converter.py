@@ -6,12 +6,15 @@ a formatos compatibles con Flet UI.
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
 import numpy as np
 import cv2
 import base64
 from io import BytesIO
 import logging
+import threading
+import time
 
 
 class FrameConversionStrategy(ABC):
@@ -142,6 +145,133 @@ class BytesJPEGStrategy(FrameConversionStrategy):
         return "image/jpeg"
 
 
+class EncodedFrameCache:
+    """
+    Cache LRU de frames codificados acotada por bytes.
+    
+    Guarda la codificación más reciente por clave
+    (camera_id, tamaño, calidad, formato) junto con el número de secuencia
+    del frame de origen; una entrada solo es válida para esa secuencia.
+    Así varios clientes que piden el mismo escalón reciben una única
+    codificación por frame.
+    
+    Attributes:
+        max_bytes: Tamaño máximo total de las entradas
+        hits: Aciertos de cache
+        misses: Fallos de cache
+        evictions: Entradas expulsadas por límite de tamaño
+    """
+    
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        """
+        Inicializa la cache.
+        
+        Args:
+            max_bytes: Límite total en bytes
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[int, Any, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def make_key(
+        camera_id: str,
+        size: Optional[Tuple[int, int]],
+        quality: int,
+        encoding: str
+    ) -> Tuple[str, Optional[Tuple[int, int]], int, str]:
+        """Construye la clave de cache."""
+        return (camera_id, size, quality, encoding)
+    
+    @staticmethod
+    def _payload_size(payload: Any) -> int:
+        """Tamaño aproximado del payload codificado."""
+        if isinstance(payload, (bytes, bytearray, str)):
+            return len(payload)
+        return 0
+    
+    def get(self, key: Hashable, sequence: int) -> Optional[Any]:
+        """
+        Obtiene la codificación de una clave para una secuencia concreta.
+        
+        Args:
+            key: Clave de cache
+            sequence: Secuencia del frame de origen
+            
+        Returns:
+            Payload codificado o None si no existe o es de otro frame
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != sequence:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def put(self, key: Hashable, sequence: int, payload: Any) -> None:
+        """
+        Guarda la codificación más reciente de una clave.
+        
+        Args:
+            key: Clave de cache
+            sequence: Secuencia del frame de origen
+            payload: Frame codificado
+        """
+        size = self._payload_size(payload)
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                # No reemplazar una codificación más reciente por una antigua
+                if previous[0] > sequence:
+                    self._entries[key] = previous
+                    return
+                self._total_bytes -= previous[2]
+            
+            self._entries[key] = (sequence, payload, size)
+            self._total_bytes += size
+            
+            while self._total_bytes > self.max_bytes and self._entries:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+                self.evictions += 1
+    
+    def invalidate_camera(self, camera_id: str) -> None:
+        """Elimina todas las entradas de una cámara."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == camera_id]:
+                self._total_bytes -= self._entries.pop(key)[2]
+    
+    def clear(self) -> None:
+        """Vacía la cache."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+    
+    def get_stats(self) -> dict:
+        """Obtiene estadísticas de la cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'total_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0
+            }
+
+
 class FrameConverter:
     """
     Convertidor de frames con soporte para múltiples estrategias.
@@ -151,18 +281,30 @@ class FrameConverter:
         default_quality: Calidad por defecto para compresión
     """
     
-    def __init__(self, strategy: Optional[FrameConversionStrategy] = None, default_quality: int = 85):
+    def __init__(
+        self,
+        strategy: Optional[FrameConversionStrategy] = None,
+        default_quality: int = 85,
+        cache: Optional[EncodedFrameCache] = None
+    ):
         """
         Inicializa el convertidor.
         
         Args:
             strategy: Estrategia de conversión (por defecto Base64JPEGStrategy)
             default_quality: Calidad por defecto (1-100)
+            cache: Cache de frames codificados (opcional)
         """
         self._strategy = strategy or Base64JPEGStrategy()
         self.default_quality = default_quality
+        self.cache = cache
         self.logger = logging.getLogger(__name__)
     
+    @property
+    def strategy(self) -> FrameConversionStrategy:
+        """Estrategia de conversión actual."""
+        return self._strategy
+    
     def set_strategy(self, strategy: FrameConversionStrategy) -> None:
         """Cambia la estrategia de conversión."""
         self._strategy = strategy
@@ -171,7 +313,8 @@ class FrameConverter:
         self, 
         frame: np.ndarray, 
         resize: Optional[Tuple[int, int]] = None,
-        quality: Optional[int] = None
+        quality: Optional[int] = None,
+        timings: Optional[Dict[str, float]] = None
     ) -> any:
         """
         Convierte un frame usando la estrategia actual.
@@ -180,6 +323,8 @@ class FrameConverter:
             frame: Frame OpenCV (numpy array)
             resize: Tupla (width, height) para redimensionar
             quality: Calidad de compresión (usa default si es None)
+            timings: Diccionario donde anotar la duración en ms de las
+                etapas ``resize`` y ``encode`` (opcional)
             
         Returns:
             Frame convertido según la estrategia
@@ -187,15 +332,48 @@ class FrameConverter:
         if frame is None or frame.size == 0:
             raise ValueError("Frame inválido o vacío")
         
+        start = time.perf_counter()
+        
         # Redimensionar si es necesario
         if resize:
             frame = self._resize_frame(frame, resize)
+            if timings is not None:
+                resized = time.perf_counter()
+                timings['resize'] = (resized - start) * 1000
+                start = resized
         
         # Usar calidad por defecto si no se especifica
         quality = quality or self.default_quality
         
         # Convertir usando la estrategia
-        return self._strategy.convert(frame, quality)
+        result = self._strategy.convert(frame, quality)
+        if timings is not None:
+            timings['encode'] = (time.perf_counter() - start) * 1000
+        return result
+    
+    def cache_key(
+        self,
+        camera_id: str,
+        resize: Optional[Tuple[int, int]],
+        quality: Optional[int]
+    ) -> Tuple[str, Optional[Tuple[int, int]], int, str]:
+        """
+        Clave de cache para una codificación con la estrategia actual.
+        
+        Args:
+            camera_id: ID de la cámara
+            resize: Tamaño objetivo
+            quality: Calidad (usa default si es None)
+            
+        Returns:
+            Clave (camera_id, tamaño, calidad, formato)
+        """
+        return EncodedFrameCache.make_key(
+            camera_id,
+            resize,
+            quality or self.default_quality,
+            type(self._strategy).__name__
+        )
     
     def convert_to_data_uri(
         self,
@@ -261,6 +439,23 @@ class FrameConverter:
         
         return resized
     
+    @staticmethod
+    def size_for_max_width(frame: np.ndarray, max_width: int) -> Optional[Tuple[int, int]]:
+        """
+        Calcula el tamaño de redimensionado para limitar el ancho.
+        
+        Args:
+            frame: Frame original
+            max_width: Ancho máximo permitido
+            
+        Returns:
+            (width, height) objetivo o None si no hace falta redimensionar
+        """
+        height, width = frame.shape[:2]
+        if width > max_width:
+            return (max_width, int(height * max_width / width))
+        return None
+    
     @staticmethod
     def estimate_size(frame: np.ndarray, strategy: FrameConversionStrategy, quality: int = 85) -> int:
         """
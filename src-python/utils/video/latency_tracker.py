@@ -0,0 +1,133 @@
+"""
+Seguimiento de latencias por etapa con ventana deslizante.
+
+Mantiene las últimas N muestras por clave y calcula percentiles bajo
+demanda, sin dependencias externas.
+"""
+
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Calcula un percentil por interpolación lineal.
+
+    Args:
+        sorted_values: Muestras ordenadas ascendentemente
+        pct: Percentil (0-100)
+
+    Returns:
+        Valor del percentil o 0.0 si no hay muestras
+    """
+    if not sorted_values:
+        return 0.0
+
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+
+    rank = (pct / 100.0) * (len(sorted_values) - 1)
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = rank - lower
+
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+class LatencyTracker:
+    """
+    Registro de latencias en milisegundos agrupadas por clave (etapa).
+
+    Es seguro llamar a ``record`` desde threads de trabajo y leer los
+    percentiles desde el event loop.
+    """
+
+    DEFAULT_PERCENTILES = (50, 95, 99)
+
+    def __init__(self, window_size: int = 300):
+        """
+        Inicializa el tracker.
+
+        Args:
+            window_size: Muestras a conservar por clave
+        """
+        self.window_size = window_size
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, latency_ms: float) -> None:
+        """
+        Registra una muestra.
+
+        Args:
+            key: Etapa o categoría (p.ej. "encode")
+            latency_ms: Latencia medida en milisegundos
+        """
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = deque(maxlen=self.window_size)
+                self._samples[key] = samples
+            samples.append(latency_ms)
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def get_summary(
+        self,
+        key: str,
+        percentiles: Iterable[int] = DEFAULT_PERCENTILES
+    ) -> Optional[Dict[str, float]]:
+        """
+        Obtiene el resumen de una clave.
+
+        Args:
+            key: Etapa a resumir
+            percentiles: Percentiles a calcular
+
+        Returns:
+            Diccionario con count, avg, max y pXX, o None sin muestras
+        """
+        with self._lock:
+            samples = self._samples.get(key)
+            if not samples:
+                return None
+            values = sorted(samples)
+            total = self._counts.get(key, 0)
+
+        summary = {
+            'count': total,
+            'avg_ms': round(sum(values) / len(values), 2),
+            'max_ms': round(values[-1], 2)
+        }
+        for pct in percentiles:
+            summary[f'p{pct}_ms'] = round(percentile(values, pct), 2)
+
+        return summary
+
+    def get_all_summaries(self) -> Dict[str, Dict[str, float]]:
+        """Obtiene el resumen de todas las claves registradas."""
+        with self._lock:
+            keys = list(self._samples.keys())
+
+        summaries = {}
+        for key in keys:
+            summary = self.get_summary(key)
+            if summary:
+                summaries[key] = summary
+        return summaries
+
+    def reset(self, key: Optional[str] = None) -> None:
+        """
+        Elimina muestras.
+
+        Args:
+            key: Clave a limpiar (todas si es None)
+        """
+        with self._lock:
+            if key is None:
+                self._samples.clear()
+                self._counts.clear()
+            else:
+                self._samples.pop(key, None)
+                self._counts.pop(key, None)
@@ -0,0 +1,138 @@
+"""
+Protocolo binario para envío de frames por WebSocket.
+
+Cada mensaje binario contiene una cabecera fija de 24 bytes (big-endian)
+seguida de los bytes del JPEG/PNG sin codificar en base64:
+
+    offset  tamaño  campo
+    0       4       magic  b"UCVF"
+    4       1       versión del protocolo
+    5       1       formato (0 = jpeg, 1 = png)
+    6       2       reservado (0)
+    8       4       hash de camera_id (CRC32)
+    12      4       número de secuencia del frame
+    16      8       timestamp de captura en ms (epoch)
+
+El cliente puede asociar el hash a la cámara usando el valor enviado en
+el mensaje de estado ``stream_started``.
+"""
+
+import struct
+import zlib
+from typing import Dict, Any, Optional, NamedTuple
+
+
+FRAME_MAGIC = b"UCVF"
+FRAME_PROTOCOL_VERSION = 1
+
+FRAME_HEADER = struct.Struct(">4sBBHIIQ")
+FRAME_HEADER_SIZE = FRAME_HEADER.size
+
+FRAME_FORMATS = {
+    "jpeg": 0,
+    "png": 1
+}
+
+
+class BinaryFrameHeader(NamedTuple):
+    """Cabecera decodificada de un frame binario."""
+    version: int
+    format: str
+    camera_hash: int
+    sequence: int
+    capture_timestamp: int
+
+
+def camera_id_hash(camera_id: str) -> int:
+    """
+    Calcula el hash de 32 bits de un camera_id.
+
+    Args:
+        camera_id: ID de la cámara
+
+    Returns:
+        CRC32 del ID como entero sin signo
+    """
+    return zlib.crc32(camera_id.encode("utf-8")) & 0xFFFFFFFF
+
+
+def pack_frame(
+    camera_id: str,
+    sequence: int,
+    capture_timestamp: Optional[float],
+    payload: bytes,
+    frame_format: str = "jpeg"
+) -> bytes:
+    """
+    Construye un mensaje binario con cabecera y payload.
+
+    Args:
+        camera_id: ID de la cámara
+        sequence: Número secuencial del frame
+        capture_timestamp: Timestamp de captura en ms (0 si se desconoce)
+        payload: Bytes codificados del frame
+        frame_format: Formato del payload (jpeg, png)
+
+    Returns:
+        Mensaje listo para ``websocket.send_bytes``
+    """
+    header = FRAME_HEADER.pack(
+        FRAME_MAGIC,
+        FRAME_PROTOCOL_VERSION,
+        FRAME_FORMATS.get(frame_format, 0),
+        0,
+        camera_id_hash(camera_id),
+        sequence & 0xFFFFFFFF,
+        int(capture_timestamp or 0)
+    )
+    return header + payload
+
+
+def unpack_frame_header(message: bytes) -> BinaryFrameHeader:
+    """
+    Decodifica la cabecera de un mensaje binario.
+
+    Args:
+        message: Mensaje binario completo
+
+    Returns:
+        Cabecera decodificada
+
+    Raises:
+        ValueError: Si el mensaje no tiene una cabecera válida
+    """
+    if len(message) < FRAME_HEADER_SIZE:
+        raise ValueError("Mensaje binario demasiado corto")
+
+    magic, version, fmt, _, cam_hash, sequence, timestamp = FRAME_HEADER.unpack_from(message)
+    if magic != FRAME_MAGIC:
+        raise ValueError("Magic de frame binario inválido")
+
+    format_names = {code: name for name, code in FRAME_FORMATS.items()}
+
+    return BinaryFrameHeader(
+        version=version,
+        format=format_names.get(fmt, "jpeg"),
+        camera_hash=cam_hash,
+        sequence=sequence,
+        capture_timestamp=timestamp
+    )
+
+
+def describe_protocol(camera_id: str) -> Dict[str, Any]:
+    """
+    Describe el protocolo binario para informar al cliente.
+
+    Args:
+        camera_id: ID de la cámara del stream
+
+    Returns:
+        Diccionario con la descripción de la cabecera
+    """
+    return {
+        "version": FRAME_PROTOCOL_VERSION,
+        "header_size": FRAME_HEADER_SIZE,
+        "byte_order": "big",
+        "camera_hash": camera_id_hash(camera_id),
+        "fields": ["magic", "version", "format", "reserved", "camera_hash", "sequence", "capture_timestamp_ms"]
+    }
@@ -0,0 +1,209 @@
+"""
+Control de congestión por cliente WebSocket.
+
+Ajusta calidad JPEG, ancho máximo y salto de frames de un cliente en
+función de la latencia de envío y los bytes pendientes medidos en su
+conexión, para que los enlaces lentos degraden la imagen en lugar de
+acumular latencia.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+
+@dataclass(frozen=True)
+class QualityLevel:
+    """
+    Escalón de calidad de la escalera adaptativa.
+
+    Attributes:
+        quality: Calidad JPEG (1-100)
+        max_width: Ancho máximo del frame
+        frame_skip: Frames a saltar entre envíos (0 = enviar todos)
+    """
+    quality: int
+    max_width: int
+    frame_skip: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        """Convierte el escalón a diccionario."""
+        return {
+            'quality': self.quality,
+            'max_width': self.max_width,
+            'frame_skip': self.frame_skip
+        }
+
+
+# Escalera por defecto: el índice 0 corresponde a la codificación compartida.
+# Ningún escalón mejora en calidad ni en ancho al anterior.
+DEFAULT_LADDER: List[QualityLevel] = [
+    QualityLevel(quality=85, max_width=1280, frame_skip=0),
+    QualityLevel(quality=70, max_width=1280, frame_skip=0),
+    # Igual al preset compartido 'low' (QUALITY_PRESETS en websocket_stream_service)
+    QualityLevel(quality=70, max_width=854, frame_skip=0),
+    QualityLevel(quality=60, max_width=854, frame_skip=0),
+    QualityLevel(quality=50, max_width=640, frame_skip=1),
+    QualityLevel(quality=40, max_width=480, frame_skip=2),
+]
+
+
+def ladder_index_for(quality: int, max_width: int,
+                     ladder: Sequence[QualityLevel] = DEFAULT_LADDER) -> int:
+    """
+    Obtiene el mejor escalón que no supera una calidad y un ancho dados.
+
+    Args:
+        quality: Calidad JPEG máxima
+        max_width: Ancho máximo
+        ladder: Escalera de mejor a peor
+
+    Returns:
+        Índice del escalón (el último si ninguno cumple)
+    """
+    for index, level in enumerate(ladder):
+        if level.quality <= quality and level.max_width <= max_width:
+            return index
+    return len(ladder) - 1
+
+
+class CongestionController:
+    """
+    Controlador AIMD sencillo sobre una escalera de calidad.
+
+    Baja un escalón en cuanto se acumulan ``downgrade_after`` envíos
+    congestionados seguidos y sube uno tras ``upgrade_after`` envíos sanos,
+    lo que evita oscilar en enlaces con jitter.
+    """
+
+    def __init__(
+        self,
+        ladder: Optional[Sequence[QualityLevel]] = None,
+        target_latency_ms: float = 150.0,
+        max_outstanding_bytes: int = 2 * 1024 * 1024,
+        downgrade_after: int = 3,
+        upgrade_after: int = 60,
+        smoothing: float = 0.2
+    ):
+        """
+        Inicializa el controlador.
+
+        Args:
+            ladder: Escalones de calidad de mejor a peor
+            target_latency_ms: Latencia de envío considerada congestión
+            max_outstanding_bytes: Bytes pendientes considerados congestión
+            downgrade_after: Envíos congestionados para bajar un escalón
+            upgrade_after: Envíos sanos para subir un escalón
+            smoothing: Factor del promedio exponencial de latencia
+        """
+        self.ladder: List[QualityLevel] = list(ladder or DEFAULT_LADDER)
+        self.target_latency_ms = target_latency_ms
+        self.max_outstanding_bytes = max_outstanding_bytes
+        self.downgrade_after = downgrade_after
+        self.upgrade_after = upgrade_after
+        self.smoothing = smoothing
+
+        self.level_index = 0
+        self.ceiling_index = 0
+        self.avg_latency_ms = 0.0
+        self.adjustments = 0
+
+        self._congested_streak = 0
+        self._healthy_streak = 0
+        self._skip_counter = 0
+
+    @property
+    def level(self) -> QualityLevel:
+        """Escalón actual."""
+        return self.ladder[self.level_index]
+
+    @property
+    def is_degraded(self) -> bool:
+        """Indica si el cliente está por debajo de la calidad compartida."""
+        return self.level_index > 0
+
+    def set_ceiling(self, index: int) -> None:
+        """
+        Limita la mejor calidad alcanzable (preferencia del cliente).
+
+        Si el escalón actual estaba fijado por el techo anterior se mueve al
+        nuevo; una degradación por congestión se conserva.
+
+        Args:
+            index: Índice del mejor escalón permitido
+        """
+        previous = self.ceiling_index
+        self.ceiling_index = max(0, min(index, len(self.ladder) - 1))
+        if self.level_index < self.ceiling_index or self.level_index == previous:
+            self.level_index = self.ceiling_index
+
+    def should_send(self) -> bool:
+        """
+        Decide si el frame actual se envía según el salto de frames.
+
+        Returns:
+            True si el frame debe enviarse
+        """
+        skip = self.level.frame_skip
+        if skip <= 0:
+            return True
+
+        self._skip_counter += 1
+        if self._skip_counter > skip:
+            self._skip_counter = 0
+            return True
+        return False
+
+    def record_send(self, latency_ms: float, outstanding_bytes: int = 0) -> Optional[QualityLevel]:
+        """
+        Registra un envío y ajusta el escalón si corresponde.
+
+        Args:
+            latency_ms: Duración del envío en milisegundos
+            outstanding_bytes: Bytes pendientes en la conexión
+
+        Returns:
+            Nuevo escalón si cambió, None en caso contrario
+        """
+        if self.avg_latency_ms == 0.0:
+            self.avg_latency_ms = latency_ms
+        else:
+            self.avg_latency_ms += self.smoothing * (latency_ms - self.avg_latency_ms)
+
+        congested = (
+            self.avg_latency_ms > self.target_latency_ms
+            or outstanding_bytes > self.max_outstanding_bytes
+        )
+
+        if congested:
+            self._healthy_streak = 0
+            self._congested_streak += 1
+            if self._congested_streak >= self.downgrade_after and self.level_index < len(self.ladder) - 1:
+                self._congested_streak = 0
+                return self._change_level(self.level_index + 1)
+        else:
+            self._congested_streak = 0
+            self._healthy_streak += 1
+            if self._healthy_streak >= self.upgrade_after and self.level_index > self.ceiling_index:
+                self._healthy_streak = 0
+                return self._change_level(self.level_index - 1)
+
+        return None
+
+    def _change_level(self, index: int) -> QualityLevel:
+        """Cambia de escalón y reinicia el estado asociado."""
+        self.level_index = index
+        self.adjustments += 1
+        self._skip_counter = 0
+        # Descartar el historial para medir el nuevo escalón desde cero
+        self.avg_latency_ms = 0.0
+        return self.level
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtiene el estado del controlador."""
+        return {
+            'level': self.level_index,
+            'ceiling': self.ceiling_index,
+            'avg_send_latency_ms': round(self.avg_latency_ms, 2),
+            'adjustments': self.adjustments,
+            **self.level.to_dict()
+        }
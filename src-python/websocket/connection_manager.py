@@ -2,82 +2,339 @@
 Gestor de conexiones WebSocket
 """
 
-from typing import Dict, List, Set, Optional
+from typing import Any, Callable, Deque, Dict, List, Set, Optional, Union
 from fastapi import WebSocket, WebSocketDisconnect
-import json
+from collections import deque
 import logging
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 import asyncio
 
+from config.settings import settings
+from utils.json_codec import dumps_text
+
 logger = logging.getLogger(__name__)
 
 
+def encode_json(data: dict) -> str:
+    """
+    Serializa un mensaje en formato compacto con ``utils.json_codec``.
+    
+    Los datetime, Enum y valores NumPy del mensaje se serializan sin
+    conversión previa.
+    
+    Args:
+        data: Mensaje a serializar
+        
+    Returns:
+        Texto JSON listo para ``send_text``
+    """
+    return dumps_text(data)
+
+
+class _OutboundMessage:
+    """Mensaje pendiente en la cola de salida de una conexión."""
+    
+    __slots__ = ("send", "payload", "size", "is_frame", "enqueued_at", "future", "on_sent")
+    
+    def __init__(self, send: Callable, payload: Union[str, bytes], size: int,
+                 is_frame: bool, future: Optional[asyncio.Future] = None,
+                 on_sent: Optional[Callable[[float], None]] = None):
+        self.send = send
+        self.payload = payload
+        self.size = size
+        self.is_frame = is_frame
+        self.enqueued_at = time.perf_counter()
+        self.future = future
+        self.on_sent = on_sent
+
+
 class WebSocketConnection:
-    """Representa una conexión WebSocket individual."""
+    """
+    Representa una conexión WebSocket individual.
+    
+    Todos los envíos pasan por una cola de salida que vacía una única tarea
+    escritora, de modo que un cliente lento no acumula tareas de envío.
+    La cola está acotada en frames y en bytes: al llenarse se descartan los
+    frames más antiguos, nunca los mensajes de control (estado, errores,
+    métricas), que además conservan su orden respecto a los frames.
+    """
     
-    def __init__(self, websocket: WebSocket, client_id: str):
+    def __init__(self, websocket: WebSocket, client_id: str,
+                 max_queued_frames: int = settings.WS_SEND_QUEUE_MAX_FRAMES,
+                 max_queued_bytes: int = settings.WS_SEND_QUEUE_MAX_BYTES):
         self.websocket = websocket
         self.client_id = client_id
         self.connected_at = datetime.utcnow()
         self.rooms: Set[str] = set()
         
-    async def send_json(self, data: dict) -> bool:
+        # Métricas de envío para control de congestión: bytes encolados o
+        # en envío y tiempo desde que se encoló el último mensaje enviado
+        self.bytes_in_flight = 0
+        self.bytes_sent = 0
+        self.last_send_latency_ms = 0.0
+        
+        # Cola de salida acotada
+        self.max_queued_frames = max(1, max_queued_frames)
+        self.max_queued_bytes = max(1, max_queued_bytes)
+        self._outbox: Deque[_OutboundMessage] = deque()
+        self._queued_frames = 0
+        self._queued_bytes = 0
+        self._outbox_ready: Optional[asyncio.Event] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._closed = False
+        self._queue_stats = {
+            "frames_enqueued": 0,
+            "frames_sent": 0,
+            "frames_dropped": 0,
+            "bytes_dropped": 0,
+            "control_sent": 0,
+            "send_errors": 0,
+            "send_timeouts": 0,
+            "max_queue_depth": 0
+        }
+    
+    def _is_connected(self) -> bool:
+        """Comprueba que la conexión está abierta antes de encolar."""
+        if self._closed:
+            return False
+        # 0 = CONNECTING, 1 = CONNECTED, 2 = DISCONNECTED
+        if hasattr(self.websocket, 'client_state') and self.websocket.client_state.value != 1:
+            logger.debug(f"WebSocket no conectado para {self.client_id}, ignorando mensaje")
+            return False
+        return True
+    
+    def _enqueue(self, message: _OutboundMessage) -> None:
+        """
+        Añade un mensaje a la cola y aplica los límites de frames y bytes.
+        
+        Args:
+            message: Mensaje a encolar
+        """
+        self._outbox.append(message)
+        self._queued_bytes += message.size
+        self.bytes_in_flight += message.size
+        if message.is_frame:
+            self._queued_frames += 1
+            self._queue_stats["frames_enqueued"] += 1
+            self._drop_oldest_frames()
+        
+        self._queue_stats["max_queue_depth"] = max(
+            self._queue_stats["max_queue_depth"], len(self._outbox)
+        )
+        self._ensure_writer()
+        self._outbox_ready.set()
+    
+    def _drop_oldest_frames(self) -> None:
+        """Descarta frames antiguos hasta volver a los límites; conserva el último."""
+        while (self._queued_frames > self.max_queued_frames
+               or (self._queued_bytes > self.max_queued_bytes and self._queued_frames > 1)):
+            oldest = next(m for m in self._outbox if m.is_frame)
+            self._outbox.remove(oldest)
+            self._queued_frames -= 1
+            self._queued_bytes -= oldest.size
+            self.bytes_in_flight -= oldest.size
+            self._queue_stats["frames_dropped"] += 1
+            self._queue_stats["bytes_dropped"] += oldest.size
+    
+    def _ensure_writer(self) -> None:
+        """Arranca la tarea escritora si no está activa."""
+        if self._writer is not None and not self._writer.done():
+            return
+        self._outbox_ready = asyncio.Event()
+        self._writer = asyncio.get_running_loop().create_task(self._writer_loop())
+    
+    async def _writer_loop(self) -> None:
+        """Envía los mensajes de la cola en orden, de uno en uno."""
+        while not self._closed:
+            if not self._outbox:
+                self._outbox_ready.clear()
+                await self._outbox_ready.wait()
+                continue
+            
+            message = self._outbox.popleft()
+            self._queued_bytes -= message.size
+            if message.is_frame:
+                self._queued_frames -= 1
+            
+            sent = False
+            try:
+                await message.send(message.payload)
+                sent = True
+                self.bytes_sent += message.size
+                self._queue_stats["frames_sent" if message.is_frame else "control_sent"] += 1
+            except asyncio.CancelledError:
+                if message.future is not None and not message.future.done():
+                    message.future.set_result(False)
+                raise
+            except Exception as e:
+                self._queue_stats["send_errors"] += 1
+                self._log_send_error(e)
+            finally:
+                self.bytes_in_flight -= message.size
+                self.last_send_latency_ms = (time.perf_counter() - message.enqueued_at) * 1000
+            
+            if message.future is not None and not message.future.done():
+                message.future.set_result(sent)
+            if sent and message.on_sent is not None:
+                try:
+                    message.on_sent(self.last_send_latency_ms)
+                except Exception as e:
+                    logger.debug(f"Error en callback de envío para {self.client_id}: {e}")
+    
+    def _log_send_error(self, error: Exception) -> None:
+        """Registra un error de envío sin ruido en desconexiones esperadas."""
+        error_msg = str(error)
+        if "WebSocket" in error_msg or "Cannot call" in error_msg or "close message" in error_msg:
+            logger.debug(f"WebSocket cerrado para {self.client_id}: {error_msg}")
+        else:
+            logger.error(f"Error enviando a {self.client_id}: {error}")
+    
+    async def _send_control(self, send: Callable, payload: Union[str, bytes], size: int,
+                            timeout: Optional[float] = None) -> bool:
+        """
+        Encola un mensaje de control y espera a que se envíe.
+        
+        Args:
+            send: Método de envío del WebSocket
+            payload: Datos a enviar
+            size: Tamaño del payload en bytes
+            timeout: Segundos máximos de espera; si vencen y el mensaje
+                sigue en cola se retira de ella
+            
+        Returns:
+            bool: True si se envió correctamente
+        """
+        if not self._is_connected():
+            return False
+        future = asyncio.get_running_loop().create_future()
+        message = _OutboundMessage(send, payload, size, is_frame=False, future=future)
+        self._enqueue(message)
+        if timeout is None:
+            return await future
+        
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self._queue_stats["send_timeouts"] += 1
+            self._withdraw(message)
+            return False
+    
+    def _withdraw(self, message: _OutboundMessage) -> None:
+        """Retira de la cola un mensaje que aún no ha empezado a enviarse."""
+        try:
+            self._outbox.remove(message)
+        except ValueError:
+            # Ya lo tiene la tarea escritora; su resultado se ignora
+            return
+        self._queued_bytes -= message.size
+        self.bytes_in_flight -= message.size
+        if message.future is not None and not message.future.done():
+            message.future.set_result(False)
+        
+    async def send_json(self, data: dict, timeout: Optional[float] = None) -> bool:
         """
         Enviar datos JSON a través del WebSocket.
         
         Args:
             data: Diccionario a enviar
+            timeout: Segundos máximos de espera del envío (opcional)
             
         Returns:
             bool: True si se envió correctamente
         """
         try:
-            # Verificar estado del WebSocket antes de enviar
-            if hasattr(self.websocket, 'client_state'):
-                # 0 = CONNECTING, 1 = CONNECTED, 2 = DISCONNECTED
-                if self.websocket.client_state.value != 1:
-                    logger.debug(f"WebSocket no conectado para {self.client_id}, ignorando mensaje")
-                    return False
-            
-            await self.websocket.send_json(data)
-            return True
+            text = encode_json(data)
         except Exception as e:
-            # Solo loggear si no es un error esperado de desconexión
-            error_msg = str(e)
-            if "WebSocket" in error_msg or "Cannot call" in error_msg or "close message" in error_msg:
-                logger.debug(f"WebSocket cerrado para {self.client_id}: {error_msg}")
-            else:
-                logger.error(f"Error enviando a {self.client_id}: {e}")
+            logger.error(f"Error serializando mensaje para {self.client_id}: {e}")
             return False
+        return await self._send_control(self.websocket.send_text, text, len(text), timeout)
     
-    async def send_text(self, message: str) -> bool:
+    async def send_text(self, message: str, timeout: Optional[float] = None) -> bool:
         """
         Enviar texto a través del WebSocket.
         
         Args:
             message: Mensaje a enviar
+            timeout: Segundos máximos de espera del envío (opcional)
             
         Returns:
             bool: True si se envió correctamente
         """
-        try:
-            # Verificar estado del WebSocket antes de enviar
-            if hasattr(self.websocket, 'client_state'):
-                if self.websocket.client_state.value != 1:
-                    logger.debug(f"WebSocket no conectado para {self.client_id}, ignorando mensaje")
-                    return False
+        return await self._send_control(self.websocket.send_text, message, len(message), timeout)
+
+    
+    async def send_bytes(self, data: bytes, timeout: Optional[float] = None) -> bool:
+        """
+        Enviar datos binarios a través del WebSocket.
+        
+        Args:
+            data: Bytes a enviar
+            timeout: Segundos máximos de espera del envío (opcional)
             
-            await self.websocket.send_text(message)
-            return True
-        except Exception as e:
-            # Solo loggear si no es un error esperado de desconexión
-            error_msg = str(e)
-            if "WebSocket" in error_msg or "Cannot call" in error_msg or "close message" in error_msg:
-                logger.debug(f"WebSocket cerrado para {self.client_id}: {error_msg}")
-            else:
-                logger.error(f"Error enviando a {self.client_id}: {e}")
+        Returns:
+            bool: True si se envió correctamente
+        """
+        return await self._send_control(self.websocket.send_bytes, data, len(data), timeout)
+    
+    def queue_frame(self, frame: Union[dict, bytes],
+                    on_sent: Optional[Callable[[float], None]] = None) -> bool:
+        """
+        Encola un frame de video sin esperar a que se envíe.
+        
+        Si la cola supera sus límites se descartan los frames más antiguos.
+        
+        Args:
+            frame: Mensaje JSON (dict) o mensaje binario del frame
+            on_sent: Función llamada con los ms desde que se encoló hasta que
+                se escribió en el socket (no se llama si se descarta)
+            
+        Returns:
+            bool: True si se encoló, False si la conexión está cerrada
+        """
+        if not self._is_connected():
             return False
-
+        if isinstance(frame, dict):
+            payload: Union[str, bytes] = encode_json(frame)
+            send = self.websocket.send_text
+        else:
+            payload = frame
+            send = self.websocket.send_bytes
+        self._enqueue(_OutboundMessage(send, payload, len(payload), is_frame=True, on_sent=on_sent))
+        return True
+    
+    async def close(self) -> None:
+        """Detiene la tarea escritora y descarta lo pendiente."""
+        self._closed = True
+        if self._writer is not None:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._writer = None
+        while self._outbox:
+            message = self._outbox.popleft()
+            if message.future is not None and not message.future.done():
+                message.future.set_result(False)
+        self._queued_frames = 0
+        self._queued_bytes = 0
+        self.bytes_in_flight = 0
+    
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado de la cola de salida.
+        
+        Returns:
+            Profundidad actual en mensajes, frames y bytes, límites y
+            contadores de frames enviados y descartados
+        """
+        return {
+            "queue_depth": len(self._outbox),
+            "queued_frames": self._queued_frames,
+            "queued_bytes": self._queued_bytes,
+            "max_queued_frames": self.max_queued_frames,
+            "max_queued_bytes": self.max_queued_bytes,
+            "last_send_latency_ms": round(self.last_send_latency_ms, 2),
+            **self._queue_stats
+        }
 
 class ConnectionManager:
     """Gestor global de conexiones WebSocket."""
@@ -90,6 +347,9 @@ class ConnectionManager:
         # Métricas
         self.total_connections = 0
         self.total_messages_sent = 0
+        self.total_broadcasts = 0
+        # Timeout por destinatario en los broadcast
+        self.send_timeout = settings.WS_SEND_TIMEOUT
         
     async def connect(self, websocket: WebSocket, client_id: str) -> WebSocketConnection:
         """
@@ -116,7 +376,7 @@ class ConnectionManager:
             "type": "connection",
             "status": "connected",
             "client_id": client_id,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": datetime.now(timezone.utc)
         })
         
         return connection
@@ -135,8 +395,9 @@ class ConnectionManager:
             for room in list(connection.rooms):
                 await self.leave_room(client_id, room)
             
-            # Eliminar conexión
+            # Eliminar conexión y detener su cola de salida
             del self.active_connections[client_id]
+            await connection.close()
             
             logger.info(f"Cliente desconectado: {client_id}")
             logger.info(f"Total conexiones activas: {len(self.active_connections)}")
@@ -163,7 +424,7 @@ class ConnectionManager:
             await connection.send_json({
                 "type": "room_joined",
                 "room": room,
-                "timestamp": datetime.utcnow().isoformat() + "Z"
+                "timestamp": datetime.now(timezone.utc)
             })
     
     async def leave_room(self, client_id: str, room: str):
@@ -204,39 +465,51 @@ class ConnectionManager:
             return success
         return False
     
-    async def broadcast(self, message: dict, room: Optional[str] = None):
+    async def broadcast(self, message: Union[dict, str, bytes], room: Optional[str] = None):
         """
         Enviar mensaje a todos los clientes o a una sala específica.
         
+        El mensaje se serializa una sola vez y el mismo texto (o bytes) se
+        reparte a todos los destinatarios. Cada envío tiene su propio
+        timeout para que un socket lento no retenga al resto de la sala.
+        
         Args:
-            message: Mensaje a enviar
+            message: Mensaje a enviar (dict, texto JSON ya serializado o bytes)
             room: Sala opcional para broadcast dirigido
         """
         if room:
             # Broadcast a sala específica
-            if room in self.rooms:
-                tasks = []
-                for client_id in self.rooms[room]:
-                    if client_id in self.active_connections:
-                        connection = self.active_connections[client_id]
-                        tasks.append(connection.send_json(message))
-                
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                sent = sum(1 for r in results if r is True)
-                self.total_messages_sent += sent
-                
-                logger.debug(f"Broadcast a sala {room}: {sent}/{len(tasks)} mensajes enviados")
+            if room not in self.rooms:
+                return
+            connections = [
+                self.active_connections[client_id]
+                for client_id in self.rooms[room]
+                if client_id in self.active_connections
+            ]
         else:
             # Broadcast global
-            tasks = []
-            for connection in self.active_connections.values():
-                tasks.append(connection.send_json(message))
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            sent = sum(1 for r in results if r is True)
-            self.total_messages_sent += sent
-            
-            logger.debug(f"Broadcast global: {sent}/{len(tasks)} mensajes enviados")
+            connections = list(self.active_connections.values())
+        
+        if not connections:
+            return
+        
+        try:
+            payload = encode_json(message) if isinstance(message, dict) else message
+        except Exception as e:
+            logger.error(f"Error serializando broadcast: {e}")
+            return
+        if isinstance(payload, bytes):
+            tasks = [c.send_bytes(payload, timeout=self.send_timeout) for c in connections]
+        else:
+            tasks = [c.send_text(payload, timeout=self.send_timeout) for c in connections]
+        
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        sent = sum(1 for r in results if r is True)
+        self.total_messages_sent += sent
+        self.total_broadcasts += 1
+        
+        target = f"sala {room}" if room else "global"
+        logger.debug(f"Broadcast {target}: {sent}/{len(tasks)} mensajes enviados")
     
     def get_connection(self, client_id: str) -> Optional[WebSocketConnection]:
         """Obtener conexión por client_id."""
@@ -248,6 +521,7 @@ class ConnectionManager:
             "active_connections": len(self.active_connections),
             "total_connections": self.total_connections,
             "total_messages_sent": self.total_messages_sent,
+            "total_broadcasts": self.total_broadcasts,
             "rooms": {room: len(clients) for room, clients in self.rooms.items()},
             "clients": list(self.active_connections.keys())
         }
@@ -0,0 +1,556 @@
+"""
+Manejador del mosaico de cámaras por WebSocket.
+
+Multiplexa miniaturas de varias cámaras sobre una única conexión. Cada
+tile se suscribe a la variante 'thumbnail' del stream compartido (substream
+de la cámara, baja resolución y pocos FPS) y solo el tile enfocado abre el
+stream principal a resolución completa.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import WebSocket
+from .connection_manager import manager
+from .binary_frame import pack_frame, camera_id_hash, describe_protocol
+from .stream_handler import FRAME_TRANSPORTS
+from services.websocket_stream_service import websocket_stream_service
+from models.streaming.frame_model import EncodedFrame
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Límites de FPS aceptados por tile
+MIN_TILE_FPS = 1
+MAX_TILE_FPS = 10
+
+# FPS por defecto del tile enfocado (stream principal)
+DEFAULT_FOCUS_FPS = 15
+
+
+class GridTile:
+    """
+    Estado de un tile del mosaico.
+
+    Attributes:
+        camera_id: ID de la cámara
+        fps: Límite de FPS de envío del tile
+        frames_sent: Frames enviados
+        frames_skipped: Frames descartados por el límite de FPS
+    """
+
+    __slots__ = ('camera_id', 'fps', 'task', 'ready', 'last_sent', 'frames_sent', 'frames_skipped')
+
+    def __init__(self, camera_id: str, fps: int):
+        self.camera_id = camera_id
+        self.fps = fps
+        self.task: Optional[asyncio.Task] = None
+        self.ready = False
+        self.last_sent = 0.0
+        self.frames_sent = 0
+        self.frames_skipped = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convierte el tile a diccionario."""
+        return {
+            'camera_id': self.camera_id,
+            'fps': self.fps,
+            'ready': self.ready,
+            'frames_sent': self.frames_sent,
+            'frames_skipped': self.frames_skipped
+        }
+
+
+class GridStreamHandler:
+    """
+    Manejador de una conexión de mosaico.
+
+    Los tiles dejan su último frame en un buffer por cámara y una única
+    tarea de escritura los envía, de modo que un cliente lento recibe el
+    frame más reciente de cada tile en lugar de acumular retraso.
+    """
+
+    def __init__(self, websocket: WebSocket, client_id: str):
+        self.websocket = websocket
+        self.client_id = client_id
+        self.connection = manager.get_connection(client_id)
+
+        self.is_active = True
+        self.transport = "binary"
+        self.tiles: Dict[str, GridTile] = {}
+
+        # Tile enfocado (stream principal)
+        self.focused: Optional[str] = None
+        self.focus_fps = DEFAULT_FOCUS_FPS
+        self._focus_task: Optional[asyncio.Task] = None
+
+        # Último frame pendiente por cámara: (frame, enfocado)
+        self._pending: Dict[str, tuple] = {}
+        self._wakeup = asyncio.Event()
+        self._writer_task: Optional[asyncio.Task] = None
+
+        self.start_time = datetime.utcnow()
+
+    async def handle_message(self, message: dict) -> None:
+        """
+        Procesar mensaje recibido del cliente.
+
+        Args:
+            message: Mensaje JSON del cliente
+        """
+        action = message.get("action")
+        params = message.get("params", {})
+
+        if action == "set_tiles":
+            await self.set_tiles(params)
+        elif action == "set_tile_fps":
+            await self.set_tile_fps(params.get("camera_id"), params.get("fps"))
+        elif action == "focus":
+            await self.focus(params)
+        elif action == "unfocus":
+            await self.unfocus()
+        elif action == "ping":
+            await self.send_status("pong")
+        elif action is None:
+            logger.debug(f"[grid {self.client_id}] Mensaje sin acción, ignorando")
+        else:
+            await self.send_error(f"Unrecognized action: {action}")
+
+    async def set_tiles(self, params: Dict[str, Any]) -> None:
+        """
+        Define el conjunto de tiles visibles.
+
+        Los tiles que ya existían conservan su suscripción; los que dejan de
+        estar visibles liberan la suya.
+
+        Args:
+            params: ``cameras`` (lista de IDs o de {camera_id, fps}),
+                ``fps`` por defecto y ``transport`` opcional
+        """
+        transport = params.get("transport", self.transport)
+        if transport not in FRAME_TRANSPORTS:
+            await self.send_error(f"Invalid transport: {transport}")
+            return
+
+        default_fps = params.get("fps", settings.GRID_TILE_FPS)
+        requested: Dict[str, int] = {}
+        for entry in params.get("cameras", []):
+            if isinstance(entry, dict):
+                camera_id = entry.get("camera_id")
+                fps = entry.get("fps", default_fps)
+            else:
+                camera_id, fps = entry, default_fps
+            if camera_id:
+                requested[camera_id] = self._clamp_fps(fps)
+
+        if len(requested) > settings.GRID_MAX_TILES:
+            await self.send_error(f"Too many tiles (max {settings.GRID_MAX_TILES})")
+            return
+
+        self.transport = transport
+        self._ensure_writer()
+
+        for camera_id in list(self.tiles):
+            if camera_id not in requested:
+                await self._remove_tile(camera_id)
+
+        for camera_id, fps in requested.items():
+            tile = self.tiles.get(camera_id)
+            if tile is None:
+                tile = GridTile(camera_id, fps)
+                self.tiles[camera_id] = tile
+                tile.task = asyncio.create_task(
+                    self._tile_loop(tile),
+                    name=f"grid_{self.client_id}_{camera_id}"
+                )
+            else:
+                tile.fps = fps
+
+        if self.focused and self.focused not in self.tiles:
+            await self.unfocus()
+
+        status_data = {
+            "transport": self.transport,
+            "tiles": [tile.to_dict() for tile in self.tiles.values()]
+        }
+        if self.transport == "binary":
+            # El cliente identifica cada tile por el hash de la cabecera binaria
+            protocol = describe_protocol("")
+            protocol.pop("camera_hash")
+            status_data["binary_protocol"] = protocol
+            status_data["camera_hashes"] = {
+                camera_id: camera_id_hash(camera_id) for camera_id in self.tiles
+            }
+        await self.send_status("grid_updated", status_data)
+
+        logger.info(f"[grid {self.client_id}] {len(self.tiles)} tiles ({self.transport})")
+
+    async def set_tile_fps(self, camera_id: Optional[str], fps: Any) -> None:
+        """
+        Cambia el límite de FPS de un tile.
+
+        Args:
+            camera_id: ID de la cámara del tile
+            fps: Nuevo límite de FPS
+        """
+        tile = self.tiles.get(camera_id) if camera_id else None
+        if tile is None:
+            await self.send_error(f"Unknown tile: {camera_id}")
+            return
+
+        tile.fps = self._clamp_fps(fps)
+        await self.send_status("tile_updated", tile.to_dict())
+
+    async def focus(self, params: Dict[str, Any]) -> None:
+        """
+        Enfoca un tile: abre el stream principal de su cámara.
+
+        Mientras dure el enfoque se dejan de enviar miniaturas de esa cámara.
+
+        Args:
+            params: ``camera_id``, ``fps`` y ``quality`` opcionales
+        """
+        camera_id = params.get("camera_id")
+        if camera_id not in self.tiles:
+            await self.send_error(f"Unknown tile: {camera_id}")
+            return
+
+        # Validar antes de tocar el estado del enfoque
+        try:
+            focus_fps = max(1, min(int(params.get("fps", DEFAULT_FOCUS_FPS)), 30))
+        except (TypeError, ValueError, OverflowError):
+            await self.send_error(f"Invalid fps: {params.get('fps')}")
+            return
+
+        if self.focused == camera_id:
+            # Mismo tile: el loop de enfoque lee focus_fps en cada frame
+            self.focus_fps = focus_fps
+            await self.send_status("tile_focused", {"camera_id": camera_id, "fps": self.focus_fps})
+            return
+
+        await self.unfocus(notify=False)
+
+        self.focused = camera_id
+        self.focus_fps = focus_fps
+        self._focus_task = asyncio.create_task(
+            self._focus_loop(camera_id, params.get("quality", "medium")),
+            name=f"grid_focus_{self.client_id}"
+        )
+
+        await self.send_status("tile_focused", {"camera_id": camera_id, "fps": self.focus_fps})
+
+    async def unfocus(self, notify: bool = True) -> None:
+        """
+        Quita el enfoque y vuelve a miniaturas.
+
+        Args:
+            notify: Enviar estado al cliente
+        """
+        camera_id = self.focused
+        self.focused = None
+
+        task, self._focus_task = self._focus_task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        if camera_id:
+            self._pending.pop(camera_id, None)
+            if notify:
+                await self.send_status("tile_unfocused", {"camera_id": camera_id})
+
+    async def close(self) -> None:
+        """Libera todas las suscripciones de la conexión."""
+        self.is_active = False
+        await self.unfocus(notify=False)
+
+        for camera_id in list(self.tiles):
+            await self._remove_tile(camera_id)
+
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            await asyncio.gather(self._writer_task, return_exceptions=True)
+            self._writer_task = None
+
+    async def _remove_tile(self, camera_id: str) -> None:
+        """Elimina un tile y espera a que libere su suscripción."""
+        tile = self.tiles.pop(camera_id, None)
+        self._pending.pop(camera_id, None)
+        if tile is not None and tile.task is not None:
+            tile.task.cancel()
+            await asyncio.gather(tile.task, return_exceptions=True)
+
+    async def _tile_loop(self, tile: GridTile) -> None:
+        """Consume la variante miniatura de una cámara respetando el FPS del tile."""
+        subscription = None
+        stream_config = {
+            'fps': max(tile.fps, settings.GRID_TILE_FPS),
+            'quality': 'thumbnail',
+            'buffer_size': 1,
+            'check_connectivity': True,
+            'keyframes_only': settings.GRID_KEYFRAMES_ONLY
+        }
+
+        try:
+            result = await websocket_stream_service.subscribe_camera_stream(
+                camera_id=tile.camera_id,
+                subscriber_id=f"{self.client_id}:{tile.camera_id}",
+                stream_config=stream_config,
+                variant='thumbnail'
+            )
+            if not result['success']:
+                await self.send_status("tile_error", {
+                    "camera_id": tile.camera_id,
+                    "error": result.get('error', 'Error desconocido')
+                })
+                return
+
+            subscription = result['subscription']
+            tile.ready = True
+            await self.send_status("tile_ready", tile.to_dict())
+
+            loop = asyncio.get_running_loop()
+            while self.is_active:
+                frame = await subscription.get(timeout=0.5)
+                if frame is None or self.focused == tile.camera_id:
+                    continue
+
+                now = loop.time()
+                if now - tile.last_sent < (1.0 / tile.fps) * 0.9:
+                    tile.frames_skipped += 1
+                    continue
+
+                tile.last_sent = now
+                self._queue_frame(tile.camera_id, frame, focused=False)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[grid {self.client_id}] Error en tile {tile.camera_id}: {e}")
+            await self.send_status("tile_error", {"camera_id": tile.camera_id, "error": str(e)})
+        finally:
+            tile.ready = False
+            if subscription is not None:
+                await websocket_stream_service.unsubscribe_camera_stream(subscription)
+
+    async def _focus_loop(self, camera_id: str, quality: str) -> None:
+        """Consume el stream principal de la cámara enfocada."""
+        subscription = None
+
+        try:
+            result = await websocket_stream_service.subscribe_camera_stream(
+                camera_id=camera_id,
+                subscriber_id=f"{self.client_id}:focus",
+                stream_config={
+                    'fps': self.focus_fps,
+                    'quality': quality,
+                    'buffer_size': 5,
+                    'check_connectivity': True
+                }
+            )
+            if not result['success']:
+                await self.send_status("tile_error", {
+                    "camera_id": camera_id,
+                    "error": result.get('error', 'Error desconocido')
+                })
+                self.focused = None
+                return
+
+            subscription = result['subscription']
+            loop = asyncio.get_running_loop()
+            last_sent = 0.0
+
+            while self.is_active and self.focused == camera_id:
+                frame = await subscription.get(timeout=0.5)
+                if frame is None:
+                    continue
+
+                now = loop.time()
+                if now - last_sent < (1.0 / self.focus_fps) * 0.9:
+                    continue
+
+                last_sent = now
+                self._queue_frame(camera_id, frame, focused=True)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[grid {self.client_id}] Error en stream enfocado {camera_id}: {e}")
+        finally:
+            if subscription is not None:
+                await websocket_stream_service.unsubscribe_camera_stream(subscription)
+
+    def _queue_frame(self, camera_id: str, frame: EncodedFrame, focused: bool) -> None:
+        """Deja el frame como pendiente del tile (reemplaza al anterior)."""
+        self._pending[camera_id] = (frame, focused)
+        self._wakeup.set()
+
+    def _ensure_writer(self) -> None:
+        """Inicia la tarea de escritura si no está activa."""
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(
+                self._writer_loop(),
+                name=f"grid_writer_{self.client_id}"
+            )
+
+    async def _writer_loop(self) -> None:
+        """Envía los frames pendientes de todos los tiles."""
+        while self.is_active:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            pending, self._pending = self._pending, {}
+            for camera_id, (frame, focused) in pending.items():
+                if camera_id not in self.tiles:
+                    continue
+                try:
+                    await self._send_tile_frame(camera_id, frame, focused)
+                except Exception as e:
+                    logger.info(f"[grid {self.client_id}] Envío fallido, cerrando mosaico: {e}")
+                    self.is_active = False
+                    return
+
+                tile = self.tiles.get(camera_id)
+                if tile is not None and not focused:
+                    tile.frames_sent += 1
+
+    async def _send_tile_frame(self, camera_id: str, frame: Any, focused: bool) -> None:
+        """
+        Envía un frame de tile según el transporte de la conexión.
+
+        Args:
+            camera_id: ID de la cámara del tile
+            frame: EncodedFrame compartido (o base64 en frames de error)
+            focused: True si procede del stream principal
+        """
+        if not self.connection:
+            return
+
+        if not isinstance(frame, EncodedFrame):
+            frame = EncodedFrame(camera_id=camera_id, payload=frame)
+
+        capture_timestamp = frame.capture_timestamp or time.time() * 1000
+
+        if self.transport == "binary":
+            await self.connection.send_bytes(pack_frame(
+                camera_id=camera_id,
+                sequence=frame.sequence,
+                capture_timestamp=capture_timestamp,
+                payload=frame.data,
+                frame_format=frame.encoding
+            ))
+            return
+
+        await self.connection.send_json({
+            "type": "tile",
+            "camera_id": camera_id,
+            "focused": focused,
+            "data": frame.base64,
+            "sequence": frame.sequence,
+            "capture_timestamp": capture_timestamp
+        })
+
+    async def send_error(self, error: str) -> None:
+        """Enviar error al cliente."""
+        if not self.connection:
+            return
+
+        await self.connection.send_json({
+            "type": "error",
+            "error": error,
+            "timestamp": datetime.now(timezone.utc)
+        })
+
+    async def send_status(self, status: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """Enviar estado del mosaico al cliente."""
+        if not self.connection or not self.is_active:
+            return
+
+        await self.connection.send_json({
+            "type": "status",
+            "status": status,
+            "data": data or {},
+            "timestamp": datetime.now(timezone.utc)
+        })
+
+    @staticmethod
+    def _clamp_fps(fps: Any) -> int:
+        """Limita el FPS de un tile al rango permitido."""
+        try:
+            fps = int(fps)
+        except (TypeError, ValueError):
+            fps = settings.GRID_TILE_FPS
+        return max(MIN_TILE_FPS, min(fps, MAX_TILE_FPS))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtiene el estado de la conexión de mosaico."""
+        return {
+            "client_id": self.client_id,
+            "transport": self.transport,
+            "focused": self.focused,
+            "tiles": [tile.to_dict() for tile in self.tiles.values()],
+            "uptime_seconds": round((datetime.utcnow() - self.start_time).total_seconds(), 1)
+        }
+
+
+class GridManager:
+    """Gestor global de conexiones de mosaico."""
+
+    def __init__(self):
+        self.active_grids: Dict[str, GridStreamHandler] = {}
+
+    async def handle_grid_connection(self, websocket: WebSocket, client_id: str) -> None:
+        """
+        Manejar una conexión de mosaico hasta su cierre.
+
+        Args:
+            websocket: WebSocket de FastAPI
+            client_id: ID del cliente
+        """
+        await manager.connect(websocket, client_id)
+        await websocket_stream_service.initialize()
+
+        handler = GridStreamHandler(websocket, client_id)
+        self.active_grids[client_id] = handler
+
+        try:
+            while handler.is_active:
+                data = await websocket.receive_json()
+                await handler.handle_message(data)
+        except Exception as e:
+            error_msg = str(e)
+            if not ("WebSocket" in error_msg and "not connected" in error_msg):
+                logger.debug(f"Conexión de mosaico {client_id} finalizada: {e}")
+        finally:
+            await self.cleanup_grid(client_id)
+
+    async def cleanup_grid(self, client_id: str) -> None:
+        """
+        Liberar los streams de una conexión de mosaico.
+
+        Args:
+            client_id: ID del cliente
+        """
+        handler = self.active_grids.pop(client_id, None)
+        try:
+            if handler is not None:
+                await handler.close()
+            await manager.disconnect(client_id)
+        except Exception as e:
+            logger.error(f"Error durante cleanup de mosaico: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtener estadísticas de las conexiones de mosaico."""
+        grids: List[Dict[str, Any]] = [handler.get_stats() for handler in self.active_grids.values()]
+        return {
+            "active_grids": len(grids),
+            "total_tiles": sum(len(grid["tiles"]) for grid in grids),
+            "grids": grids
+        }
+
+
+# Instancia global del gestor de mosaicos
+grid_manager = GridManager()
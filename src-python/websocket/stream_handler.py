@@ -9,7 +9,7 @@ import asyncio
 import logging
 import random
 import time
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional, Union
 from datetime import datetime, timezone
 import base64
 import numpy as np
@@ -17,11 +17,29 @@ import cv2
 
 from fastapi import WebSocket
 from .connection_manager import manager, WebSocketConnection
-from services.websocket_stream_service import websocket_stream_service
+from .binary_frame import pack_frame, describe_protocol
+from .congestion_controller import CongestionController, ladder_index_for
+from services.websocket_stream_service import QUALITY_PRESETS, websocket_stream_service
 from models.streaming.stream_metrics import StreamMetrics
+from models.streaming.frame_model import EncodedFrame
+from services.video.frame_broadcast_hub import FrameSubscription
 
 logger = logging.getLogger(__name__)
 
+# Transportes de frames soportados por conexión
+FRAME_TRANSPORTS = ("json", "binary")
+
+# Cada cuántos frames binarios se envían métricas en un mensaje JSON aparte
+BINARY_METRICS_INTERVAL = 30
+
+# Mejor escalón de calidad adaptativa permitido según la calidad pedida,
+# cuando la codificación compartida es de un preset distinto
+QUALITY_CEILINGS = {
+    "high": 0,
+    "medium": 0,
+    "low": ladder_index_for(*QUALITY_PRESETS["low"])
+}
+
 
 class StreamHandler:
     """
@@ -42,6 +60,11 @@ class StreamHandler:
         self.quality = "medium"
         self.fps = 30
         self.format = "jpeg"
+        self.transport = "json"
+        
+        # Control de congestión por cliente
+        self.adaptive = True
+        self.congestion = CongestionController()
         
         # Métricas
         self.frame_count = 0
@@ -53,6 +76,8 @@ class StreamHandler:
         # Control de FPS para frames simulados
         self.frame_interval = 1.0 / self.fps
         self.last_sent_time = 0
+        # Próximo envío del stream compartido (plazo acumulado)
+        self.next_send_time = 0.0
         
         # El servicio se inicializará cuando sea necesario
         self._service_initialized = False
@@ -95,23 +120,35 @@ class StreamHandler:
             await self.send_status("already_streaming")
             return
         
+        transport = params.get("transport", "json")
+        if transport not in FRAME_TRANSPORTS:
+            await self.send_error(f"Invalid transport: {transport}")
+            return
+        
         # Configurar parámetros
         self.quality = params.get("quality", "medium")
         self.fps = params.get("fps", 30)
         self.format = params.get("format", "jpeg")
+        self.transport = transport
         self.frame_interval = 1.0 / self.fps
+        self.adaptive = bool(params.get("adaptive", True))
+        self._apply_quality_ceiling()
         
         # Iniciar streaming
         self.is_streaming = True
         self.start_time = datetime.utcnow()
         self.frame_count = 0
+        self.next_send_time = 0.0
         
-        await self.send_status("stream_started")
+        status_data = {"transport": self.transport}
+        if self.transport == "binary":
+            status_data["binary_protocol"] = describe_protocol(self.camera_id)
+        await self.send_status("stream_started", status_data)
         
         # Iniciar loop de streaming
         asyncio.create_task(self.stream_loop())
         
-        logger.info(f"[{self.camera_id}] Stream started: {self.quality} @ {self.fps}fps")
+        logger.info(f"[{self.camera_id}] Stream started: {self.quality} @ {self.fps}fps ({self.transport})")
     
     async def stop_stream(self) -> None:
         """Detener streaming de video."""
@@ -136,10 +173,23 @@ class StreamHandler:
             return
         
         self.quality = quality
+        self._apply_quality_ceiling()
         await self.send_status("quality_updated", {"quality": quality})
         
         logger.info(f"[{self.camera_id}] Quality updated: {quality}")
     
+    def _apply_quality_ceiling(self) -> None:
+        """
+        Fija el techo de calidad adaptativa según la calidad pedida.
+        
+        Si la codificación compartida ya usa el preset pedido, el frame
+        compartido sirve tal cual y no hace falta recodificar.
+        """
+        ceiling = QUALITY_CEILINGS.get(self.quality, 0)
+        if ceiling and websocket_stream_service.get_stream_quality(self.camera_id) == self.quality:
+            ceiling = 0
+        self.congestion.set_ceiling(ceiling)
+    
     async def update_fps(self, fps: int) -> None:
         """
         Actualizar FPS del stream.
@@ -218,12 +268,24 @@ class StreamHandler:
         
         return base64.b64encode(buffer).decode('utf-8')
     
-    async def send_frame(self, frame_data: str, capture_timestamp: Optional[float] = None) -> None:
+    async def send_frame(
+        self,
+        frame_data: Union[str, EncodedFrame],
+        capture_timestamp: Optional[float] = None
+    ) -> None:
         """
         Enviar frame al cliente con timestamp de captura para cálculo de latencia.
         
+        En transporte binario se envían los bytes del JPEG con una cabecera
+        fija; en transporte JSON se mantiene el mensaje base64 legado. El
+        frame se deja en la cola de salida acotada de la conexión, que
+        descarta los más antiguos si el cliente no da abasto.
+        
+        Los frames del pipeline real registran las latencias de base64,
+        envío y total desde la captura.
+        
         Args:
-            frame_data: Frame en base64
+            frame_data: Frame en base64 o frame codificado compartido
             capture_timestamp: Timestamp de captura en milisegundos (opcional)
         """
         # Verificar que la conexión sigue activa
@@ -236,14 +298,29 @@ class StreamHandler:
             logger.debug(f"[{self.camera_id}] WebSocket desconectado, ignorando frame")
             return
         
-        # Obtener métricas sin latencia (el frontend la calculará)
-        metrics = self.calculate_metrics()
-        
         # Si no hay timestamp de captura, usar el actual
         if capture_timestamp is None:
             capture_timestamp = time.time() * 1000  # Convertir a milisegundos
             logger.warning(f"[{self.camera_id}] Frame sin timestamp de captura, usando timestamp actual")
         
+        if self.transport == "binary":
+            await self._send_binary_frame(frame_data, capture_timestamp)
+            return
+        
+        on_sent = self._send_tracer(frame_data)
+        sequence = self.frame_count
+        if isinstance(frame_data, EncodedFrame):
+            sequence = frame_data.sequence
+            encoded = frame_data
+            needs_base64 = not encoded.base64_ready
+            start = time.perf_counter()
+            frame_data = encoded.base64
+            if needs_base64:
+                self._record_latency(encoded, "base64", (time.perf_counter() - start) * 1000)
+        
+        # Obtener métricas sin latencia (el frontend la calculará)
+        metrics = self.calculate_metrics()
+        
         # Crear timestamp ISO para el mensaje
         capture_time_iso = datetime.fromtimestamp(capture_timestamp / 1000, tz=timezone.utc).isoformat()
         
@@ -251,15 +328,83 @@ class StreamHandler:
             "type": "frame",
             "camera_id": self.camera_id,
             "data": frame_data,
-            "timestamp": datetime.utcnow().isoformat() + "Z",  # Timestamp del mensaje
+            "timestamp": datetime.now(timezone.utc),  # Timestamp del mensaje
             "capture_timestamp": capture_time_iso,  # Timestamp de captura del frame
             "frame_number": self.frame_count,
+            "sequence": sequence,
             "metrics": metrics
         }
         
         logger.debug(f"[{self.camera_id}] Enviando frame #{self.frame_count} con capture_timestamp: {capture_time_iso}")
         
-        await self.connection.send_json(message)
+        self.connection.queue_frame(message, on_sent=on_sent)
+    
+    def _record_latency(self, frame: EncodedFrame, stage: str, latency_ms: float) -> None:
+        """Registra la latencia de una etapa en las métricas del stream del frame."""
+        websocket_stream_service.record_frame_latency(frame.camera_id, stage, latency_ms)
+    
+    def _send_tracer(self, frame_data: Union[str, EncodedFrame]) -> Optional[Callable[[float], None]]:
+        """
+        Crea el callback que mide el envío y la latencia total de un frame.
+        
+        Args:
+            frame_data: Frame a enviar
+            
+        Returns:
+            Callback para ``queue_frame`` o None si el frame no viene del pipeline
+        """
+        if not isinstance(frame_data, EncodedFrame):
+            return None
+        
+        def on_sent(send_ms: float) -> None:
+            self._record_latency(frame_data, "send", send_ms)
+            if frame_data.captured_at is not None:
+                self._record_latency(
+                    frame_data, "total", (time.monotonic() - frame_data.captured_at) * 1000
+                )
+        
+        return on_sent
+    
+    async def _send_binary_frame(
+        self,
+        frame_data: Union[str, EncodedFrame],
+        capture_timestamp: float
+    ) -> None:
+        """
+        Enviar frame como mensaje binario (cabecera + bytes JPEG).
+        
+        Args:
+            frame_data: Frame en base64 o frame codificado compartido
+            capture_timestamp: Timestamp de captura en milisegundos
+        """
+        on_sent = self._send_tracer(frame_data)
+        if not isinstance(frame_data, EncodedFrame):
+            frame_data = EncodedFrame(
+                camera_id=self.camera_id,
+                payload=frame_data,
+                sequence=self.frame_count,
+                encoding=self.format
+            )
+        
+        message = pack_frame(
+            camera_id=self.camera_id,
+            sequence=frame_data.sequence,
+            capture_timestamp=capture_timestamp,
+            payload=frame_data.data,
+            frame_format=frame_data.encoding
+        )
+        
+        self.connection.queue_frame(message, on_sent=on_sent)
+        
+        # Las métricas viajan aparte para no inflar cada frame binario
+        if self.frame_count % BINARY_METRICS_INTERVAL == 0:
+            await self.connection.send_json({
+                "type": "metrics",
+                "camera_id": self.camera_id,
+                "frame_number": self.frame_count,
+                "metrics": self.calculate_metrics(),
+                "timestamp": datetime.now(timezone.utc)
+            })
     
     async def send_error(self, error: str) -> None:
         """
@@ -282,7 +427,7 @@ class StreamHandler:
             "type": "error",
             "camera_id": self.camera_id,
             "error": error,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": datetime.now(timezone.utc)
         }
         
         await self.connection.send_json(message)
@@ -310,7 +455,7 @@ class StreamHandler:
             "camera_id": self.camera_id,
             "status": status,
             "data": data or {},
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": datetime.now(timezone.utc)
         }
         
         await self.connection.send_json(message)
@@ -327,11 +472,17 @@ class StreamHandler:
         """
         Intenta streaming real desde la cámara.
         
+        El handler se suscribe al stream compartido de la cámara, de modo
+        que varios clientes viendo la misma cámara reutilizan una sola
+        captura y codificación.
+        
         Returns:
             True si el streaming real funciona, False si hay que usar mock
         """
         logger.info(f"Iniciando conexión real para cámara {self.camera_id}")
         
+        subscription = None
+        
         try:
             # Configurar opciones del stream
             stream_config = {
@@ -341,72 +492,31 @@ class StreamHandler:
                 'check_connectivity': True
             }
             
-            # Callback para frames
-            async def on_frame_callback(camera_id: str, frame_data: str):
-                try:
-                    # Verificar que el WebSocket sigue conectado
-                    if not self.connection or self.websocket.client_state.value != 1:
-                        logger.debug("WebSocket desconectado, ignorando frame")
-                        return
-                    
-                    # Capturar timestamp cuando recibimos el frame
-                    capture_timestamp = time.time() * 1000  # En milisegundos
-                    
-                    # Enviar frame con timestamp de captura
-                    await self.send_frame(frame_data, capture_timestamp)
-                    self.frame_count += 1
-                    
-                    # Log cada 30 frames con timestamp
-                    if self.frame_count % 30 == 0:
-                        logger.info(f"[{self.camera_id}] Frames enviados: {self.frame_count} (último timestamp: {capture_timestamp:.0f}ms)")
-                    
-                    # Log el primer frame
-                    if self.frame_count == 1:
-                        logger.info(f"Primer frame recibido. Tamaño: {len(frame_data)} bytes")
-                        
-                except Exception as e:
-                    if "WebSocket" in str(e) or "Cannot call" in str(e):
-                        logger.info("WebSocket cerrado, deteniendo stream")
-                        self.is_streaming = False
-                    else:
-                        logger.error(f"Error procesando frame: {e}")
-            
-            # Convertir callback async a sync
-            def sync_frame_callback(camera_id: str, frame_data: str):
-                asyncio.create_task(on_frame_callback(camera_id, frame_data))
-            
-            # Iniciar stream a través del servicio
-            result = await websocket_stream_service.start_camera_stream(
+            # Suscribirse al stream compartido de la cámara
+            result = await websocket_stream_service.subscribe_camera_stream(
                 camera_id=self.camera_id,
-                stream_config=stream_config,
-                on_frame_callback=sync_frame_callback
+                subscriber_id=self.client_id,
+                stream_config=stream_config
             )
             
             if result['success']:
-                logger.info("Streaming real iniciado exitosamente")
+                subscription = result['subscription']
+                # El preset de la captura compartida ya es conocido
+                self._apply_quality_ceiling()
+                logger.info(
+                    "Streaming real iniciado exitosamente"
+                    + (" (stream compartido)" if result.get('shared') else "")
+                )
                 await self.send_status("connected", {
                     "message": "Streaming real activo",
                     "camera_id": self.camera_id,
-                    "protocol": result.get('protocol', 'RTSP')
+                    "protocol": result.get('protocol', 'RTSP'),
+                    "shared": result.get('shared', False),
+                    "viewers": websocket_stream_service.get_viewer_count(self.camera_id)
                 })
                 
-                # Mantener el stream activo
-                last_health_check = asyncio.get_event_loop().time()
-                health_check_interval = 5.0
-                
-                while self.is_streaming and self.connection:
-                    current_time = asyncio.get_event_loop().time()
-                    
-                    # Verificar salud del stream
-                    if current_time - last_health_check > health_check_interval:
-                        metrics = await websocket_stream_service.get_stream_metrics(self.camera_id)
-                        if metrics:
-                            logger.debug(f"Stream saludable: {metrics.get('frames_processed', 0)} frames procesados")
-                        else:
-                            logger.warning("No se pueden obtener métricas del stream")
-                        last_health_check = current_time
-                    
-                    await asyncio.sleep(0.1)
+                # Consumir frames mientras el stream siga activo
+                await self.consume_subscription(subscription)
                 
                 return True
             else:
@@ -423,9 +533,149 @@ class StreamHandler:
             await self.send_error(str(e))
             return False
         finally:
-            # Limpieza
-            if websocket_stream_service.is_streaming(self.camera_id):
-                await websocket_stream_service.stop_camera_stream(self.camera_id)
+            # Limpieza: la captura solo se detiene al salir el último visor
+            if subscription is not None:
+                await websocket_stream_service.unsubscribe_camera_stream(subscription)
+    
+    async def consume_subscription(self, subscription: FrameSubscription) -> None:
+        """
+        Envía al cliente los frames de una suscripción al stream compartido.
+        
+        Aplica el límite de FPS del cliente y el control de congestión hasta
+        que se detenga el stream o se cierre la conexión.
+        
+        Args:
+            subscription: Suscripción del hub de difusión
+        """
+        loop = asyncio.get_event_loop()
+        last_health_check = loop.time()
+        health_check_interval = 5.0
+        
+        while self.is_streaming and self.connection:
+            frame_data = await subscription.get(timeout=0.5)
+            current_time = loop.time()
+            
+            # Verificar salud del stream
+            if current_time - last_health_check > health_check_interval:
+                metrics = await websocket_stream_service.get_stream_metrics(subscription.camera_id)
+                if metrics:
+                    logger.debug(f"Stream saludable: {metrics.get('frames_processed', 0)} frames procesados")
+                else:
+                    logger.warning("No se pueden obtener métricas del stream")
+                last_health_check = current_time
+            
+            if frame_data is None:
+                continue
+            
+            # Respetar los FPS de este cliente aunque la captura compartida vaya más rápido
+            if current_time < self.next_send_time:
+                continue
+            
+            # Saltar frames si el enlace del cliente está congestionado
+            if self.adaptive and not self.congestion.should_send():
+                continue
+            
+            self._advance_send_deadline(current_time)
+            self.last_sent_time = current_time
+            if isinstance(frame_data, EncodedFrame) and frame_data.encoded_at is not None:
+                self._record_latency(
+                    frame_data, "dispatch", (time.monotonic() - frame_data.encoded_at) * 1000
+                )
+            frame_data = await self._adapt_frame(frame_data)
+            await self._deliver_frame(frame_data)
+            await self._update_congestion()
+    
+    def _advance_send_deadline(self, current_time: float) -> None:
+        """
+        Avanza el plazo del siguiente envío en un intervalo de frame.
+        
+        El plazo se acumula en lugar de medirse desde el último envío: los
+        frames compartidos llegan con la cadencia de la cámara, y medir
+        huecos descartaría frames aunque el cliente pida los mismos FPS.
+        Tras una pausa solo se concede un intervalo de holgura, para no
+        enviar una ráfaga.
+        
+        Args:
+            current_time: Instante del envío (reloj del event loop)
+        """
+        self.next_send_time = max(self.next_send_time, current_time - self.frame_interval)
+        self.next_send_time += self.frame_interval
+    
+    async def _deliver_frame(self, frame_data: Union[str, EncodedFrame]) -> None:
+        """
+        Envía un frame del stream real y actualiza contadores.
+        
+        Args:
+            frame_data: Frame a enviar
+        """
+        try:
+            # Verificar que el WebSocket sigue conectado
+            if not self.connection or self.websocket.client_state.value != 1:
+                logger.debug("WebSocket desconectado, ignorando frame")
+                return
+            
+            # Timestamp sellado en el thread de captura, no al llegar aquí
+            capture_timestamp = (
+                frame_data.capture_timestamp if isinstance(frame_data, EncodedFrame) else None
+            )
+            
+            # Enviar frame con timestamp de captura
+            await self.send_frame(frame_data, capture_timestamp)
+            self.frame_count += 1
+            
+            # Log cada 30 frames con timestamp
+            if self.frame_count % 30 == 0:
+                logger.info(f"[{self.camera_id}] Frames enviados: {self.frame_count} (último timestamp: {capture_timestamp or 0:.0f}ms)")
+            
+            # Log el primer frame
+            if self.frame_count == 1:
+                size = frame_data.size_bytes if isinstance(frame_data, EncodedFrame) else len(frame_data)
+                logger.info(f"Primer frame recibido. Tamaño: {size} bytes")
+                
+        except Exception as e:
+            if "WebSocket" in str(e) or "Cannot call" in str(e):
+                logger.info("WebSocket cerrado, deteniendo stream")
+                self.is_streaming = False
+            else:
+                logger.error(f"Error procesando frame: {e}")
+    
+    async def _adapt_frame(self, frame_data: Union[str, EncodedFrame]) -> Union[str, EncodedFrame]:
+        """
+        Recodifica el frame según el escalón de calidad actual del cliente.
+        
+        Args:
+            frame_data: Frame compartido
+            
+        Returns:
+            Frame a enviar (el compartido si no hay degradación)
+        """
+        if not self.adaptive or not self.congestion.is_degraded:
+            return frame_data
+        
+        if not isinstance(frame_data, EncodedFrame) or frame_data.source is None:
+            return frame_data
+        
+        level = self.congestion.level
+        return await websocket_stream_service.encode_frame_variant(
+            frame_data, level.quality, level.max_width
+        )
+    
+    async def _update_congestion(self) -> None:
+        """Alimenta el controlador con el último envío y notifica cambios."""
+        if not self.adaptive or not self.connection:
+            return
+        
+        new_level = self.congestion.record_send(
+            self.connection.last_send_latency_ms,
+            self.connection.bytes_in_flight
+        )
+        
+        if new_level:
+            logger.info(
+                f"[{self.camera_id}] Calidad adaptada para {self.client_id}: "
+                f"q={new_level.quality} w={new_level.max_width} skip={new_level.frame_skip}"
+            )
+            await self.send_status("quality_adapted", self.congestion.get_stats())
     
     async def _run_mock_stream(self) -> None:
         """Ejecuta streaming con frames simulados."""
@@ -476,11 +726,13 @@ class StreamHandler:
                 "target_fps": self.fps,
                 "quality": self.quality,
                 "format": self.format,
+                "transport": self.transport,
                 "frames_sent": self.frame_count,
                 "uptime_seconds": round(elapsed, 1),
                 # Métricas adicionales del modelo (sin latencia)
                 "avg_fps": round(self.metrics.get_average_fps(), 1),
-                "health_score": round(self.metrics.get_health_score(), 1)
+                "health_score": round(self.metrics.get_health_score(), 1),
+                "adaptive": self.congestion.get_stats() if self.adaptive else None
             }
         except Exception as e:
             logger.error(f"[{self.camera_id}] Error calculando métricas: {e}")
@@ -586,12 +838,18 @@ class StreamManager:
         """
         Obtener estadísticas de streams activos.
         
+        Incluye, por cliente, el estado de su cola de salida (profundidad y
+        frames descartados) y los totales de todas las colas.
+        
         Returns:
             Estadísticas de streams
         """
         stats = {
             "active_cameras": len(self.active_streams),
             "total_clients": sum(len(clients) for clients in self.active_streams.values()),
+            "queued_frames": 0,
+            "queued_bytes": 0,
+            "frames_dropped": 0,
             "cameras": {}
         }
         
@@ -603,10 +861,16 @@ class StreamManager:
             
             for client_id, handler in clients.items():
                 if handler.is_streaming:
+                    send_queue = handler.connection.get_queue_stats() if handler.connection else None
                     stats["cameras"][camera_id]["clients"].append({
                         "client_id": client_id,
-                        "metrics": handler.calculate_metrics()
+                        "metrics": handler.calculate_metrics(),
+                        "send_queue": send_queue
                     })
+                    if send_queue:
+                        stats["queued_frames"] += send_queue["queued_frames"]
+                        stats["queued_bytes"] += send_queue["queued_bytes"]
+                        stats["frames_dropped"] += send_queue["frames_dropped"]
         
         return stats
 